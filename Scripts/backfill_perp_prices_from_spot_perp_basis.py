@@ -31,6 +31,7 @@ from datetime import datetime, timedelta, timezone
 import psycopg2
 
 from config import settings
+from data.rate_tracker import RateTracker
 
 PLACEHOLDER_PRICE = 10.10101
 
@@ -231,6 +232,12 @@ def main():
             updated = execute_update(conn, cutoff_datetime)
             print_summary(total, updated, dry_run=False)
 
+            # Corrected prices feed PnL through pnl_rates_hourly; refresh_pnl_rates() also clears
+            # the chart cache computed from it
+            tracker = RateTracker(use_cloud=True, connection_url=settings.SUPABASE_URL)
+            rebuilt = tracker.refresh_pnl_rates(start=cutoff_datetime)
+            print(f"  Rebuilt {rebuilt:,} pnl_rates_hourly rows")
+
         return 0
 
     except Exception as e:
@@ -36,6 +36,7 @@ from collections import defaultdict
 import psycopg2
 
 from config import settings
+from data.rate_tracker import RateTracker
 
 PLACEHOLDER_PRICE = 10.10101
 
@@ -336,6 +337,12 @@ def main():
                 print(f"\nApplying UPDATE...")
                 updated = execute_update(conn, anchor)
                 print(f"  Updated {updated:,} rows.")
+
+                # Corrected prices feed PnL through pnl_rates_hourly; refresh_pnl_rates() also clears
+                # the chart cache computed from it
+                tracker = RateTracker(use_cloud=True, connection_url=settings.SUPABASE_URL)
+                rebuilt = tracker.refresh_pnl_rates()
+                print(f"  Rebuilt {rebuilt:,} pnl_rates_hourly rows.")
             else:
                 print("\nNo rows to update.")
 
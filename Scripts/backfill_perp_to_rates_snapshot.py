@@ -42,6 +42,7 @@ import psycopg2
 import psycopg2.extras
 
 from config import settings
+from data.rate_tracker import RateTracker
 from utils.time_helpers import to_seconds, to_datetime_str
 
 DUMMY_PRICE = 10.10101  # Same placeholder used in live refresh path (bluefin_reader.py)
@@ -401,6 +402,12 @@ def main():
             stats['matched'] = inserted
             print_summary(stats, rows_to_insert, dry_run=False)
 
+            # Inserted use_for_pnl rows feed PnL through pnl_rates_hourly; refresh_pnl_rates() also clears
+            # the chart cache computed from it
+            tracker = RateTracker(use_cloud=True, connection_url=settings.SUPABASE_URL)
+            rebuilt = tracker.refresh_pnl_rates(start=cutoff_datetime)
+            print(f"  Rebuilt {rebuilt:,} pnl_rates_hourly rows")
+
         return 0
 
     except Exception as e:
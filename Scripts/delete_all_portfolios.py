@@ -19,7 +19,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from dashboard.dashboard_utils import get_db_connection
+from data.db_utils import get_db_connection
 from analysis.portfolio_service import PortfolioService
 
 
@@ -15,7 +15,7 @@ import os
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from dashboard.dashboard_utils import get_db_connection
+from data.db_utils import get_db_connection
 
 
 def purge_all_positions(force=False):
@@ -0,0 +1,195 @@
+"""
+Background delivery for Slack notifications.
+
+SlackNotifier.send_message() used to POST inline, so a slow or failing webhook
+(10s timeout, up to 3 retries with backoff) was added to the refresh. Once start()
+is called, send_message() validates and builds the payload, hands the POST to
+submit() and returns; a single worker thread delivers queued notifications in
+order:
+
+- the queue is bounded (settings.SLACK_QUEUE_SIZE); when it is full new
+  notifications are dropped and logged instead of blocking the refresh
+- a failed POST is retried up to settings.SLACK_SEND_ATTEMPTS times with
+  exponential backoff (settings.SLACK_RETRY_BACKOFF_SECONDS × 2^n)
+- stop() - registered with atexit by start() - drains the queue before the process
+  exits, waiting at most settings.SLACK_DRAIN_TIMEOUT_SECONDS
+
+Without start() (dashboard, scripts) send_message() stays synchronous.
+
+digest() coalesces alerts independently of the queue: inside
+
+    with notification_queue.digest('rebalance', notifier.send_rebalance_digest):
+        auto_rebalance_positions(...)
+
+SlackNotifier.alert_position_rebalanced() calls are collected (one per position,
+first wins) and sent as one message when the block exits.
+"""
+
+import atexit
+import queue
+import threading
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional
+
+from config import settings
+
+_lock = threading.Lock()
+_queue: Optional[queue.Queue] = None
+_worker: Optional[threading.Thread] = None
+_deadline: Optional[float] = None  # time.monotonic() by which stop() gives up retrying
+_stats = {'queued': 0, 'sent': 0, 'failed': 0, 'dropped': 0, 'retries': 0}
+_digests: Dict[str, dict] = {}  # group -> {key: item}, while a digest() block is open
+_STOP = object()
+
+
+def start(maxsize: Optional[int] = None) -> None:
+    """
+    Start the delivery thread (idempotent). send_message() queues from now on.
+
+    Args:
+        maxsize: Queue bound (default settings.SLACK_QUEUE_SIZE)
+    """
+    global _queue, _worker, _deadline
+    with _lock:
+        if _worker is not None and _worker.is_alive():
+            return
+        _queue = queue.Queue(maxsize=maxsize or settings.SLACK_QUEUE_SIZE)
+        _deadline = None
+        _worker = threading.Thread(target=_run, args=(_queue,), name='slack-notifications', daemon=True)
+        _worker.start()
+    atexit.register(stop)
+    print(f"[SLACK QUEUE] Background delivery started (max {_queue.maxsize} queued)")
+
+
+def is_running() -> bool:
+    return _worker is not None and _worker.is_alive() and _deadline is None
+
+
+def submit(send: Callable[[], bool], description: str) -> bool:
+    """
+    Queue send() for the delivery thread.
+
+    Args:
+        send: Performs one delivery attempt; returns True on success
+        description: Short label for logs (e.g. the message's first line)
+
+    Returns:
+        True if queued, False if the queue is full (notification dropped)
+    """
+    try:
+        _queue.put_nowait((send, description))
+    except queue.Full:
+        _stats['dropped'] += 1
+        print(f"[SLACK QUEUE] WARNING: Queue full ({_queue.maxsize}) - dropped: {description}")
+        return False
+    _stats['queued'] += 1
+    return True
+
+
+def _deliver(send: Callable[[], bool], description: str) -> None:
+    """Run send() with retries; never raises."""
+    attempts = max(1, settings.SLACK_SEND_ATTEMPTS)
+    for attempt in range(attempts):
+        try:
+            if send():
+                _stats['sent'] += 1
+                return
+        except Exception as e:
+            print(f"[SLACK QUEUE] Delivery error: {e}")
+        if attempt == attempts - 1:
+            break
+        delay = settings.SLACK_RETRY_BACKOFF_SECONDS * 2 ** attempt
+        if _deadline is not None and time.monotonic() + delay > _deadline:
+            break  # Shutting down - no time left for another attempt
+        _stats['retries'] += 1
+        time.sleep(delay)
+    _stats['failed'] += 1
+    print(f"[SLACK QUEUE] ❌ Giving up after {attempt + 1} attempt(s): {description}")
+
+
+def _run(q: queue.Queue) -> None:
+    while True:
+        item = q.get()
+        try:
+            if item is _STOP:
+                return
+            _deliver(*item)
+        finally:
+            q.task_done()
+
+
+def stop(timeout: Optional[float] = None) -> int:
+    """
+    Deliver what is queued, then stop the delivery thread. Safe to call twice.
+
+    Args:
+        timeout: Max seconds to wait (default settings.SLACK_DRAIN_TIMEOUT_SECONDS)
+
+    Returns:
+        Number of notifications still undelivered when the wait ended
+    """
+    global _deadline
+    with _lock:
+        worker, q = _worker, _queue
+        if worker is None or not worker.is_alive() or _deadline is not None:
+            return 0
+        timeout = settings.SLACK_DRAIN_TIMEOUT_SECONDS if timeout is None else timeout
+        _deadline = time.monotonic() + timeout
+
+    pending = q.qsize()
+    if pending:
+        print(f"[SLACK QUEUE] Draining {pending} queued notification(s) (max {timeout:.0f}s)")
+    try:
+        q.put(_STOP, timeout=max(0.0, _deadline - time.monotonic()))
+    except queue.Full:
+        pass
+    worker.join(max(0.0, _deadline - time.monotonic()))
+
+    undelivered = 0 if not worker.is_alive() else q.qsize()
+    if undelivered:
+        print(f"[SLACK QUEUE] WARNING: {undelivered} notification(s) not delivered before shutdown")
+    return undelivered
+
+
+def stats() -> dict:
+    """Delivery counters since start (for the refresh daemon's health endpoint)."""
+    return {**_stats, 'pending': _queue.qsize() if _queue is not None else 0, 'running': is_running()}
+
+
+@contextmanager
+def digest(group: str, flush: Callable[[List[object]], None]):
+    """
+    Collect collect(group, ...) items while the block runs; flush(items) once on exit.
+
+    Args:
+        group: Digest name (e.g. 'rebalance')
+        flush: Called with the collected items (in order) if there are any
+    """
+    with _lock:
+        _digests[group] = {}
+    try:
+        yield
+    finally:
+        with _lock:
+            items = list(_digests.pop(group, {}).values())
+        if items:
+            try:
+                flush(items)
+            except Exception as e:
+                print(f"[SLACK QUEUE] WARNING: Sending {group} digest failed: {e}")
+
+
+def collect(group: str, key: str, item: object) -> bool:
+    """
+    Add item to the open digest for group; a repeated key keeps the first item.
+
+    Returns:
+        False if no digest(group) block is open - the caller should send it now
+    """
+    with _lock:
+        pending = _digests.get(group)
+        if pending is None:
+            return False
+        pending.setdefault(key, item)
+        return True
@@ -13,6 +13,7 @@ import pandas as pd  # ADDED: Required for DataFrame operations
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 from config import settings
+from analysis.result_schema import with_display_columns
 from utils.time_helpers import to_datetime_str  # ADDED: CRITICAL - required for timestamp formatting
 
 
@@ -106,17 +107,18 @@ class SlackNotifier:
         """
         Send a message to Slack with retry logic and timeout
 
+        Once alerts.notification_queue.start() has been called the POST runs on the
+        background delivery thread and this returns as soon as it is queued.
+
         Args:
             message: Plain text message (fallback)
             blocks: Slack blocks for rich formatting (for classic webhooks)
             variables: Dictionary of variables for Slack Workflows
 
         Returns:
-            True if successful, False otherwise
+            True if sent (or queued), False otherwise
         """
-        import time
-        from requests.adapters import HTTPAdapter
-        from urllib3.util.retry import Retry
+        from alerts import notification_queue
 
         if not self.webhook_url or self.webhook_url == "YOUR_SLACK_WEBHOOK_URL_HERE":
             print("WARNING:  Slack webhook not configured. Set SLACK_WEBHOOK_URL in config/settings.py")
@@ -143,9 +145,29 @@ class SlackNotifier:
         if is_workflow and payload_size > 3000:
             print(f"[SLACK NOTIFICATION] WARNING: Payload size ({payload_size} bytes) exceeds recommended limit (3000 bytes)")
 
+        if notification_queue.is_running():
+            # The delivery thread retries with its own backoff
+            description = (message or '').splitlines()[0][:80] if message else 'notification'
+            return notification_queue.submit(lambda: self._post(payload_str, retries=0), description)
+        return self._post(payload_str, retries=3)
+
+    def _post(self, payload_str: str, retries: int = 3) -> bool:
+        """
+        POST a JSON payload to the webhook.
+
+        Args:
+            payload_str: JSON body built by send_message()
+            retries: urllib3 retries for 429/5xx responses and connection errors
+
+        Returns:
+            True if Slack answered 200, False otherwise (never raises)
+        """
+        from requests.adapters import HTTPAdapter
+        from urllib3.util.retry import Retry
+
         # Configure retry strategy for transient failures
         retry_strategy = Retry(
-            total=3,  # Max 3 retries
+            total=retries,  # Max retries
             backoff_factor=1,  # Wait 1s, 2s, 4s between retries
             status_forcelist=[429, 500, 502, 503, 504],  # Retry on these HTTP codes
             allowed_methods=["POST"],  # Retry POST requests
@@ -190,7 +212,7 @@ class SlackNotifier:
             return False
         finally:
             session.close()
-    
+
     def alert_high_apr(self, strategy: Dict) -> bool:
         """
         Alert when a high APR opportunity is found
@@ -333,6 +355,11 @@ class SlackNotifier:
                 all_results.get('is_levered', True) == False
             ].nlargest(3, _apr_col) if 'is_levered' in all_results.columns else pd.DataFrame()
 
+            # Derive the display fields the summary line needs (core schema carries net_apr only)
+            filtered_set1 = with_display_columns(filtered_set1, ['apr5'])
+            filtered_set2 = with_display_columns(filtered_set2, ['apr5'])
+            filtered_set3 = with_display_columns(filtered_set3, ['apr5']) if not filtered_set3.empty else filtered_set3
+
             # Build formatted lines
             set1_lines = [format_strategy_summary_line(row.to_dict(), liquidation_distance) for _, row in filtered_set1.iterrows()]
             set2_lines = [format_strategy_summary_line(row.to_dict(), liquidation_distance) for _, row in filtered_set2.iterrows()]
@@ -660,6 +687,61 @@ class SlackNotifier:
             }
         ]
 
+        # Inside a refresh's rebalance digest: sent together by send_rebalance_digest()
+        from alerts import notification_queue
+        if notification_queue.collect('rebalance', position_id, (message, blocks, variables)):
+            return True
+
+        return self.send_message(message, blocks, variables)
+
+    def send_rebalance_digest(self, alerts: List[tuple]) -> bool:
+        """
+        Send the rebalance alerts collected during one refresh as a single message.
+
+        Args:
+            alerts: (message, blocks, variables) per rebalanced position, as built by
+                    alert_position_rebalanced() (collected via notification_queue.digest())
+
+        Returns:
+            True if successful
+        """
+        if len(alerts) == 1:
+            return self.send_message(*alerts[0])
+
+        messages = [message for message, _, _ in alerts]
+        message = f"🔄 {len(alerts)} positions rebalanced\n\n" + "\n\n".join(messages)
+
+        # Workflow variables: each field lists every position, one per line
+        variables = {}
+        for _, _, position_variables in alerts:
+            for key, value in position_variables.items():
+                variables.setdefault(key, []).append(str(value))
+        variables = {key: "\n".join(values) for key, values in variables.items()}
+        variables["notification_text"] = message
+
+        # Slack allows 50 blocks per message: header + one section per position
+        max_sections = 48
+        blocks = [
+            {
+                "type": "header",
+                "text": {
+                    "type": "plain_text",
+                    "text": f"🔄 {len(alerts)} Positions Rebalanced",
+                    "emoji": True
+                }
+            }
+        ]
+        for position_message in messages[:max_sections]:
+            blocks.append({
+                "type": "section",
+                "text": {"type": "mrkdwn", "text": position_message[:3000]}
+            })
+        if len(messages) > max_sections:
+            blocks.append({
+                "type": "context",
+                "elements": [{"type": "mrkdwn", "text": f"... and {len(messages) - max_sections} more"}]
+            })
+
         return self.send_message(message, blocks, variables)
 
 
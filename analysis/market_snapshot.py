@@ -0,0 +1,127 @@
+"""
+In-memory market snapshot for the current refresh.
+
+refresh_pipeline() writes one rates_snapshot row per (protocol, token_contract) and
+one spot_perp_basis row per (perp_proxy, spot_contract), then PositionService
+immediately needs those same rows again for every active position. MarketSnapshot
+holds them in memory, keyed the way PositionService looks them up, so live-timestamp
+leg lookups skip the database. Lookups at any other timestamp still go to SQL.
+
+Values mirror what RateTracker._save_rates_snapshot() writes:
+    lend_base_apr   = lend_total - lend_reward
+    borrow_base_apr = borrow_total + borrow_reward
+    borrow_weight defaults to 1.0, liquidation_threshold to 0.0
+    values rates_snapshot stores as NULL are None
+"""
+
+from dataclasses import dataclass, field
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Columns served per (protocol, token_contract), same names as rates_snapshot
+RATE_COLUMNS = (
+    'lend_base_apr', 'lend_reward_apr', 'borrow_base_apr', 'borrow_reward_apr',
+    'price_usd', 'collateral_ratio', 'liquidation_threshold', 'borrow_weight',
+)
+
+# Columns served per spot_contract, same names as spot_perp_basis
+BASIS_COLUMNS = ('spot_bid', 'spot_ask', 'perp_bid', 'perp_ask', 'basis_bid', 'basis_ask', 'basis_mid')
+
+
+@dataclass
+class MarketSnapshot:
+    """Rates and basis for one refresh timestamp, indexed by (protocol, token_contract)."""
+
+    timestamp: int  # Unix seconds - the refresh timestamp the rows were saved under
+    rates: Dict[Tuple[str, str], dict] = field(default_factory=dict)
+    basis: Dict[str, dict] = field(default_factory=dict)
+
+    @classmethod
+    def from_merged_frames(
+        cls,
+        timestamp: int,
+        lend_rates: pd.DataFrame,
+        borrow_rates: pd.DataFrame,
+        collateral_ratios: pd.DataFrame,
+        prices: pd.DataFrame,
+        lend_rewards: pd.DataFrame,
+        borrow_rewards: pd.DataFrame,
+        borrow_weights: pd.DataFrame,
+        liquidation_thresholds: pd.DataFrame,
+        basis_df: Optional[pd.DataFrame] = None,
+    ) -> "MarketSnapshot":
+        """
+        Build from merge_protocol_data() output and the basis frame of this refresh.
+
+        Args:
+            timestamp: Refresh timestamp (Unix seconds)
+            lend_rates ... liquidation_thresholds: Merged frames (Token | Contract | <protocol>...)
+            basis_df: BluefinPricingReader.get_spot_perp_basis() output (optional)
+
+        Returns:
+            MarketSnapshot with one rates entry per (protocol, token_contract) that has a
+            lend or borrow rate - the same rows save_snapshot() writes.
+        """
+        if not isinstance(timestamp, int):
+            raise TypeError(f"timestamp must be int (Unix seconds), got {type(timestamp).__name__}")
+
+        snapshot = cls(timestamp=timestamp)
+
+        if lend_rates is not None and not lend_rates.empty:
+            protocols = [c for c in lend_rates.columns if c not in ('Token', 'Contract')]
+            contracts = lend_rates['Contract']
+
+            def aligned(df: Optional[pd.DataFrame]) -> np.ndarray:
+                """Protocol matrix aligned to lend_rates rows (first row per contract, like save_snapshot)."""
+                if df is None or df.empty:
+                    return np.full((len(contracts), len(protocols)), np.nan)
+                table = df.drop_duplicates('Contract').set_index('Contract')
+                return table.reindex(index=contracts, columns=protocols).to_numpy(dtype=float)
+
+            lend_total = aligned(lend_rates)
+            borrow_total = aligned(borrow_rates)
+            lend_reward = np.nan_to_num(aligned(lend_rewards), nan=0.0)
+            borrow_reward = np.nan_to_num(aligned(borrow_rewards), nan=0.0)
+            columns = {
+                'lend_base_apr': lend_total - lend_reward,
+                'lend_reward_apr': lend_reward,
+                'borrow_base_apr': borrow_total + borrow_reward,
+                'borrow_reward_apr': borrow_reward,
+                'price_usd': aligned(prices),
+                'collateral_ratio': aligned(collateral_ratios),
+                'liquidation_threshold': np.nan_to_num(aligned(liquidation_thresholds), nan=0.0),
+                'borrow_weight': np.nan_to_num(aligned(borrow_weights), nan=1.0),
+            }
+
+            present = ~(np.isnan(lend_total) & np.isnan(borrow_total))
+            for i, j in zip(*np.nonzero(present)):
+                # Missing values are None, as rates_snapshot stores NULL
+                snapshot.rates[(protocols[j], contracts.iat[i])] = {
+                    name: None if np.isnan(values[i, j]) else float(values[i, j])
+                    for name, values in columns.items()
+                }
+
+        if basis_df is not None and not basis_df.empty:
+            for row in basis_df.drop_duplicates('spot_contract').itertuples(index=False):
+                snapshot.basis[row.spot_contract] = {
+                    name: getattr(row, name, None) for name in BASIS_COLUMNS
+                }
+
+        return snapshot
+
+    def covers(self, timestamp: int) -> bool:
+        """True when lookups at this timestamp can be served from memory."""
+        return timestamp == self.timestamp
+
+    def get_rates(self, protocol: str, token_contract: str) -> Optional[dict]:
+        """rates_snapshot columns for one leg, or None if that row was not saved."""
+        return self.rates.get((protocol, token_contract))
+
+    def get_basis(self, spot_contract: str) -> Optional[dict]:
+        """spot_perp_basis columns for a spot contract, or None if not fetched this refresh."""
+        return self.basis.get(spot_contract)
+
+    def __len__(self) -> int:
+        return len(self.rates)
@@ -17,7 +17,7 @@ Design:
 import sqlite3
 import uuid
 import json
-from typing import Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 import pandas as pd
 from datetime import datetime
 from utils.time_helpers import to_seconds
@@ -29,11 +29,9 @@ try:
 except ImportError:
     psycopg2 = None
 
-# SQLAlchemy support
-try:
+# SQLAlchemy support (annotation only - engines come from data.db_utils on demand)
+if TYPE_CHECKING:
     from sqlalchemy import Engine
-except ImportError:
-    Engine = None
 
 
 class PortfolioService:
@@ -62,7 +60,7 @@ class PortfolioService:
 
         # If no engine provided, create one on-demand from config
         if self.engine is None:
-            from dashboard.db_utils import get_db_engine
+            from data.db_utils import get_db_engine
             self.engine = get_db_engine()
 
     def _get_placeholder(self):
@@ -1,7 +1,7 @@
 import sqlite3
 import uuid
 import time
-from typing import Callable, Dict, List, Optional, Tuple, Union
+from typing import TYPE_CHECKING, Callable, Dict, List, Optional, Tuple, Union
 import pandas as pd
 from datetime import datetime
 import sys
@@ -14,19 +14,21 @@ try:
 except ImportError:
     psycopg2 = None
 
-# SQLAlchemy support
-try:
+# SQLAlchemy support (annotation only - engines come from data.db_utils on demand)
+if TYPE_CHECKING:
     from sqlalchemy import Engine
-except ImportError:
-    Engine = None
 
 # Add parent directory to path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from utils.time_helpers import to_datetime_str, to_seconds
+from analysis.market_snapshot import MarketSnapshot
+from analysis.result_schema import display_row
 from analysis.position_calculator import PositionCalculator
 from analysis.strategy_calculators import get_calculator
 from config import settings
+from data.snapshot_diff import rates_source
+from data import pnl_rates
 
 
 class PositionService:
@@ -42,22 +44,30 @@ class PositionService:
 
     def __init__(self,
                  conn: Union[sqlite3.Connection, 'psycopg2.extensions.connection'],
-                 engine: Optional['Engine'] = None):
+                 engine: Optional['Engine'] = None,
+                 market_snapshot: Optional[MarketSnapshot] = None):
         """
         Initialize with database connection (SQLite or PostgreSQL).
 
         Args:
             conn: Raw database connection for cursor operations
             engine: SQLAlchemy engine for pandas operations (if None, will be created from config)
+            market_snapshot: In-memory rates/basis for the current refresh. Leg lookups at
+                             market_snapshot.timestamp are served from it; all other
+                             timestamps still query rates_snapshot / spot_perp_basis.
         """
         self.conn = conn
         self.engine = engine
+        self.market_snapshot = market_snapshot
 
         # If no engine provided, create one on-demand from config
         if self.engine is None:
-            from dashboard.db_utils import get_db_engine
+            from data.db_utils import get_db_engine
             self.engine = get_db_engine()
 
+        # PnL reads pnl_rates_hourly; create/backfill it on databases that predate it
+        pnl_rates.ensure_table_for_engine(self.engine)
+
     def _get_placeholder(self):
         """Get SQL placeholder based on connection type"""
         if psycopg2 and isinstance(self.conn, psycopg2.extensions.connection):
@@ -174,6 +184,10 @@ class PositionService:
         if not strategy_type:
             raise ValueError("strategy_type is required — received empty string or None")
 
+        # Rows straight from RateAnalyzer / the analysis cache are in the core result
+        # schema - derive apr5/apr30/apr90/days_to_breakeven rather than defaulting to 0
+        strategy_row = display_row(strategy_row)
+
         # Validate timestamp - use to_seconds() to convert at boundary (pandas Series -> int)
         # This follows DESIGN_NOTES.md principle #5: convert at boundaries
         entry_timestamp_raw = strategy_row.get('timestamp')
@@ -785,8 +799,6 @@ class PositionService:
         b_a = position['b_a']
         L_B = position['l_b']
         b_b = position['b_b']
-        entry_token2_borrow_fee = position.get('entry_token2_borrow_fee') or 0
-        entry_token4_borrow_fee = position.get('entry_token4_borrow_fee') or 0
 
         # Position legs
         token1 = position['token1']
@@ -815,19 +827,19 @@ class PositionService:
         end_str = to_datetime_str(end_timestamp)
 
         ph = self._get_placeholder()
+        time_range, time_params = pnl_rates.time_range(ph, start_timestamp, end_timestamp)
         all_rates_query = f"""
         SELECT timestamp, protocol, token, lend_base_apr, lend_reward_apr,
                borrow_base_apr, borrow_reward_apr
-        FROM rates_snapshot
-        WHERE timestamp >= {ph} AND timestamp <= {ph}
-          AND use_for_pnl = TRUE
+        FROM {pnl_rates.TABLE}
+        WHERE {time_range}
           AND ((protocol = {ph} AND token = {ph}) OR
                (protocol = {ph} AND token = {ph}) OR
                (protocol = {ph} AND token = {ph}) OR
                (protocol = {ph} AND token = {ph}))
         ORDER BY timestamp ASC
         """
-        params = (start_str, end_str,
+        params = (*time_params,
                   protocol_a, token1,
                   protocol_a, token2,
                   protocol_b, token2,
@@ -1008,18 +1020,7 @@ class PositionService:
 
         # Calculate FEES - One-Time Upfront Fees
         # For rebalance segments, fees are calculated separately based on token deltas
-        if include_initial_fees:
-            strategy_type = position.get('strategy_type', '')
-            borrow_fees = deployment * (b_a * entry_token2_borrow_fee + b_b * entry_token4_borrow_fee)
-            if strategy_type == 'perp_lending':
-                perp_trading_fees = deployment * b_b * 2.0 * settings.BLUEFIN_TAKER_FEE
-            elif strategy_type in ('perp_borrowing', 'perp_borrowing_recursive'):
-                perp_trading_fees = deployment * L_B * 2.0 * settings.BLUEFIN_TAKER_FEE
-            else:
-                perp_trading_fees = 0.0
-            fees = borrow_fees + perp_trading_fees
-        else:
-            fees = 0
+        fees = self.calculate_upfront_fees(position) if include_initial_fees else 0
 
         # Calculate NET$$$ and Current Value
         net_earnings = lend_earnings - borrow_costs - fees
@@ -1039,6 +1040,29 @@ class PositionService:
             'has_forward_filled_data': len(missing_data_log) > 0
         }
 
+    @staticmethod
+    def calculate_upfront_fees(position: pd.Series) -> float:
+        """
+        One-time fees paid when the position was opened (USD).
+
+        Borrow fees on the B_A / B_B legs plus, for perp strategies, Bluefin taker
+        fees on both perp sides. Independent of rates, so callers that only need the
+        fees do not have to integrate the segment.
+        """
+        deployment = position['deployment_usd']
+        entry_token2_borrow_fee = position.get('entry_token2_borrow_fee') or 0
+        entry_token4_borrow_fee = position.get('entry_token4_borrow_fee') or 0
+
+        strategy_type = position.get('strategy_type', '')
+        borrow_fees = deployment * (position['b_a'] * entry_token2_borrow_fee + position['b_b'] * entry_token4_borrow_fee)
+        if strategy_type == 'perp_lending':
+            perp_trading_fees = deployment * position['b_b'] * 2.0 * settings.BLUEFIN_TAKER_FEE
+        elif strategy_type in ('perp_borrowing', 'perp_borrowing_recursive'):
+            perp_trading_fees = deployment * position['l_b'] * 2.0 * settings.BLUEFIN_TAKER_FEE
+        else:
+            perp_trading_fees = 0.0
+        return borrow_fees + perp_trading_fees
+
     def calculate_realized_apr(self, position: pd.Series, live_timestamp: int) -> float:
         """
         Calculate realized APR = (NET$$$ / T × 365) / deployment_usd
@@ -1081,6 +1105,9 @@ class PositionService:
         """
         Calculate base and reward earnings for a single token slot over a time period.
 
+        Single-leg form of calculate_legs_earnings_split() - prefer that when more
+        than one slot of the same position/segment is needed (one query for all legs).
+
         Args:
             position: Position record (universal convention: token1=L_A, token2=B_A,
                       token3=L_B, token4=B_B)
@@ -1095,7 +1122,157 @@ class PositionService:
             Tuple of (base_amount, reward_amount) in USD.
             Returns (0.0, 0.0) for unused token slots (token_contract is None).
         """
-        # Input validation
+        return self.calculate_legs_earnings_split(
+            position, {token: action}, start_timestamp, end_timestamp
+        )[token]
+
+    def calculate_legs_earnings_split(
+        self,
+        position: pd.Series,
+        leg_actions: Dict[str, str],
+        start_timestamp: int,
+        end_timestamp: int
+    ) -> Dict[str, Tuple[float, float]]:
+        """
+        Calculate base and reward earnings for several token slots over one time period.
+
+        All legs are read with ONE pnl_rates_hourly range query (the hourly PnL rows
+        of every (protocol, token_contract) leg), then each leg is integrated with NumPy:
+        forward-looking rates, so the rate/price at timestamp[i] applies to the
+        period [timestamp[i], timestamp[i+1]).
+
+            base   = amount × Σ price[i] × base_apr[i]   × Δt[i] / year
+            reward = amount × Σ price[i] × reward_apr[i] × Δt[i] / year
+
+        Missing (NULL) APRs and prices count as 0.0.
+
+        Args:
+            position: Position record (universal convention: token1=L_A, token2=B_A,
+                      token3=L_B, token4=B_B)
+            leg_actions: {slot: action}, e.g. {'token1': 'Lend', 'token2': 'Borrow',
+                         'token3': 'Lend', 'token4': 'ShortPerp'}.
+                         'Lend' / 'LongPerp' read lend_* columns; 'Borrow' / 'ShortPerp' read borrow_* columns.
+            start_timestamp: Start of period (Unix seconds)
+            end_timestamp: End of period (Unix seconds)
+
+        Returns:
+            {slot: (base_amount, reward_amount)} in USD for every slot in leg_actions.
+            Unused slots (token_contract is None) get (0.0, 0.0).
+
+        Raises:
+            TypeError: If timestamps are not int
+            ValueError: If end < start, or an active slot has a NULL entry amount
+        """
+        self._validate_period(start_timestamp, end_timestamp)
+
+        results: Dict[str, Tuple[float, float]] = {token: (0.0, 0.0) for token in leg_actions}
+        legs = self._resolve_earnings_legs(position, leg_actions)
+
+        # Handle zero-duration period / no active legs
+        if not legs or end_timestamp == start_timestamp:
+            return results
+
+        by_pair = self._load_leg_rates(legs, start_timestamp, end_timestamp)
+        for token, side, protocol, contract, token_amount in legs:
+            rates = by_pair.get((protocol, contract))
+            if rates is not None:
+                results[token] = self._integrate_leg_rates(rates, side, token_amount)
+
+        return results
+
+    def calculate_legs_earnings_since(
+        self,
+        position: pd.Series,
+        leg_actions: Dict[str, str],
+        segment_start_timestamp: int,
+        checkpoint_timestamp: int,
+        end_timestamp: int,
+        lookback_seconds: int
+    ) -> Optional[Tuple[Dict[str, Tuple[float, float]], int]]:
+        """
+        Earnings accrued since a checkpoint, i.e. split(S, end) - split(S, checkpoint).
+
+        A split up to the checkpoint integrated each leg up to its last rate row at or
+        before the checkpoint (the period starting there had no end yet). This resumes
+        each leg from that anchor row, so adding the result to the checkpoint values
+        gives exactly what calculate_legs_earnings_split(S, end) would. Only rows from
+        max(S, checkpoint - lookback_seconds) onwards are read.
+
+        Args:
+            position / leg_actions: As for calculate_legs_earnings_split()
+            segment_start_timestamp: Live segment start S (Unix seconds)
+            checkpoint_timestamp: Timestamp the checkpoint was integrated to (>= S)
+            end_timestamp: New end of period (Unix seconds, > checkpoint)
+            lookback_seconds: How far before the checkpoint to look for each leg's anchor row
+
+        Returns:
+            (earnings, new_rows): {slot: (base_amount, reward_amount)} accrued since the
+            checkpoint, and the number of use_for_pnl rows after the checkpoint.
+            None if a leg has no rate row inside the lookback window but the segment
+            started before it - the anchor cannot be located, so recompute in full.
+        """
+        self._validate_period(segment_start_timestamp, checkpoint_timestamp)
+        self._validate_period(checkpoint_timestamp, end_timestamp)
+
+        results: Dict[str, Tuple[float, float]] = {token: (0.0, 0.0) for token in leg_actions}
+        legs = self._resolve_earnings_legs(position, leg_actions)
+        if not legs:
+            return results, 0
+
+        window_start = max(segment_start_timestamp, checkpoint_timestamp - lookback_seconds)
+        by_pair = self._load_leg_rates(legs, window_start, end_timestamp)
+
+        new_rows = sum(int((rates['timestamp'] > checkpoint_timestamp).sum()) for rates in by_pair.values())
+
+        for token, side, protocol, contract, token_amount in legs:
+            rates = by_pair.get((protocol, contract))
+            if rates is None:
+                if window_start > segment_start_timestamp:
+                    return None
+                continue
+            before = rates['timestamp'] <= checkpoint_timestamp
+            if before.any():
+                # Resume from the anchor: the last row the checkpoint already integrated up to
+                rates = rates[rates['timestamp'] >= rates.loc[before, 'timestamp'].max()]
+            elif window_start > segment_start_timestamp:
+                return None  # anchor is older than the window - unknown
+            results[token] = self._integrate_leg_rates(rates, side, token_amount)
+
+        return results, new_rows
+
+    def count_leg_rate_rows(
+        self,
+        position: pd.Series,
+        leg_actions: Dict[str, str],
+        start_timestamp: int,
+        end_timestamp: int
+    ) -> int:
+        """
+        Number of pnl_rates_hourly rows feeding the legs over [start, end].
+
+        Stored with position_statistics checkpoints so a later resume can detect rows
+        backfilled into the already-integrated range.
+        """
+        self._validate_period(start_timestamp, end_timestamp)
+        legs = self._resolve_earnings_legs(position, leg_actions)
+        if not legs:
+            return 0
+
+        pairs_join, pair_params = self._leg_pair_join(legs, alias='pr')
+        ph = self._get_placeholder()
+        time_range, time_params = pnl_rates.time_range(ph, start_timestamp, end_timestamp, alias='pr')
+        query = f"""
+        SELECT COUNT(*) AS n
+        FROM {pnl_rates.TABLE} pr
+        {pairs_join}
+        WHERE {time_range}
+        """
+        params = pair_params + time_params
+        result = pd.read_sql_query(query, self.engine, params=tuple(params))
+        return int(result['n'].iloc[0])
+
+    @staticmethod
+    def _validate_period(start_timestamp: int, end_timestamp: int) -> None:
         if not isinstance(start_timestamp, int):
             raise TypeError(f"start_timestamp must be int (Unix seconds), got {type(start_timestamp).__name__}")
         if not isinstance(end_timestamp, int):
@@ -1104,102 +1281,120 @@ class PositionService:
         if end_timestamp < start_timestamp:
             raise ValueError("end_timestamp cannot be before start_timestamp")
 
-        # Derive lookup fields from universal token slot
-        token_contract = position.get(f'{token}_contract')
-        if token_contract is None:
-            return 0.0, 0.0  # Unused slot — no contract means zero earnings
+    @staticmethod
+    def _resolve_earnings_legs(position: pd.Series, leg_actions: Dict[str, str]) -> List[tuple]:
+        """
+        Active legs as (token, side, protocol, token_contract, token_amount) tuples.
 
-        token_amount_raw = position.get(f'entry_{token}_amount')
-        if token_amount_raw is None or (isinstance(token_amount_raw, float) and pd.isna(token_amount_raw)):
-            raise ValueError(
-                f"Active token slot '{token}' (contract={token_contract!r}) has NULL entry amount. "
-                f"Position data is incomplete."
-            )
-        token_amount = float(token_amount_raw)
+        Unused slots (token_contract is None) are skipped; side is 'lend' or 'borrow'.
 
-        # Universal protocol convention: token1/token2 → protocol_a; token3/token4 → protocol_b
-        protocol = position['protocol_a'] if token in ('token1', 'token2') else position['protocol_b']
+        Raises:
+            ValueError: If an active slot has a NULL entry amount
+        """
+        legs = []
+        for token, action in leg_actions.items():
+            token_contract = position.get(f'{token}_contract')
+            if token_contract is None:
+                continue  # Unused slot — no contract means zero earnings
+
+            token_amount_raw = position.get(f'entry_{token}_amount')
+            if token_amount_raw is None or (isinstance(token_amount_raw, float) and pd.isna(token_amount_raw)):
+                raise ValueError(
+                    f"Active token slot '{token}' (contract={token_contract!r}) has NULL entry amount. "
+                    f"Position data is incomplete."
+                )
 
-        # Handle zero-duration period
-        if end_timestamp == start_timestamp:
-            return 0.0, 0.0
+            # Universal protocol convention: token1/token2 → protocol_a; token3/token4 → protocol_b
+            protocol = position['protocol_a'] if token in ('token1', 'token2') else position['protocol_b']
+            # LongPerp uses lend columns; ShortPerp uses borrow columns
+            # (perp funding rates stored in same lend/borrow apr columns as lending rates)
+            side = 'lend' if action in ('Lend', 'LongPerp') else 'borrow'
+            legs.append((token, side, protocol, token_contract, float(token_amount_raw)))
+        return legs
 
-        # OPTIMIZATION: Batch load all rates for the entire segment at once
-        start_str = to_datetime_str(start_timestamp)
-        end_str = to_datetime_str(end_timestamp)
+    def _leg_pair_join(self, legs: List[tuple], alias: str) -> Tuple[str, list]:
+        """JOIN restricting the {alias} rates table to the legs' (token_contract, protocol) pairs (build_pair_join)."""
+        from analysis.strategy_history.data_fetcher import build_pair_join
+
+        pairs = [(contract, protocol) for _, _, protocol, contract, _ in legs]
+        return build_pair_join(pairs, alias=alias, use_cloud=self._get_placeholder() == '%s')
+
+    def _load_leg_rates(self, legs: List[tuple], start_timestamp: int, end_timestamp: int) -> Dict[Tuple[str, str], pd.DataFrame]:
+        """
+        One range query for every leg's use_for_pnl rows.
 
+        Returns:
+            {(protocol, token_contract): DataFrame} with Unix-second timestamps, one row
+            per timestamp (ascending) and NULL rates/prices as 0.0.
+        """
+        from utils.time_helpers import series_to_seconds
+
+        pairs_join, pair_params = self._leg_pair_join(legs, alias='pr')
         ph = self._get_placeholder()
+        time_range, time_params = pnl_rates.time_range(ph, start_timestamp, end_timestamp, alias='pr')
 
         # DESIGN PRINCIPLE: Use token_contract for lookups, not token symbol
-        # LongPerp uses lend columns; ShortPerp uses borrow columns
-        # (perp funding rates stored in same lend/borrow apr columns as lending rates)
-        if action in ('Lend', 'LongPerp'):
-            bulk_query = f"""
-            SELECT timestamp, lend_base_apr, lend_reward_apr, price_usd
-            FROM rates_snapshot
-            WHERE timestamp >= {ph} AND timestamp <= {ph}
-              AND use_for_pnl = TRUE
-              AND protocol = {ph} AND token_contract = {ph}
-            ORDER BY timestamp ASC
-            """
-        else:  # Borrow, ShortPerp
-            bulk_query = f"""
-            SELECT timestamp, borrow_base_apr, borrow_reward_apr, price_usd
-            FROM rates_snapshot
-            WHERE timestamp >= {ph} AND timestamp <= {ph}
-              AND use_for_pnl = TRUE
-              AND protocol = {ph} AND token_contract = {ph}
-            ORDER BY timestamp ASC
-            """
-
-        # Execute ONCE - get all rates for this token's segment
-        all_rates = pd.read_sql_query(bulk_query, self.engine,
-                                      params=(start_str, end_str, protocol, token_contract))
+        bulk_query = f"""
+        SELECT pr.timestamp, pr.protocol, pr.token_contract,
+               pr.lend_base_apr, pr.lend_reward_apr, pr.borrow_base_apr, pr.borrow_reward_apr, pr.price_usd
+        FROM {pnl_rates.TABLE} pr
+        {pairs_join}
+        WHERE {time_range}
+        ORDER BY pr.timestamp ASC
+        """
+        params = pair_params + time_params
 
+        all_rates = pd.read_sql_query(bulk_query, self.engine, params=tuple(params))
         if all_rates.empty:
-            return 0.0, 0.0
+            return {}
 
-        # Create lookup dictionary for O(1) timestamp access
-        rates_lookup = {}
-        for _, row in all_rates.iterrows():
-            ts = to_seconds(row['timestamp'])
-            price_usd = row['price_usd']
-            if action in ('Lend', 'LongPerp'):
-                base_apr = row['lend_base_apr']
-                reward_apr = row['lend_reward_apr']
-            else:  # Borrow, ShortPerp
-                base_apr = row['borrow_base_apr']
-                reward_apr = row['borrow_reward_apr']
-
-            rates_lookup[ts] = {
-                'base_apr': float(base_apr) if base_apr is not None and pd.notna(base_apr) else 0.0,
-                'reward_apr': float(reward_apr) if reward_apr is not None and pd.notna(reward_apr) else 0.0,
-                'price_usd': float(price_usd) if price_usd is not None and pd.notna(price_usd) else 0.0
-            }
+        all_rates['timestamp'] = series_to_seconds(all_rates['timestamp'])
+        value_cols = ['lend_base_apr', 'lend_reward_apr', 'borrow_base_apr', 'borrow_reward_apr', 'price_usd']
+        all_rates[value_cols] = all_rates[value_cols].apply(pd.to_numeric, errors='coerce').fillna(0.0)
+        return {
+            key: group.drop_duplicates('timestamp', keep='last').sort_values('timestamp')
+            for key, group in all_rates.groupby(['protocol', 'token_contract'], sort=False)
+        }
 
-        timestamps = sorted(rates_lookup.keys())
+    @staticmethod
+    def _integrate_leg_rates(rates: pd.DataFrame, side: str, token_amount: float) -> Tuple[float, float]:
+        """(base, reward) USD for one leg over consecutive rate rows (forward-looking)."""
+        import numpy as np
 
-        if len(timestamps) < 2:
+        if len(rates) < 2:
             return 0.0, 0.0
 
-        base_total = 0.0
-        reward_total = 0.0
+        seconds_per_year = 365.25 * 86400
+        timestamps = rates['timestamp'].to_numpy(dtype=np.int64)
+        period_years = np.diff(timestamps) / seconds_per_year
+        usd_value = token_amount * rates['price_usd'].to_numpy(dtype=float)[:-1]
+        weights = usd_value * period_years
 
-        for i in range(len(timestamps) - 1):
-            ts_current = timestamps[i]
-            ts_next = timestamps[i + 1]
-            period_years = (ts_next - ts_current) / (365.25 * 86400)
-
-            rate_data = rates_lookup.get(ts_current, {'base_apr': 0.0, 'reward_apr': 0.0})
-            base_apr = rate_data['base_apr']
-            reward_apr = rate_data['reward_apr']
-            price_usd = rate_data['price_usd']
-            usd_value = token_amount * price_usd
+        base_total = float(np.dot(weights, rates[f'{side}_base_apr'].to_numpy(dtype=float)[:-1]))
+        reward_total = float(np.dot(weights, rates[f'{side}_reward_apr'].to_numpy(dtype=float)[:-1]))
+        return base_total, reward_total
 
-            base_total += usd_value * base_apr * period_years
-            reward_total += usd_value * reward_apr * period_years
+    def get_latest_position_statistics(self, position_id: str, before_timestamp: int) -> Optional[pd.Series]:
+        """
+        Most recent position_statistics row strictly before a timestamp.
 
-        return base_total, reward_total
+        Used as the checkpoint for incremental statistics. Returns None if there is no
+        earlier row (or the table predates the checkpoint columns).
+        """
+        ph = self._get_placeholder()
+        query = f"""
+        SELECT *
+        FROM position_statistics
+        WHERE position_id = {ph} AND timestamp < {ph}
+        ORDER BY timestamp DESC
+        LIMIT 1
+        """
+        try:
+            rows = pd.read_sql_query(query, self.engine, params=(position_id, to_datetime_str(before_timestamp)))
+        except Exception as e:
+            print(f"[POSITION STATS] Could not load checkpoint for {position_id[:8]}: {e}")
+            return None
+        return None if rows.empty else rows.iloc[0]
 
     # ==================== Basis PnL ====================
 
@@ -1422,10 +1617,15 @@ class PositionService:
         _token4_action = 'ShortPerp' if _st in settings.PERP_LENDING_STRATEGIES else 'Borrow'
         opening_ts = snapshot['opening_timestamp']
         try:
-            base1, reward1 = self.calculate_leg_earnings_split(position, 'token1', 'Lend',       opening_ts, live_timestamp)
-            base2, reward2 = self.calculate_leg_earnings_split(position, 'token2', 'Borrow',     opening_ts, live_timestamp)
-            base3, reward3 = self.calculate_leg_earnings_split(position, 'token3', _token3_action, opening_ts, live_timestamp)
-            base4, reward4 = self.calculate_leg_earnings_split(position, 'token4', _token4_action, opening_ts, live_timestamp)
+            legs = self.calculate_legs_earnings_split(
+                position,
+                {'token1': 'Lend', 'token2': 'Borrow', 'token3': _token3_action, 'token4': _token4_action},
+                opening_ts, live_timestamp,
+            )
+            base1, reward1 = legs['token1']
+            base2, reward2 = legs['token2']
+            base3, reward3 = legs['token3']
+            base4, reward4 = legs['token4']
             snapshot['token1_earnings'] =  base1
             snapshot['token1_rewards']  =  reward1
             snapshot['token2_earnings'] = -base2
@@ -1804,58 +2004,73 @@ class PositionService:
 
         DESIGN PRINCIPLE: Use token CONTRACT addresses for queries, not symbols.
         DESIGN PRINCIPLE: Use Unix timestamp (int), convert to datetime string for SQL.
-        """
-        # Convert timestamp to datetime string for query
-        timestamp_str = to_datetime_str(timestamp)
-
-        # Query rates for all 4 legs
-        ph = self._get_placeholder()
-        query = f"""
-        SELECT protocol, token_contract, lend_base_apr, lend_reward_apr,
-               borrow_base_apr, borrow_reward_apr, price_usd, collateral_ratio,
-               liquidation_threshold, borrow_weight
-        FROM rates_snapshot
-        WHERE timestamp = {ph}
-          AND ((protocol = {ph} AND token_contract = {ph}) OR
-               (protocol = {ph} AND token_contract = {ph}) OR
-               (protocol = {ph} AND token_contract = {ph}) OR
-               (protocol = {ph} AND token_contract = {ph}))
-        """
-        params = (
-            timestamp_str,
-            position['protocol_a'], position['token1_contract'],   # token1 = L_A
-            position['protocol_a'], position['token2_contract'],   # token2 = B_A
-            position['protocol_b'], position['token3_contract'],   # token3 = L_B
-            position['protocol_b'], position['token4_contract']    # token4 = B_B
-        )
 
-        rates_df = pd.read_sql_query(query, self.engine, params=params)
+        Served from self.market_snapshot instead when it covers this timestamp.
+        """
+        def value(row, column, default=0):
+            # NULL arrives as None (snapshot) or NaN (read_sql float columns)
+            v = row.get(column)
+            return default if v is None or pd.isna(v) or v == 0 else v
 
-        # Extract rates for each leg
-        def get_leg_data(protocol, token_contract):
-            row = rates_df[
-                (rates_df['protocol'] == protocol) &
-                (rates_df['token_contract'] == token_contract)
-            ]
-            if row.empty:
-                return {
-                    'lend_rate': 0,
-                    'borrow_rate': 0,
-                    'price': 0,
-                    'collateral_ratio': 0,
-                    'liquidation_threshold': 0,
-                    'borrow_weight': 1.0
-                }
-            row = row.iloc[0]
+        def leg_values(row) -> Dict:
             return {
-                'lend_rate': (row['lend_base_apr'] or 0) + (row['lend_reward_apr'] or 0),
-                'borrow_rate': (row['borrow_base_apr'] or 0) + (row['borrow_reward_apr'] or 0),
-                'price': row['price_usd'] or 0,
-                'collateral_ratio': row['collateral_ratio'] or 0,
-                'liquidation_threshold': row['liquidation_threshold'] or 0,
-                'borrow_weight': row.get('borrow_weight', 1.0) or 1.0
+                'lend_rate': value(row, 'lend_base_apr') + value(row, 'lend_reward_apr'),
+                'borrow_rate': value(row, 'borrow_base_apr') + value(row, 'borrow_reward_apr'),
+                'price': value(row, 'price_usd'),
+                'collateral_ratio': value(row, 'collateral_ratio'),
+                'liquidation_threshold': value(row, 'liquidation_threshold'),
+                'borrow_weight': value(row, 'borrow_weight', 1.0)
             }
 
+        missing_leg = {
+            'lend_rate': 0,
+            'borrow_rate': 0,
+            'price': 0,
+            'collateral_ratio': 0,
+            'liquidation_threshold': 0,
+            'borrow_weight': 1.0
+        }
+
+        if self.market_snapshot is not None and self.market_snapshot.covers(timestamp):
+            # Live refresh: the pipeline already holds exactly the rows it just saved
+            def get_leg_data(protocol, token_contract):
+                row = self.market_snapshot.get_rates(protocol, token_contract)
+                return missing_leg if row is None else leg_values(row)
+        else:
+            # Convert timestamp to datetime string for query
+            timestamp_str = to_datetime_str(timestamp)
+
+            # Query rates for all 4 legs
+            ph = self._get_placeholder()
+            query = f"""
+            SELECT protocol, token_contract, lend_base_apr, lend_reward_apr,
+                   borrow_base_apr, borrow_reward_apr, price_usd, collateral_ratio,
+                   liquidation_threshold, borrow_weight
+            FROM {rates_source(self.engine)}
+            WHERE timestamp = {ph}
+              AND ((protocol = {ph} AND token_contract = {ph}) OR
+                   (protocol = {ph} AND token_contract = {ph}) OR
+                   (protocol = {ph} AND token_contract = {ph}) OR
+                   (protocol = {ph} AND token_contract = {ph}))
+            """
+            params = (
+                timestamp_str,
+                position['protocol_a'], position['token1_contract'],   # token1 = L_A
+                position['protocol_a'], position['token2_contract'],   # token2 = B_A
+                position['protocol_b'], position['token3_contract'],   # token3 = L_B
+                position['protocol_b'], position['token4_contract']    # token4 = B_B
+            )
+
+            rates_df = pd.read_sql_query(query, self.engine, params=params)
+
+            # Extract rates for each leg
+            def get_leg_data(protocol, token_contract):
+                row = rates_df[
+                    (rates_df['protocol'] == protocol) &
+                    (rates_df['token_contract'] == token_contract)
+                ]
+                return missing_leg if row.empty else leg_values(row.iloc[0])
+
         leg_1a = get_leg_data(position['protocol_a'], position['token1_contract'])
         leg_2a = get_leg_data(position['protocol_a'], position['token2_contract'])
         leg_2b = get_leg_data(position['protocol_b'], position['token3_contract'])   # token3 = L_B
@@ -1913,18 +2128,27 @@ class PositionService:
         if not spot_contract:
             return None
 
-        ph = self._get_placeholder()
-        cursor = self.conn.cursor()
-        cursor.execute(f"""
-            SELECT spot_bid, spot_ask, perp_bid, perp_ask, basis_bid, basis_ask, basis_mid
-            FROM spot_perp_basis
-            WHERE spot_contract = {ph}
-              AND timestamp <= {ph}
-            ORDER BY timestamp DESC
-            LIMIT 1
-        """, (spot_contract, to_datetime_str(timestamp)))
+        # Live refresh: basis fetched this run is the latest row at or before timestamp.
+        # Contracts missing from it (e.g. fetch failed) fall through to SQL for older rows.
+        row = None
+        if self.market_snapshot is not None and self.market_snapshot.covers(timestamp):
+            basis = self.market_snapshot.get_basis(spot_contract)
+            if basis is not None:
+                row = (basis['spot_bid'], basis['spot_ask'], basis['perp_bid'], basis['perp_ask'])
 
-        row = cursor.fetchone()
+        if row is None:
+            ph = self._get_placeholder()
+            cursor = self.conn.cursor()
+            cursor.execute(f"""
+                SELECT spot_bid, spot_ask, perp_bid, perp_ask, basis_bid, basis_ask, basis_mid
+                FROM spot_perp_basis
+                WHERE spot_contract = {ph}
+                  AND timestamp <= {ph}
+                ORDER BY timestamp DESC
+                LIMIT 1
+            """, (spot_contract, to_datetime_str(timestamp)))
+
+            row = cursor.fetchone()
 
         # All 8 slots always present; only strategy-relevant ones are non-None.
         result = {
@@ -20,6 +20,16 @@ from analysis.position_service import PositionService
 from utils.time_helpers import to_seconds, to_datetime_str
 from config import settings
 
+# Version of the statistics calculation stored with every row. Bump it whenever the
+# earnings/PnL logic changes so incremental runs stop resuming from rows computed
+# the old way (they fall back to a full recompute once, then resume again).
+STATISTICS_VERSION = 1
+
+# How far before a checkpoint to look for each leg's last integrated rate row.
+# use_for_pnl rows are hourly, so 2 days is plenty; a leg with no row in the window
+# (long data gap) just triggers a full recompute.
+CHECKPOINT_LOOKBACK_SECONDS = 2 * 86400
+
 
 def calculate_position_statistics(
     position_id: str,
@@ -27,18 +37,27 @@ def calculate_position_statistics(
     service: PositionService,
     get_rate_func,  # Function to get rates from database at timestamp
     get_borrow_fee_func,  # Function to get borrow fees from database at timestamp
+    incremental: bool = False,
 ) -> dict:
     """
     Calculate position summary statistics for a given timestamp.
 
     This implements the correct calculation logic from dashboard_renderer.py (lines 1893-1997).
 
+    Incremental mode resumes from the position's latest stored position_statistics
+    row (the checkpoint): live-segment leg earnings are the checkpoint's plus only the
+    rate periods since it, and closed-segment totals are taken from the checkpoint
+    instead of re-integrating every closed segment. The result matches a full
+    recompute. It falls back to a full recompute when the checkpoint cannot be
+    trusted - see _usable_checkpoint().
+
     Args:
         position_id: The position ID to calculate statistics for
         timestamp: Unix timestamp in seconds (the "live" time for calculation)
         service: PositionService instance for leg earnings calculations
         get_rate_func: Function(token_contract, protocol, side) -> rate (decimal)
         get_borrow_fee_func: Function(token_contract, protocol) -> fee (decimal)
+        incremental: Resume from the latest stored statistics row when possible
 
     Returns:
         dict: Statistics ready to insert into position_statistics table
@@ -137,19 +156,41 @@ def calculate_position_statistics(
     token3_action = 'LongPerp' if _strategy_type in ('perp_borrowing', 'perp_borrowing_recursive') else 'Lend'
     token4_action = 'ShortPerp' if _strategy_type == 'perp_lending' else 'Borrow'
 
-    # Calculate earnings for all 4 token slots (live segment)
-    base_1, reward_1 = service.calculate_leg_earnings_split(
-        live_position, 'token1', 'Lend', segment_start_ts, timestamp
-    )
-    base_2, reward_2 = service.calculate_leg_earnings_split(
-        live_position, 'token2', 'Borrow', segment_start_ts, timestamp
-    )
-    base_3, reward_3 = service.calculate_leg_earnings_split(
-        live_position, 'token3', token3_action, segment_start_ts, timestamp
-    )
-    base_4, reward_4 = service.calculate_leg_earnings_split(
-        live_position, 'token4', token4_action, segment_start_ts, timestamp
-    )
+    live_leg_actions = {'token1': 'Lend', 'token2': 'Borrow', 'token3': token3_action, 'token4': token4_action}
+
+    # Incremental: resume live-segment legs from the checkpoint when it is still valid
+    checkpoint = None
+    resumed = None
+    if incremental:
+        checkpoint = _usable_checkpoint(service, position_id, live_position, live_leg_actions, segment_start_ts, timestamp)
+    if checkpoint is not None:
+        resumed = service.calculate_legs_earnings_since(
+            live_position, live_leg_actions, segment_start_ts,
+            to_seconds(checkpoint['timestamp']), timestamp, CHECKPOINT_LOOKBACK_SECONDS
+        )
+        if resumed is None:
+            print(f"[POSITION STATS] {position_id[:8]}: full recompute - leg anchor older than checkpoint lookback")
+
+    if resumed is not None:
+        # Checkpoint stores signed per-leg earnings (+lend, -borrow); borrow legs flip back
+        delta, new_rows = resumed
+        base_1 = float(checkpoint['token1_earnings']) + delta['token1'][0]
+        base_2 = -float(checkpoint['token2_earnings']) + delta['token2'][0]
+        base_3 = float(checkpoint['token3_earnings']) + delta['token3'][0]
+        base_4 = -float(checkpoint['token4_earnings']) + delta['token4'][0]
+        reward_1 = float(checkpoint['token1_rewards']) + delta['token1'][1]
+        reward_2 = float(checkpoint['token2_rewards']) + delta['token2'][1]
+        reward_3 = float(checkpoint['token3_rewards']) + delta['token3'][1]
+        reward_4 = float(checkpoint['token4_rewards']) + delta['token4'][1]
+        rate_rows_used = int(checkpoint['rate_rows_used']) + new_rows
+    else:
+        # Calculate earnings for all 4 token slots (live segment, one rates query)
+        live_legs = service.calculate_legs_earnings_split(live_position, live_leg_actions, segment_start_ts, timestamp)
+        base_1, reward_1 = live_legs['token1']
+        base_2, reward_2 = live_legs['token2']
+        base_3, reward_3 = live_legs['token3']
+        base_4, reward_4 = live_legs['token4']
+        rate_rows_used = service.count_leg_rate_rows(live_position, live_leg_actions, segment_start_ts, timestamp)
 
     # Calculate live segment earnings
     live_base_lend = base_1 + base_3      # lend slots (token1, token3)
@@ -157,11 +198,10 @@ def calculate_position_statistics(
     live_base_earnings = live_base_lend - live_base_borrow
     live_reward_earnings = reward_1 + reward_2 + reward_3 + reward_4
 
-    # Get live segment fees from calculate_position_value (already correctly calculated)
-    # Only include initial fees if position has never been rebalanced
+    # Live segment fees: upfront entry fees, only if position has never been rebalanced
+    # (same as calculate_position_value(...)['fees'], without integrating the segment)
     include_initial = not has_rebalances
-    pv_result = service.calculate_position_value(position, segment_start_ts, timestamp, include_initial_fees=include_initial)
-    live_fees = pv_result.get('fees', 0.0)
+    live_fees = service.calculate_upfront_fees(position) if include_initial and timestamp > segment_start_ts else 0.0
 
     # Live segment totals
     live_total_earnings = live_base_earnings + live_reward_earnings
@@ -178,7 +218,20 @@ def calculate_position_statistics(
     rebalanced_reward_earnings = 0.0
     rebalanced_fees = 0.0
 
-    if has_rebalances:
+    if resumed is not None:
+        # Closed segments cannot change without moving the live segment start (checked
+        # by _usable_checkpoint), so take their totals from the checkpoint:
+        # checkpoint totals minus the checkpoint's own live-segment legs.
+        checkpoint_live_base = sum(float(checkpoint[f'token{n}_earnings']) for n in range(1, 5))
+        checkpoint_live_reward = sum(float(checkpoint[f'token{n}_rewards']) for n in range(1, 5))
+        rebalanced_pnl = float(checkpoint['realized_pnl'])
+        rebalanced_base_earnings = float(checkpoint['base_earnings']) - checkpoint_live_base
+        rebalanced_reward_earnings = float(checkpoint['reward_earnings']) - checkpoint_live_reward
+        rebalanced_total_earnings = rebalanced_base_earnings + rebalanced_reward_earnings
+        if has_rebalances:
+            rebalanced_fees = float(closed_rebalances['realised_fees'].sum())
+
+    elif has_rebalances:
         # Iterate through all CLOSED rebalance segments only (open segment has no closing data)
         for _, rebal in closed_rebalances.iterrows():
             # Get the segment boundaries
@@ -216,19 +269,16 @@ def calculate_position_statistics(
             seg_token3_action = 'LongPerp' if _seg_strategy_type in ('perp_borrowing', 'perp_borrowing_recursive') else 'Lend'
             seg_token4_action = 'ShortPerp' if _seg_strategy_type == 'perp_lending' else 'Borrow'
 
-            # Calculate earnings for all 4 token slots (rebalance segment)
-            rebal_base_1, rebal_reward_1 = service.calculate_leg_earnings_split(
-                rebal_as_pos, 'token1', 'Lend', opening_ts_rebal, closing_ts_rebal
-            )
-            rebal_base_2, rebal_reward_2 = service.calculate_leg_earnings_split(
-                rebal_as_pos, 'token2', 'Borrow', opening_ts_rebal, closing_ts_rebal
-            )
-            rebal_base_3, rebal_reward_3 = service.calculate_leg_earnings_split(
-                rebal_as_pos, 'token3', seg_token3_action, opening_ts_rebal, closing_ts_rebal
-            )
-            rebal_base_4, rebal_reward_4 = service.calculate_leg_earnings_split(
-                rebal_as_pos, 'token4', seg_token4_action, opening_ts_rebal, closing_ts_rebal
+            # Calculate earnings for all 4 token slots (rebalance segment, one rates query)
+            rebal_legs = service.calculate_legs_earnings_split(
+                rebal_as_pos,
+                {'token1': 'Lend', 'token2': 'Borrow', 'token3': seg_token3_action, 'token4': seg_token4_action},
+                opening_ts_rebal, closing_ts_rebal
             )
+            rebal_base_1, rebal_reward_1 = rebal_legs['token1']
+            rebal_base_2, rebal_reward_2 = rebal_legs['token2']
+            rebal_base_3, rebal_reward_3 = rebal_legs['token3']
+            rebal_base_4, rebal_reward_4 = rebal_legs['token4']
 
             # Calculate segment base/reward breakdown
             segment_base_lend = rebal_base_1 + rebal_base_3    # lend slots (token1, token3)
@@ -331,4 +381,55 @@ def calculate_position_statistics(
         'token4_earnings': -base_4,
         'token4_rewards':  reward_4,
         'accumulated_realised_pnl': rebalanced_pnl,
+        # Checkpoint metadata for incremental runs
+        'stats_version': STATISTICS_VERSION,
+        'segment_start_timestamp': segment_start_ts,  # Unix seconds
+        'rate_rows_used': rate_rows_used,
     }
+
+
+def _usable_checkpoint(
+    service: PositionService,
+    position_id: str,
+    live_position: pd.Series,
+    leg_actions: dict,
+    segment_start_ts: int,
+    timestamp: int,
+) -> Optional[pd.Series]:
+    """
+    Latest stored statistics row for the position, if it is safe to resume from.
+
+    A full recompute is needed (returns None) when:
+      - there is no earlier row, or it has no checkpoint metadata
+      - stats_version differs from STATISTICS_VERSION (calculation changed)
+      - segment_start_timestamp differs (a rebalance happened since the checkpoint)
+      - the number of use_for_pnl rate rows in [segment start, checkpoint] changed
+        (rates were backfilled or removed after the checkpoint was computed)
+
+    In-place revisions of existing rate values are not detected; bump
+    STATISTICS_VERSION or run a full recompute after such a backfill.
+    """
+    checkpoint = service.get_latest_position_statistics(position_id, timestamp)
+    if checkpoint is None:
+        return None
+
+    def _missing(col):
+        return col not in checkpoint.index or checkpoint[col] is None or pd.isna(checkpoint[col])
+
+    reason = None
+    if _missing('stats_version') or int(checkpoint['stats_version']) != STATISTICS_VERSION:
+        reason = "statistics version changed"
+    elif _missing('segment_start_timestamp') or to_seconds(checkpoint['segment_start_timestamp']) != segment_start_ts:
+        reason = "rebalanced since checkpoint"
+    elif any(_missing(col) for col in ['rate_rows_used', 'realized_pnl', 'base_earnings', 'reward_earnings']
+             + [f'token{n}_{kind}' for n in range(1, 5) for kind in ('earnings', 'rewards')]):
+        reason = "incomplete checkpoint"
+    else:
+        checkpoint_ts = to_seconds(checkpoint['timestamp'])
+        if service.count_leg_rate_rows(live_position, leg_actions, segment_start_ts, checkpoint_ts) != int(checkpoint['rate_rows_used']):
+            reason = "rates backfilled since checkpoint"
+
+    if reason is not None:
+        print(f"[POSITION STATS] {position_id[:8]}: full recompute - {reason}")
+        return None
+    return checkpoint
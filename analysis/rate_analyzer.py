@@ -4,7 +4,13 @@ Rate analyzer to find the best protocol pair and token combination
 
 import pandas as pd
 import numpy as np
+import contextlib
+import heapq
+import io
 import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Tuple, Optional
 from datetime import datetime
 import sys
@@ -17,6 +23,96 @@ from config import settings
 from config.stablecoins import STABLECOIN_SYMBOLS
 from analysis.strategy_calculators import get_calculator, get_all_strategy_types
 from analysis.strategy_calculators.base import StrategyCalculatorBase
+from analysis.result_schema import slim_results
+
+
+# Analyzer of a generation worker process. Each worker receives a pickled copy of
+# the analyzer once, from the pool initializer, instead of one per task.
+_WORKER_ANALYZER: Optional["RateAnalyzer"] = None
+
+
+def _worker_context():
+    """
+    Multiprocessing context for the generation pools: 'forkserver', else 'spawn'.
+
+    Workers start from the fork server (a clean single-threaded process that has
+    already imported this module), never from the caller. The caller can therefore
+    be running other threads - the Slack delivery queue, the refresh daemon's
+    scheduler and health server - without a child inheriting locks they hold.
+    """
+    if 'forkserver' in multiprocessing.get_all_start_methods():
+        context = multiprocessing.get_context('forkserver')
+        context.set_forkserver_preload([__name__])  # No-op once the server is running
+        return context
+    return multiprocessing.get_context('spawn')
+
+
+def _init_worker(analyzer: "RateAnalyzer") -> None:
+    """Pool initializer: keep the analyzer for the tasks run by this worker."""
+    global _WORKER_ANALYZER
+    _WORKER_ANALYZER = analyzer
+
+
+def _generate_in_worker(strategy_type: str, tokens: Optional[List[str]]) -> Tuple[pd.DataFrame, float, str, int, Optional[int]]:
+    """
+    Run one strategy type's generator in a worker process.
+
+    Returns:
+        (strategies, wall seconds, captured log, rate-spread exclusions, bound-pruned count)
+    """
+    analyzer = _WORKER_ANALYZER
+    excluded_before = analyzer.excluded_by_rate_spread
+    log = io.StringIO()
+    with contextlib.redirect_stdout(log):
+        start = time.perf_counter()
+        strategies = analyzer._generate_for_type(strategy_type, tokens)
+        elapsed = time.perf_counter() - start
+    return (strategies, elapsed, log.getvalue(),
+            analyzer.excluded_by_rate_spread - excluded_before,
+            analyzer.pruned_by_bound.get(strategy_type))
+
+
+def _recursive_shard_in_worker(token2: str, shard_args: tuple) -> dict:
+    """Run one token2 shard of recursive_lending in a worker process (see RateAnalyzer._recursive_shard)."""
+    analyzer = _WORKER_ANALYZER
+    calculator = analyzer.calculators['recursive_lending']
+    return analyzer._recursive_shard(calculator, token2, *shard_args, pruner=analyzer._make_pruner())
+
+
+class _BoundPruner:
+    """
+    Cutoff tracker for branch-and-bound strategy generation.
+
+    The cutoff is the net APR floor, raised to the running K-th best net APR once
+    top_k results have been admitted. A combination (or a whole group of them) is
+    skipped when its upper-bound APR is strictly below the cutoff - it can neither
+    clear the floor nor displace anything from the final top K.
+    """
+
+    def __init__(self, min_net_apr: Optional[float], top_k: Optional[int]):
+        self.floor = -np.inf if min_net_apr is None else min_net_apr
+        self.top_k = top_k
+        self._best: List[float] = []  # min-heap of the best top_k net APRs so far
+        self.skipped_groups = 0        # token groups skipped before the protocol loops
+        self.skipped_combinations = 0  # (tokens, protocol_a, protocol_b) combinations never evaluated
+
+    def cutoff(self) -> float:
+        if self.top_k and len(self._best) >= self.top_k:
+            return max(self.floor, self._best[0])
+        return self.floor
+
+    def can_skip(self, upper_bound: float) -> bool:
+        """True if a combination bounded by upper_bound cannot make the result set (NaN never skips)."""
+        return upper_bound < self.cutoff()
+
+    def admit(self, net_apr: float) -> None:
+        """Record the net APR of an evaluated strategy."""
+        if not self.top_k or net_apr is None or np.isnan(net_apr):
+            return
+        if len(self._best) < self.top_k:
+            heapq.heappush(self._best, net_apr)
+        elif net_apr > self._best[0]:
+            heapq.heapreplace(self._best, net_apr)
 
 
 class RateAnalyzer:
@@ -38,7 +134,12 @@ class RateAnalyzer:
         liquidation_distance: Optional[float] = None,
         strategy_types: Optional[List[str]] = None,  # NEW: Multi-strategy support
         rate_tracker=None,  # NEW: Optional RateTracker for perp lending strategies
-        perp_basis: Optional[pd.DataFrame] = None  # Directional bid/ask from spot_perp_basis
+        perp_basis: Optional[pd.DataFrame] = None,  # Directional bid/ask from spot_perp_basis
+        min_net_apr: Optional[float] = None,  # Branch-and-bound: drop strategies below this net APR
+        top_k: Optional[int] = None,  # Branch-and-bound: keep only the best K per strategy type
+        workers: Optional[int] = None,  # Processes for analyze_all_combinations (default settings.ANALYSIS_WORKERS)
+        recursive_workers: Optional[int] = None,  # Processes for recursive_lending token2 shards (default settings.RECURSIVE_WORKERS)
+        progress_every: Optional[int] = None  # Recursive progress line every N token2 shards (default settings.RECURSIVE_PROGRESS_EVERY)
     ):
         """
         Initialize the rate analyzer
@@ -59,9 +160,26 @@ class RateAnalyzer:
             strategy_types: REQUIRED list of strategy types to generate  # NEW
                            Use get_all_strategy_types() to get all available types
                            Example: ['recursive_lending'] or ['stablecoin_lending', 'recursive_lending']
+            min_net_apr: Optional net APR floor (decimal). When set, only strategies with
+                         net_apr >= min_net_apr are returned, and the noloop / recursive
+                         generators skip combinations whose upper-bound APR is below it.
+            top_k: Optional limit per strategy type. When set, only the top_k strategies
+                   by net_apr are returned per type, and the noloop / recursive generators
+                   skip combinations whose upper bound cannot beat the current K-th best.
+                   Leave both unset (default) to generate the full result set, which the
+                   analysis cache and dashboard need.
+            workers: Worker processes for analyze_all_combinations() (default
+                     settings.ANALYSIS_WORKERS). Above 1, strategy types are generated
+                     concurrently in worker processes (forkserver, or spawn).
+            recursive_workers: Worker processes for the recursive_lending generator
+                               (default settings.RECURSIVE_WORKERS). Above 1, its work is
+                               split by token2 across worker processes; output is identical.
+            progress_every: Print recursive_lending progress every N token2 shards
+                            (default settings.RECURSIVE_PROGRESS_EVERY, 0 = off)
 
         Raises:
-            ValueError: If strategy_types is None, empty, or contains invalid types
+            ValueError: If strategy_types is None, empty, or contains invalid types,
+                        or top_k is not a positive integer
         """
         self.lend_rates = lend_rates
         self.borrow_rates = borrow_rates
@@ -93,6 +211,9 @@ class RateAnalyzer:
         # ALL_TOKENS = all tokens in the merged data
         self.ALL_TOKENS = all_tokens_in_df
 
+        # Lookup indexes for the perp generators' inner loops (built once, read-only)
+        self._build_lookup_indexes()
+
         # Multi-strategy support - load calculators for each strategy type
         # FAIL LOUD: Require explicit strategy_types parameter
         if strategy_types is None:
@@ -130,6 +251,19 @@ class RateAnalyzer:
         # Track exclusions
         self.excluded_by_rate_spread = 0  # Count strategies excluded by rate spread filter
 
+        # Branch-and-bound generation (off unless a floor or top-K is requested)
+        if top_k is not None and (not isinstance(top_k, int) or top_k <= 0):
+            raise ValueError(f"top_k must be a positive integer, got {top_k!r}")
+        self.min_net_apr = min_net_apr
+        self.top_k = top_k
+        self.pruned_by_bound: Dict[str, int] = {}  # strategy_type -> combinations skipped by upper bound
+
+        # Parallel generation across strategy types
+        self.workers = settings.ANALYSIS_WORKERS if workers is None else workers
+        self.recursive_workers = settings.RECURSIVE_WORKERS if recursive_workers is None else recursive_workers
+        self.progress_every = settings.RECURSIVE_PROGRESS_EVERY if progress_every is None else progress_every
+        self.generation_seconds: Dict[str, float] = {}  # strategy_type -> generator wall time (last run)
+
         # Store timestamp (when this data was captured) - must be int (seconds)
         if timestamp is None:
             raise ValueError("timestamp is required and must be explicitly provided")
@@ -139,7 +273,21 @@ class RateAnalyzer:
 
         print(f"[ANALYZER] Initialized: {len(self.protocols)} protocols, {len(self.ALL_TOKENS)} tokens (Stablecoins: {len(self.STABLECOINS)}, High-Yield: {len(self.OTHER_TOKENS)})")
         print(f"[ANALYZER] Strategy types enabled: {', '.join(self.strategy_types)}")
-    
+
+    @classmethod
+    def from_market_data(cls, market, **kwargs) -> "RateAnalyzer":
+        """
+        Build from a data.market_data.MarketData container.
+
+        Args:
+            market: MarketData (refresh_pipeline's packed merge output)
+            **kwargs: Every other RateAnalyzer argument (timestamp, liquidation_distance, ...)
+
+        Returns:
+            RateAnalyzer reading the container's zero-copy wide frame views
+        """
+        return cls(**market.as_dict(), **kwargs)
+
     def get_rate(self, df: pd.DataFrame, token: str, protocol: str) -> float:
         """
         Safely get a rate from a dataframe
@@ -302,6 +450,58 @@ class RateAnalyzer:
         except:
             return 1.0
 
+    def _build_lookup_indexes(self) -> None:
+        """
+        Build dict indexes over lend_rates / borrow_rates / perp_basis.
+
+        Every lookup below used to apply a boolean mask over a full DataFrame; the
+        perp generators call them inside their protocol x stablecoin loops. Each
+        index keeps the FIRST matching row, which is what the mask + iloc[0]
+        lookups returned.
+
+            _contract_by_token   token symbol -> contract (lend_rates, then borrow_rates)
+            _token_by_contract   contract -> first token in ALL_TOKENS with that contract
+            _lend_row_by_contract contract -> {protocol: lend rate} (first lend_rates row)
+            _basis_by_pair       (perp_proxy, spot_contract) -> spot_perp_basis row
+            _basis_by_perp       perp_proxy -> first spot_perp_basis row for that perp
+            _basis_by_spot       spot_contract -> first spot_perp_basis row for that spot
+        """
+        self._contract_by_token: Dict[str, str] = {}
+        for df in (self.lend_rates, self.borrow_rates):
+            if df is None or df.empty or 'Token' not in df.columns or 'Contract' not in df.columns:
+                continue
+            for token, contract in zip(df['Token'], df['Contract']):
+                self._contract_by_token.setdefault(token, contract)
+
+        self._token_by_contract: Dict[str, str] = {}
+        for token in self.ALL_TOKENS:
+            contract = self._contract_by_token.get(token)
+            if contract is not None:
+                self._token_by_contract.setdefault(contract, token)
+
+        self._lend_row_by_contract: Dict[str, dict] = {}
+        for row in self.lend_rates.to_dict('records'):
+            self._lend_row_by_contract.setdefault(row.get('Contract'), row)
+
+        self._basis_by_pair: Dict[Tuple[str, str], dict] = {}
+        self._basis_by_perp: Dict[str, dict] = {}
+        self._basis_by_spot: Dict[str, dict] = {}
+        if not self.perp_basis.empty:
+            for row in self.perp_basis.to_dict('records'):
+                perp_proxy = row.get('perp_proxy')
+                spot_contract = row.get('spot_contract')
+                self._basis_by_pair.setdefault((perp_proxy, spot_contract), row)
+                self._basis_by_perp.setdefault(perp_proxy, row)
+                self._basis_by_spot.setdefault(spot_contract, row)
+
+    @staticmethod
+    def _basis_value(row: Optional[dict], col: str) -> Optional[float]:
+        """Float value of a basis row column, or None if the row/value is missing."""
+        if row is None:
+            return None
+        val = row.get(col)
+        return float(val) if val is not None and not pd.isna(val) else None
+
     def get_contract(self, token: str, protocol: str) -> Optional[str]:
         """
         Get contract address for a token on a specific protocol
@@ -313,19 +513,20 @@ class RateAnalyzer:
         Returns:
             Contract address or None if not found
         """
-        # Check lend_rates first (has 'Token' and 'Contract' columns)
-        mask = (self.lend_rates['Token'] == token)
-        if mask.any():
-            row = self.lend_rates[mask].iloc[0]
-            return row.get('Contract')
-
-        # Fallback to borrow_rates
-        mask = (self.borrow_rates['Token'] == token)
-        if mask.any():
-            row = self.borrow_rates[mask].iloc[0]
-            return row.get('Contract')
+        # lend_rates first, then borrow_rates (see _build_lookup_indexes)
+        return self._contract_by_token.get(token)
 
-        return None
+    def get_token_for_contract(self, contract: str) -> Optional[str]:
+        """
+        Reverse of get_contract(): token symbol for a contract address.
+
+        Args:
+            contract: On-chain contract address (e.g. a BLUEFIN_TO_LENDINGS spot contract)
+
+        Returns:
+            First token in ALL_TOKENS with that contract, or None if not in the merged data
+        """
+        return self._token_by_contract.get(contract)
 
     def get_perp_basis_price(self, perp_proxy: str, spot_contract: str, col: str) -> float:
         """
@@ -339,19 +540,8 @@ class RateAnalyzer:
         Returns:
             Price as float, or float('nan') if not found / data unavailable.
         """
-        if self.perp_basis.empty:
-            return float('nan')
-
-        mask = (
-            (self.perp_basis['perp_proxy'] == perp_proxy) &
-            (self.perp_basis['spot_contract'] == spot_contract)
-        )
-        rows = self.perp_basis[mask]
-        if rows.empty:
-            return float('nan')
-
-        val = rows.iloc[0][col]
-        return float(val) if val is not None and not pd.isna(val) else float('nan')
+        val = self._basis_value(self._basis_by_pair.get((perp_proxy, spot_contract)), col)
+        return val if val is not None else float('nan')
 
     def get_perp_price(self, perp_proxy: str, col: str) -> float:
         """
@@ -368,15 +558,8 @@ class RateAnalyzer:
         Returns:
             Price as float, or float('nan') if no basis data available.
         """
-        if self.perp_basis.empty:
-            return float('nan')
-
-        rows = self.perp_basis[self.perp_basis['perp_proxy'] == perp_proxy]
-        if rows.empty:
-            return float('nan')
-
-        val = rows.iloc[0][col]
-        return float(val) if val is not None and not pd.isna(val) else float('nan')
+        val = self._basis_value(self._basis_by_perp.get(perp_proxy), col)
+        return val if val is not None else float('nan')
 
     def get_basis_mid(self, perp_proxy: str, spot_contract: str) -> float | None:
         """
@@ -384,25 +567,12 @@ class RateAnalyzer:
 
         Returns None if data is unavailable.
         """
-        if self.perp_basis.empty:
-            return None
-        if 'basis_bid' not in self.perp_basis.columns or 'basis_ask' not in self.perp_basis.columns:
-            return None
-
-        mask = (
-            (self.perp_basis['perp_proxy'] == perp_proxy) &
-            (self.perp_basis['spot_contract'] == spot_contract)
-        )
-        rows = self.perp_basis[mask]
-        if rows.empty:
-            return None
-
-        row = rows.iloc[0]
-        bid = row['basis_bid']
-        ask = row['basis_ask']
-        if bid is None or ask is None or pd.isna(bid) or pd.isna(ask):
+        row = self._basis_by_pair.get((perp_proxy, spot_contract))
+        bid = self._basis_value(row, 'basis_bid')
+        ask = self._basis_value(row, 'basis_ask')
+        if bid is None or ask is None:
             return None
-        return (float(bid) + float(ask)) / 2.0
+        return (bid + ask) / 2.0
 
     def get_basis_spread(self, perp_proxy: str, spot_contract: str) -> float | None:
         """
@@ -420,53 +590,20 @@ class RateAnalyzer:
             basis_ask - basis_bid as float (always >= 0), or None if basis data
             is unavailable for this pair.
         """
-        if self.perp_basis.empty:
-            return None
-        if 'basis_bid' not in self.perp_basis.columns or 'basis_ask' not in self.perp_basis.columns:
-            return None
-
-        mask = (
-            (self.perp_basis['perp_proxy'] == perp_proxy) &
-            (self.perp_basis['spot_contract'] == spot_contract)
-        )
-        rows = self.perp_basis[mask]
-        if rows.empty:
+        row = self._basis_by_pair.get((perp_proxy, spot_contract))
+        bid = self._basis_value(row, 'basis_bid')
+        ask = self._basis_value(row, 'basis_ask')
+        if bid is None or ask is None:
             return None
-
-        row = rows.iloc[0]
-        bid = row['basis_bid']
-        ask = row['basis_ask']
-        if bid is None or ask is None or pd.isna(bid) or pd.isna(ask):
-            return None
-        return float(ask) - float(bid)
+        return ask - bid
 
     def get_basis_bid(self, perp_proxy: str, spot_contract: str) -> float | None:
         """Return basis_bid for a given pair, or None if unavailable."""
-        if self.perp_basis.empty or 'basis_bid' not in self.perp_basis.columns:
-            return None
-        mask = (
-            (self.perp_basis['perp_proxy'] == perp_proxy) &
-            (self.perp_basis['spot_contract'] == spot_contract)
-        )
-        rows = self.perp_basis[mask]
-        if rows.empty:
-            return None
-        val = rows.iloc[0]['basis_bid']
-        return float(val) if val is not None and not pd.isna(val) else None
+        return self._basis_value(self._basis_by_pair.get((perp_proxy, spot_contract)), 'basis_bid')
 
     def get_basis_ask(self, perp_proxy: str, spot_contract: str) -> float | None:
         """Return basis_ask for a given pair, or None if unavailable."""
-        if self.perp_basis.empty or 'basis_ask' not in self.perp_basis.columns:
-            return None
-        mask = (
-            (self.perp_basis['perp_proxy'] == perp_proxy) &
-            (self.perp_basis['spot_contract'] == spot_contract)
-        )
-        rows = self.perp_basis[mask]
-        if rows.empty:
-            return None
-        val = rows.iloc[0]['basis_ask']
-        return float(val) if val is not None and not pd.isna(val) else None
+        return self._basis_value(self._basis_by_pair.get((perp_proxy, spot_contract)), 'basis_ask')
 
     def get_latest_basis(self, spot_contract: str) -> dict | None:
         """
@@ -478,22 +615,11 @@ class RateAnalyzer:
         Returns:
             Dict with basis_bid, basis_ask, basis_mid, basis_spread, or None if unavailable.
         """
-        if self.perp_basis.empty:
+        row = self._basis_by_spot.get(spot_contract)
+        bid = self._basis_value(row, 'basis_bid')
+        ask = self._basis_value(row, 'basis_ask')
+        if bid is None or ask is None:
             return None
-        required_cols = {'basis_bid', 'basis_ask'}
-        if not required_cols.issubset(self.perp_basis.columns):
-            return None
-        mask = self.perp_basis['spot_contract'] == spot_contract
-        rows = self.perp_basis[mask]
-        if rows.empty:
-            return None
-        row = rows.iloc[0]
-        bid = row['basis_bid']
-        ask = row['basis_ask']
-        if bid is None or ask is None or pd.isna(bid) or pd.isna(ask):
-            return None
-        bid = float(bid)
-        ask = float(ask)
         return {
             'basis_bid': bid,
             'basis_ask': ask,
@@ -514,6 +640,86 @@ class RateAnalyzer:
                 pairs.append((protocol_a, protocol_b))
         return pairs
 
+    def _make_pruner(self) -> Optional[_BoundPruner]:
+        """Branch-and-bound state for one generator run, or None when pruning is off."""
+        if self.min_net_apr is None and self.top_k is None:
+            return None
+        return _BoundPruner(self.min_net_apr, self.top_k)
+
+    def _token_bound_inputs(self, tokens: List[str]) -> Dict[str, Dict[str, float]]:
+        """
+        Per-token best-case inputs for group-level upper bounds.
+
+        For each token, across all protocols:
+            max_lend   highest lend APR
+            min_borrow lowest borrow APR
+            max_cf     highest collateral ratio
+            max_lt     highest liquidation threshold
+            min_bw     lowest borrow weight (missing weights count as 1.0, like get_borrow_weight)
+
+        Any (token, protocol) value the generators can see is bounded by these, so an
+        APR bound built from them holds for every protocol pair of the group.
+        Missing tokens get NaN, which never prunes.
+        """
+        def per_token(df: pd.DataFrame, how: str, fill: Optional[float] = None) -> pd.Series:
+            if df is None or df.empty or 'Token' not in df.columns:
+                return pd.Series(dtype=float)
+            cols = [p for p in self.protocols if p in df.columns]
+            values = df.set_index('Token')[cols].apply(pd.to_numeric, errors='coerce')
+            if fill is not None:
+                values = values.fillna(fill)
+            grouped = values.groupby(level=0)
+            return (grouped.max().max(axis=1) if how == 'max' else grouped.min().min(axis=1))
+
+        columns = {
+            'max_lend': per_token(self.lend_rates, 'max'),
+            'min_borrow': per_token(self.borrow_rates, 'min'),
+            'max_cf': per_token(self.collateral_ratios, 'max'),
+            'max_lt': per_token(self.liquidation_thresholds, 'max'),
+            'min_bw': per_token(self.borrow_weights, 'min', fill=1.0),
+        }
+        bounds = {}
+        for token in tokens:
+            entry = {name: float(series.get(token, np.nan)) for name, series in columns.items()}
+            if np.isnan(entry['min_bw']):
+                entry['min_bw'] = 1.0
+            bounds[token] = entry
+        return bounds
+
+    @staticmethod
+    def _recursive_leverage_bound(r_a: float, r_b: float) -> Tuple[float, float]:
+        """
+        Upper bounds on (b_a, b_b) for a recursive loop with borrow ratios <= r_a, r_b.
+
+        b_a = r_A / (1 - r_A*r_B) and b_b = r_A*r_B / (1 - r_A*r_B) both increase in
+        r_A and r_B, so the caps give the bound. Returns (inf, inf) when the caps
+        would not converge (no bound).
+        """
+        if np.isnan(r_a) or np.isnan(r_b):
+            return np.nan, np.nan
+        loop = r_a * r_b
+        if loop >= 1.0:
+            return np.inf, np.inf
+        return r_a / (1.0 - loop), loop / (1.0 - loop)
+
+    def _apply_result_limits(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply min_net_apr / top_k to one strategy type's results (no-op when unset)."""
+        if df.empty or 'net_apr' not in df.columns:
+            return df
+        if self.min_net_apr is not None:
+            df = df[df['net_apr'] >= self.min_net_apr]
+        if self.top_k is not None:
+            df = df.sort_values(by='net_apr', ascending=False, kind='stable').head(self.top_k)
+        return df.reset_index(drop=True)
+
+    def _report_pruning(self, label: str, strategy_type: str, pruner: Optional[_BoundPruner], evaluated: int) -> None:
+        if pruner is None:
+            return
+        self.pruned_by_bound[strategy_type] = pruner.skipped_combinations
+        print(f"[ANALYZER] {label}: Bound pruning skipped {pruner.skipped_combinations} combinations "
+              f"({pruner.skipped_groups} token groups), evaluated {evaluated} "
+              f"(final cutoff {pruner.cutoff() * 100:.2f}%)")
+
     def _generate_stablecoin_strategies(
         self,
         calculator: StrategyCalculatorBase
@@ -621,11 +827,29 @@ class RateAnalyzer:
         if excluded_token2s:
             print(f"[ANALYZER] NoLoop: Excluded {len(excluded_token2s)} tokens with r_max < b_min")
 
+        # Branch-and-bound: net APR = rate_token1 + B_A x (rate_token3 - rate_token2 - borrow_fee_token2)
+        # with B_A = min(LT_1 / ((1 + liq_max) x BW_2), CF_1), so best-case rates and ratios bound it
+        pruner = self._make_pruner()
+        if pruner is not None:
+            bound_inputs = self._token_bound_inputs(list(stablecoins) + valid_token2s)
+            liq_max = self.liquidation_distance / (1.0 - self.liquidation_distance)
+            combos_per_group = len(self.protocols) * (len(self.protocols) - 1)
+        evaluated = 0
+
         for token1 in stablecoins:
             for token2 in valid_token2s:
                 if token1 == token2:
                     continue
 
+                if pruner is not None:
+                    t1, t2 = bound_inputs[token1], bound_inputs[token2]
+                    b_a_max = np.minimum(t1['max_cf'], t1['max_lt'] / ((1.0 + liq_max) * t2['min_bw']))
+                    upper_bound = t1['max_lend'] + b_a_max * np.maximum(0.0, t2['max_lend'] - t2['min_borrow'])
+                    if pruner.can_skip(upper_bound):
+                        pruner.skipped_groups += 1
+                        pruner.skipped_combinations += combos_per_group
+                        continue
+
                 # Nested protocol loops with early filtering for efficiency
                 for protocol_a in self.protocols:
                     # Early check: Does token1 exist in protocol_a for lending?
@@ -638,6 +862,15 @@ class RateAnalyzer:
                     if np.isnan(rate_token2):
                         continue  # token2 not borrowable at protocol_a
 
+                    if pruner is not None:
+                        # B_A and the upfront fee depend only on (token1, token2, protocol_a)
+                        b_a_bound = np.minimum(
+                            self.get_rate(self.collateral_ratios, token1, protocol_a),
+                            self.get_liquidation_threshold(token1, protocol_a)
+                            / ((1.0 + liq_max) * self.get_borrow_weight(token2, protocol_a)),
+                        )
+                        fee_bound = self.get_rate(self.borrow_fees, token2, protocol_a)
+
                     for protocol_b in self.protocols:
                         # Skip if same protocol (cross-protocol strategy requires different protocols)
                         if protocol_b == protocol_a:
@@ -648,6 +881,13 @@ class RateAnalyzer:
                         if np.isnan(rate_token3):
                             continue  # token2 not present at protocol_b
 
+                        if pruner is not None:
+                            upper_bound = rate_token1 + b_a_bound * np.maximum(0.0, rate_token3 - rate_token2 - fee_bound)
+                            if pruner.can_skip(upper_bound):
+                                pruner.skipped_combinations += 1
+                                continue
+                        evaluated += 1
+
                         # All tokens exist in required protocols - now get remaining data
                         collateral_ratio_token1 = self.get_rate(self.collateral_ratios, token1, protocol_a)
                         liquidation_threshold_token1 = self.get_liquidation_threshold(token1, protocol_a)
@@ -712,11 +952,14 @@ class RateAnalyzer:
 
                         if result.get('valid', False):
                             results.append(result)
+                            if pruner is not None:
+                                pruner.admit(result['net_apr'])
 
                             # Progress indicator every 50 strategies
                             if len(results) % 500 == 0:
                                 print(f"[ANALYZER] NoLoop: Generated {len(results)} strategies so far...")
 
+        self._report_pruning('NoLoop', calculator.get_strategy_type(), pruner, evaluated)
         print(f"[ANALYZER] NoLoop: Generated {len(results)} total strategies")
         df = pd.DataFrame(results)
         if not df.empty:
@@ -822,118 +1065,255 @@ class RateAnalyzer:
             else:
                 excluded_token4s.append((stablecoin, min_borrow_rate))
 
-        results = []
+        # Branch-and-bound: with L_A = 1 + B_B and L_B = B_A,
+        #   net APR = rate_token1 + B_B x (rate_token1 - rate_token4 - fee_4) + B_A x (rate_token3 - rate_token2 - fee_2)
+        # B_A, B_B grow with the loop ratios r_A <= min(CF_1, LT_1 / (1 + liq_dist)) / BW_2 and
+        # r_B <= min(CF_3, LT_3 / (1 + liq_dist)) / BW_4, so best-case rates and ratios bound it
+        pruner = self._make_pruner()
+        bound_inputs = None
+        if pruner is not None:
+            bound_inputs = self._token_bound_inputs(list(dict.fromkeys(valid_token1s + valid_token2s + valid_token4s)))
+
+        # Work is partitioned by token2. Each shard runs the token1 x token4 x protocol
+        # loops for one token2 and buckets its strategies by token1, so concatenating
+        # shards in token2 order within each token1 reproduces the single-process
+        # iteration order exactly.
+        token1s = [token1 for token1 in valid_token1s if token1 in self.STABLECOINS]
+        shard_args = (token1s, valid_token4s, spread_threshold, bound_inputs)
+        shards = None
+        if self.recursive_workers > 1 and len(valid_token2s) > 1:
+            shards = self._recursive_shards_parallel(valid_token2s, shard_args)
+        parallel = shards is not None
+        if not parallel:
+            shards = (self._recursive_shard(calculator, token2, *shard_args, pruner=pruner) for token2 in valid_token2s)
+
+        by_token1: Dict[str, List[dict]] = {token1: [] for token1 in token1s}
+        analyzed = 0
+        valid = 0
+        evaluated = 0
+        for done, shard in enumerate(shards, start=1):
+            for token1, token1_results in shard['by_token1'].items():
+                by_token1[token1].extend(token1_results)
+            analyzed += shard['analyzed']
+            valid += shard['valid']
+            evaluated += shard['evaluated']
+            self.excluded_by_rate_spread += shard['excluded_by_rate_spread']
+            if parallel and pruner is not None:
+                # Workers pruned against their own cutoffs - fold their counts into ours
+                pruner.skipped_groups += shard['skipped_groups']
+                pruner.skipped_combinations += shard['skipped_combinations']
+                for token1_results in shard['by_token1'].values():
+                    for result in token1_results:
+                        pruner.admit(result['net_apr'])
+            if self.progress_every and (done % self.progress_every == 0 or done == len(valid_token2s)):
+                print(f"[ANALYZER] Recursive: {done}/{len(valid_token2s)} token2 shards done, {valid} valid strategies so far")
+
+        results = [result for token1 in token1s for result in by_token1[token1]]
+
+        self._report_pruning('Recursive', calculator.get_strategy_type(), pruner, evaluated)
+        print(f"[ANALYZER] Found {valid} valid strategies from {analyzed} combinations")
+
+        if not results:
+            return pd.DataFrame()
+
+        df_results = pd.DataFrame(results)
+        df_results['timestamp'] = self.timestamp
+        df_results['timestamp'] = df_results['timestamp'].astype(int)
+        df_results['strategy_type'] = 'recursive_lending'
+        return df_results
+
+    def _recursive_shard(
+        self,
+        calculator: StrategyCalculatorBase,
+        token2: str,
+        token1s: List[str],
+        token4s: List[str],
+        spread_threshold: float,
+        bound_inputs: Optional[Dict[str, Dict[str, float]]],
+        pruner: Optional[_BoundPruner] = None,
+    ) -> dict:
+        """
+        Recursive lending combinations for a single token2.
+
+        Runs token1 x token4 x protocol_a x protocol_b for this token2 - the body of
+        _generate_recursive_strategies(), which merges the shards.
+
+        Returns:
+            Dict with by_token1 (token1 -> valid strategy dicts, in iteration order),
+            analyzed / valid / evaluated / excluded_by_rate_spread counts, and the
+            skipped_groups / skipped_combinations this shard added to the pruner
+        """
+        if pruner is not None:
+            liq_dist = getattr(calculator, 'liq_dist', 0.0)
+            combos_per_group = len(self.protocols) * (len(self.protocols) - 1)
+            skipped_groups_before = pruner.skipped_groups
+            skipped_combinations_before = pruner.skipped_combinations
+
+        by_token1: Dict[str, List[dict]] = {}
         analyzed = 0
         valid = 0
+        evaluated = 0
+        excluded = 0
 
-        for token1 in valid_token1s:
-            if token1 not in self.STABLECOINS:
+        for token1 in token1s:
+            if token1 == token2:
                 continue
+            token1_results = by_token1.setdefault(token1, [])
 
-            for token2 in valid_token2s:
-                if token1 == token2:
+            for token4 in token4s:  # token4 = B_B closing stablecoin
+                if token4 == token2:
                     continue
 
-                for token4 in valid_token4s:  # token4 = B_B closing stablecoin
-                    if token4 == token2:
+                if pruner is not None:
+                    t1, t2, t4 = bound_inputs[token1], bound_inputs[token2], bound_inputs[token4]
+                    b_a_max, b_b_max = self._recursive_leverage_bound(
+                        np.minimum(t1['max_cf'], t1['max_lt'] / (1.0 + liq_dist)) / t2['min_bw'],
+                        np.minimum(t2['max_cf'], t2['max_lt'] / (1.0 + liq_dist)) / t4['min_bw'],
+                    )
+                    upper_bound = (t1['max_lend']
+                                   + b_b_max * np.maximum(0.0, t1['max_lend'] - t4['min_borrow'])
+                                   + b_a_max * np.maximum(0.0, t2['max_lend'] - t2['min_borrow']))
+                    if pruner.can_skip(upper_bound):
+                        pruner.skipped_groups += 1
+                        pruner.skipped_combinations += combos_per_group
                         continue
 
-                    for protocol_a in self.protocols:
-                        for protocol_b in self.protocols:
-                            if protocol_a == protocol_b:
-                                continue
-                            analyzed += 1
-
-                            rate_token1 = self.get_rate(self.lend_rates, token1, protocol_a)
-                            if np.isnan(rate_token1): continue
-                            rate_token2 = self.get_rate(self.borrow_rates, token2, protocol_a)
-                            if np.isnan(rate_token2): continue
-                            rate_token3 = self.get_rate(self.lend_rates, token2, protocol_b)
-                            if np.isnan(rate_token3): continue
-                            rate_token4 = self.get_rate(self.borrow_rates, token4, protocol_b)
-                            if np.isnan(rate_token4): continue
-
-                            token2_spread = rate_token3 - rate_token2
-                            token1_spread = rate_token1 - rate_token4
-
-                            if token2_spread < spread_threshold and token1_spread < spread_threshold:
-                                self.excluded_by_rate_spread += 1
-                                continue
+                for protocol_a in self.protocols:
+                    for protocol_b in self.protocols:
+                        if protocol_a == protocol_b:
+                            continue
+                        analyzed += 1
 
-                            collateral_ratio_token1 = self.get_rate(self.collateral_ratios, token1, protocol_a)
-                            collateral_ratio_token3 = self.get_rate(self.collateral_ratios, token2, protocol_b)
-                            liquidation_threshold_token1 = self.get_liquidation_threshold(token1, protocol_a)
-                            liquidation_threshold_token3 = self.get_liquidation_threshold(token2, protocol_b)
-                            price_token1 = self.get_price(token1, protocol_a)
-                            price_token2 = self.get_price(token2, protocol_a)
-                            price_token3 = self.get_price(token2, protocol_b)
-                            price_token4 = self.get_price(token4, protocol_b)  # B_B: closing stablecoin
-                            available_borrow_token2 = self.get_available_borrow(token2, protocol_a)
-                            available_borrow_token4 = self.get_available_borrow(token4, protocol_b)
-                            borrow_fee_token2 = self.get_borrow_fee(token2, protocol_a)
-                            borrow_fee_token4 = self.get_borrow_fee(token4, protocol_b)
-                            borrow_weight_token2 = self.get_borrow_weight(token2, protocol_a)
-                            borrow_weight_token4 = self.get_borrow_weight(token4, protocol_b)
-
-                            if any(np.isnan([rate_token1, rate_token2, rate_token3,
-                                            rate_token4, collateral_ratio_token1, collateral_ratio_token3,
-                                            liquidation_threshold_token1, liquidation_threshold_token3,
-                                            price_token1, price_token2, price_token3, price_token4])):
-                                continue
-                            if collateral_ratio_token1 <= 1e-9 or collateral_ratio_token3 <= 1e-9:
-                                continue
-                            if liquidation_threshold_token1 <= 1e-9 or liquidation_threshold_token3 <= 1e-9:
-                                continue
-                            if any(p <= 1e-9 for p in [price_token1, price_token2, price_token3, price_token4]):
-                                continue
+                        rate_token1 = self.get_rate(self.lend_rates, token1, protocol_a)
+                        if np.isnan(rate_token1): continue
+                        rate_token2 = self.get_rate(self.borrow_rates, token2, protocol_a)
+                        if np.isnan(rate_token2): continue
+                        rate_token3 = self.get_rate(self.lend_rates, token2, protocol_b)
+                        if np.isnan(rate_token3): continue
+                        rate_token4 = self.get_rate(self.borrow_rates, token4, protocol_b)
+                        if np.isnan(rate_token4): continue
+
+                        token2_spread = rate_token3 - rate_token2
+                        token1_spread = rate_token1 - rate_token4
+
+                        if token2_spread < spread_threshold and token1_spread < spread_threshold:
+                            excluded += 1
+                            continue
 
-                            result = calculator.analyze_strategy(
-                                token1=token1,
-                                token2=token2,
-                                token4=token4,  # B_B closing stablecoin
-                                protocol_a=protocol_a,
-                                protocol_b=protocol_b,
-                                rate_token1=rate_token1,
-                                rate_token2=rate_token2,
-                                rate_token3=rate_token3,
-                                rate_token4=rate_token4,
-                                collateral_ratio_token1=collateral_ratio_token1,
-                                collateral_ratio_token3=collateral_ratio_token3,
-                                liquidation_threshold_token1=liquidation_threshold_token1,
-                                liquidation_threshold_token3=liquidation_threshold_token3,
-                                price_token1=price_token1,
-                                price_token2=price_token2,
-                                price_token3=price_token3,
-                                price_token4=price_token4,
-                                available_borrow_token2=available_borrow_token2,
-                                available_borrow_token4=available_borrow_token4,
-                                borrow_fee_token2=borrow_fee_token2,
-                                borrow_fee_token4=borrow_fee_token4,
-                                borrow_weight_token2=borrow_weight_token2,
-                                borrow_weight_token4=borrow_weight_token4,
-                                token1_contract=self.get_contract(token1, protocol_a),
-                                token2_contract=self.get_contract(token2, protocol_a),
-                                token4_contract=self.get_contract(token4, protocol_b),
+                        if pruner is not None:
+                            b_a_bound, b_b_bound = self._recursive_leverage_bound(
+                                np.minimum(
+                                    self.get_rate(self.collateral_ratios, token1, protocol_a),
+                                    self.get_liquidation_threshold(token1, protocol_a) / (1.0 + liq_dist),
+                                ) / self.get_borrow_weight(token2, protocol_a),
+                                np.minimum(
+                                    self.get_rate(self.collateral_ratios, token2, protocol_b),
+                                    self.get_liquidation_threshold(token2, protocol_b) / (1.0 + liq_dist),
+                                ) / self.get_borrow_weight(token4, protocol_b),
                             )
+                            fee_2 = self.get_rate(self.borrow_fees, token2, protocol_a)
+                            fee_4 = self.get_rate(self.borrow_fees, token4, protocol_b)
+                            upper_bound = (rate_token1
+                                           + b_b_bound * np.maximum(0.0, token1_spread - fee_4)
+                                           + b_a_bound * np.maximum(0.0, token2_spread - fee_2))
+                            if pruner.can_skip(upper_bound):
+                                pruner.skipped_combinations += 1
+                                continue
+                        evaluated += 1
 
-                            if result['valid']:
-                                valid += 1
-                                results.append(result)
+                        collateral_ratio_token1 = self.get_rate(self.collateral_ratios, token1, protocol_a)
+                        collateral_ratio_token3 = self.get_rate(self.collateral_ratios, token2, protocol_b)
+                        liquidation_threshold_token1 = self.get_liquidation_threshold(token1, protocol_a)
+                        liquidation_threshold_token3 = self.get_liquidation_threshold(token2, protocol_b)
+                        price_token1 = self.get_price(token1, protocol_a)
+                        price_token2 = self.get_price(token2, protocol_a)
+                        price_token3 = self.get_price(token2, protocol_b)
+                        price_token4 = self.get_price(token4, protocol_b)  # B_B: closing stablecoin
+                        available_borrow_token2 = self.get_available_borrow(token2, protocol_a)
+                        available_borrow_token4 = self.get_available_borrow(token4, protocol_b)
+                        borrow_fee_token2 = self.get_borrow_fee(token2, protocol_a)
+                        borrow_fee_token4 = self.get_borrow_fee(token4, protocol_b)
+                        borrow_weight_token2 = self.get_borrow_weight(token2, protocol_a)
+                        borrow_weight_token4 = self.get_borrow_weight(token4, protocol_b)
 
-        print(f"[ANALYZER] Found {valid} valid strategies from {analyzed} combinations")
+                        if any(np.isnan([rate_token1, rate_token2, rate_token3,
+                                        rate_token4, collateral_ratio_token1, collateral_ratio_token3,
+                                        liquidation_threshold_token1, liquidation_threshold_token3,
+                                        price_token1, price_token2, price_token3, price_token4])):
+                            continue
+                        if collateral_ratio_token1 <= 1e-9 or collateral_ratio_token3 <= 1e-9:
+                            continue
+                        if liquidation_threshold_token1 <= 1e-9 or liquidation_threshold_token3 <= 1e-9:
+                            continue
+                        if any(p <= 1e-9 for p in [price_token1, price_token2, price_token3, price_token4]):
+                            continue
 
-        if not results:
-            return pd.DataFrame()
+                        result = calculator.analyze_strategy(
+                            token1=token1,
+                            token2=token2,
+                            token4=token4,  # B_B closing stablecoin
+                            protocol_a=protocol_a,
+                            protocol_b=protocol_b,
+                            rate_token1=rate_token1,
+                            rate_token2=rate_token2,
+                            rate_token3=rate_token3,
+                            rate_token4=rate_token4,
+                            collateral_ratio_token1=collateral_ratio_token1,
+                            collateral_ratio_token3=collateral_ratio_token3,
+                            liquidation_threshold_token1=liquidation_threshold_token1,
+                            liquidation_threshold_token3=liquidation_threshold_token3,
+                            price_token1=price_token1,
+                            price_token2=price_token2,
+                            price_token3=price_token3,
+                            price_token4=price_token4,
+                            available_borrow_token2=available_borrow_token2,
+                            available_borrow_token4=available_borrow_token4,
+                            borrow_fee_token2=borrow_fee_token2,
+                            borrow_fee_token4=borrow_fee_token4,
+                            borrow_weight_token2=borrow_weight_token2,
+                            borrow_weight_token4=borrow_weight_token4,
+                            token1_contract=self.get_contract(token1, protocol_a),
+                            token2_contract=self.get_contract(token2, protocol_a),
+                            token4_contract=self.get_contract(token4, protocol_b),
+                        )
 
-        df_results = pd.DataFrame(results)
-        df_results['timestamp'] = self.timestamp
-        df_results['timestamp'] = df_results['timestamp'].astype(int)
-        df_results['is_stablecoin_only'] = df_results.apply(
-            lambda row: row['token1'] in self.STABLECOINS and row['token2'] in self.STABLECOINS,
-            axis=1
-        )
-        df_results['strategy_type'] = 'recursive_lending'
-        return df_results
+                        if result['valid']:
+                            valid += 1
+                            token1_results.append(result)
+                            if pruner is not None:
+                                pruner.admit(result['net_apr'])
+
+        return {
+            'by_token1': by_token1,
+            'analyzed': analyzed,
+            'valid': valid,
+            'evaluated': evaluated,
+            'excluded_by_rate_spread': excluded,
+            'skipped_groups': pruner.skipped_groups - skipped_groups_before if pruner is not None else 0,
+            'skipped_combinations': pruner.skipped_combinations - skipped_combinations_before if pruner is not None else 0,
+        }
+
+    def _recursive_shards_parallel(self, token2s: List[str], shard_args: tuple) -> Optional[List[dict]]:
+        """
+        Run _recursive_shard() for each token2 in a worker pool.
+
+        Shards come back in token2 order (pool.map), so the merge is deterministic.
+        Each worker prunes against its own cutoff, which is never above the global
+        one, so branch-and-bound stays exact.
+
+        Returns:
+            Shard outputs in token2 order, or None to run sequentially (already
+            inside a generation worker)
+        """
+        if _WORKER_ANALYZER is not None:
+            return None  # Inside a strategy-type worker - no nested pools
+
+        n_workers = min(self.recursive_workers, len(token2s))
+        print(f"[ANALYZER] Recursive: {len(token2s)} token2 shards across {n_workers} worker processes")
+
+        with ProcessPoolExecutor(max_workers=n_workers, mp_context=_worker_context(),
+                                 initializer=_init_worker, initargs=(self,)) as pool:
+            return list(pool.map(_recursive_shard_in_worker, token2s, [shard_args] * len(token2s)))
 
     def _generate_perp_lending_strategies(
         self,
@@ -999,20 +1379,15 @@ class RateAnalyzer:
             # For each compatible spot token
             for spot_contract in compatible_spot_contracts:
                 # Find spot token symbol from contract
-                spot_token = None
-                for token in self.ALL_TOKENS:
-                    if self.get_contract(token, self.protocols[0]) == spot_contract:
-                        spot_token = token
-                        break
-
+                spot_token = self.get_token_for_contract(spot_contract)
                 if not spot_token:
                     continue
 
                 # Pre-filter to protocols where this spot contract is actually lendable.
-                # Uses contract address directly on in-memory DataFrame (Design Note #9).
+                # Uses contract address directly on in-memory data (Design Note #9).
                 # NaN = token absent at that protocol; 0.0 = present but zero rate (valid).
-                spot_row = self.lend_rates[self.lend_rates['Contract'] == spot_contract]
-                if spot_row.empty:
+                spot_row = self._lend_row_by_contract.get(spot_contract)
+                if spot_row is None:
                     # Every contract in BLUEFIN_TO_LENDINGS should appear in lend_rates.
                     # If it doesn't, something is wrong upstream — alert loudly, then skip.
                     print(f"⚠️  [ANALYZER] spot_contract {spot_contract!r} not found in lend_rates — "
@@ -1023,8 +1398,7 @@ class RateAnalyzer:
 
                 valid_protocols = [
                     p for p in self.protocols
-                    if p != 'Bluefin' and p in spot_row.columns
-                    and pd.notna(spot_row[p].values[0])
+                    if p != 'Bluefin' and p in spot_row and pd.notna(spot_row[p])
                 ]
                 if not valid_protocols:
                     continue
@@ -1164,14 +1538,18 @@ class RateAnalyzer:
                 continue
 
             for spot_contract in spot_contracts:                       # find token2
-                spot_token = next(
-                    (t for t in self.ALL_TOKENS
-                     if self.get_contract(t, self.protocols[0]) == spot_contract),
-                    None
-                )
+                spot_token = self.get_token_for_contract(spot_contract)
                 if not spot_token:
                     continue
 
+                # Same for every stablecoin / protocol_a below - look up once per spot contract.
+                # spot_bid: selling borrowed spot token (perp_borrowing sells spot)
+                price_token2_basis = self.get_perp_basis_price(perp_key, spot_contract, 'spot_bid')
+                basis_spread = self.get_basis_spread(perp_key, spot_contract)
+                basis_mid    = self.get_basis_mid(perp_key, spot_contract)
+                basis_bid    = self.get_basis_bid(perp_key, spot_contract)
+                basis_ask    = self.get_basis_ask(perp_key, spot_contract)
+
                 for token1 in self.STABLECOINS:                        # stablecoin collateral
                     for protocol_a in self.protocols:
                         if protocol_a == 'Bluefin':
@@ -1189,9 +1567,7 @@ class RateAnalyzer:
                         liquidation_threshold_token1 = self.get_liquidation_threshold(token1, protocol_a)
                         price_token1 = self.get_rate(self.prices, token1, protocol_a)
 
-                        # spot_bid: selling borrowed spot token (perp_borrowing sells spot)
                         # Fall back to lending protocol price if basis data unavailable
-                        price_token2_basis = self.get_perp_basis_price(perp_key, spot_contract, 'spot_bid')
                         price_token2 = price_token2_basis if not np.isnan(price_token2_basis) else \
                                    self.get_rate(self.prices, spot_token, protocol_a)
 
@@ -1201,12 +1577,6 @@ class RateAnalyzer:
                         if collateral_ratio_token1 <= 1e-9 or liquidation_threshold_token1 <= 1e-9:
                             continue
 
-                        # Round-trip basis spread and mid (None if no basis data available)
-                        basis_spread = self.get_basis_spread(perp_key, spot_contract)
-                        basis_mid    = self.get_basis_mid(perp_key, spot_contract)
-                        basis_bid    = self.get_basis_bid(perp_key, spot_contract)
-                        basis_ask    = self.get_basis_ask(perp_key, spot_contract)
-
                         result = calculator.analyze_strategy(
                             token1=token1,
                             token2=spot_token,
@@ -1245,6 +1615,89 @@ class RateAnalyzer:
             df['timestamp'] = df['timestamp'].astype(int)
         return df
 
+    def _generate_for_type(self, strategy_type: str, tokens: Optional[List[str]] = None) -> Optional[pd.DataFrame]:
+        """
+        Run the generator for one strategy type.
+
+        Returns:
+            DataFrame of strategies (may be empty), or None for an unknown strategy type
+        """
+        calculator = self.calculators[strategy_type]
+        if strategy_type == 'stablecoin_lending':
+            return self._generate_stablecoin_strategies(calculator)
+        elif strategy_type == 'noloop_cross_protocol_lending':
+            return self._generate_noloop_strategies(calculator)
+        elif strategy_type == 'recursive_lending':
+            return self._generate_recursive_strategies(calculator, tokens)
+        elif strategy_type in settings.PERP_LENDING_STRATEGIES:
+            return self._generate_perp_lending_strategies(calculator)
+        elif strategy_type in settings.PERP_BORROWING_STRATEGIES:
+            return self._generate_perp_borrowing_strategies(calculator)
+        return None
+
+    def _generate_sequential(self, tokens: Optional[List[str]]) -> Dict[str, Optional[pd.DataFrame]]:
+        """Run every strategy type's generator in this process, in calculator order."""
+        generated = {}
+        for strategy_type in self.calculators:
+            start = time.perf_counter()
+            generated[strategy_type] = self._generate_for_type(strategy_type, tokens)
+            self.generation_seconds[strategy_type] = time.perf_counter() - start
+        return generated
+
+    def _generate_parallel(self, tokens: Optional[List[str]]) -> Optional[Dict[str, Optional[pd.DataFrame]]]:
+        """
+        Run the strategy type generators concurrently in worker processes.
+
+        The generators only read the market matrices, so each worker gets a copy of
+        the analyzer once (pool initializer) and returns its DataFrames. Worker logs
+        are captured and printed here in calculator order so output matches a
+        sequential run.
+
+        Returns:
+            strategy_type -> DataFrame, or None if the pool failed (caller falls back
+            to sequential)
+        """
+        strategy_types = list(self.calculators)
+        # recursive_lending with its own shard pool runs in-process after this pool
+        # closes (no nested pools); its log is captured the same way
+        sharded = [st for st in strategy_types if st == 'recursive_lending' and self.recursive_workers > 1]
+        pooled = [st for st in strategy_types if st not in sharded]
+        n_workers = min(self.workers, max(len(pooled), 1))
+        print(f"[ANALYZER] Generating {len(strategy_types)} strategy types across {n_workers} worker processes")
+
+        try:
+            with ProcessPoolExecutor(max_workers=n_workers, mp_context=_worker_context(),
+                                     initializer=_init_worker, initargs=(self,)) as pool:
+                futures = {st: pool.submit(_generate_in_worker, st, tokens) for st in pooled}
+                outputs = {st: future.result() for st, future in futures.items()}
+        except Exception as e:
+            print(f"[ANALYZER] Parallel generation failed ({e}) - running sequentially")
+            return None
+
+        for strategy_type in sharded:
+            excluded_before = self.excluded_by_rate_spread
+            log = io.StringIO()
+            with contextlib.redirect_stdout(log):
+                start = time.perf_counter()
+                strategies = self._generate_for_type(strategy_type, tokens)
+                elapsed = time.perf_counter() - start
+            excluded = self.excluded_by_rate_spread - excluded_before
+            self.excluded_by_rate_spread = excluded_before  # re-added below with the pooled types
+            outputs[strategy_type] = (strategies, elapsed, log.getvalue(), excluded,
+                                      self.pruned_by_bound.get(strategy_type))
+
+        generated = {}
+        for strategy_type in strategy_types:
+            strategies, elapsed, log, excluded, pruned = outputs[strategy_type]
+            if log:
+                print(log, end='')
+            generated[strategy_type] = strategies
+            self.generation_seconds[strategy_type] = elapsed
+            self.excluded_by_rate_spread += excluded
+            if pruned is not None:
+                self.pruned_by_bound[strategy_type] = pruned
+        return generated
+
     def analyze_all_combinations(self, tokens: Optional[List[str]] = None) -> pd.DataFrame:
         """
         Analyze all possible protocol pairs and token combinations for ALL strategy types.
@@ -1252,32 +1705,39 @@ class RateAnalyzer:
         IMPORTANT: Token1 must be a stablecoin to avoid price exposure.
         The strategy starts by lending a stablecoin to remain market neutral.
 
+        With workers > 1 the strategy types are generated concurrently (see
+        _generate_parallel); frames are still concatenated in calculator order and
+        sorted the same way, so the result is identical to a sequential run.
+
         Args:
             tokens: List of tokens to analyze (default: all tokens from merged data)
 
         Returns:
-            DataFrame with strategies from all types, sorted by net_apr descending
+            DataFrame with strategies from all types, sorted by net_apr descending, in
+            the core result schema (analysis/result_schema.py): display columns such as
+            apr5/apr30/apr90 are dropped and token/protocol columns are categories.
+            Call with_display_columns() before rendering.
+            attrs['generation_seconds'] holds per-strategy-type generator wall time.
         """
         if tokens is None:
             tokens = self.ALL_TOKENS
 
+        self.generation_seconds = {}
+        generated = None
+        if self.workers > 1 and len(self.calculators) > 1:
+            generated = self._generate_parallel(tokens)
+        if generated is None:
+            generated = self._generate_sequential(tokens)
+
         all_strategies = []
 
-        for strategy_type, calculator in self.calculators.items():
-            if strategy_type == 'stablecoin_lending':
-                strategies = self._generate_stablecoin_strategies(calculator)
-            elif strategy_type == 'noloop_cross_protocol_lending':
-                strategies = self._generate_noloop_strategies(calculator)
-            elif strategy_type == 'recursive_lending':
-                strategies = self._generate_recursive_strategies(calculator, tokens)
-            elif strategy_type in settings.PERP_LENDING_STRATEGIES:
-                strategies = self._generate_perp_lending_strategies(calculator)
-            elif strategy_type in settings.PERP_BORROWING_STRATEGIES:
-                strategies = self._generate_perp_borrowing_strategies(calculator)
-            else:
+        for strategy_type, strategies in generated.items():
+            if strategies is None:
                 print(f"[ANALYZER] Unknown strategy type: {strategy_type}, skipping")
                 continue
 
+            strategies = self._apply_result_limits(strategies)
+
             if not strategies.empty:
                 print(f"[ANALYZER] Generated {len(strategies)} {strategy_type} strategies")
                 all_strategies.append(strategies)
@@ -1288,6 +1748,8 @@ class RateAnalyzer:
 
         combined = pd.concat(all_strategies, ignore_index=True)
         combined = combined.sort_values(by='net_apr', ascending=False)
+        combined = slim_results(combined)
+        combined.attrs['generation_seconds'] = dict(self.generation_seconds)
         print(f"[ANALYZER] Total strategies: {len(combined)}")
         return combined
     
@@ -0,0 +1,240 @@
+"""
+Core schema for RateAnalyzer results, plus display columns derived on demand.
+
+RateAnalyzer.analyze_all_combinations() used to return (and save_analysis_cache()
+used to persist) every field every calculator emits. Several of those are pure
+functions of other columns in the same row:
+
+    apr5 / apr30 / apr90 = (apr_gross × N/365 − total_upfront_fee) × 365/N
+    days_to_breakeven    = total_upfront_fee × 365 / apr_gross  (per-type edge cases)
+    valid / error        = constant for every row that reaches the results frame
+    is_stablecoin_only   = token1 and token2 both stablecoins (recursive_lending rows)
+
+The core frame keeps ids, legs, multipliers, rates, fees, prices/units and net_apr,
+with token / protocol / contract strings stored as pandas categories (a few dozen
+distinct values repeated across thousands of rows). The derived columns above are
+registered below and added only when a consumer asks:
+
+    all_results = with_display_columns(all_results)            # dashboard
+    top = with_display_columns(all_results.nlargest(3, 'net_apr'), ['apr5'])  # Slack
+    strategy_row = display_row(strategy_row)                     # position creation
+
+Derived values use the same float expressions, in the same order, as the
+calculators, so they are bit-identical to what the calculators returned.
+"""
+
+from typing import Callable, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+from config.stablecoins import STABLECOIN_SYMBOLS
+
+# Low-cardinality string columns stored as pandas categories in the core frame
+CATEGORY_COLUMNS = (
+    'strategy_type',
+    'token1', 'token2', 'token3', 'token4',
+    'protocol_a', 'protocol_b',
+    'token1_contract', 'token2_contract', 'token3_contract', 'token4_contract',
+)
+
+# Cache payload format written by to_cache_payload() (legacy caches are a list of row dicts)
+CACHE_FORMAT = 'columnar-v1'
+
+# name -> fn(core frame) -> values aligned to the frame's rows
+_DISPLAY_COLUMNS: Dict[str, Callable[[pd.DataFrame], object]] = {}
+
+
+def display_column(name: str):
+    """Register fn(df) as the deriver for display column `name`."""
+    def register(fn):
+        _DISPLAY_COLUMNS[name] = fn
+        return fn
+    return register
+
+
+def display_columns() -> List[str]:
+    """Names of all derived display columns, in registration order."""
+    return list(_DISPLAY_COLUMNS)
+
+
+def _float_column(df: pd.DataFrame, column: str, derived: str) -> np.ndarray:
+    if column not in df.columns:
+        raise KeyError(f"Cannot derive '{derived}': core column '{column}' missing from results")
+    return pd.to_numeric(df[column], errors='coerce').to_numpy(dtype=float)
+
+
+def _time_adjusted_apr(df: pd.DataFrame, days: int, name: str) -> np.ndarray:
+    """(apr_gross × days/365 − total_upfront_fee) × 365/days, as every calculator computes it."""
+    gross = _float_column(df, 'apr_gross', name)
+    upfront = _float_column(df, 'total_upfront_fee', name)
+    return (gross * days / 365 - upfront) * 365 / days
+
+
+@display_column('apr5')
+def _apr5(df: pd.DataFrame) -> np.ndarray:
+    return _time_adjusted_apr(df, 5, 'apr5')
+
+
+@display_column('apr30')
+def _apr30(df: pd.DataFrame) -> np.ndarray:
+    return _time_adjusted_apr(df, 30, 'apr30')
+
+
+@display_column('apr90')
+def _apr90(df: pd.DataFrame) -> np.ndarray:
+    return _time_adjusted_apr(df, 90, 'apr90')
+
+
+@display_column('days_to_breakeven')
+def _days_to_breakeven(df: pd.DataFrame) -> np.ndarray:
+    """
+    Lending types (StrategyCalculatorBase.calculate_days_to_breakeven): 0.0 when
+    apr_gross <= 0 or there is no fee. Perp types: inf when apr_gross <= 0.
+    """
+    gross = _float_column(df, 'apr_gross', 'days_to_breakeven')
+    upfront = _float_column(df, 'total_upfront_fee', 'days_to_breakeven')
+    with np.errstate(divide='ignore', invalid='ignore'):
+        days = upfront * 365.0 / gross
+    is_perp = df['strategy_type'].isin(settings.PERP_STRATEGIES).to_numpy()
+    lending_days = np.where((gross <= 0) | (upfront == 0), 0.0, days)
+    perp_days = np.where(gross > 0, days, np.inf)
+    return np.where(is_perp, perp_days, lending_days)
+
+
+@display_column('valid')
+def _valid(df: pd.DataFrame) -> bool:
+    # Invalid calculator results never reach the results frame
+    return True
+
+
+@display_column('error')
+def _error(df: pd.DataFrame) -> None:
+    return None
+
+
+@display_column('is_stablecoin_only')
+def _is_stablecoin_only(df: pd.DataFrame) -> pd.Series:
+    """Only recursive_lending rows carried this flag; other types stay NaN."""
+    flag = (df['token1'].astype(object).isin(STABLECOIN_SYMBOLS)
+            & df['token2'].astype(object).isin(STABLECOIN_SYMBOLS))
+    return flag.astype(object).where(df['strategy_type'] == 'recursive_lending', np.nan)
+
+
+def slim_results(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Reduce a results frame to the core schema.
+
+    Drops every registered display column and stores CATEGORY_COLUMNS as categories.
+
+    Args:
+        df: Results frame as built from calculator output
+
+    Returns:
+        New DataFrame (row order, index and attrs preserved)
+    """
+    if df is None or df.empty:
+        return df
+    slim = df.drop(columns=[c for c in _DISPLAY_COLUMNS if c in df.columns])
+    for column in CATEGORY_COLUMNS:
+        if column in slim.columns:
+            slim[column] = slim[column].astype('category')
+    slim.attrs = dict(df.attrs)
+    return slim
+
+
+def with_display_columns(df: pd.DataFrame, columns: Optional[Iterable[str]] = None) -> pd.DataFrame:
+    """
+    Add derived display columns and convert category columns back to object.
+
+    Columns already present (e.g. results loaded from a legacy cache) are kept as-is.
+
+    Args:
+        df: Core (or already expanded) results frame
+        columns: Display columns to add (default: all registered)
+
+    Returns:
+        New DataFrame ready for filtering/rendering with plain string columns
+
+    Raises:
+        KeyError: Unknown display column, or a core column the deriver needs is missing
+    """
+    if df is None:
+        return df
+    wanted = display_columns() if columns is None else list(columns)
+    unknown = [c for c in wanted if c not in _DISPLAY_COLUMNS]
+    if unknown:
+        raise KeyError(f"Unknown display column(s): {unknown}. Registered: {display_columns()}")
+
+    out = df.copy()
+    for column in out.columns:
+        if isinstance(out[column].dtype, pd.CategoricalDtype):
+            out[column] = out[column].astype(object)
+    if out.empty:
+        for name in wanted:
+            if name not in out.columns:
+                out[name] = pd.Series(dtype=object)
+        return out
+    for name in wanted:
+        if name not in out.columns:
+            out[name] = _DISPLAY_COLUMNS[name](out)
+    return out
+
+
+def display_row(row) -> dict:
+    """
+    Single-strategy version of with_display_columns().
+
+    Args:
+        row: Strategy as a dict or pandas Series (core or expanded)
+
+    Returns:
+        dict with every display column present
+    """
+    record = row.to_dict() if isinstance(row, pd.Series) else dict(row)
+    if all(name in record for name in _DISPLAY_COLUMNS):
+        return record
+    return with_display_columns(pd.DataFrame([record])).to_dict('records')[0]
+
+
+def to_cache_payload(df: pd.DataFrame) -> dict:
+    """
+    Columnar, JSON-serialisable form of a core results frame.
+
+    Category columns are written once as categories + integer codes instead of
+    repeating the string (contracts are ~70 characters) on every row.
+
+    Returns:
+        {'format': CACHE_FORMAT, 'rows': n, 'columns': {name: {'categories', 'codes'} | {'values'}}}
+    """
+    columns = {}
+    for column in df.columns:
+        series = df[column]
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            columns[column] = {
+                'categories': series.cat.categories.tolist(),
+                'codes': series.cat.codes.tolist(),
+            }
+        else:
+            columns[column] = {'values': series.tolist()}
+    return {'format': CACHE_FORMAT, 'rows': len(df), 'columns': columns}
+
+
+def from_cache_payload(payload) -> pd.DataFrame:
+    """
+    Inverse of to_cache_payload(); also accepts the legacy list-of-row-dicts cache.
+
+    Legacy rows already contain the display columns - with_display_columns() keeps them.
+    """
+    if isinstance(payload, list):
+        return pd.DataFrame(payload)
+    if payload.get('format') != CACHE_FORMAT:
+        raise ValueError(f"Unknown analysis cache format: {payload.get('format')!r}")
+    data = {}
+    for column, encoded in payload['columns'].items():
+        if 'codes' in encoded:
+            data[column] = pd.Categorical.from_codes(encoded['codes'], categories=encoded['categories'])
+        else:
+            data[column] = encoded['values']
+    return pd.DataFrame(data, index=pd.RangeIndex(payload['rows']))
@@ -334,6 +334,7 @@ class StrategyCalculatorBase(ABC):
         Returns:
             Dict with:
                 - apr_gross: Earnings - borrowing costs (before fees)
+                - total_upfront_fee: b_a × borrow_fee_token2 + b_b × borrow_fee_token4
                 - net_apr: Net APR (365-day, after fees)
                 - apr5: 5-day time-adjusted APR
                 - apr30: 30-day time-adjusted APR
@@ -374,6 +375,7 @@ class StrategyCalculatorBase(ABC):
 
         return {
             'apr_gross': gross_apr,
+            'total_upfront_fee': total_fee_cost,
             'net_apr': apr_net,
             'apr5': apr5,
             'apr30': apr30,
@@ -306,6 +306,8 @@ class NoLoopCrossProtocolCalculator(StrategyCalculatorBase):
             # APR metrics
             'net_apr': apr_net,
             'basis_adj_net_apr': apr_net,
+            'apr_gross': apr_gross,
+            'total_upfront_fee': fee_adjusted_aprs['total_upfront_fee'],
             'apr5': apr5,
             'apr30': apr30,
             'apr90': apr90,
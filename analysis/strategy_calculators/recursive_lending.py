@@ -372,6 +372,8 @@ class RecursiveLendingCalculator(StrategyCalculatorBase):
                 # APR metrics
                 'net_apr': net_apr,
                 'basis_adj_net_apr': net_apr,
+                'apr_gross': apr_gross,
+                'total_upfront_fee': fee_adjusted_aprs['total_upfront_fee'],
                 'apr5': apr5,
                 'apr30': apr30,
                 'apr90': apr90,
@@ -178,6 +178,8 @@ class StablecoinLendingCalculator(StrategyCalculatorBase):
             # APR metrics (all equal for stablecoin since no fees)
             'net_apr': apr_net,
             'basis_adj_net_apr': apr_net,
+            'apr_gross': apr_gross,
+            'total_upfront_fee': fee_adjusted_aprs['total_upfront_fee'],
             'apr5': apr5,
             'apr30': apr30,
             'apr90': apr90,
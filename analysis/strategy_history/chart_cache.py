@@ -0,0 +1,157 @@
+"""
+Chart data cache: strategy history series stored per (strategy, time range, snapshot).
+
+render_position_history_chart and the Analysis tab rebuilt every chart from
+fetch_rates_from_database + calculate_apr_timeseries on each load. The computed
+series (hourly, from pnl_rates_hourly) are stored in chart_cache instead of chart HTML,
+as a compressed numpy archive (RateTracker.save_chart_cache / load_chart_cache):
+
+- '_timestamp': int64 Unix seconds (the history DataFrame index)
+- '_columns' / '_object_columns': column order, and the columns that were object
+  dtype (None for missing values) rather than float (NaN)
+- one array per numeric column: float64 for prices and object columns (which may
+  hold Decimals from PostgreSQL), float32 for the float APR columns
+
+decode_series() restores the same columns, in the same order, with the same null
+values; strategy_type is taken from the strategy dict instead of being stored.
+
+Entries are keyed by (strategy_hash, time_range, timestamp_seconds), where
+timestamp_seconds is the snapshot the dashboard is showing. Once a newer snapshot
+lands the dashboard asks for a new key (a miss, recomputed and saved), and saving it
+drops the entries of older snapshots for the same strategy and range.
+"""
+
+import io
+from typing import Dict, Optional
+
+import numpy as np
+import pandas as pd
+
+from analysis.strategy_history.chart_utils import get_chart_time_range
+from analysis.strategy_history.strategy_history import get_strategy_history
+
+# Float APR columns; display precision is 2-3 decimals of a percentage
+SERIES_DTYPE = np.float32
+
+# Columns restored from the strategy dict instead of being stored
+TEXT_COLUMNS = ('strategy_type',)
+
+_INDEX_KEY = '_timestamp'
+_COLUMNS_KEY = '_columns'
+_OBJECT_COLUMNS_KEY = '_object_columns'
+
+_tracker = None
+
+
+def _is_price_column(column: str) -> bool:
+    return column.endswith('_price') or column.endswith('price_usd')
+
+
+def encode_series(history_df: pd.DataFrame) -> bytes:
+    """
+    Pack a strategy history DataFrame into the chart_cache binary format.
+
+    Args:
+        history_df: get_strategy_history() result (Unix-second index)
+
+    Returns:
+        Compressed .npz bytes
+    """
+    object_columns = [c for c in history_df.columns if history_df[c].dtype == object and c not in TEXT_COLUMNS]
+    arrays = {
+        _INDEX_KEY: np.asarray(history_df.index, dtype=np.int64),
+        _COLUMNS_KEY: np.array(list(history_df.columns), dtype=str),
+        _OBJECT_COLUMNS_KEY: np.array(object_columns, dtype=str),
+    }
+    for column in history_df.columns:
+        if column in TEXT_COLUMNS:
+            continue
+        full_precision = column in object_columns or _is_price_column(column)
+        values = pd.to_numeric(history_df[column], errors='coerce')
+        arrays[column] = values.to_numpy(dtype=np.float64 if full_precision else SERIES_DTYPE, na_value=np.nan)
+
+    buffer = io.BytesIO()
+    np.savez_compressed(buffer, **arrays)
+    return buffer.getvalue()
+
+
+def decode_series(chart_data: bytes, strategy_type: Optional[str] = None) -> pd.DataFrame:
+    """
+    Unpack chart_cache bytes into the history DataFrame encode_series() was given.
+
+    Args:
+        chart_data: Bytes written by encode_series()
+        strategy_type: Value for the strategy_type column, if the original had one
+
+    Returns:
+        DataFrame with the original columns in order: float columns as float64 (NaN
+        for missing), object columns with None for missing
+    """
+    with np.load(io.BytesIO(chart_data), allow_pickle=False) as archive:
+        index = pd.Index(archive[_INDEX_KEY], name='timestamp')
+        column_order = archive[_COLUMNS_KEY].tolist()
+        object_columns = set(archive[_OBJECT_COLUMNS_KEY].tolist())
+        columns = {}
+        for name in column_order:
+            if name in TEXT_COLUMNS:
+                columns[name] = pd.Series(strategy_type, index=index)
+                continue
+            values = pd.Series(archive[name].astype(np.float64), index=index)
+            if name in object_columns:
+                values = values.astype(object).where(values.notna(), None)
+            columns[name] = values
+    return pd.DataFrame(columns, index=index, columns=column_order)
+
+
+def _get_tracker():
+    global _tracker
+    if _tracker is None:
+        from config import settings
+        from data.rate_tracker import RateTracker
+
+        _tracker = RateTracker(
+            use_cloud=settings.USE_CLOUD_DB,
+            db_path=settings.SQLITE_PATH,
+            connection_url=settings.SUPABASE_URL,
+        )
+    return _tracker
+
+
+def get_cached_strategy_history(
+    strategy: Dict,
+    time_range: str,
+    timestamp_seconds: int,
+    tracker=None
+) -> pd.DataFrame:
+    """
+    get_strategy_history() for a chart time range, served from chart_cache when possible.
+
+    Args:
+        strategy: Strategy dict (as for get_strategy_history)
+        time_range: '7d', '30d', '90d' or 'all' (case-insensitive)
+        timestamp_seconds: Snapshot the dashboard is showing - end of the range and part of the key
+        tracker: Optional RateTracker (default: one per process from settings)
+
+    Returns:
+        History DataFrame, as get_strategy_history() returns it
+    """
+    from data.rate_tracker import RateTracker
+
+    time_range = time_range.lower()
+    tracker = tracker or _get_tracker()
+    strategy_hash = RateTracker.compute_strategy_hash(strategy)
+
+    chart_data = tracker.load_chart_cache(strategy_hash, time_range, timestamp_seconds)
+    if chart_data is not None:
+        history_df = decode_series(chart_data, strategy.get('strategy_type'))
+        print(f"[CACHE HIT] Chart data {strategy_hash}/{time_range}: {len(history_df)} points")
+        return history_df
+
+    start_ts, end_ts = get_chart_time_range(time_range, timestamp_seconds)
+    history_df = get_strategy_history(strategy, start_ts, end_ts)
+
+    # Empty results are not cached - the next snapshot may have data
+    if not history_df.empty:
+        tracker.save_chart_cache(strategy_hash, time_range, timestamp_seconds, encode_series(history_df))
+    return history_df
+
@@ -5,13 +5,16 @@ import pandas as pd
 from typing import Optional
 from datetime import datetime
 
+from analysis.strategy_history.downsample import downsample_history
+
 
 def create_history_chart(
     history_df: pd.DataFrame,
     title: str,
     include_price: bool = False,
     price_column: str = 'token2_price',
-    height: int = 400
+    height: int = 400,
+    width_px: Optional[int] = None
 ) -> go.Figure:
     """
     Create interactive Plotly chart for APR history.
@@ -28,11 +31,15 @@ def create_history_chart(
         include_price: If True, add price as secondary y-axis
         price_column: Column name for price data (only used if include_price=True)
         height: Chart height in pixels
+        width_px: Plot width to downsample long ranges for (default: settings.HISTORY_CHART_WIDTH_PX)
 
     Returns:
         Plotly Figure object ready for st.plotly_chart()
     """
 
+    plotted = ['net_apr'] + ([price_column] if include_price else [])
+    history_df = downsample_history(history_df, plotted, width_px)
+
     fig = go.Figure()
 
     # Convert timestamp index to datetime for plotting
@@ -4,12 +4,68 @@ import pandas as pd
 from typing import List, Tuple, Optional
 import logging
 
-from dashboard.db_utils import get_db_engine
+from data.db_utils import get_db_engine
+from data import pnl_rates
+from data.snapshot_retention import HOUR, history_source, history_time_range
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 
+def build_pair_join(
+    token_protocol_pairs: List[Tuple[str, str]],
+    alias: str = 'rs',
+    use_cloud: Optional[bool] = None
+) -> Tuple[str, list]:
+    """
+    Build a JOIN clause restricting rates_snapshot rows to the given token/protocol pairs.
+
+    PostgreSQL gets two parallel text arrays unnested into a relation (constant
+    parameter count, so the statement shape does not change with the number of legs).
+    SQLite gets an inline VALUES list (SQLite names its columns column1/column2).
+    Either way the join lets the planner probe a (token_contract, protocol, time)
+    index (pnl_rates_hourly's primary key, idx_rates_pnl_lookup on rates_snapshot)
+    once per pair instead of evaluating
+    an OR chain against every row.
+
+    Args:
+        token_protocol_pairs: List of (token_contract, protocol) tuples
+        alias: Alias of the rates table in the enclosing query
+        use_cloud: PostgreSQL (True) or SQLite (False) syntax (default: settings.USE_CLOUD_DB)
+
+    Returns:
+        (join_sql, params) - params must precede any WHERE-clause params
+
+    Raises:
+        ValueError: If token_protocol_pairs is empty
+    """
+    # De-duplicate while keeping order (strategies often reuse a leg, e.g. token2 on protocol_a)
+    pairs = list(dict.fromkeys((str(c), str(p)) for c, p in token_protocol_pairs))
+    if not pairs:
+        raise ValueError("token_protocol_pairs must contain at least one (token_contract, protocol) pair")
+
+    if use_cloud is None:
+        use_cloud = settings.USE_CLOUD_DB
+
+    if use_cloud:
+        join_sql = (
+            "JOIN unnest(%s::text[], %s::text[]) AS pairs(token_contract, protocol)\n"
+            f"          ON {alias}.token_contract = pairs.token_contract\n"
+            f"         AND {alias}.protocol = pairs.protocol"
+        )
+        params = [[c for c, _ in pairs], [p for _, p in pairs]]
+    else:
+        values_sql = ", ".join(["(?, ?)"] * len(pairs))
+        join_sql = (
+            f"JOIN (VALUES {values_sql}) AS pairs\n"
+            f"          ON {alias}.token_contract = pairs.column1\n"
+            f"         AND {alias}.protocol = pairs.column2"
+        )
+        params = [v for pair in pairs for v in pair]
+
+    return join_sql, params
+
+
 def fetch_rates_from_database(
     token_protocol_pairs: List[Tuple[str, str]],
     start_timestamp: Optional[int] = None,
@@ -41,49 +97,39 @@ def fetch_rates_from_database(
         >>> # Returns all rate snapshots for those pairs in that time range
 
     Note:
+        - Reads the use_for_pnl snapshot of each hour: pnl_rates_hourly (data/pnl_rates.py),
+          or the retention rollups where the range reaches past it (history_source())
         - Uses parameterized queries to prevent SQL injection
         - Converts Unix timestamps to datetime strings for SQLite/PostgreSQL compatibility
         - Always fetches both collateral_ratio AND liquidation_threshold (Principle 10)
     """
     engine = get_db_engine()
-
-    # Convert Unix timestamps to datetime strings for SQL (Principle 5: Timestamp boundaries)
-    from utils.time_helpers import to_datetime_str
+    pnl_rates.ensure_table_for_engine(engine)  # Databases that predate pnl_rates_hourly
 
     # Use correct placeholder for database type (PostgreSQL uses %s, SQLite uses ?)
     placeholder = '%s' if settings.USE_CLOUD_DB else '?'
 
-    # Build WHERE clause for token/protocol pairs (parameterized for safety)
-    pair_conditions = []
-    for token_contract, protocol in token_protocol_pairs:
-        pair_conditions.append(
-            f"(token_contract = {placeholder} AND protocol = {placeholder})"
-        )
+    # Token/protocol pairs become a joined relation instead of an OR chain, so the
+    # planner can drive one primary key range scan per pair.
+    pairs_join, params = build_pair_join(token_protocol_pairs, alias='rs')
 
-    pairs_clause = " OR ".join(pair_conditions)
+    # Hourly rows from the coarsest table covering the range: pnl_rates_hourly, or the
+    # retention rollups for ranges reaching past it (data/snapshot_retention.py)
+    source = history_source(engine, start_timestamp, end_timestamp, resolution=HOUR)
 
-    # Flatten token_protocol_pairs into parameter list
-    params = []
-    for token_contract, protocol in token_protocol_pairs:
-        params.extend([token_contract, protocol])
+    # Time range as datetime strings (Principle 5: Timestamp boundaries)
+    time_range, time_params = history_time_range(source, placeholder, start_timestamp, end_timestamp, alias='rs')
+    params += time_params
 
-    # Build time range clause with parameters
-    time_clause = ""
-    if start_timestamp is not None:
-        time_clause += f" AND timestamp >= {placeholder}"
-        params.append(to_datetime_str(start_timestamp))
-    if end_timestamp is not None:
-        time_clause += f" AND timestamp <= {placeholder}"
-        params.append(to_datetime_str(end_timestamp))
-
-    # Query rates_snapshot table (Principle 10: Always fetch both collateral_ratio and liquidation_threshold)
+    # Query the hourly PnL rows (Principle 10: Always fetch both
+    # collateral_ratio and liquidation_threshold)
     # Include base and reward APR components for breakdown analysis
     # avg8hr/avg24hr columns are populated for Bluefin perp rows only (NULL elsewhere)
     query = f"""
         SELECT
-            timestamp,
-            token_contract,
-            protocol,
+            rs.timestamp,
+            rs.token_contract,
+            rs.protocol,
             lend_total_apr,
             lend_base_apr,
             lend_reward_apr,
@@ -98,11 +144,10 @@ def fetch_rates_from_database(
             avg8hr_borrow_total_apr,
             avg24hr_lend_total_apr,
             avg24hr_borrow_total_apr
-        FROM rates_snapshot
-        WHERE use_for_pnl = TRUE
-          AND ({pairs_clause})
-          {time_clause}
-        ORDER BY timestamp ASC
+        FROM {source} rs
+        {pairs_join}
+        WHERE {time_range or 'TRUE'}
+        ORDER BY rs.timestamp ASC
     """
 
     logger.debug(f"Fetching rates for {len(token_protocol_pairs)} token/protocol pairs")
@@ -114,9 +159,9 @@ def fetch_rates_from_database(
         df = pd.read_sql(query, engine, params=tuple(params))
 
         # Convert timestamp strings back to Unix seconds for internal processing (Principle 5)
-        from utils.time_helpers import to_seconds
+        from utils.time_helpers import series_to_seconds
         if not df.empty and 'timestamp' in df.columns:
-            df['timestamp'] = df['timestamp'].apply(to_seconds)
+            df['timestamp'] = series_to_seconds(df['timestamp'])
 
         logger.info(f"Fetched {len(df)} rate snapshots")
         return df
@@ -151,7 +196,7 @@ def fetch_basis_history(
         Empty DataFrame if no data is available.
     """
     engine = get_db_engine()
-    from utils.time_helpers import to_datetime_str, to_seconds
+    from utils.time_helpers import to_datetime_str, series_to_seconds
 
     placeholder = '%s' if settings.USE_CLOUD_DB else '?'
 
@@ -177,7 +222,7 @@ def fetch_basis_history(
         df = pd.read_sql(query, engine, params=tuple(params))
         if df.empty:
             return pd.DataFrame(columns=['timestamp', 'basis_bid', 'basis_ask', 'basis_mid']).set_index('timestamp')
-        df['timestamp'] = df['timestamp'].apply(to_seconds)
+        df['timestamp'] = series_to_seconds(df['timestamp'])
         df = df.set_index('timestamp')
         return df
     except Exception as e:
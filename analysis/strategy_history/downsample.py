@@ -0,0 +1,97 @@
+"""
+Downsampling for strategy history charts (settings.HISTORY_CHART_WIDTH_PX).
+
+History series are hourly, so multi-month ranges sent thousands of points per trace
+to Plotly - far more than the plot has pixels. downsample_history() keeps every row
+while the series fits the width, and otherwise selects rows by time bucket:
+
+- the bucket size is the smallest step in RESOLUTIONS that yields at most
+  width_px / (2 * number of plotted columns) buckets over the data's span
+- each bucket keeps the rows holding the min and the max of every plotted column,
+  so spikes and dips survive; the first and last rows are always kept
+
+Rows are selected, not averaged: every plotted point is a real history value.
+Buckets are aligned to the epoch, so the same range downsamples the same way on
+every rerun.
+"""
+
+import logging
+from typing import Iterable, Optional
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+
+logger = logging.getLogger(__name__)
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Bucket sizes (seconds), smallest first; longer spans use whole days
+RESOLUTIONS = (
+    5 * 60, 15 * 60, 30 * 60,
+    HOUR, 2 * HOUR, 3 * HOUR, 4 * HOUR, 6 * HOUR, 8 * HOUR, 12 * HOUR,
+    DAY, 2 * DAY, 3 * DAY, 7 * DAY,
+)
+
+
+def pick_resolution(span_seconds: int, max_buckets: int) -> int:
+    """
+    Smallest bucket size (seconds) covering span_seconds in at most max_buckets buckets.
+
+    Args:
+        span_seconds: Time covered by the data (last - first timestamp)
+        max_buckets: Bucket budget
+
+    Returns:
+        A RESOLUTIONS entry, or a whole number of days beyond them
+    """
+    target = span_seconds / max(max_buckets, 1)
+    for resolution in RESOLUTIONS:
+        if resolution >= target:
+            return resolution
+    return int(np.ceil(target / DAY)) * DAY
+
+
+def downsample_history(
+    history_df: pd.DataFrame,
+    columns: Iterable[str],
+    width_px: Optional[int] = None
+) -> pd.DataFrame:
+    """
+    Reduce a history DataFrame to about width_px rows for plotting the given columns.
+
+    Args:
+        history_df: get_strategy_history() result (Unix-second 'timestamp' index)
+        columns: Columns the chart plots (missing ones are ignored)
+        width_px: Plot width in pixels (default: settings.HISTORY_CHART_WIDTH_PX; 0 = off)
+
+    Returns:
+        history_df itself when it already fits (short ranges), otherwise the selected
+        rows in timestamp order with all columns
+    """
+    width_px = settings.HISTORY_CHART_WIDTH_PX if width_px is None else width_px
+    columns = [c for c in columns if c in history_df.columns]
+    if width_px <= 0 or len(history_df) <= width_px or not columns:
+        return history_df
+
+    history_df = history_df.sort_index()
+    timestamps = np.asarray(history_df.index, dtype=np.int64)
+    # Each bucket keeps up to two rows (min, max) per column
+    resolution = pick_resolution(int(timestamps[-1] - timestamps[0]), width_px // (2 * len(columns)))
+
+    keep = {history_df.index[0], history_df.index[-1]}
+    for column in columns:
+        values = pd.to_numeric(history_df[column], errors='coerce').dropna()
+        if values.empty:
+            continue
+        grouped = values.groupby(np.asarray(values.index, dtype=np.int64) // resolution)
+        keep.update(grouped.idxmin())
+        keep.update(grouped.idxmax())
+
+    logger.debug(
+        f"Downsampled history: {len(history_df)} -> {len(keep)} rows "
+        f"({resolution}s buckets, {len(columns)} columns, {width_px}px)"
+    )
+    return history_df.loc[sorted(keep)]
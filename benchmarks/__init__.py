@@ -0,0 +1 @@
+"""Benchmarks package for sui-lending-bot."""
@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+Benchmark: history reads from rates_snapshot
+
+Builds a synthetic SQLite rates_snapshot (one year of hourly use_for_pnl rows for
+a configurable number of tokens x protocols), fills pnl_rates_hourly from it, and
+compares:
+
+  legacy  - rates_snapshot, OR chain of (token_contract = ? AND protocol = ?) + .apply(to_seconds)
+  current - fetch_rates_from_database(): pnl_rates_hourly, joined pair relation + series_to_seconds()
+
+Usage:
+    python benchmarks/bench_fetch_rates.py
+    python benchmarks/bench_fetch_rates.py --days 365 --tokens 40 --legs 4 --repeat 5
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+
+# Local SQLite only - must be set before config.settings is imported
+os.environ['USE_CLOUD_DB'] = 'false'
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+import pandas as pd
+
+from config import settings
+
+PROTOCOLS = ['Navi', 'AlphaFi', 'Suilend', 'ScallopLend', 'ScallopBorrow', 'Pebble']
+
+
+def build_synthetic_db(db_path: str, days: int, n_tokens: int, seed: int = 7) -> list:
+    """
+    Create rates_snapshot with hourly rows and the production indexes, plus pnl_rates_hourly.
+    Returns all (contract, protocol) pairs.
+    """
+    from data import pnl_rates
+
+    rng = np.random.default_rng(seed)
+    conn = sqlite3.connect(db_path)
+    conn.executescript("""
+        CREATE TABLE rates_snapshot (
+            timestamp TIMESTAMP NOT NULL,
+            protocol VARCHAR(50) NOT NULL,
+            token VARCHAR(50) NOT NULL,
+            token_contract TEXT NOT NULL,
+            lend_base_apr DECIMAL(10,6), lend_reward_apr DECIMAL(10,6), lend_total_apr DECIMAL(10,6),
+            borrow_base_apr DECIMAL(10,6), borrow_reward_apr DECIMAL(10,6), borrow_total_apr DECIMAL(10,6),
+            avg8hr_lend_total_apr NUMERIC(10,6), avg8hr_borrow_total_apr NUMERIC(10,6),
+            avg24hr_lend_total_apr NUMERIC(10,6), avg24hr_borrow_total_apr NUMERIC(10,6),
+            collateral_ratio DECIMAL(10,6), liquidation_threshold DECIMAL(10,6),
+            price_usd DECIMAL(20,10), borrow_fee DECIMAL(10,6),
+            use_for_pnl BOOLEAN NOT NULL DEFAULT FALSE,
+            PRIMARY KEY (timestamp, protocol, token_contract)
+        );
+        CREATE INDEX idx_rates_time ON rates_snapshot(timestamp);
+        CREATE INDEX idx_rates_contract ON rates_snapshot(token_contract);
+        CREATE INDEX idx_rates_protocol_contract ON rates_snapshot(protocol, token_contract);
+        CREATE INDEX idx_rates_pnl_flag ON rates_snapshot(use_for_pnl, timestamp) WHERE use_for_pnl = TRUE;
+        CREATE INDEX idx_rates_pnl_lookup ON rates_snapshot(token_contract, protocol, timestamp) WHERE use_for_pnl = TRUE;
+    """)
+
+    hours = pd.date_range('2025-01-01', periods=days * 24, freq='h')
+    ts_strings = hours.strftime('%Y-%m-%d %H:%M:%S').tolist()
+    pairs = [(f"0x{i:064x}::tok{i}::TOK{i}", protocol) for i in range(n_tokens) for protocol in PROTOCOLS]
+
+    for contract, protocol in pairs:
+        n = len(ts_strings)
+        lend = rng.normal(0.05, 0.01, n)
+        borrow = lend + rng.normal(0.02, 0.005, n)
+        price = 1.0 + rng.normal(0, 0.001, n).cumsum()
+        conn.executemany(
+            "INSERT INTO rates_snapshot (timestamp, protocol, token, token_contract, "
+            "lend_base_apr, lend_reward_apr, lend_total_apr, borrow_base_apr, borrow_reward_apr, borrow_total_apr, "
+            "collateral_ratio, liquidation_threshold, price_usd, borrow_fee, use_for_pnl) "
+            "VALUES (?, ?, ?, ?, ?, 0, ?, ?, 0, ?, 0.7, 0.8, ?, 0.001, 1)",
+            zip(ts_strings, [protocol] * n, [contract.split('::')[-1]] * n, [contract] * n,
+                lend.tolist(), lend.tolist(), borrow.tolist(), borrow.tolist(), price.tolist())
+        )
+    cursor = conn.cursor()
+    for statement in pnl_rates.schema_statements():
+        cursor.execute(statement)
+    pnl_rates.refresh(cursor, use_cloud=False)
+    conn.commit()
+    conn.execute("ANALYZE")
+    conn.close()
+    return pairs
+
+
+def legacy_fetch(engine, pairs, start_ts, end_ts) -> pd.DataFrame:
+    """The pre-join implementation, kept verbatim for comparison."""
+    from utils.time_helpers import to_datetime_str, to_seconds
+
+    pairs_clause = " OR ".join(["(token_contract = ? AND protocol = ?)"] * len(pairs))
+    params = [v for pair in pairs for v in pair]
+    params += [to_datetime_str(start_ts), to_datetime_str(end_ts)]
+    query = f"""
+        SELECT timestamp, token_contract, protocol,
+               lend_total_apr, lend_base_apr, lend_reward_apr,
+               borrow_total_apr, borrow_base_apr, borrow_reward_apr,
+               price_usd, collateral_ratio, liquidation_threshold, borrow_fee,
+               avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+               avg24hr_lend_total_apr, avg24hr_borrow_total_apr
+        FROM rates_snapshot
+        WHERE use_for_pnl = TRUE
+          AND ({pairs_clause})
+          AND timestamp >= ? AND timestamp <= ?
+        ORDER BY timestamp ASC
+    """
+    df = pd.read_sql(query, engine, params=tuple(params))
+    if not df.empty:
+        df['timestamp'] = df['timestamp'].apply(to_seconds)
+    return df
+
+
+def time_it(fn, repeat: int):
+    """Return (best_seconds, last_result)."""
+    best = float('inf')
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn()
+        best = min(best, time.perf_counter() - t0)
+    return best, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark rates_snapshot history reads")
+    parser.add_argument('--days', type=int, default=365, help="Days of hourly history (default: 365)")
+    parser.add_argument('--tokens', type=int, default=40, help="Number of synthetic tokens (default: 40)")
+    parser.add_argument('--legs', type=int, default=4, help="Token/protocol pairs per query (default: 4)")
+    parser.add_argument('--repeat', type=int, default=5, help="Repetitions, best time reported (default: 5)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench_rates.db')
+        settings.SQLITE_PATH = db_path
+
+        t0 = time.perf_counter()
+        pairs = build_synthetic_db(db_path, args.days, args.tokens)
+        print(f"[SETUP] {len(pairs) * args.days * 24:,} rows ({len(pairs)} pairs x {args.days * 24} hours) "
+              f"in {time.perf_counter() - t0:.1f}s")
+
+        from data.db_utils import get_db_engine, dispose_engines
+        from analysis.strategy_history.data_fetcher import fetch_rates_from_database
+        from utils.time_helpers import to_seconds
+
+        engine = get_db_engine()
+        legs = pairs[::max(1, len(pairs) // args.legs)][:args.legs]
+        start_ts = to_seconds('2025-01-01 00:00:00')
+        end_ts = start_ts + args.days * 86400
+
+        legacy_s, legacy_df = time_it(lambda: legacy_fetch(engine, legs, start_ts, end_ts), args.repeat)
+        current_s, current_df = time_it(lambda: fetch_rates_from_database(legs, start_ts, end_ts), args.repeat)
+
+        pd.testing.assert_frame_equal(
+            legacy_df.sort_values(['timestamp', 'token_contract', 'protocol']).reset_index(drop=True),
+            current_df.sort_values(['timestamp', 'token_contract', 'protocol']).reset_index(drop=True),
+            check_dtype=False,
+        )
+
+        print(f"[RESULT] {len(current_df):,} rows for {len(legs)} legs (outputs identical)")
+        print(f"  legacy  (OR chain + apply)      : {legacy_s * 1000:8.1f} ms")
+        print(f"  current (pair join + vectorized): {current_s * 1000:8.1f} ms")
+        print(f"  speedup                         : {legacy_s / current_s:8.2f}x")
+
+        dispose_engines()
+
+
+if __name__ == "__main__":
+    main()
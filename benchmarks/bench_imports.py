@@ -0,0 +1,182 @@
+#!/usr/bin/env python3
+"""
+Benchmark: headless cold-start import cost (with a budget check)
+
+Imports every repo module the headless entry points can load (main.py, the refresh
+daemon, main_perp_refresh.py - following imports inside functions too, since
+refresh_pipeline() imports most of its dependencies lazily) in a fresh interpreter,
+and fails when:
+
+  - a dashboard-only dependency (FORBIDDEN_MODULES: plotly, streamlit) gets imported
+  - the import time (best of --repeat runs) exceeds --budget-s
+
+Run it before merging changes to the data/analysis layer; a new top-level import
+of a heavy package shows up here. --top N lists the slowest top-level imports
+(python -X importtime) to find what regressed.
+
+Usage:
+    python benchmarks/bench_imports.py
+    python benchmarks/bench_imports.py --budget-s 1.5 --repeat 5 --top 15
+"""
+import argparse
+import ast
+import json
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Headless entry points; everything they import - at module level or inside
+# functions - is followed through the repo (see headless_modules())
+ENTRY_POINTS = ('main', 'main_perp_refresh', 'data.refresh_daemon')
+
+# Dashboard-only dependencies the headless path must never import
+FORBIDDEN_MODULES = ('plotly', 'streamlit')
+
+# Default budget for importing headless_modules() (seconds, excluding interpreter start)
+DEFAULT_BUDGET_S = 1.0
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+for name in {modules!r}:
+    __import__(name)
+elapsed = time.perf_counter() - start
+print(json.dumps({{'import_s': elapsed, 'modules': sorted(sys.modules)}}))
+"""
+
+
+def _module_path(name: str):
+    """Repo file for a dotted module name, or None for third-party/stdlib modules."""
+    base = REPO_ROOT.joinpath(*name.split('.'))
+    for path in (base.with_suffix('.py'), base / '__init__.py'):
+        if path.is_file():
+            return path
+    return None
+
+
+def _imported_names(path: Path, module: str) -> set:
+    """Dotted names imported anywhere in a file (module level and inside functions)."""
+    tree = ast.parse(path.read_text(), filename=str(path))
+    package = module if path.name == '__init__.py' else module.rpartition('.')[0]
+    names = set()
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names.update(alias.name for alias in node.names)
+        elif isinstance(node, ast.ImportFrom):
+            if node.level:
+                parts = package.split('.')
+                parent = '.'.join(parts[:len(parts) - node.level + 1])
+                source = f"{parent}.{node.module}" if node.module else parent
+            else:
+                source = node.module
+            names.add(source)
+            # "from pkg import submodule"
+            names.update(f"{source}.{alias.name}" for alias in node.names)
+    return names
+
+
+def headless_modules() -> list:
+    """
+    Repo modules reachable from ENTRY_POINTS, following lazy imports too.
+
+    Returns:
+        Sorted dotted module names (third-party imports are not listed; importing
+        these modules loads them)
+    """
+    seen = set()
+    pending = list(ENTRY_POINTS)
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        path = _module_path(name)
+        if path is None:
+            continue
+        seen.add(name)
+        for imported in _imported_names(path, name):
+            # Importing a.b.c also runs a/__init__ and a/b/__init__
+            parts = imported.split('.')
+            pending.extend('.'.join(parts[:i]) for i in range(1, len(parts) + 1))
+    return sorted(seen)
+
+
+def _child_env() -> dict:
+    env = dict(os.environ)
+    env['USE_CLOUD_DB'] = 'false'  # config.settings must not need a database URL
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [str(REPO_ROOT), env.get('PYTHONPATH')]))
+    return env
+
+
+def measure_once(modules, extra_args=()) -> subprocess.CompletedProcess:
+    """Import modules in a fresh interpreter."""
+    return subprocess.run(
+        [sys.executable, *extra_args, '-c', _CHILD.format(modules=tuple(modules))],
+        capture_output=True, text=True, cwd=REPO_ROOT, env=_child_env(),
+    )
+
+
+def top_imports(modules, n: int) -> list:
+    """(cumulative_us, module) for the n slowest top-level imports, via -X importtime."""
+    proc = measure_once(modules, ['-X', 'importtime'])
+    rows = []
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"; top level has 1 space of indent
+        m = re.match(r'import time:\s+\d+ \|\s+(\d+) \| (\S.*)$', line)
+        if m:
+            rows.append((int(m.group(1)), m.group(2)))
+    return sorted(rows, reverse=True)[:n]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check headless cold-start imports against a budget")
+    parser.add_argument('--budget-s', type=float, default=DEFAULT_BUDGET_S,
+                        help=f"Max import time in seconds (default: {DEFAULT_BUDGET_S})")
+    parser.add_argument('--repeat', type=int, default=3, help="Fresh interpreters, best time counted (default: 3)")
+    parser.add_argument('--top', type=int, default=0, help="Also list the N slowest top-level imports")
+    args = parser.parse_args()
+
+    headless = headless_modules()
+    times = []
+    modules = []
+    for _ in range(args.repeat):
+        proc = measure_once(headless)
+        if proc.returncode != 0:
+            print(proc.stderr)
+            print("[BENCH] FAIL: headless modules failed to import")
+            sys.exit(1)
+        result = json.loads(proc.stdout.strip().splitlines()[-1])
+        times.append(result['import_s'])
+        modules = result['modules']
+
+    best = min(times)
+    forbidden = sorted(m for m in modules if m.split('.')[0] in FORBIDDEN_MODULES)
+
+    print(f"\n[BENCH] Headless imports: {len(headless)} repo modules -> {len(modules)} modules loaded")
+    print(f"[BENCH] Import time: best {best:.3f}s, all {', '.join(f'{t:.3f}' for t in times)} "
+          f"(budget {args.budget_s:.3f}s)")
+
+    if args.top:
+        print(f"\n{'cumulative_ms':>14s}  top-level import")
+        for cumulative_us, name in top_imports(headless, args.top):
+            print(f"{cumulative_us / 1000:14.1f}  {name}")
+        print()
+
+    failed = False
+    if forbidden:
+        roots = sorted({m.split('.')[0] for m in forbidden})
+        print(f"[BENCH] FAIL: dashboard-only modules imported on the headless path: {roots}")
+        failed = True
+    if best > args.budget_s:
+        print(f"[BENCH] FAIL: import time {best:.3f}s exceeds budget {args.budget_s:.3f}s")
+        failed = True
+    if failed:
+        sys.exit(1)
+    print("[BENCH] OK")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,289 @@
+#!/usr/bin/env python3
+"""
+Benchmark: end-to-end refresh stages
+
+Runs the refresh_pipeline() stages one by one against a fresh local SQLite DB and
+reports wall time, rows/s and peak RSS per stage:
+
+  basis_save           - spot_perp_basis upsert (synthetic mode)
+  merge                - merge_protocol_data() over reader-shaped frames
+  snapshot_save        - RateTracker.save_snapshot()
+  market_snapshot      - MarketSnapshot.from_merged_frames() for PositionService
+  analysis:<type>      - RateAnalyzer.analyze_all_combinations() per strategy type
+  analysis:parallel    - all strategy types in one call with --workers processes (only if --workers > 1)
+  analysis_cache_save  - RateTracker.save_analysis_cache()
+  rebalance            - auto_rebalance_positions() over all active positions
+  statistics           - update_position_statistics() over all active positions
+
+Market data is either synthetic (scaled by --tokens/--protocols/--perps) or a
+recorded refresh replayed offline (--replay DIR, see utils/fixtures.py). Positions
+are opened from the analysis results at --history-days before the refresh, with
+hourly rates_snapshot history generated for that window.
+
+Usage:
+    python benchmarks/bench_refresh.py
+    python benchmarks/bench_refresh.py --tokens 80 --perps 6 --positions 50 --history-days 30
+    python benchmarks/bench_refresh.py --replay fixtures/2026-10-18 --output after.json
+    python benchmarks/harness.py before.json after.json
+"""
+import argparse
+import os
+import sqlite3
+import sys
+import tempfile
+from datetime import datetime
+
+# Local SQLite only - must be set before config.settings is imported
+os.environ['USE_CLOUD_DB'] = 'false'
+
+# Add parent directory to path
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pandas as pd
+
+from config import settings
+from benchmarks.harness import StageRecorder, git_commit
+from benchmarks.synthetic import MarketScale, SyntheticMarket
+
+# Fixed refresh time for synthetic runs so results are reproducible
+SYNTHETIC_TIMESTAMP = datetime(2026, 1, 15, 12, 0)
+
+APR_COLUMNS = ('lend_base_apr', 'lend_total_apr', 'borrow_base_apr', 'borrow_total_apr')
+
+
+def build_history(db_path: str, snapshot_ts: str, hours: int) -> int:
+    """
+    Copy the saved snapshot back `hours` hours with deterministic jitter on the APR
+    columns and use_for_pnl = TRUE. Returns rows inserted.
+    """
+    conn = sqlite3.connect(db_path)
+    try:
+        columns = [row[1] for row in conn.execute("PRAGMA table_info(rates_snapshot)")]
+        exprs = []
+        for col in columns:
+            if col == 'timestamp':
+                exprs.append("strftime('%Y-%m-%d %H:%M:%S', rs.timestamp, '-' || h.n || ' hours')")
+            elif col == 'use_for_pnl':
+                exprs.append("1")
+            elif col in APR_COLUMNS:
+                exprs.append(f"rs.{col} * (1 + ((h.n * 7919 + rs.rowid) % 41 - 20) / 400.0)")
+            else:
+                exprs.append(f"rs.{col}")
+        before = conn.total_changes
+        conn.execute(f"""
+            WITH RECURSIVE h(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM h WHERE n < ?)
+            INSERT INTO rates_snapshot ({', '.join(columns)})
+            SELECT {', '.join(exprs)}
+            FROM rates_snapshot rs CROSS JOIN h
+            WHERE rs.timestamp = ?
+        """, (hours, snapshot_ts))
+        inserted = conn.total_changes - before
+        conn.execute("UPDATE rates_snapshot SET use_for_pnl = 1 WHERE timestamp = ?", (snapshot_ts,))
+        conn.commit()
+        conn.execute("ANALYZE")
+        return inserted
+    finally:
+        conn.close()
+
+
+def open_positions(all_results: pd.DataFrame, n_positions: int, entry_seconds: int) -> int:
+    """Open paper positions from the analysis results, round-robin over strategy types."""
+    from analysis.position_service import PositionService
+    from data.db_utils import get_db_connection
+
+    if all_results.empty or n_positions <= 0:
+        return 0
+
+    # Interleave the best rows of each strategy type
+    ranked = all_results.sort_values('net_apr', ascending=False)
+    ranked = ranked.assign(_rank=ranked.groupby('strategy_type').cumcount()).sort_values(['_rank', 'net_apr'], ascending=[True, False])
+
+    conn = get_db_connection()
+    service = PositionService(conn)
+    created = 0
+    try:
+        for _, row in ranked.head(n_positions).iterrows():
+            row = row.copy()
+            row['timestamp'] = entry_seconds
+            try:
+                service.create_position(
+                    strategy_row=row,
+                    positions={
+                        'l_a': row.get('l_a', 0), 'b_a': row.get('b_a', 0),
+                        'l_b': row.get('l_b', 0), 'b_b': row.get('b_b'),
+                    },
+                    token1=row['token1'],
+                    token2=row.get('token2'),
+                    token3=row.get('token3'),
+                    token1_contract=row['token1_contract'],
+                    token2_contract=row.get('token2_contract'),
+                    token3_contract=row.get('token3_contract'),
+                    protocol_a=row['protocol_a'],
+                    protocol_b=row['protocol_b'],
+                    deployment_usd=1000.0,
+                    strategy_type=row['strategy_type'],
+                    execution_time=entry_seconds,
+                    notes="bench_refresh",
+                    token4=row.get('token4'),
+                    token4_contract=row.get('token4_contract'),
+                )
+                created += 1
+            except Exception as e:
+                print(f"[SETUP] Skipped {row['strategy_type']} position: {e}")
+    finally:
+        conn.close()
+    return created
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark refresh pipeline stages")
+    parser.add_argument('--tokens', type=int, default=20, help="Non-stablecoin spot tokens (default: 20)")
+    parser.add_argument('--protocols', type=int, default=6, help="Lending protocols, max 6 (default: 6)")
+    parser.add_argument('--perps', type=int, default=6, help="Bluefin perp markets, max 6 (default: 6)")
+    parser.add_argument('--positions', type=int, default=20, help="Active positions (default: 20)")
+    parser.add_argument('--history-days', type=int, default=14, help="Hourly history before the refresh (default: 14)")
+    parser.add_argument('--seed', type=int, default=7, help="Synthetic data seed (default: 7)")
+    parser.add_argument('--workers', type=int, default=1, help="Also time all strategy types with N worker processes (default: 1 = skip)")
+    parser.add_argument('--recursive-workers', type=int, default=1, help="Worker processes for recursive_lending token2 shards (default: 1)")
+    parser.add_argument('--replay', metavar='DIR', help="Use a recorded refresh instead of synthetic data")
+    parser.add_argument('--output', metavar='PATH', help="JSON results path (default: benchmarks/results/refresh_<commit>.json)")
+    parser.add_argument('--verbose', action='store_true', help="Show pipeline logs for every stage")
+    args = parser.parse_args()
+
+    from data import protocol_merger
+    from data.init_db import init_sqlite
+    from data.rate_tracker import RateTracker
+    from data.db_utils import dispose_engines
+    from analysis.market_snapshot import MarketSnapshot
+    from analysis.rate_analyzer import RateAnalyzer
+    from analysis.strategy_calculators import get_all_strategy_types
+    from data.refresh_pipeline import auto_rebalance_positions, update_position_statistics
+    from utils.time_helpers import to_datetime_str
+
+    recorder = StageRecorder(verbose=args.verbose)
+    params = {k: v for k, v in vars(args).items() if k not in ('output', 'verbose')}
+
+    with tempfile.TemporaryDirectory() as tmp:
+        db_path = os.path.join(tmp, 'bench_refresh.db')
+        market = None
+
+        if args.replay:
+            from utils.fixtures import configure_fixture_mode
+            ts = recorder.run('setup:fixtures', lambda: configure_fixture_mode('replay', args.replay, sqlite_path=db_path))
+            params['mode'] = 'replay'
+        else:
+            settings.SQLITE_PATH = db_path
+            recorder.run('setup:init_db', lambda: init_sqlite(db_path))
+            market = SyntheticMarket(MarketScale(
+                tokens=args.tokens, protocols=args.protocols, perps=args.perps, seed=args.seed
+            ))
+            protocol_merger.fetch_protocol_data = market.fetch_protocol_data
+            settings.ENABLED_PROTOCOLS = market.enabled_protocols
+            ts = SYNTHETIC_TIMESTAMP
+            params['mode'] = 'synthetic'
+            params['universe_tokens'] = len(market.tokens)
+
+        current_seconds = int(ts.timestamp())
+        tracker = RateTracker(use_cloud=False, db_path=db_path)
+
+        if market is not None:
+            basis_df = market.basis_frame(to_datetime_str(current_seconds))
+            recorder.run('basis_save', lambda: tracker.save_spot_perp_basis(basis_df), rows=lambda n: n)
+
+        merged = recorder.run(
+            'merge',
+            lambda: protocol_merger.merge_protocol_data(timestamp=current_seconds),
+            rows=lambda frames: frames[0].drop(columns=['Token', 'Contract']).notna().sum().sum(),
+        )
+        (lend_rates, borrow_rates, collateral_ratios, prices, lend_rewards, borrow_rewards,
+         available_borrow, borrow_fees, borrow_weights, liquidation_thresholds) = merged
+        params['merged_tokens'] = len(lend_rates)
+
+        def save_snapshot():
+            tracker.save_snapshot(
+                timestamp=ts, lend_rates=lend_rates, borrow_rates=borrow_rates,
+                collateral_ratios=collateral_ratios, prices=prices, lend_rewards=lend_rewards,
+                borrow_rewards=borrow_rewards, available_borrow=available_borrow,
+                borrow_fees=borrow_fees, borrow_weights=borrow_weights,
+                liquidation_thresholds=liquidation_thresholds,
+            )
+            with sqlite3.connect(db_path) as conn:
+                return conn.execute("SELECT MAX(timestamp), COUNT(*) FROM rates_snapshot").fetchone()
+
+        snapshot_ts, _ = recorder.run('snapshot_save', save_snapshot, rows=lambda r: r[1])
+        market_snapshot = recorder.run('market_snapshot', lambda: MarketSnapshot.from_merged_frames(
+            timestamp=current_seconds, lend_rates=lend_rates, borrow_rates=borrow_rates,
+            collateral_ratios=collateral_ratios, prices=prices, lend_rewards=lend_rewards,
+            borrow_rewards=borrow_rewards, borrow_weights=borrow_weights,
+            liquidation_thresholds=liquidation_thresholds,
+            basis_df=basis_df if market is not None else None,
+        ), rows=len)
+
+        history_hours = args.history_days * 24
+        recorder.run('setup:history', lambda: build_history(db_path, snapshot_ts, history_hours), rows=lambda n: n)
+
+        perp_basis = tracker.load_spot_perp_basis(current_seconds)
+        results = []
+        for strategy_type in get_all_strategy_types():
+            def analyze(strategy_type=strategy_type):
+                analyzer = RateAnalyzer(
+                    lend_rates=lend_rates, borrow_rates=borrow_rates, collateral_ratios=collateral_ratios,
+                    liquidation_thresholds=liquidation_thresholds, prices=prices,
+                    lend_rewards=lend_rewards, borrow_rewards=borrow_rewards,
+                    available_borrow=available_borrow, borrow_fees=borrow_fees,
+                    borrow_weights=borrow_weights, timestamp=current_seconds,
+                    strategy_types=[strategy_type], perp_basis=perp_basis,
+                    recursive_workers=args.recursive_workers,
+                )
+                return analyzer.analyze_all_combinations()
+            results.append(recorder.run(f'analysis:{strategy_type}', analyze, rows=len))
+
+        if args.workers > 1:
+            recorder.run('analysis:parallel', lambda: RateAnalyzer(
+                lend_rates=lend_rates, borrow_rates=borrow_rates, collateral_ratios=collateral_ratios,
+                liquidation_thresholds=liquidation_thresholds, prices=prices,
+                lend_rewards=lend_rewards, borrow_rewards=borrow_rewards,
+                available_borrow=available_borrow, borrow_fees=borrow_fees,
+                borrow_weights=borrow_weights, timestamp=current_seconds,
+                strategy_types=get_all_strategy_types(), perp_basis=perp_basis, workers=args.workers,
+                recursive_workers=args.recursive_workers,
+            ).analyze_all_combinations(), rows=len)
+
+        all_results = pd.concat([r for r in results if not r.empty], ignore_index=True) if any(
+            not r.empty for r in results) else pd.DataFrame()
+        if not all_results.empty:
+            all_results = all_results.sort_values(by='net_apr', ascending=False)
+        params['strategies'] = len(all_results)
+
+        recorder.run('analysis_cache_save', lambda: tracker.save_analysis_cache(
+            timestamp_seconds=current_seconds,
+            liquidation_distance=settings.DEFAULT_LIQUIDATION_DISTANCE,
+            all_results=all_results,
+        ), rows=lambda _: len(all_results))
+
+        entry_seconds = current_seconds - history_hours * 3600 if history_hours else current_seconds
+        n_positions = recorder.run(
+            'setup:positions', lambda: open_positions(all_results, args.positions, entry_seconds), rows=lambda n: n
+        )
+        params['positions_opened'] = n_positions
+
+        recorder.run('rebalance', lambda: auto_rebalance_positions(
+            current_seconds=current_seconds, notifier=None, send_slack_notifications=False,
+            market_snapshot=market_snapshot,
+        ), rows=lambda _: n_positions)
+        recorder.run('statistics', lambda: update_position_statistics(
+            tracker=tracker, current_seconds=current_seconds, lend_rates=lend_rates,
+            borrow_rates=borrow_rates, borrow_fees=borrow_fees, market_snapshot=market_snapshot,
+        ), rows=lambda n: n)
+
+        dispose_engines()
+
+    recorder.print_table()
+    output = args.output or os.path.join(
+        os.path.dirname(os.path.abspath(__file__)), 'results', f"refresh_{git_commit() or 'local'}.json"
+    )
+    recorder.write_json(output, 'refresh', params)
+
+
+if __name__ == "__main__":
+    main()
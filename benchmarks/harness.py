@@ -0,0 +1,128 @@
+"""
+Stage timing harness shared by the benchmark scripts.
+
+Each stage records wall time, rows processed, rows/s and process peak RSS, and the
+whole run is written as JSON (with git commit + parameters) so results can be
+diffed between commits:
+
+    python benchmarks/bench_refresh.py --output before.json
+    git checkout <branch>
+    python benchmarks/bench_refresh.py --output after.json
+    python benchmarks/harness.py before.json after.json
+"""
+import contextlib
+import io
+import json
+import platform
+import resource
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, List, Optional
+
+
+def peak_rss_mb() -> float:
+    """Process peak resident set size in MB (ru_maxrss is KB on Linux, bytes on macOS)."""
+    maxrss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return maxrss / (1024 * 1024) if sys.platform == 'darwin' else maxrss / 1024
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+            cwd=Path(__file__).resolve().parent,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+class StageRecorder:
+    """Collect per-stage timings. Stage logs are swallowed unless verbose=True."""
+
+    def __init__(self, verbose: bool = False):
+        self.verbose = verbose
+        self.stages: List[dict] = []
+
+    def run(self, name: str, fn: Callable, rows: Optional[Callable] = None):
+        """
+        Time fn() as stage `name` and return its result.
+
+        Args:
+            name: Stage name (e.g. 'merge', 'analysis:recursive_lending')
+            fn: Zero-argument callable to time
+            rows: Optional callable(result) -> rows processed, for rows/s
+        """
+        sink = contextlib.nullcontext() if self.verbose else contextlib.redirect_stdout(io.StringIO())
+        rss_before = peak_rss_mb()
+        with sink:
+            start = time.perf_counter()
+            result = fn()
+            wall = time.perf_counter() - start
+        n_rows = int(rows(result)) if rows is not None else None
+        self.stages.append({
+            'stage': name,
+            'wall_s': round(wall, 4),
+            'rows': n_rows,
+            'rows_per_s': round(n_rows / wall, 1) if n_rows is not None and wall > 0 else None,
+            'peak_rss_mb': round(peak_rss_mb(), 1),
+            'peak_rss_growth_mb': round(peak_rss_mb() - rss_before, 1),
+        })
+        return result
+
+    def print_table(self) -> None:
+        print(f"\n{'stage':40s} {'wall_s':>9s} {'rows':>9s} {'rows/s':>11s} {'peak_rss_mb':>12s}")
+        for s in self.stages:
+            rows = '' if s['rows'] is None else f"{s['rows']:,}"
+            rps = '' if s['rows_per_s'] is None else f"{s['rows_per_s']:,.0f}"
+            print(f"{s['stage']:40s} {s['wall_s']:9.3f} {rows:>9s} {rps:>11s} {s['peak_rss_mb']:12.1f}")
+        print(f"{'total (excluding setup:*)':40s} {self.total_wall_s():9.3f}\n")
+
+    def total_wall_s(self) -> float:
+        """Wall time of measured stages; 'setup:*' stages are reported but not counted."""
+        return round(sum(s['wall_s'] for s in self.stages if not s['stage'].startswith('setup:')), 4)
+
+    def to_dict(self, benchmark: str, params: dict) -> dict:
+        return {
+            'benchmark': benchmark,
+            'commit': git_commit(),
+            'created_at': datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S'),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'params': params,
+            'stages': self.stages,
+            'total_wall_s': self.total_wall_s(),
+        }
+
+    def write_json(self, path: str, benchmark: str, params: dict) -> None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(benchmark, params), f, indent=2)
+        print(f"[BENCH] Results written to {path}")
+
+
+def compare(before_path: str, after_path: str) -> None:
+    """Print per-stage wall time and RSS deltas between two result files."""
+    with open(before_path) as f:
+        before = {s['stage']: s for s in json.load(f)['stages']}
+    with open(after_path) as f:
+        after = {s['stage']: s for s in json.load(f)['stages']}
+
+    print(f"{'stage':40s} {'before_s':>9s} {'after_s':>9s} {'change':>8s} {'rss_before':>11s} {'rss_after':>10s}")
+    for name in list(before) + [n for n in after if n not in before]:
+        b, a = before.get(name), after.get(name)
+        b_s = f"{b['wall_s']:9.3f}" if b else f"{'-':>9s}"
+        a_s = f"{a['wall_s']:9.3f}" if a else f"{'-':>9s}"
+        change = f"{(a['wall_s'] / b['wall_s'] - 1) * 100:+7.1f}%" if a and b and b['wall_s'] > 0 else f"{'':>8s}"
+        b_rss = f"{b['peak_rss_mb']:11.1f}" if b else f"{'-':>11s}"
+        a_rss = f"{a['peak_rss_mb']:10.1f}" if a else f"{'-':>10s}"
+        print(f"{name:40s} {b_s} {a_s} {change} {b_rss} {a_rss}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) != 3:
+        print("Usage: python benchmarks/harness.py BEFORE.json AFTER.json")
+        sys.exit(1)
+    compare(sys.argv[1], sys.argv[2])
@@ -0,0 +1,192 @@
+"""
+Synthetic market data for benchmarks.
+
+Produces reader-shaped (lend, borrow, collateral) DataFrames per protocol, in the
+same column layout the real readers return, so merge_protocol_data() and every
+stage after it run unmodified. Spot tokens for the selected perp markets are taken
+from settings.BLUEFIN_TO_LENDINGS so perp strategies find their mappings.
+"""
+from dataclasses import dataclass
+from typing import Dict, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+LENDING_PROTOCOLS = ['Navi', 'AlphaFi', 'Suilend', 'ScallopLend', 'ScallopBorrow', 'Pebble']
+
+
+@dataclass
+class MarketScale:
+    """Size knobs for a synthetic market."""
+    tokens: int = 40          # Non-stablecoin spot tokens
+    protocols: int = 6        # Lending protocols (first N of LENDING_PROTOCOLS)
+    perps: int = 6            # Bluefin perp markets (first N of BLUEFIN_TO_LENDINGS)
+    coverage: float = 0.8     # Probability a token is listed on a given protocol
+    seed: int = 7
+
+
+class SyntheticMarket:
+    """Deterministic synthetic protocol data at a given MarketScale."""
+
+    def __init__(self, scale: MarketScale):
+        from config import settings
+        from config.stablecoins import STABLECOINS
+        from data.protocol_merger import normalize_coin_type
+
+        self.scale = scale
+        self.protocols = LENDING_PROTOCOLS[:scale.protocols]
+        rng = np.random.default_rng(scale.seed)
+
+        # Token universe: all stablecoins + perp-mapped spot tokens + synthetic fillers
+        self.perp_markets = list(settings.BLUEFIN_TO_LENDINGS.items())[:scale.perps]
+        spot: Dict[str, str] = {}
+        for _, contracts in self.perp_markets:
+            for contract in contracts:
+                contract = normalize_coin_type(contract)
+                if contract not in spot and len(spot) < scale.tokens:
+                    spot[contract] = contract.split('::')[-1]
+        i = 0
+        while len(spot) < scale.tokens:
+            spot[f"0x{i + 1:064x}::syn{i}::SYN{i}"] = f"SYN{i}"
+            i += 1
+
+        # Symbols must be unique (several mapped contracts are all '::COIN')
+        seen: Dict[str, int] = {}
+        self.tokens: List[Tuple[str, str, bool]] = []  # (symbol, contract, is_stable)
+        for symbol, contract in STABLECOINS.items():
+            self.tokens.append((symbol, contract, True))
+        for contract, symbol in spot.items():
+            n = seen.get(symbol, 0)
+            seen[symbol] = n + 1
+            self.tokens.append((symbol if n == 0 else f"{symbol}{n + 1}", contract, False))
+
+        # Listings: every token on at least two protocols so the merger keeps it
+        listed = rng.random((len(self.tokens), len(self.protocols))) < scale.coverage
+        for row in listed:
+            if row.sum() < min(2, len(self.protocols)):
+                row[rng.choice(len(self.protocols), size=min(2, len(self.protocols)), replace=False)] = True
+        self.listed = listed
+
+        self.prices = np.array([1.0 if stable else float(rng.lognormal(1.0, 1.5)) for _, _, stable in self.tokens])
+        self._rng = rng
+        self._frames = {p: self._protocol_frames(j) for j, p in enumerate(self.protocols)}
+        self._frames['Bluefin'] = self._bluefin_frames()
+
+    # ---------- reader-shaped frames ----------
+
+    def _protocol_frames(self, j: int) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        rng = self._rng
+        idx = np.flatnonzero(self.listed[:, j])
+        n = len(idx)
+        symbols = [self.tokens[i][0] for i in idx]
+        contracts = [self.tokens[i][1] for i in idx]
+        prices = self.prices[idx] * (1 + rng.normal(0, 0.001, n))
+
+        supply_base = rng.uniform(0.005, 0.12, n)
+        supply_reward = np.where(rng.random(n) < 0.4, rng.uniform(0, 0.08, n), 0.0)
+        borrow_base = supply_base + rng.uniform(0.005, 0.06, n)
+        borrow_reward = np.where(rng.random(n) < 0.2, rng.uniform(0, 0.03, n), 0.0)
+        collateral = rng.uniform(0.5, 0.85, n)
+        lltv = np.minimum(collateral + rng.uniform(0.02, 0.08, n), 0.95)
+        fee = rng.choice([0.0, 0.001, 0.003], n)
+        weight = rng.choice([1.0, 1.0, 1.5], n)
+
+        lend = pd.DataFrame({
+            'Token': symbols,
+            'Supply_base_apr': supply_base,
+            'Supply_reward_apr': supply_reward,
+            'Supply_apr': supply_base + supply_reward,
+            'Price': prices,
+            'Available_borrow_usd': rng.lognormal(13, 1.5, n),
+            'Borrow_fee': fee,
+            'Borrow_weight': weight,
+            'Liquidation_ltv': lltv,
+            'Token_coin_type': contracts,
+        })
+        borrow = pd.DataFrame({
+            'Token': symbols,
+            'Borrow_base_apr': borrow_base,
+            'Borrow_reward_apr': borrow_reward,
+            'Borrow_apr': borrow_base - borrow_reward,
+            'Price': prices,
+            'Borrow_fee': fee,
+            'Borrow_weight': weight,
+            'Liquidation_ltv': lltv,
+            'Token_coin_type': contracts,
+        })
+        collateral_df = pd.DataFrame({
+            'Token': symbols,
+            'Collateralization_factor': collateral,
+            'Liquidation_threshold': lltv,
+            'Token_coin_type': contracts,
+        })
+        return lend, borrow, collateral_df
+
+    def _bluefin_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Same shape as BluefinReader.get_all_data_for_timestamp()."""
+        rng = self._rng
+        rows = []
+        for proxy, _ in self.perp_markets:
+            base = proxy[2:].split('-')[0]
+            rows.append((f"{base}-USDC-PERP", proxy, float(-rng.normal(0.08, 0.05)), self._perp_price(proxy)))
+        if not rows:
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+        symbols, contracts, rates, prices = map(list, zip(*rows))
+        lend = pd.DataFrame({'Token': symbols, 'Supply_base_apr': rates, 'Supply_reward_apr': 0.0,
+                             'Supply_apr': rates, 'Price': prices, 'Token_coin_type': contracts})
+        borrow = pd.DataFrame({'Token': symbols, 'Borrow_base_apr': rates, 'Borrow_reward_apr': 0.0,
+                               'Borrow_apr': rates, 'Price': prices, 'Token_coin_type': contracts})
+        collateral = pd.DataFrame({'Token': symbols, 'Collateralization_factor': None,
+                                   'Liquidation_threshold': None, 'Token_coin_type': contracts})
+        return lend, borrow, collateral
+
+    def _perp_price(self, proxy: str) -> float:
+        from data.protocol_merger import normalize_coin_type
+
+        spot = {normalize_coin_type(c) for c in dict(self.perp_markets)[proxy]}
+        prices = [self.prices[i] for i, (_, contract, _) in enumerate(self.tokens) if contract in spot]
+        return float(np.mean(prices)) if prices else 1.0
+
+    def fetch_protocol_data(self, protocol_name: str, timestamp: int) -> Tuple[pd.DataFrame, pd.DataFrame, pd.DataFrame]:
+        """Drop-in replacement for data.protocol_merger.fetch_protocol_data."""
+        lend, borrow, collateral = self._frames.get(protocol_name, (pd.DataFrame(), pd.DataFrame(), pd.DataFrame()))
+        return lend.copy(), borrow.copy(), collateral.copy()
+
+    @property
+    def enabled_protocols(self) -> List[str]:
+        return self.protocols + (['Bluefin'] if self.perp_markets else [])
+
+    @property
+    def input_rows(self) -> int:
+        """Reader rows fed into the merge (lend frames only)."""
+        return sum(len(frames[0]) for frames in self._frames.values())
+
+    # ---------- spot/perp basis ----------
+
+    def basis_frame(self, timestamp_str: str) -> pd.DataFrame:
+        """spot_perp_basis rows in the shape BluefinPricingReader.get_spot_perp_basis() returns."""
+        from data.protocol_merger import normalize_coin_type
+
+        rng = self._rng
+        by_contract = {contract: i for i, (_, contract, _) in enumerate(self.tokens)}
+        rows = []
+        for proxy, contracts in self.perp_markets:
+            perp_mid = self._perp_price(proxy)
+            perp_bid, perp_ask = perp_mid * 0.9998, perp_mid * 1.0002
+            ticker = proxy[2:].split('-')[0] + '-PERP'
+            for contract in contracts:
+                i = by_contract.get(normalize_coin_type(contract))
+                if i is None:
+                    continue
+                spot_mid = self.prices[i] * (1 + rng.normal(0, 0.002))
+                spot_bid, spot_ask = spot_mid * 0.999, spot_mid * 1.001
+                basis_bid = (perp_bid - spot_ask) / perp_bid
+                basis_ask = (perp_ask - spot_bid) / perp_ask
+                rows.append({
+                    'timestamp': timestamp_str, 'perp_proxy': proxy, 'perp_ticker': ticker,
+                    'spot_contract': contract, 'spot_bid': spot_bid, 'spot_ask': spot_ask,
+                    'perp_bid': perp_bid, 'perp_ask': perp_ask, 'basis_bid': basis_bid,
+                    'basis_ask': basis_ask, 'basis_mid': (basis_bid + basis_ask) / 2,
+                    'actual_fetch_time': timestamp_str,
+                })
+        return pd.DataFrame(rows)
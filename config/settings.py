@@ -204,6 +204,122 @@ DEFAULT_ALLOCATION_CONSTRAINTS = {
     'stablecoin_preferences': DEFAULT_STABLECOIN_PREFERENCES  # Stablecoin multipliers
 }
 
+# ==============================================================================
+# HTTP CLIENT (utils/http_client.py)
+# ==============================================================================
+
+# Optional on-disk response cache for external JSON fetches and Node SDK output
+# (utils/fixtures.py). `python main.py --record/--replay DIR` sets both in-process.
+# HTTP_CACHE_MODE: 'record' (write live responses) or 'replay' (serve from disk only).
+# Both must be set to enable the cache; unset means every request goes live.
+HTTP_CACHE_DIR = os.getenv('HTTP_CACHE_DIR') or None
+HTTP_CACHE_MODE = os.getenv('HTTP_CACHE_MODE') or None
+
+# ==============================================================================
+# TOKEN ID CATALOGS (utils/id_catalogs.py)
+# ==============================================================================
+
+# Where the CoinGecko coin list / Pyth feed catalog lookup indexes are cached.
+CATALOG_CACHE_DIR = os.getenv('CATALOG_CACHE_DIR', 'data/catalog_cache')
+
+# How long a cached index is used without contacting the API. After that it is
+# revalidated (ETag / Last-Modified) and only re-downloaded if the catalog changed.
+COINGECKO_CATALOG_TTL_HOURS = float(os.getenv('COINGECKO_CATALOG_TTL_HOURS', '24'))
+PYTH_CATALOG_TTL_HOURS = float(os.getenv('PYTH_CATALOG_TTL_HOURS', '24'))
+
+# ==============================================================================
+# STRATEGY ANALYSIS (analysis/rate_analyzer.py)
+# ==============================================================================
+
+# Worker processes for RateAnalyzer.analyze_all_combinations(). Strategy types are
+# generated concurrently in processes started from a fork server (spawn on Windows),
+# each sent a copy of the analyzer once - safe while the Slack queue or the daemon's
+# threads are running.
+# 1 = generate every strategy type sequentially in-process.
+ANALYSIS_WORKERS = int(os.getenv('ANALYSIS_WORKERS', '1'))
+
+# Worker processes for the recursive_lending generator, which is split by token2
+# (one shard per token2, merged in a fixed order - output is identical to 1), in
+# worker processes started the same way as ANALYSIS_WORKERS.
+RECURSIVE_WORKERS = int(os.getenv('RECURSIVE_WORKERS', '1'))
+
+# Print a recursive_lending progress line every N token2 shards (0 = off).
+RECURSIVE_PROGRESS_EVERY = int(os.getenv('RECURSIVE_PROGRESS_EVERY', '0'))
+
+# Store historical snapshots loaded by the dashboard (load_historical_snapshot) as
+# float32 instead of float64. Halves the container; strategy APRs computed from them
+# differ from a float64 run in the last digits. The refresh pipeline always persists
+# and analyses float64.
+MARKET_DATA_FLOAT32 = get_bool_env('MARKET_DATA_FLOAT32', default=False)
+
+# ==============================================================================
+# REFRESH DAEMON (main.py --daemon, data/refresh_daemon.py)
+# ==============================================================================
+
+# Health endpoint port (Railway sets PORT for services). 0 = no health endpoint.
+DAEMON_HEALTH_PORT = int(os.getenv('DAEMON_HEALTH_PORT', os.getenv('PORT', '8080')))
+
+# Run one refresh immediately on start, before the first scheduled slot.
+DAEMON_RUN_ON_START = get_bool_env('DAEMON_RUN_ON_START', default=True)
+
+# Also run main_perp_refresh.py hourly at :05 inside the daemon.
+DAEMON_PERP_REFRESH = get_bool_env('DAEMON_PERP_REFRESH', default=True)
+
+# Max pooled PostgreSQL connections per database (data/db_pool.py, daemon only).
+DB_POOL_SIZE = int(os.getenv('DB_POOL_SIZE', '5'))
+
+# ==============================================================================
+# SLACK NOTIFICATION QUEUE (alerts/notification_queue.py)
+# ==============================================================================
+
+# Send refresh notifications from a background thread instead of inline.
+# False = SlackNotifier.send_message() posts synchronously, as the dashboard does.
+SLACK_ASYNC = get_bool_env('SLACK_ASYNC', default=True)
+
+# Max queued notifications; further ones are dropped (and logged) until the queue drains.
+SLACK_QUEUE_SIZE = int(os.getenv('SLACK_QUEUE_SIZE', '100'))
+
+# Delivery attempts per notification, waiting SLACK_RETRY_BACKOFF_SECONDS × 2^n between them.
+SLACK_SEND_ATTEMPTS = int(os.getenv('SLACK_SEND_ATTEMPTS', '4'))
+SLACK_RETRY_BACKOFF_SECONDS = float(os.getenv('SLACK_RETRY_BACKOFF_SECONDS', '1'))
+
+# On process exit, wait at most this long for queued notifications to be delivered.
+SLACK_DRAIN_TIMEOUT_SECONDS = float(os.getenv('SLACK_DRAIN_TIMEOUT_SECONDS', '30'))
+
+# ==============================================================================
+# SNAPSHOT DIFFING (data/snapshot_diff.py)
+# ==============================================================================
+
+# Store rates_snapshot rows that did not change since the previous snapshot as narrow
+# markers (rates_snapshot_unchanged) instead of full rows. Readers then select from the
+# rates_snapshot_resolved view, which expands the markers. Turning it off stops new
+# markers only: readers keep using the view while the marker table exists.
+SNAPSHOT_DIFF_ENABLED = get_bool_env('SNAPSHOT_DIFF_ENABLED', default=False)
+
+# ==============================================================================
+# RATES SNAPSHOT RETENTION (data/snapshot_retention.py)
+# ==============================================================================
+
+# Keep every rates_snapshot row for this many days; older snapshots are reduced to
+# one row per hour (the use_for_pnl row) in rates_snapshot_hourly after each refresh.
+# 0 disables retention - nothing is ever moved or deleted. pnl_rates_hourly is never
+# trimmed: it is the PnL ledger (data/pnl_rates.py).
+RATES_RAW_RETENTION_DAYS = int(os.getenv('RATES_RAW_RETENTION_DAYS', '0'))
+
+# Hourly rows older than this many days are averaged into one row per day in
+# rates_snapshot_daily. 0 keeps hourly rows forever; otherwise must be >= the raw days.
+RATES_HOURLY_RETENTION_DAYS = int(os.getenv('RATES_HOURLY_RETENTION_DAYS', '0'))
+
+# ==============================================================================
+# HISTORY CHART DOWNSAMPLING (analysis/strategy_history/downsample.py)
+# ==============================================================================
+
+# Plot width (pixels) history charts are downsampled for. Charts stretch to the page,
+# so this is the widest expected plot area rather than a measured width.
+# A chart gets at most this many points; shorter series are plotted exactly.
+# 0 disables downsampling.
+HISTORY_CHART_WIDTH_PX = int(os.getenv('HISTORY_CHART_WIDTH_PX', '1200'))
+
 # ==============================================================================
 # LOCAL DEVELOPMENT ONLY
 # ==============================================================================
@@ -1,13 +1,13 @@
 """Analysis tab — strategy rate charting with 8hr/24hr rolling avg overlays."""
 
 from datetime import datetime
-from typing import Optional
 
 import pandas as pd
 import plotly.graph_objects as go
 import streamlit as st
 
-from analysis.strategy_history.strategy_history import get_strategy_history
+from analysis.strategy_history.chart_cache import get_cached_strategy_history
+from analysis.strategy_history.downsample import downsample_history
 from config import settings
 from config.stablecoins import STABLECOIN_SYMBOLS
 
@@ -26,14 +26,6 @@ def _fmt(v) -> str:
         return "—"
 
 
-def _resolve_start_timestamp(time_range: str, end_ts: int) -> Optional[int]:
-    """Convert UI time-range string → Unix seconds start. Design Note #1: explicit timestamps."""
-    days = {'7d': 7, '30d': 30, '90d': 90}.get(time_range)
-    if days is None:
-        return None  # 'All' — no lower bound
-    return end_ts - days * 86400
-
-
 def _strategy_label(row: pd.Series) -> str:
     """Build a human-readable strategy selector label."""
     stype  = row.get('strategy_type', '')
@@ -270,6 +262,11 @@ def _render_apr_chart(history_df: pd.DataFrame) -> None:
     show_8hr   = col2.checkbox("8hr avg APR",    value=True,  key="analysis_show_8hr")
     show_24hr  = col3.checkbox("24hr avg APR",   value=True,  key="analysis_show_24hr")
 
+    # Long ranges: plot min/max rows per time bucket instead of every hourly point
+    plotted = [c for c, shown in (('net_apr', show_spot), ('net_avg8hr_apr', show_8hr),
+                                  ('net_avg24hr_apr', show_24hr)) if shown]
+    history_df = downsample_history(history_df, plotted)
+
     # Convert Unix-second index to display strings (Design Note #5: conversion at display boundary)
     ts_display = [datetime.fromtimestamp(int(ts)).strftime('%Y-%m-%d %H:%M')
                   for ts in history_df.index]
@@ -329,6 +326,11 @@ def _render_basis_chart(history_df: pd.DataFrame) -> None:
     show_ask = col2.checkbox("Basis Ask", value=True, key="analysis_show_basis_ask")
     show_mid = col3.checkbox("Mid Basis", value=True, key="analysis_show_basis_mid")
 
+    # Long ranges: plot min/max rows per time bucket instead of every hourly point
+    plotted = [c for c, shown in (('basis_bid', show_bid), ('basis_ask', show_ask),
+                                  ('basis_mid', show_mid)) if shown]
+    history_df = downsample_history(history_df, plotted)
+
     # Convert Unix-second index to display strings (Design Note #5: conversion at display boundary)
     ts_display = [datetime.fromtimestamp(int(ts)).strftime('%Y-%m-%d %H:%M')
                   for ts in history_df.index]
@@ -437,14 +439,10 @@ def render_analysis_tab(all_results: pd.DataFrame, timestamp_seconds: int) -> No
 
     # ── Load history ──────────────────────────────────────────────────────
     if load_btn:
-        start_ts = _resolve_start_timestamp(time_range, timestamp_seconds)
         with st.spinner("Loading historical rates…"):
             try:
-                history_df = get_strategy_history(
-                    strategy_dict,
-                    start_timestamp=start_ts,
-                    end_timestamp=timestamp_seconds,
-                )
+                # Cached per strategy, range and snapshot (analysis/strategy_history/chart_cache.py)
+                history_df = get_cached_strategy_history(strategy_dict, time_range, timestamp_seconds)
             except Exception as e:
                 st.error(f"Failed to load history: {e}")
                 return
@@ -20,9 +20,11 @@ from config import settings
 from config.stablecoins import STABLECOIN_CONTRACTS, STABLECOIN_SYMBOLS
 from dashboard.data_loaders import DataLoader
 from data.rate_tracker import RateTracker
+from data.snapshot_diff import rates_source
 from analysis.position_calculator import PositionCalculator
 from analysis.position_statistics_calculator import calculate_position_statistics
 from analysis.strategy_calculators import get_all_strategy_types
+from analysis.result_schema import with_display_columns
 from dashboard.position_renderers import (
     build_rate_lookup,
     build_oracle_prices,
@@ -1313,7 +1315,7 @@ def render_positions_table_tab(timestamp_seconds: int):
             # Provide context-aware messaging based on whether viewing historical timestamp
             from dashboard.db_utils import get_db_engine
             engine = get_db_engine()
-            latest_ts_query = "SELECT MAX(timestamp) FROM rates_snapshot"
+            latest_ts_query = f"SELECT MAX(timestamp) FROM {rates_source(engine)}"
             latest_ts_result = pd.read_sql_query(latest_ts_query, engine)
 
             if not latest_ts_result.empty and latest_ts_result.iloc[0, 0] is not None:
@@ -1342,7 +1344,7 @@ def render_positions_table_tab(timestamp_seconds: int):
         ph = service._get_placeholder()
         rates_query = f"""
         SELECT protocol, token, token_contract, lend_total_apr, borrow_total_apr, borrow_fee, price_usd
-        FROM rates_snapshot
+        FROM {rates_source(engine)}
         WHERE timestamp = {ph}
         """
         rates_df = pd.read_sql_query(rates_query, engine, params=(latest_timestamp_str,))
@@ -4146,7 +4148,8 @@ def render_dashboard(data_loader: DataLoader, mode: str):
             liquidation_distance=liquidation_distance,
             strategy_types=get_all_strategy_types(),  # Generate all strategy types
             rate_tracker=tracker,  # NEW: Pass RateTracker for perp lending strategies
-            perp_basis=perp_basis_df
+            perp_basis=perp_basis_df,
+            workers=1  # Never fork from the Streamlit server process
         )
         analyzer_init_time = (time.time() - analyzer_init_start) * 1000
         print(f"[{(time.time() - dashboard_start) * 1000:7.1f}ms] [DASHBOARD] RateAnalyzer initialized in {analyzer_init_time:.1f}ms")
@@ -4161,6 +4164,9 @@ def render_dashboard(data_loader: DataLoader, mode: str):
         analysis_time = (time.time() - analysis_start) * 1000
         print(f"[{(time.time() - dashboard_start) * 1000:7.1f}ms] [DASHBOARD] Total analysis time: {analysis_time:.1f}ms")
 
+    # Core result schema -> display frame (apr5/30/90, days_to_breakeven, ... and plain string columns)
+    all_results = with_display_columns(all_results)
+
     # Apply filters
     filter_start = time.time()
     filtered_results = all_results.copy()
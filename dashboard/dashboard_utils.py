@@ -1,23 +1,19 @@
 import pandas as pd
-import plotly.graph_objects as go
 from datetime import datetime, timedelta
-from typing import Optional, List, Tuple, Any, Union, Dict
+from typing import TYPE_CHECKING, Optional, List, Tuple, Any, Union, Dict
 import sys
 import os
 
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from config import settings
+from data.market_data import MarketData
+from data.snapshot_diff import rates_source
+from data.snapshot_retention import history_source
+from data.db_utils import get_db_connection  # Re-exported; lives in the data layer
 
-
-def get_db_connection():
-    """Get database connection (SQLite or PostgreSQL based on settings)"""
-    if settings.USE_CLOUD_DB:
-        import psycopg2
-        return psycopg2.connect(settings.SUPABASE_URL)
-    else:
-        import sqlite3
-        return sqlite3.connect(settings.SQLITE_PATH)
+if TYPE_CHECKING:
+    import plotly.graph_objects as go
 
 
 def get_latest_timestamp(conn: Optional[Any] = None) -> Optional[str]:
@@ -37,11 +33,11 @@ def get_latest_timestamp(conn: Optional[Any] = None) -> Optional[str]:
         should_close = False
 
     # Get SQLAlchemy engine for pandas operations
-    from dashboard.db_utils import get_db_engine
+    from data.db_utils import get_db_engine
     engine = get_db_engine()
 
     try:
-        query = "SELECT MAX(timestamp) as latest FROM rates_snapshot"
+        query = f"SELECT MAX(timestamp) as latest FROM {rates_source(engine)}"
         result = pd.read_sql_query(query, engine)
 
         if result.empty or pd.isna(result['latest'].iloc[0]):
@@ -71,12 +67,12 @@ def get_available_timestamps(conn: Optional[Any] = None) -> List[str]:
         should_close = False
 
     # Get SQLAlchemy engine for pandas operations
-    from dashboard.db_utils import get_db_engine
+    from data.db_utils import get_db_engine
     engine = get_db_engine()
 
     try:
         print(f"[INIT] Querying available timestamps from database")
-        query = "SELECT DISTINCT timestamp FROM rates_snapshot ORDER BY timestamp DESC"
+        query = f"SELECT DISTINCT timestamp FROM {rates_source(engine)} ORDER BY timestamp DESC"
         df = pd.read_sql_query(query, engine)
         timestamps = df['timestamp'].tolist()
         print(f"[INIT] Found {len(timestamps)} historical snapshots")
@@ -131,7 +127,7 @@ def load_historical_snapshot(timestamp: str, conn: Optional[Any] = None) -> Tupl
         should_close = False
 
     # Get SQLAlchemy engine for pandas operations
-    from dashboard.db_utils import get_db_engine
+    from data.db_utils import get_db_engine
     engine = get_db_engine()
 
     try:
@@ -153,7 +149,7 @@ def load_historical_snapshot(timestamp: str, conn: Optional[Any] = None) -> Tupl
             borrow_fee,
             borrow_weight,
             liquidation_threshold
-        FROM rates_snapshot
+        FROM {rates_source(engine)}
         WHERE timestamp = {ph}
         ORDER BY token, protocol
         """
@@ -167,31 +163,9 @@ def load_historical_snapshot(timestamp: str, conn: Optional[Any] = None) -> Tupl
         if df.empty:
             raise ValueError(f"No snapshot data found for timestamp: {timestamp}")
 
-        # Helper to pivot data
-        def pivot_data(df, value_col):
-            pivoted = df.pivot_table(
-                index=['token', 'token_contract'],
-                columns='protocol',
-                values=value_col,
-                aggfunc='first'  # Take first value if duplicates
-            ).reset_index()
-            pivoted.rename(columns={'token': 'Token', 'token_contract': 'Contract'}, inplace=True)
-            return pivoted
-
-        # Create 10 DataFrames by pivoting
-        lend_rates = pivot_data(df, 'lend_total_apr')
-        borrow_rates = pivot_data(df, 'borrow_total_apr')
-        collateral_ratios = pivot_data(df, 'collateral_ratio')
-        prices = pivot_data(df, 'price_usd')
-        lend_rewards = pivot_data(df, 'lend_reward_apr')
-        borrow_rewards = pivot_data(df, 'borrow_reward_apr')
-        available_borrow = pivot_data(df, 'available_borrow_usd')
-        borrow_fees = pivot_data(df, 'borrow_fee')
-        borrow_weights = pivot_data(df, 'borrow_weight')
-        liquidation_thresholds = pivot_data(df, 'liquidation_threshold')
-
-        return (lend_rates, borrow_rates, collateral_ratios, prices,
-                lend_rewards, borrow_rewards, available_borrow, borrow_fees, borrow_weights, liquidation_thresholds)
+        # One pivot into the packed container; the 10 frames are views into it
+        market = MarketData.from_snapshot_rows(df, float32=settings.MARKET_DATA_FLOAT32)
+        return market.frames()
 
     finally:
         if should_close:
@@ -289,13 +263,13 @@ def fetch_historical_rates(conn: Any, token1_contract: str, token2_contract: str
     Returns:
         DataFrame with columns: timestamp (as seconds), protocol, token_contract, lend_total_apr, borrow_total_apr, price_usd
     """
-    from utils.time_helpers import to_seconds, to_datetime_str
+    from utils.time_helpers import series_to_seconds, to_datetime_str
 
     if conn is None:
         return pd.DataFrame()
 
     # Get SQLAlchemy engine for pandas operations
-    from dashboard.db_utils import get_db_engine
+    from data.db_utils import get_db_engine
     engine = get_db_engine()
 
     try:
@@ -305,60 +279,32 @@ def fetch_historical_rates(conn: Any, token1_contract: str, token2_contract: str
         # Convert seconds to datetime string for SQL query
         strategy_dt_str = to_datetime_str(strategy_seconds)
 
-        if settings.USE_CLOUD_DB:
-            query = """
-            SELECT
-                timestamp,
-                protocol,
-                token_contract,
-                lend_total_apr,
-                borrow_total_apr,
-                price_usd
-            FROM rates_snapshot
-            WHERE
-                timestamp <= %s
-                AND (
-                    (token_contract = %s AND protocol = %s) OR
-                    (token_contract = %s AND protocol = %s) OR
-                    (token_contract = %s AND protocol = %s) OR
-                    (token_contract = %s AND protocol = %s)
-                )
-            ORDER BY timestamp
-            """
-            params = (
-                strategy_dt_str,
-                token1_contract, protocol_a,
-                token2_contract, protocol_a,
-                token2_contract, protocol_b,
-                token3_contract, protocol_b
-            )
-        else:
-            query = """
+        # Join against the four legs as a relation (see build_pair_join) rather than
+        # an OR chain, so each leg is one (protocol, token_contract) index range scan.
+        from analysis.strategy_history.data_fetcher import build_pair_join
+        pairs_join, pair_params = build_pair_join([
+            (token1_contract, protocol_a),
+            (token2_contract, protocol_a),
+            (token2_contract, protocol_b),
+            (token3_contract, protocol_b),
+        ], alias='rs')
+        placeholder = '%s' if settings.USE_CLOUD_DB else '?'
+
+        query = f"""
             SELECT
-                timestamp,
-                protocol,
-                token_contract,
+                rs.timestamp,
+                rs.protocol,
+                rs.token_contract,
                 lend_total_apr,
                 borrow_total_apr,
                 price_usd
-            FROM rates_snapshot
+            FROM {history_source(engine, None, strategy_seconds)} rs
+            {pairs_join}
             WHERE
-                timestamp <= ?
-                AND (
-                    (token_contract = ? AND protocol = ?) OR
-                    (token_contract = ? AND protocol = ?) OR
-                    (token_contract = ? AND protocol = ?) OR
-                    (token_contract = ? AND protocol = ?)
-                )
-            ORDER BY timestamp
+                rs.timestamp <= {placeholder}
+            ORDER BY rs.timestamp
             """
-            params = (
-                strategy_dt_str,
-                token1_contract, protocol_a,
-                token2_contract, protocol_a,
-                token2_contract, protocol_b,
-                token3_contract, protocol_b
-            )
+        params = tuple(pair_params) + (strategy_dt_str,)
 
         df = pd.read_sql_query(query, engine, params=params)
 
@@ -379,7 +325,7 @@ def fetch_historical_rates(conn: Any, token1_contract: str, token2_contract: str
 
         # IMMEDIATELY convert timestamp column from strings to seconds
         if 'timestamp' in df.columns and len(df) > 0:
-            df['timestamp'] = df['timestamp'].apply(to_seconds)
+            df['timestamp'] = series_to_seconds(df['timestamp'])
 
         return df
     except Exception as e:
@@ -460,7 +406,7 @@ def calculate_net_apr_history(raw_df: pd.DataFrame, token1_contract: str, token2
 
 def create_strategy_history_chart(df: pd.DataFrame, token1: str, token2: str, token3: str,
                                   protocol_a: str, protocol_b: str, liq_dist: float,
-                                  l_a: float, b_a: float, l_b: float, b_b: float) -> go.Figure:
+                                  l_a: float, b_a: float, l_b: float, b_b: float) -> "go.Figure":
     """
     Create Plotly chart with dual axes (price + APR)
 
@@ -474,6 +420,7 @@ def create_strategy_history_chart(df: pd.DataFrame, token1: str, token2: str, to
     Returns:
         Plotly Figure object
     """
+    import plotly.graph_objects as go
     from utils.time_helpers import to_datetime_str
 
     # Convert timestamp (seconds) to datetime strings for chart display
@@ -3,8 +3,12 @@ Utility functions for oracle price dashboard tab.
 """
 from typing import Optional, Tuple
 from datetime import datetime
+import numpy as np
 import pandas as pd
 
+# Oracle precedence on equal timestamps follows list order (matches compute_latest_price)
+ORACLE_SOURCES = ('coingecko', 'pyth', 'defillama')
+
 
 def compute_latest_price(
     coingecko_price: Optional[float],
@@ -60,6 +64,54 @@ def compute_latest_price(
     return latest['price'], latest['oracle'], latest['time']
 
 
+def compute_latest_prices(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Vectorized compute_latest_price() over a frame of tokens.
+
+    Expects one price column and one '<oracle>_time' column per entry in
+    ORACLE_SOURCES (missing columns are treated as all-None). An oracle is a
+    candidate for a row only if both its price and its time are present; the
+    newest candidate wins, ties going to the earlier oracle in ORACLE_SOURCES.
+
+    Args:
+        df: DataFrame with coingecko, coingecko_time, pyth, pyth_time,
+            defillama, defillama_time columns
+
+    Returns:
+        DataFrame (same index) with latest_price, latest_oracle, latest_time.
+        Rows with no valid candidate get NaN / None / NaT.
+    """
+    n = len(df)
+    prices = np.full((n, len(ORACLE_SOURCES)), np.nan)
+    times = np.full((n, len(ORACLE_SOURCES)), np.iinfo(np.int64).min, dtype=np.int64)
+    time_cols = []
+
+    for i, source in enumerate(ORACLE_SOURCES):
+        price = pd.to_numeric(df[source], errors='coerce') if source in df.columns else pd.Series(np.nan, index=df.index)
+        when = (pd.to_datetime(df[f'{source}_time']) if f'{source}_time' in df.columns
+                else pd.Series(pd.NaT, index=df.index, dtype='datetime64[ns]'))
+        when = when.astype('datetime64[ns]')
+        valid = (price.notna() & when.notna()).to_numpy()
+
+        prices[:, i] = price.to_numpy(dtype=float)
+        times[valid, i] = when.to_numpy().view(np.int64)[valid]
+        time_cols.append(when.to_numpy())
+
+    has_any = (times != np.iinfo(np.int64).min).any(axis=1)
+    winner = times.argmax(axis=1)
+    rows = np.arange(n)
+
+    latest_price = np.where(has_any, prices[rows, winner], np.nan)
+    latest_oracle = np.where(has_any, np.asarray(ORACLE_SOURCES, dtype=object)[winner], None)
+    latest_time = np.where(has_any, np.column_stack(time_cols)[rows, winner], np.datetime64('NaT', 'ns'))
+
+    return pd.DataFrame({
+        'latest_price': latest_price,
+        'latest_oracle': latest_oracle,
+        'latest_time': pd.to_datetime(latest_time),
+    }, index=df.index)
+
+
 def format_contract_address(contract: str) -> str:
     """
     Format contract address for display (first 6 + last 4 chars).
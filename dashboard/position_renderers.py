@@ -22,6 +22,7 @@ from dashboard.dashboard_utils import format_days_to_breakeven
 from analysis.position_service import PositionService
 from analysis.strategy_calculators import get_calculator
 from config import settings
+from data.snapshot_diff import rates_source
 
 
 # ============================================================================
@@ -379,7 +380,7 @@ def render_positions_batch(
     ph = service._get_placeholder()
     rates_query = f"""
     SELECT protocol, token, lend_total_apr, borrow_total_apr, borrow_fee, price_usd
-    FROM rates_snapshot
+    FROM {rates_source(engine)}
     WHERE timestamp = {ph}
     """
     rates_df = pd.read_sql_query(rates_query, engine, params=(timestamp_str,))
@@ -1300,13 +1301,9 @@ def render_position_history_chart(
                 'liquidation_distance': position.get('liquidation_distance', 0.20)
             }
 
-            # Calculate time range
-            from analysis.strategy_history.chart_utils import get_chart_time_range
-            start_ts, end_ts = get_chart_time_range(time_range, timestamp_seconds)
-
-            # Fetch history
-            from analysis.strategy_history.strategy_history import get_strategy_history
-            history_df = get_strategy_history(strategy_dict, start_ts, end_ts)
+            # Fetch history (chart data cached per strategy, range and snapshot)
+            from analysis.strategy_history.chart_cache import get_cached_strategy_history
+            history_df = get_cached_strategy_history(strategy_dict, time_range, timestamp_seconds)
 
             if history_df.empty:
                 st.warning("⚠️ No historical data available for this strategy.")
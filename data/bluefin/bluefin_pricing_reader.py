@@ -15,10 +15,10 @@ API Response Format (verified 2026-02-20):
 import re
 import pandas as pd
 import requests
-import time
 from datetime import datetime, timezone
 from typing import Optional, List, Dict
 from dataclasses import dataclass
+from utils.http_client import get_http_client
 from utils.time_helpers import to_datetime_str, to_seconds
 
 
@@ -43,43 +43,36 @@ class BluefinPricingReader:
     def __init__(self, config: BluefinPricingReaderConfig = None):
         """Initialize pricing reader."""
         self.config = config or BluefinPricingReaderConfig()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'SuiLendingBot/1.0',
-            'Accept': 'application/json'
-        })
-
-    def _make_request_with_retry(self, url: str, params: Optional[dict] = None) -> dict:
-        """Make HTTP GET request with retry logic."""
-        for attempt in range(1, self.config.max_retries + 1):
-            try:
-                response = self.session.get(url, params=params, timeout=self.config.timeout)
-
-                if response.status_code in (429, 503):
-                    if attempt < self.config.max_retries:
-                        delay = self.config.retry_delay_base * attempt
-                        print(f"  [WARN] Rate limit, retrying in {delay}s")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        raise Exception(f"Rate limit after {self.config.max_retries} retries")
-
-                response.raise_for_status()
-                return response.json()
-
-            except requests.exceptions.Timeout:
-                if attempt < self.config.max_retries:
-                    delay = self.config.retry_delay_base * attempt
-                    print(f"  [WARN] Timeout, retrying in {delay}s")
-                    time.sleep(delay)
-                    continue
-                else:
-                    raise Exception(f"Timeout after {self.config.max_retries} retries")
+        self.http = get_http_client()
+
+    def _make_request_with_retry(
+        self,
+        url: str,
+        params: Optional[dict] = None
+    ) -> dict:
+        """
+        Make HTTP GET request through the shared client (rate limit + retry/backoff).
+
+        Args:
+            url: API endpoint URL
+            params: Query parameters
 
-            except requests.exceptions.RequestException as e:
-                raise Exception(f"HTTP request failed: {e}")
+        Returns:
+            JSON response as dictionary
 
-        raise Exception("Request failed after all retries")
+        Raises:
+            Exception: If all retries fail
+        """
+        try:
+            return self.http.get_json(
+                url,
+                params=params,
+                timeout=self.config.timeout,
+                max_retries=self.config.max_retries,
+                backoff_base=self.config.retry_delay_base,
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"HTTP request failed: {e}")
 
     def fetch_perp_ticker(self, market_symbol: str) -> Optional[Dict]:
         """
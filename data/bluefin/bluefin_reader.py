@@ -7,10 +7,10 @@ Rates are converted to annualized decimals per DESIGN_NOTES.md #7.
 
 import pandas as pd
 import requests
-import time
 from datetime import datetime, timezone
 from typing import Optional, List, Tuple
 from dataclasses import dataclass
+from utils.http_client import get_http_client
 from utils.time_helpers import to_datetime_str, to_datetime_utc, to_seconds
 
 
@@ -39,11 +39,7 @@ class BluefinReader:
             config: Configuration object (uses defaults if None)
         """
         self.config = config or BluefinReaderConfig()
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'SuiLendingBot/1.0',
-            'Accept': 'application/json'
-        })
+        self.http = get_http_client()
 
     def _make_request_with_retry(
         self,
@@ -51,7 +47,7 @@ class BluefinReader:
         params: Optional[dict] = None
     ) -> dict:
         """
-        Make HTTP GET request with retry logic for rate limits.
+        Make HTTP GET request through the shared client (rate limit + retry/backoff).
 
         Args:
             url: API endpoint URL
@@ -63,41 +59,16 @@ class BluefinReader:
         Raises:
             Exception: If all retries fail
         """
-        for attempt in range(1, self.config.max_retries + 1):
-            try:
-                response = self.session.get(
-                    url,
-                    params=params,
-                    timeout=self.config.timeout
-                )
-
-                # Check for rate limit or service unavailable
-                if response.status_code in (429, 503):
-                    if attempt < self.config.max_retries:
-                        delay = self.config.retry_delay_base * attempt
-                        print(f"  ⚠️  Rate limit/unavailable (status {response.status_code}), "
-                              f"retrying in {delay}s (attempt {attempt}/{self.config.max_retries})")
-                        time.sleep(delay)
-                        continue
-                    else:
-                        raise Exception(f"Rate limit exceeded after {self.config.max_retries} retries")
-
-                response.raise_for_status()
-                return response.json()
-
-            except requests.exceptions.Timeout:
-                if attempt < self.config.max_retries:
-                    delay = self.config.retry_delay_base * attempt
-                    print(f"  ⚠️  Request timeout, retrying in {delay}s (attempt {attempt}/{self.config.max_retries})")
-                    time.sleep(delay)
-                    continue
-                else:
-                    raise Exception(f"Request timeout after {self.config.max_retries} retries")
-
-            except requests.exceptions.RequestException as e:
-                raise Exception(f"HTTP request failed: {e}")
-
-        raise Exception("Request failed after all retries")
+        try:
+            return self.http.get_json(
+                url,
+                params=params,
+                timeout=self.config.timeout,
+                max_retries=self.config.max_retries,
+                backoff_base=self.config.retry_delay_base,
+            )
+        except requests.exceptions.RequestException as e:
+            raise Exception(f"HTTP request failed: {e}")
 
     def _generate_perp_token_contract(
         self,
@@ -493,11 +464,9 @@ class BluefinReader:
                         break
 
                 # Increment page number for next iteration
+                # (pacing between pages is done by the shared client's per-host token bucket)
                 page += 1
 
-                # Add small delay to avoid rate limits
-                time.sleep(0.5)
-
             print(f"  ✅ Total fetched for {base_token}-PERP: {total_fetched} rates")
 
         if not all_historical_rates:
@@ -537,6 +506,7 @@ class BluefinReader:
 
         tracker = RateTracker(
             use_cloud=settings.USE_CLOUD_DB,
+            db_path=settings.SQLITE_PATH,
             connection_url=settings.SUPABASE_URL
         )
 
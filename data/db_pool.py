@@ -0,0 +1,125 @@
+"""
+Process-wide PostgreSQL connection pool for long-running processes.
+
+RateTracker and get_db_connection() open a fresh psycopg2 connection per call
+and close it when done, which is right for a one-shot cron run. A long-running
+process (main.py --daemon) calls enable() once; after that connect() hands out
+connections from a ThreadedConnectionPool and close() returns them to the pool
+instead of tearing down the TLS session.
+
+Callers do not change: they still call conn.close() when finished, and pooled
+connections are still psycopg2.extensions.connection instances, so the
+isinstance() checks that pick '%s' placeholders keep working.
+
+SQLite connections are never pooled (opening one is a file open).
+"""
+
+import threading
+import time
+from typing import Dict
+
+import psycopg2
+import psycopg2.extensions
+from psycopg2 import pool as pg_pool
+
+# Pooled connections idle longer than this are pinged before reuse
+# (Supabase's pooler drops idle sessions).
+_PING_AFTER_SECONDS = 60
+
+_lock = threading.Lock()
+_enabled = False
+_closing = False
+_max_connections = 5
+_pools: Dict[str, pg_pool.ThreadedConnectionPool] = {}
+
+
+class PooledConnection(psycopg2.extensions.connection):
+    """psycopg2 connection owned by a pool; close() while checked out gives it back."""
+
+    _pool = None
+    _checked_out = False
+    _returned_at = None  # time.monotonic() when last put back
+
+    def close(self) -> None:
+        if not self._checked_out or _closing or self._pool.closed:
+            # Pool discarding the connection (putconn(close=True) / closeall()),
+            # or the pool was already shut down while this one was checked out
+            return super().close()
+        self._checked_out = False
+        broken = bool(self.closed)
+        if not broken:
+            try:
+                self.rollback()  # Uncommitted work is discarded, as a real close() would
+            except psycopg2.Error:
+                broken = True
+        self._returned_at = time.monotonic()
+        self._pool.putconn(self, close=broken)
+
+
+def enable(max_connections: int = 5) -> None:
+    """Pool PostgreSQL connections for the rest of this process."""
+    global _enabled, _max_connections
+    with _lock:
+        _enabled = True
+        _max_connections = max_connections
+    print(f"[DB POOL] PostgreSQL connection pooling enabled (max {max_connections} per database)")
+
+
+def is_enabled() -> bool:
+    return _enabled
+
+
+def _get_pool(connection_url: str) -> pg_pool.ThreadedConnectionPool:
+    with _lock:
+        pool = _pools.get(connection_url)
+        if pool is None:
+            # minconn is also how many idle connections the pool keeps (opened up front)
+            pool = pg_pool.ThreadedConnectionPool(
+                _max_connections, _max_connections, connection_url, connection_factory=PooledConnection
+            )
+            _pools[connection_url] = pool
+        return pool
+
+
+def _checkout(pool: pg_pool.ThreadedConnectionPool) -> PooledConnection:
+    """Get a live connection from the pool, replacing one the server has dropped."""
+    conn = pool.getconn()
+    if conn._returned_at is not None and time.monotonic() - conn._returned_at > _PING_AFTER_SECONDS:
+        try:
+            with conn.cursor() as cur:
+                cur.execute("SELECT 1")
+            conn.rollback()
+        except psycopg2.Error:
+            pool.putconn(conn, close=True)
+            conn = pool.getconn()
+    conn._pool = pool
+    conn._checked_out = True
+    return conn
+
+
+def connect(connection_url: str):
+    """
+    psycopg2.connect(connection_url), or a pooled connection after enable().
+
+    Falls back to a direct connection when the pool is exhausted.
+    """
+    if not _enabled:
+        return psycopg2.connect(connection_url)
+    pool = _get_pool(connection_url)
+    try:
+        return _checkout(pool)
+    except pg_pool.PoolError:
+        return psycopg2.connect(connection_url)
+
+
+def close_all() -> None:
+    """Close every pooled connection, including any still checked out (daemon shutdown)."""
+    global _closing
+    with _lock:
+        _closing = True
+        try:
+            for pool in _pools.values():
+                pool.closeall()
+            _pools.clear()
+        finally:
+            _closing = False
@@ -0,0 +1,83 @@
+"""
+Database connections and SQLAlchemy engines (SQLite or PostgreSQL based on settings).
+
+Data/analysis-layer home of what used to live in dashboard/dashboard_utils.py
+(get_db_connection) and dashboard/db_utils.py (engines), so the headless refresh
+path (main.py, refresh daemon, perp refresh) never imports the dashboard modules
+that pull in plotly/streamlit. The dashboard modules re-export these names.
+
+SQLAlchemy is only imported when an engine is first created.
+"""
+from typing import TYPE_CHECKING, Optional
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from config import settings
+
+if TYPE_CHECKING:
+    from sqlalchemy import Engine
+
+# Singleton engines
+_sqlite_engine: Optional["Engine"] = None
+_postgres_engine: Optional["Engine"] = None
+
+
+def get_db_connection():
+    """Get database connection (SQLite or PostgreSQL based on settings)"""
+    if settings.USE_CLOUD_DB:
+        from data import db_pool
+        return db_pool.connect(settings.SUPABASE_URL)  # Pooled once db_pool.enable() is called
+    else:
+        import sqlite3
+        return sqlite3.connect(settings.SQLITE_PATH)
+
+
+def get_db_engine() -> "Engine":
+    """
+    Get SQLAlchemy engine for pandas operations (SQLite or PostgreSQL based on settings).
+
+    Engines are cached as singletons for connection pooling efficiency.
+    Use this for pd.read_sql_query() operations.
+
+    Returns:
+        SQLAlchemy Engine object
+    """
+    global _sqlite_engine, _postgres_engine
+
+    if settings.USE_CLOUD_DB:
+        if _postgres_engine is None:
+            from sqlalchemy import create_engine
+            _postgres_engine = create_engine(
+                settings.SUPABASE_URL,
+                pool_size=5,
+                max_overflow=10,
+                pool_pre_ping=True,  # Verify connections before using
+                echo=False
+            )
+        return _postgres_engine
+    else:
+        if _sqlite_engine is None:
+            from sqlalchemy import create_engine
+            _sqlite_engine = create_engine(
+                f"sqlite:///{settings.SQLITE_PATH}",
+                connect_args={"check_same_thread": False},
+                echo=False
+            )
+        return _sqlite_engine
+
+
+def dispose_engines():
+    """
+    Dispose of all engine connections.
+    Call this on application shutdown or when switching database configurations.
+    """
+    global _sqlite_engine, _postgres_engine
+
+    if _sqlite_engine is not None:
+        _sqlite_engine.dispose()
+        _sqlite_engine = None
+
+    if _postgres_engine is not None:
+        _postgres_engine.dispose()
+        _postgres_engine = None
@@ -22,6 +22,18 @@ except ImportError:
     psycopg2 = None
 
 
+def _is_postgres_only(statement: str) -> bool:
+    """True for schema.sql statements SQLite does not support (RLS, added constraints)"""
+    code = ' '.join(
+        line for line in statement.splitlines() if not line.strip().startswith('--')
+    ).upper()
+    return (
+        'ROW LEVEL SECURITY' in code
+        or code.startswith('CREATE POLICY')
+        or (code.startswith('ALTER TABLE') and 'ADD CONSTRAINT' in code)
+    )
+
+
 def init_sqlite(db_path='data/lending_rates.db'):
     """Initialize SQLite database with schema"""
     
@@ -37,9 +49,25 @@ def init_sqlite(db_path='data/lending_rates.db'):
     print(f"📂 Creating SQLite database: {db_path}")
     conn = sqlite3.connect(db_path)
     
-    # Execute schema
-    conn.executescript(schema_sql)
+    # Execute schema statement by statement, skipping PostgreSQL-only DDL
+    # (RLS policies, ALTER TABLE ... ADD CONSTRAINT) that SQLite cannot parse
+    # Single transaction: one fsync for the whole schema instead of one per statement
+    cursor = conn.cursor()
+    cursor.execute("BEGIN")
+    statement = ''
+    skipped = 0
+    for line in schema_sql.splitlines(keepends=True):
+        statement += line
+        if not sqlite3.complete_statement(statement):
+            continue
+        stmt, statement = statement.strip(), ''
+        if _is_postgres_only(stmt):
+            skipped += 1
+            continue
+        cursor.execute(stmt)
     conn.commit()
+    if skipped:
+        print(f"   Skipped {skipped} PostgreSQL-only statements")
     
     # Verify tables created
     cursor = conn.cursor()
@@ -0,0 +1,176 @@
+"""
+Compact container for the ten merged market frames.
+
+merge_protocol_data() and load_historical_snapshot() each produce ten wide frames
+with the same layout:
+
+    Token | Contract | <protocol> | <protocol> | ...
+
+Every frame repeats the Token/Contract object columns and stores its values as a
+separate float64 block. MarketData keeps the token/contract labels once, as
+categoricals, and all values in one (field, token, protocol) float array where NaN
+marks a missing value. frame(name) / frames() hand back DataFrames that look like
+the original wide frames but whose protocol columns are views into that array,
+so RateAnalyzer and the rest of the pipeline consume them unchanged:
+
+    market = MarketData.from_frames(merge_protocol_data(timestamp=ts))
+    lend_rates, borrow_rates, ... = market.frames()
+    analyzer = RateAnalyzer.from_market_data(market, timestamp=ts, ...)
+
+With float32=True values are stored at half the size. That is meant for snapshots
+that are only displayed (load_historical_snapshot with settings.MARKET_DATA_FLOAT32);
+analysis on float32 values will differ in the last digits. refresh_pipeline() always
+builds float64 - its values are written to rates_snapshot and diffed exactly.
+"""
+
+from dataclasses import dataclass
+from typing import Dict, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Frame order of merge_protocol_data() / load_historical_snapshot() / RefreshResult
+MARKET_FIELDS = (
+    'lend_rates', 'borrow_rates', 'collateral_ratios', 'prices', 'lend_rewards',
+    'borrow_rewards', 'available_borrow', 'borrow_fees', 'borrow_weights', 'liquidation_thresholds',
+)
+
+# rates_snapshot column behind each field (see RateTracker._save_rates_snapshot)
+SNAPSHOT_COLUMNS = {
+    'lend_rates': 'lend_total_apr',
+    'borrow_rates': 'borrow_total_apr',
+    'collateral_ratios': 'collateral_ratio',
+    'prices': 'price_usd',
+    'lend_rewards': 'lend_reward_apr',
+    'borrow_rewards': 'borrow_reward_apr',
+    'available_borrow': 'available_borrow_usd',
+    'borrow_fees': 'borrow_fee',
+    'borrow_weights': 'borrow_weight',
+    'liquidation_thresholds': 'liquidation_threshold',
+}
+
+LABEL_COLUMNS = ('Token', 'Contract')
+
+
+@dataclass
+class MarketData:
+    """Ten market fields on a shared (token, protocol) grid."""
+
+    tokens: pd.Categorical      # Token symbol per row
+    contracts: pd.Categorical   # Contract per row
+    protocols: Tuple[str, ...]  # Protocol columns (same for every field)
+    values: np.ndarray          # (len(MARKET_FIELDS), rows, protocols), NaN = missing
+
+    @classmethod
+    def from_frames(cls, frames: Sequence[pd.DataFrame], float32: bool = False) -> "MarketData":
+        """
+        Pack the ten wide frames (MARKET_FIELDS order) into one container.
+
+        Args:
+            frames: merge_protocol_data() output - every frame must have the same
+                    Token/Contract rows (in the same order) and protocol columns
+            float32: Store values as float32 instead of float64
+
+        Returns:
+            MarketData whose frames() equal the input frames
+
+        Raises:
+            ValueError: Wrong frame count, or frames not on the same grid
+        """
+        frames = list(frames)
+        if len(frames) != len(MARKET_FIELDS):
+            raise ValueError(f"Expected {len(MARKET_FIELDS)} market frames, got {len(frames)}")
+
+        first = frames[0]
+        protocols = tuple(c for c in first.columns if c not in LABEL_COLUMNS)
+        labels = first[list(LABEL_COLUMNS)].reset_index(drop=True)
+        dtype = np.float32 if float32 else np.float64
+        values = np.empty((len(MARKET_FIELDS), len(first), len(protocols)), dtype=dtype)
+
+        for i, (name, df) in enumerate(zip(MARKET_FIELDS, frames)):
+            columns = tuple(c for c in df.columns if c not in LABEL_COLUMNS)
+            if columns != protocols or len(df) != len(first):
+                raise ValueError(
+                    f"{name}: protocol columns/rows differ from {MARKET_FIELDS[0]} - "
+                    f"got {list(columns)} x {len(df)}, expected {list(protocols)} x {len(first)}"
+                )
+            if not df[list(LABEL_COLUMNS)].reset_index(drop=True).equals(labels):
+                raise ValueError(f"{name}: Token/Contract rows differ from {MARKET_FIELDS[0]}")
+            values[i] = df[list(protocols)].to_numpy(dtype=dtype, na_value=np.nan)
+
+        return cls(
+            tokens=pd.Categorical(labels['Token']),
+            contracts=pd.Categorical(labels['Contract']),
+            protocols=protocols,
+            values=values,
+        )
+
+    @classmethod
+    def from_snapshot_rows(cls, rows: pd.DataFrame, float32: bool = False) -> "MarketData":
+        """
+        Build from long rates_snapshot rows (token, token_contract, protocol, <SNAPSHOT_COLUMNS>).
+
+        One pivot for all ten fields instead of ten pivot_table() calls. Rows are
+        sorted by (token, token_contract) and protocols alphabetically, like
+        pivot_table(); duplicate (token, contract, protocol) rows keep the first.
+        """
+        rows = rows.drop_duplicates(['token', 'token_contract', 'protocol'], keep='first')
+        keys = rows[['token', 'token_contract']].drop_duplicates().sort_values(['token', 'token_contract'])
+        protocols = tuple(sorted(rows['protocol'].unique()))
+        dtype = np.float32 if float32 else np.float64
+
+        row_index = pd.MultiIndex.from_frame(keys)
+        row_pos = row_index.get_indexer(pd.MultiIndex.from_frame(rows[['token', 'token_contract']]))
+        col_pos = pd.Index(protocols).get_indexer(rows['protocol'])
+
+        values = np.full((len(MARKET_FIELDS), len(keys), len(protocols)), np.nan, dtype=dtype)
+        for i, name in enumerate(MARKET_FIELDS):
+            column = pd.to_numeric(rows[SNAPSHOT_COLUMNS[name]], errors='coerce')
+            values[i, row_pos, col_pos] = column.to_numpy(dtype=dtype, na_value=np.nan)
+
+        return cls(
+            tokens=pd.Categorical(keys['token'].to_numpy()),
+            contracts=pd.Categorical(keys['token_contract'].to_numpy()),
+            protocols=protocols,
+            values=values,
+        )
+
+    def frame(self, name: str) -> pd.DataFrame:
+        """
+        One field as a wide frame: Token | Contract | <protocol>...
+
+        Protocol columns share memory with self.values (pandas copy-on-write
+        copies on first write, so callers cannot modify the container).
+        """
+        try:
+            i = MARKET_FIELDS.index(name)
+        except ValueError:
+            raise KeyError(f"Unknown market field '{name}'. Fields: {MARKET_FIELDS}") from None
+        df = pd.DataFrame(self.values[i], columns=list(self.protocols), copy=False)
+        df.insert(0, 'Token', self.tokens)
+        df.insert(1, 'Contract', self.contracts)
+        return df
+
+    def frames(self) -> Tuple[pd.DataFrame, ...]:
+        """All ten fields, in MARKET_FIELDS order (the merge_protocol_data() tuple)."""
+        return tuple(self.frame(name) for name in MARKET_FIELDS)
+
+    def as_dict(self) -> Dict[str, pd.DataFrame]:
+        """{field: frame} - keyword arguments for RateAnalyzer."""
+        return {name: self.frame(name) for name in MARKET_FIELDS}
+
+    @property
+    def missing(self) -> np.ndarray:
+        """NaN mask over values: True where a protocol has no value for a token."""
+        return np.isnan(self.values)
+
+    @property
+    def nbytes(self) -> int:
+        """Approximate memory held (values + label codes/categories)."""
+        labels = 0
+        for cat in (self.tokens, self.contracts):
+            labels += cat.codes.nbytes + sum(len(str(c)) for c in cat.categories)
+        return int(self.values.nbytes + labels)
+
+    def __len__(self) -> int:
+        return len(self.tokens)
@@ -0,0 +1,12 @@
+-- Migration 010: Checkpoint metadata for incremental position statistics
+-- stats_version:           STATISTICS_VERSION the row was calculated with (bump = full recompute)
+-- segment_start_timestamp: live segment start the per-leg earnings were integrated from
+--                          (differs from the current one after a rebalance = full recompute)
+-- rate_rows_used:          use_for_pnl rates_snapshot rows integrated for the live segment
+--                          (differs from a fresh count after a backfill = full recompute)
+-- Existing rows keep NULLs and are simply recomputed in full on the next refresh.
+
+ALTER TABLE position_statistics
+    ADD COLUMN IF NOT EXISTS stats_version INTEGER,
+    ADD COLUMN IF NOT EXISTS segment_start_timestamp TIMESTAMP,
+    ADD COLUMN IF NOT EXISTS rate_rows_used INTEGER;
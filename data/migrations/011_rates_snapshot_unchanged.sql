@@ -0,0 +1,63 @@
+-- Migration 011: Change-only persistence for rates_snapshot (settings.SNAPSHOT_DIFF_ENABLED)
+-- rates_snapshot_unchanged: marker for a row equal to the previous snapshot;
+--                           unchanged_since = timestamp of the full rates_snapshot row
+--                           holding the values
+-- rates_snapshot_resolved:  rates_snapshot plus the markers expanded from their base rows
+-- RateTracker also creates both on first use, so running this is optional.
+
+CREATE TABLE IF NOT EXISTS rates_snapshot_unchanged (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    unchanged_since TIMESTAMP NOT NULL,
+    use_for_pnl BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (timestamp, protocol, token_contract)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rates_unchanged_pnl_lookup
+    ON rates_snapshot_unchanged(token_contract, protocol, timestamp) WHERE use_for_pnl = TRUE;
+
+CREATE OR REPLACE VIEW rates_snapshot_resolved AS
+SELECT
+    timestamp, protocol, token, token_contract,
+    lend_base_apr, lend_reward_apr, lend_total_apr,
+    borrow_base_apr, borrow_reward_apr, borrow_total_apr,
+    avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+    avg24hr_lend_total_apr, avg24hr_borrow_total_apr,
+    collateral_ratio, liquidation_threshold, price_usd,
+    utilization, total_supply_usd, total_borrow_usd, available_borrow_usd,
+    borrow_fee, borrow_weight,
+    reward_token, reward_token_contract, reward_token_price_usd,
+    market, side,
+    use_for_pnl
+FROM rates_snapshot
+
+UNION ALL
+
+SELECT
+    m.timestamp, m.protocol, rs.token, m.token_contract,
+    rs.lend_base_apr, rs.lend_reward_apr, rs.lend_total_apr,
+    rs.borrow_base_apr, rs.borrow_reward_apr, rs.borrow_total_apr,
+    rs.avg8hr_lend_total_apr, rs.avg8hr_borrow_total_apr,
+    rs.avg24hr_lend_total_apr, rs.avg24hr_borrow_total_apr,
+    rs.collateral_ratio, rs.liquidation_threshold, rs.price_usd,
+    rs.utilization, rs.total_supply_usd, rs.total_borrow_usd, rs.available_borrow_usd,
+    rs.borrow_fee, rs.borrow_weight,
+    rs.reward_token, rs.reward_token_contract, rs.reward_token_price_usd,
+    rs.market, rs.side,
+    m.use_for_pnl
+FROM rates_snapshot_unchanged m
+JOIN rates_snapshot rs
+  ON rs.timestamp = m.unchanged_since
+ AND rs.protocol = m.protocol
+ AND rs.token_contract = m.token_contract;
+
+ALTER TABLE rates_snapshot_unchanged ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot_unchanged"
+ON rates_snapshot_unchanged FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_unchanged"
+ON rates_snapshot_unchanged FOR SELECT TO authenticated
+USING (true);
@@ -0,0 +1,190 @@
+-- Migration 012: Monthly range partitions for rates_snapshot, plus retention rollup tiers
+-- (data/snapshot_retention.py, settings.RATES_RAW_RETENTION_DAYS / RATES_HOURLY_RETENTION_DAYS)
+--
+-- rates_snapshot becomes PARTITION BY RANGE (timestamp) with one partition per month
+-- (rates_snapshot_YYYY_MM). RateTracker creates the current and next month's partition
+-- before writing; retention drops whole expired partitions instead of deleting rows.
+-- The primary key (timestamp, protocol, token_contract) already contains the partition key.
+--
+-- Run in a maintenance window: the data is copied once and the table is locked meanwhile.
+-- Optional - everything works on the unpartitioned table too.
+
+BEGIN;
+
+-- Views depending on rates_snapshot are recreated at the end
+DROP VIEW IF EXISTS rates_snapshot_resolved;
+DROP VIEW IF EXISTS all_token_prices;
+
+ALTER TABLE rates_snapshot RENAME TO rates_snapshot_unpartitioned;
+ALTER TABLE rates_snapshot_unpartitioned RENAME CONSTRAINT rates_snapshot_pkey TO rates_snapshot_unpartitioned_pkey;
+DROP INDEX IF EXISTS idx_rates_time;
+DROP INDEX IF EXISTS idx_rates_contract;
+DROP INDEX IF EXISTS idx_rates_protocol_contract;
+DROP INDEX IF EXISTS idx_rates_pnl_flag;
+DROP INDEX IF EXISTS idx_rates_pnl_lookup;
+
+CREATE TABLE rates_snapshot (
+    LIKE rates_snapshot_unpartitioned INCLUDING DEFAULTS,
+    PRIMARY KEY (timestamp, protocol, token_contract)
+) PARTITION BY RANGE (timestamp);
+
+CREATE INDEX IF NOT EXISTS idx_rates_time ON rates_snapshot(timestamp);
+CREATE INDEX IF NOT EXISTS idx_rates_contract ON rates_snapshot(token_contract);
+CREATE INDEX IF NOT EXISTS idx_rates_protocol_contract ON rates_snapshot(protocol, token_contract);
+CREATE INDEX IF NOT EXISTS idx_rates_pnl_flag ON rates_snapshot(use_for_pnl, timestamp) WHERE use_for_pnl = TRUE;
+CREATE INDEX IF NOT EXISTS idx_rates_pnl_lookup ON rates_snapshot(token_contract, protocol, timestamp) WHERE use_for_pnl = TRUE;
+
+-- One partition per month from the oldest snapshot through next month
+DO $$
+DECLARE
+    month_start DATE;
+    last_month DATE := (DATE_TRUNC('month', NOW()) + INTERVAL '1 month')::DATE;
+BEGIN
+    SELECT COALESCE(DATE_TRUNC('month', MIN(timestamp)), DATE_TRUNC('month', NOW()))::DATE
+    INTO month_start
+    FROM rates_snapshot_unpartitioned;
+
+    WHILE month_start <= last_month LOOP
+        EXECUTE FORMAT(
+            'CREATE TABLE IF NOT EXISTS %I PARTITION OF rates_snapshot FOR VALUES FROM (%L) TO (%L)',
+            'rates_snapshot_' || TO_CHAR(month_start, 'YYYY_MM'),
+            month_start,
+            (month_start + INTERVAL '1 month')::DATE
+        );
+        month_start := (month_start + INTERVAL '1 month')::DATE;
+    END LOOP;
+END $$;
+
+INSERT INTO rates_snapshot SELECT * FROM rates_snapshot_unpartitioned;
+DROP TABLE rates_snapshot_unpartitioned;
+
+ALTER TABLE rates_snapshot ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot"
+ON rates_snapshot FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot"
+ON rates_snapshot FOR SELECT TO authenticated
+USING (true);
+
+-- Recreate dependent views (definitions as in schema.sql / migration 011)
+CREATE OR REPLACE VIEW all_token_prices AS
+SELECT
+    timestamp,
+    token,
+    token_contract,
+    price_usd,
+    protocol,
+    'supply_borrow' as source
+FROM rates_snapshot
+
+UNION
+
+SELECT
+    timestamp,
+    reward_token as token,
+    reward_token_contract as token_contract,
+    reward_token_price_usd as price_usd,
+    NULL as protocol,
+    'reward' as source
+FROM reward_token_prices;
+
+DO $$
+BEGIN
+    -- Only if migration 011 (snapshot diffing) was applied
+    IF TO_REGCLASS('public.rates_snapshot_unchanged') IS NOT NULL THEN
+        EXECUTE $view$
+        CREATE OR REPLACE VIEW rates_snapshot_resolved AS
+        SELECT
+            timestamp, protocol, token, token_contract,
+            lend_base_apr, lend_reward_apr, lend_total_apr,
+            borrow_base_apr, borrow_reward_apr, borrow_total_apr,
+            avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+            avg24hr_lend_total_apr, avg24hr_borrow_total_apr,
+            collateral_ratio, liquidation_threshold, price_usd,
+            utilization, total_supply_usd, total_borrow_usd, available_borrow_usd,
+            borrow_fee, borrow_weight,
+            reward_token, reward_token_contract, reward_token_price_usd,
+            market, side,
+            use_for_pnl
+        FROM rates_snapshot
+        UNION ALL
+        SELECT
+            m.timestamp, m.protocol, rs.token, m.token_contract,
+            rs.lend_base_apr, rs.lend_reward_apr, rs.lend_total_apr,
+            rs.borrow_base_apr, rs.borrow_reward_apr, rs.borrow_total_apr,
+            rs.avg8hr_lend_total_apr, rs.avg8hr_borrow_total_apr,
+            rs.avg24hr_lend_total_apr, rs.avg24hr_borrow_total_apr,
+            rs.collateral_ratio, rs.liquidation_threshold, rs.price_usd,
+            rs.utilization, rs.total_supply_usd, rs.total_borrow_usd, rs.available_borrow_usd,
+            rs.borrow_fee, rs.borrow_weight,
+            rs.reward_token, rs.reward_token_contract, rs.reward_token_price_usd,
+            rs.market, rs.side,
+            m.use_for_pnl
+        FROM rates_snapshot_unchanged m
+        JOIN rates_snapshot rs
+          ON rs.timestamp = m.unchanged_since
+         AND rs.protocol = m.protocol
+         AND rs.token_contract = m.token_contract
+        $view$;
+    END IF;
+END $$;
+
+-- Retention tiers (also created by the first apply_retention())
+CREATE TABLE IF NOT EXISTS rates_snapshot_hourly (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    collateral_ratio NUMERIC, liquidation_threshold NUMERIC, price_usd NUMERIC,
+    utilization NUMERIC, total_supply_usd NUMERIC, total_borrow_usd NUMERIC, available_borrow_usd NUMERIC,
+    borrow_fee NUMERIC, borrow_weight NUMERIC,
+    reward_token TEXT, reward_token_contract TEXT, reward_token_price_usd NUMERIC,
+    market TEXT, side TEXT,
+    PRIMARY KEY (token_contract, protocol, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_rates_hourly_time ON rates_snapshot_hourly(timestamp);
+
+CREATE TABLE IF NOT EXISTS rates_snapshot_daily (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    collateral_ratio NUMERIC, liquidation_threshold NUMERIC, price_usd NUMERIC,
+    utilization NUMERIC, total_supply_usd NUMERIC, total_borrow_usd NUMERIC, available_borrow_usd NUMERIC,
+    borrow_fee NUMERIC, borrow_weight NUMERIC,
+    reward_token TEXT, reward_token_contract TEXT, reward_token_price_usd NUMERIC,
+    market TEXT, side TEXT,
+    PRIMARY KEY (token_contract, protocol, timestamp)
+);
+CREATE INDEX IF NOT EXISTS idx_rates_daily_time ON rates_snapshot_daily(timestamp);
+
+ALTER TABLE rates_snapshot_hourly ENABLE ROW LEVEL SECURITY;
+ALTER TABLE rates_snapshot_daily ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot_hourly"
+ON rates_snapshot_hourly FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_hourly"
+ON rates_snapshot_hourly FOR SELECT TO authenticated
+USING (true);
+
+CREATE POLICY "Service role has full access to rates_snapshot_daily"
+ON rates_snapshot_daily FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_daily"
+ON rates_snapshot_daily FOR SELECT TO authenticated
+USING (true);
+
+COMMIT;
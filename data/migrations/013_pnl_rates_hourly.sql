@@ -0,0 +1,61 @@
+-- Migration 013: pnl_rates_hourly - one canonical PnL rate row per (hour, protocol, token_contract)
+-- (data/pnl_rates.py). PnL integration and strategy history read this table instead of
+-- filtering rates_snapshot on use_for_pnl. RateTracker.save_snapshot() upserts it with
+-- every snapshot; this migration creates it and backfills it from the existing flags.
+-- Apply before deploying the readers (RateTracker would also create and backfill it on
+-- the next refresh, but readers fail until then).
+
+BEGIN;
+
+CREATE TABLE IF NOT EXISTS pnl_rates_hourly (
+    hour TIMESTAMP NOT NULL,              -- DATE_TRUNC('hour', timestamp)
+    protocol VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,         -- Source snapshot (earliest of the hour)
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    price_usd NUMERIC, collateral_ratio NUMERIC, liquidation_threshold NUMERIC, borrow_fee NUMERIC,
+    PRIMARY KEY (token_contract, protocol, hour)
+);
+
+-- Backfill: the use_for_pnl row of each hour (DISTINCT ON guards against a duplicate flag).
+-- With snapshot diffing enabled (migration 011), run `python -m data.pnl_rates` afterwards
+-- to include flagged rates_snapshot_unchanged markers.
+INSERT INTO pnl_rates_hourly (
+    hour, protocol, token_contract, token, timestamp,
+    lend_base_apr, lend_reward_apr, lend_total_apr,
+    borrow_base_apr, borrow_reward_apr, borrow_total_apr,
+    avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+    avg24hr_lend_total_apr, avg24hr_borrow_total_apr,
+    price_usd, collateral_ratio, liquidation_threshold, borrow_fee
+)
+SELECT DISTINCT ON (token_contract, protocol, DATE_TRUNC('hour', timestamp))
+    DATE_TRUNC('hour', timestamp), protocol, token_contract, token, timestamp,
+    lend_base_apr, lend_reward_apr, lend_total_apr,
+    borrow_base_apr, borrow_reward_apr, borrow_total_apr,
+    avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+    avg24hr_lend_total_apr, avg24hr_borrow_total_apr,
+    price_usd, collateral_ratio, liquidation_threshold, borrow_fee
+FROM rates_snapshot
+WHERE use_for_pnl = TRUE
+ORDER BY token_contract, protocol, DATE_TRUNC('hour', timestamp), timestamp
+ON CONFLICT (token_contract, protocol, hour) DO NOTHING;
+
+-- Physically order the backfilled history by (token_contract, protocol, hour) so each
+-- pair's range scan reads contiguous pages (new rows append; re-run CLUSTER occasionally)
+CLUSTER pnl_rates_hourly USING pnl_rates_hourly_pkey;
+
+ALTER TABLE pnl_rates_hourly ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to pnl_rates_hourly"
+ON pnl_rates_hourly FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read pnl_rates_hourly"
+ON pnl_rates_hourly FOR SELECT TO authenticated
+USING (true);
+
+COMMIT;
@@ -0,0 +1,32 @@
+-- Migration 014: chart_cache stores chart data instead of rendered HTML
+-- (analysis/strategy_history/chart_cache.py). Entries are compressed numpy series keyed
+-- by (strategy_hash, time_range, timestamp_seconds); created_at is Unix seconds.
+-- The old HTML table was never written by the dashboard, so it is dropped, not converted.
+
+BEGIN;
+
+DROP TABLE IF EXISTS chart_cache;
+
+CREATE TABLE chart_cache (
+    strategy_hash TEXT NOT NULL,
+    time_range TEXT NOT NULL,
+    timestamp_seconds INTEGER NOT NULL,
+    chart_data BYTEA NOT NULL,
+    created_at INTEGER NOT NULL,
+    PRIMARY KEY (strategy_hash, time_range, timestamp_seconds)
+);
+
+CREATE INDEX IF NOT EXISTS idx_chart_cache_created
+ON chart_cache(created_at);
+
+ALTER TABLE chart_cache ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to chart_cache"
+ON chart_cache FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read chart_cache"
+ON chart_cache FOR SELECT TO authenticated
+USING (true);
+
+COMMIT;
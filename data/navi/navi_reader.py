@@ -9,6 +9,7 @@ import pandas as pd
 import requests
 from typing import Tuple
 from data.navi.navi_fees import get_navi_borrow_fee
+from utils.http_client import get_http_client
 
 
 class NaviReader:
@@ -17,14 +18,12 @@ class NaviReader:
     # API endpoint
     API_URL = "https://open-api.naviprotocol.io/api/navi/pools?env=prod&sdk=1.3.4-dev.2"
 
+    # Navi's API rejects non-browser user agents
+    HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
     def __init__(self):
         """Initialize the Navi reader."""
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+        self.http = get_http_client()
 
     def _fetch_pools_data(self) -> dict:
         """
@@ -34,9 +33,7 @@ class NaviReader:
             Dictionary with pools data.
         """
         try:
-            response = self.session.get(self.API_URL, timeout=10)
-            response.raise_for_status()
-            return response.json()
+            return self.http.get_json(self.API_URL, headers=self.HEADERS)
         except requests.exceptions.RequestException as e:
             raise Exception(f"Failed to fetch Navi data: {e}")
     
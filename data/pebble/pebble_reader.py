@@ -11,6 +11,7 @@ we pick the best rate for each operation type.
 import pandas as pd
 import requests
 from typing import Tuple, Dict, List
+from utils.http_client import get_http_client
 
 
 class PebbleReader:
@@ -24,14 +25,11 @@ class PebbleReader:
     # Market types
     MARKET_TYPES = ["MainMarket", "XSuiMarket", "AltCoinMarket"]
 
+    HEADERS = {"User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"}
+
     def __init__(self):
         """Initialize the Pebble reader."""
-        self.session = requests.Session()
-        self.session.headers.update(
-            {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+        self.http = get_http_client()
 
     def _fetch_market_data(self, market_type: str) -> List[dict]:
         """
@@ -44,13 +42,11 @@ class PebbleReader:
             List of pool data dictionaries.
         """
         try:
-            response = self.session.get(
+            data = self.http.get_json(
                 self.MARKET_LIST_URL,
                 params={"marketType": market_type, "page": "1", "size": "100"},
-                timeout=10
+                headers=self.HEADERS,
             )
-            response.raise_for_status()
-            data = response.json()
             
             if data.get("code") != 0:
                 print(f"\tWarning: Non-zero response code for {market_type}")
@@ -71,9 +67,7 @@ class PebbleReader:
             Dictionary mapping (market_type, token) -> {supply_reward_apr, borrow_reward_apr}
         """
         try:
-            response = self.session.get(self.REWARDS_URL, timeout=10)
-            response.raise_for_status()
-            data = response.json()
+            data = self.http.get_json(self.REWARDS_URL, headers=self.HEADERS)
             
             if data.get("code") != 0:
                 print("\tWarning: Non-zero response code for rewards")
@@ -0,0 +1,248 @@
+"""
+pnl_rates_hourly: one canonical PnL rate row per (hour, protocol, token_contract).
+
+PnL integration (PositionService.calculate_position_value / calculate_leg_earnings_split)
+and strategy history (fetch_rates_from_database) only need the use_for_pnl row of each
+hour, and only its APR / price columns. Reading them from rates_snapshot meant filtering
+the wide table on use_for_pnl = TRUE. This table holds just those rows and columns:
+
+- hour:      DATE_TRUNC('hour', timestamp) - part of the key
+- timestamp: the snapshot the values come from (the earliest of its hour, i.e. the
+             one closest to the top of the hour - same rule as use_for_pnl)
+- RATE_COLUMNS
+
+The primary key (token_contract, protocol, hour) is the index every PnL range scan
+walks. RateTracker.save_snapshot() upserts the whole snapshot in one statement, in the
+snapshot's transaction (after the Bluefin avg columns are filled); an existing row of
+the same hour is only replaced by an earlier or equal timestamp.
+
+The table is created, and backfilled if it starts empty, once per database and
+process by ensure_table(): RateTracker calls it before writing, and the readers call
+ensure_table_for_engine() before their first query, so an existing database works
+before its first refresh under this code.
+
+Scripts that write rates_snapshot directly (backfills) call refresh() afterwards, or
+run `python -m data.pnl_rates [--start ...] [--end ...]`.
+
+Retention is deliberately out of scope for this table. It is the PnL ledger: positions
+stay open for months and their earnings (and the position_statistics checkpoints,
+which count the rows they integrated) are computed from these hourly rows, so
+thinning old hours would change the PnL of every position that spans them. It is
+the narrow part of the data - one row per market per hour, against one wide
+rates_snapshot row per market per refresh - and snapshot retention
+(data/snapshot_retention.py) trims rates_snapshot only. history_source() uses this
+table as the hourly tier for range reads.
+"""
+
+import argparse
+from typing import List, Optional, Tuple
+
+from data import snapshot_diff
+
+TABLE = 'pnl_rates_hourly'
+
+# Columns PnL / history readers select besides timestamp, protocol, token, token_contract
+RATE_COLUMNS = (
+    'lend_base_apr', 'lend_reward_apr', 'lend_total_apr',
+    'borrow_base_apr', 'borrow_reward_apr', 'borrow_total_apr',
+    'avg8hr_lend_total_apr', 'avg8hr_borrow_total_apr',
+    'avg24hr_lend_total_apr', 'avg24hr_borrow_total_apr',
+    'price_usd', 'collateral_ratio', 'liquidation_threshold', 'borrow_fee',
+)
+
+# Databases whose table exists (and was backfilled if it started empty) in this process
+_ready = set()
+
+
+def schema_statements() -> List[str]:
+    """CREATE statements for pnl_rates_hourly (idempotent, PostgreSQL and SQLite)."""
+    values = ',\n            '.join(f"{c} NUMERIC" for c in RATE_COLUMNS)
+    return [f"""
+        CREATE TABLE IF NOT EXISTS {TABLE} (
+            hour TIMESTAMP NOT NULL,
+            protocol VARCHAR(50) NOT NULL,
+            token_contract TEXT NOT NULL,
+            token VARCHAR(50) NOT NULL,
+            timestamp TIMESTAMP NOT NULL,
+            {values},
+            PRIMARY KEY (token_contract, protocol, hour)
+        )
+    """, f"CREATE INDEX IF NOT EXISTS idx_pnl_rates_hour ON {TABLE}(hour)"]
+
+
+def ensure_table(cursor, use_cloud: bool, key: str) -> None:
+    """
+    Create pnl_rates_hourly once per database and process; backfill it if empty (caller commits).
+
+    Args:
+        cursor: DB-API cursor
+        use_cloud: True for PostgreSQL
+        key: Identifies the database (connection URL or SQLite path)
+    """
+    if key in _ready:
+        return
+    for statement in schema_statements():
+        cursor.execute(statement)
+    cursor.execute(f"SELECT 1 FROM {TABLE} LIMIT 1")
+    if cursor.fetchone() is None:
+        rows = refresh(cursor, use_cloud, key=key)
+        if rows:
+            print(f"[DB] Backfilled {TABLE} with {rows} rows from rates_snapshot")
+    _ready.add(key)
+
+
+def ensure_table_for_engine(engine) -> None:
+    """ensure_table() through a SQLAlchemy engine (PnL and strategy history readers)."""
+    key = engine.url.render_as_string(hide_password=False)
+    if key in _ready:
+        return
+    conn = engine.raw_connection()
+    try:
+        ensure_table(conn.cursor(), engine.dialect.name == 'postgresql', key)
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        conn.close()
+
+
+def _hour_expr(use_cloud: bool) -> str:
+    # SQLite stores timestamps as 'YYYY-MM-DD HH:MM:SS' text
+    return "DATE_TRUNC('hour', timestamp)" if use_cloud else "strftime('%Y-%m-%d %H:00:00', timestamp)"
+
+
+def _insert_columns() -> str:
+    return ', '.join(('hour', 'protocol', 'token_contract', 'token', 'timestamp') + RATE_COLUMNS)
+
+
+def _update_set() -> str:
+    return ', '.join(f"{c} = excluded.{c}" for c in ('token', 'timestamp') + RATE_COLUMNS)
+
+
+def upsert_snapshot(cursor, use_cloud: bool, timestamp, key: Optional[str] = None) -> int:
+    """
+    Upsert the snapshot saved at timestamp (markers resolved) in one statement.
+
+    Args:
+        cursor: DB-API cursor inside the snapshot's transaction
+        use_cloud: True for PostgreSQL
+        timestamp: Snapshot timestamp (as written to rates_snapshot)
+        key: Identifies the database, for snapshot_diff.rates_source_for()
+
+    Returns:
+        Rows inserted or replaced
+    """
+    ph = '%s' if use_cloud else '?'
+    values = ', '.join(RATE_COLUMNS)
+    cursor.execute(f"""
+        INSERT INTO {TABLE} ({_insert_columns()})
+        SELECT {_hour_expr(use_cloud)}, protocol, token_contract, token, timestamp, {values}
+        FROM {snapshot_diff.rates_source_for(cursor, use_cloud, key)}
+        WHERE timestamp = {ph}
+        ON CONFLICT (token_contract, protocol, hour) DO UPDATE SET {_update_set()}
+        WHERE excluded.timestamp <= {TABLE}.timestamp
+    """, (timestamp,))
+    return max(cursor.rowcount, 0)
+
+
+def refresh(cursor, use_cloud: bool, start=None, end=None, key: Optional[str] = None) -> int:
+    """
+    Rebuild pnl_rates_hourly from the use_for_pnl rows of rates_snapshot (caller commits).
+
+    Args:
+        cursor: DB-API cursor
+        use_cloud: True for PostgreSQL
+        start / end: Optional timestamp bounds (datetime or 'YYYY-MM-DD HH:MM:SS');
+            whole hours overlapping [start, end] are rebuilt, None = unbounded. Hours
+            before the oldest rates_snapshot row (moved out by snapshot retention) are
+            never touched - there is nothing left to rebuild them from.
+        key: Identifies the database, for snapshot_diff.rates_source_for()
+
+    Returns:
+        Rows written
+    """
+    from utils.time_helpers import to_datetime_str, to_seconds
+
+    cursor.execute("SELECT MIN(timestamp) FROM rates_snapshot")
+    oldest = cursor.fetchone()[0]
+    if oldest is None:
+        return 0
+    if start is None or to_seconds(start) < to_seconds(oldest):
+        start = oldest
+
+    ph = '%s' if use_cloud else '?'
+    first_hour = to_datetime_str(to_seconds(start) // 3600 * 3600)
+    conditions, params = [f"hour >= {ph}"], [first_hour]                    # pnl_rates_hourly.hour
+    source_conditions = ["use_for_pnl = TRUE", f"timestamp >= {ph}"]       # rates_snapshot.timestamp
+    source_params = [first_hour]
+    if end is not None:
+        last_hour = to_seconds(end) // 3600 * 3600
+        conditions.append(f"hour <= {ph}")
+        source_conditions.append(f"timestamp < {ph}")
+        params.append(to_datetime_str(last_hour))
+        source_params.append(to_datetime_str(last_hour + 3600))
+    cursor.execute(f"DELETE FROM {TABLE} WHERE {' AND '.join(conditions)}", tuple(params))
+
+    # Flags should already be one per hour; the window keeps a stray duplicate from
+    # failing the insert (earliest wins, as in upsert_snapshot)
+    hour = _hour_expr(use_cloud)
+    values = ', '.join(RATE_COLUMNS)
+    cursor.execute(f"""
+        INSERT INTO {TABLE} ({_insert_columns()})
+        SELECT hour, protocol, token_contract, token, timestamp, {values}
+        FROM (
+            SELECT {hour} AS hour, protocol, token_contract, token, timestamp, {values},
+                   ROW_NUMBER() OVER (PARTITION BY token_contract, protocol, {hour} ORDER BY timestamp) AS n
+            FROM {snapshot_diff.rates_source_for(cursor, use_cloud, key)}
+            WHERE {' AND '.join(source_conditions)}
+        ) flagged
+        WHERE n = 1
+    """, tuple(source_params))
+    return max(cursor.rowcount, 0)
+
+
+def time_range(ph: str, start_seconds: Optional[int], end_seconds: Optional[int], alias: str = '') -> Tuple[str, list]:
+    """
+    WHERE conditions for rows with start_seconds <= timestamp <= end_seconds.
+
+    The bounds are applied to timestamp (exact) and to hour (so the range is a
+    primary key range scan).
+
+    Returns:
+        (conditions joined with AND, or '' when unbounded, params)
+    """
+    from utils.time_helpers import to_datetime_str
+
+    prefix = f"{alias}." if alias else ''
+    conditions, params = [], []
+    if start_seconds is not None:
+        conditions += [f"{prefix}hour >= {ph}", f"{prefix}timestamp >= {ph}"]
+        params += [to_datetime_str(start_seconds // 3600 * 3600), to_datetime_str(start_seconds)]
+    if end_seconds is not None:
+        conditions += [f"{prefix}hour <= {ph}", f"{prefix}timestamp <= {ph}"]
+        params += [to_datetime_str(end_seconds), to_datetime_str(end_seconds)]
+    return ' AND '.join(conditions), params
+
+
+def main():
+    """Rebuild pnl_rates_hourly (all of it, or a range) on the configured database."""
+    from config import settings
+    from data.rate_tracker import RateTracker
+
+    parser = argparse.ArgumentParser(description="Rebuild pnl_rates_hourly from rates_snapshot use_for_pnl rows")
+    parser.add_argument('--start', help="First hour to rebuild, 'YYYY-MM-DD HH:MM:SS' (default: all)")
+    parser.add_argument('--end', help="Last hour to rebuild, 'YYYY-MM-DD HH:MM:SS' (default: all)")
+    args = parser.parse_args()
+
+    tracker = RateTracker(
+        use_cloud=settings.USE_CLOUD_DB,
+        db_path=settings.SQLITE_PATH,
+        connection_url=settings.SUPABASE_URL,
+    )
+    rows = tracker.refresh_pnl_rates(start=args.start, end=args.end)
+    print(f"[DB] {TABLE}: {rows} rows rebuilt")
+
+
+if __name__ == "__main__":
+    main()
@@ -5,18 +5,31 @@ Supports both SQLite (local) and PostgreSQL (Supabase) for easy cloud migration.
 """
 
 import sqlite3
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 import pandas as pd
 from pathlib import Path
 from typing import Optional, List
 import psycopg2
 from psycopg2.extras import execute_values
+from config import settings
+from data import db_pool, pnl_rates, snapshot_diff, snapshot_retention
 from utils.time_helpers import to_seconds, to_datetime_str
 
 
 class RateTracker:
     """Track lending rates and prices over time"""
-    
+
+    # Databases whose cache tables were already created by this process (long-running
+    # processes build a RateTracker per refresh; the DDL only needs to run once)
+    _cache_tables_ready = set()
+
+    # Databases whose snapshot diff marker table / resolved view exist (data/snapshot_diff.py)
+    _snapshot_diff_ready = set()
+
+    # (database, month) partitions of a partitioned rates_snapshot known to exist;
+    # False under a database key means rates_snapshot is not partitioned there
+    _partitions_ready = {}
+
     def __init__(self, use_cloud=True, db_path='data/lending_rates.db', connection_url=None):
         """
         Initialize rate tracker
@@ -39,8 +52,11 @@ class RateTracker:
             Path(db_path).parent.mkdir(exist_ok=True)
             print(f"[DB] RateTracker: Using SQLite ({db_path})")
 
-        # Create cache tables
-        self._create_cache_tables()
+        # Create cache tables (once per database per process)
+        target = self.connection_url if self.use_cloud else str(Path(db_path).resolve())
+        if target not in RateTracker._cache_tables_ready:
+            self._create_cache_tables()
+            RateTracker._cache_tables_ready.add(target)
     
     def _get_connection(self):
         """Get database connection based on configuration"""
@@ -49,7 +65,7 @@ class RateTracker:
                 raise ValueError("PostgreSQL connection_url required when use_cloud=True")
             if psycopg2 is None:
                 raise ImportError("psycopg2 is required for PostgreSQL support. Install with: pip install psycopg2-binary")
-            return psycopg2.connect(self.connection_url)
+            return db_pool.connect(self.connection_url)  # Pooled once db_pool.enable() is called
         else:
             return sqlite3.connect(self.db_path)
     
@@ -82,6 +98,9 @@ class RateTracker:
         conn = self._get_connection()
         
         try:
+            # Before the insert, so a lazy backfill only covers earlier snapshots
+            self._ensure_pnl_rates_table(conn)
+
             # Save rates_snapshot
             rows_saved = self._save_rates_snapshot(
                 conn, timestamp, lend_rates, borrow_rates,
@@ -98,8 +117,10 @@ class RateTracker:
                 reward_rows = 0
             
             # Fill perp rolling avg APR columns for Bluefin rows (same transaction, Design Note #17)
-            if self.use_cloud:
-                self._update_perp_avg_rates(conn, timestamp)
+            self._update_perp_avg_rates(conn, timestamp)
+
+            # Canonical hourly PnL rows, after the avg columns are filled (data/pnl_rates.py)
+            pnl_rates.upsert_snapshot(conn.cursor(), self.use_cloud, timestamp, key=self._db_key())
 
             # Commit
             conn.commit()
@@ -116,6 +137,71 @@ class RateTracker:
         finally:
             conn.close()
 
+    def apply_retention(self, now: Optional[datetime] = None) -> dict:
+        """
+        Move snapshots older than settings.RATES_RAW_RETENTION_DAYS into the hourly /
+        daily rollup tables (data/snapshot_retention.py). One transaction.
+
+        Args:
+            now: Reference time for the cutoffs (default: current UTC time)
+
+        Returns:
+            Summary counts from snapshot_retention.apply_retention()
+        """
+        conn = self._get_connection()
+        try:
+            summary = snapshot_retention.apply_retention(conn, self.use_cloud, now)
+            conn.commit()
+            print(
+                f"[RETENTION] {summary['hourly_rows']} rows rolled up to hourly, "
+                f"{summary['raw_deleted']} raw rows / {summary['partitions_dropped']} partitions removed, "
+                f"{summary['daily_rows']} daily rollups ({summary['hourly_deleted']} hourly rows removed)"
+            )
+            return summary
+        except Exception as e:
+            conn.rollback()
+            print(f"[ERROR] Error applying snapshot retention: {e}")
+            raise
+        finally:
+            conn.close()
+
+    def refresh_pnl_rates(self, start=None, end=None) -> int:
+        """
+        Rebuild pnl_rates_hourly from rates_snapshot's use_for_pnl rows (after backfills).
+
+        Args:
+            start / end: Optional bounds (datetime or 'YYYY-MM-DD HH:MM:SS'), None = all
+
+        Returns:
+            Rows written
+        """
+        conn = self._get_connection()
+        try:
+            self._ensure_pnl_rates_table(conn)
+            rows = pnl_rates.refresh(conn.cursor(), self.use_cloud, start, end, key=self._db_key())
+            conn.commit()
+        except Exception:
+            conn.rollback()
+            raise
+        finally:
+            conn.close()
+
+        # Cached chart series were computed from the rows just rebuilt
+        self.clear_chart_cache()
+        return rows
+
+    def _ensure_pnl_rates_table(self, conn) -> None:
+        """Create pnl_rates_hourly once per database and process; backfill it if empty."""
+        pnl_rates.ensure_table(conn.cursor(), self.use_cloud, self._db_key())
+
+    def _db_key(self) -> str:
+        """Identifies this tracker's database in per-process caches."""
+        return self.connection_url if self.use_cloud else self.db_path
+
+    def _rates_source(self, conn) -> str:
+        """snapshot_diff.rates_source() for this tracker's database."""
+        return snapshot_diff.rates_source_for(conn.cursor(), self.use_cloud, self._db_key())
+
     def save_position_statistics(self, stats: dict):
         """
         Save position statistics to database.
@@ -141,10 +227,10 @@ class RateTracker:
         conn = self._get_connection()
 
         try:
-            # Convert Unix timestamps to datetime strings for database
-            from datetime import datetime
-            timestamp_str = datetime.fromtimestamp(stats['timestamp']).strftime('%Y-%m-%d %H:%M:%S')
-            calc_timestamp_str = datetime.fromtimestamp(stats['calculation_timestamp']).strftime('%Y-%m-%d %H:%M:%S')
+            # Convert Unix timestamps to datetime strings for database (UTC, like every
+            # other table - incremental statistics read these back with to_seconds())
+            timestamp_str = to_datetime_str(stats['timestamp'])
+            calc_timestamp_str = to_datetime_str(stats['calculation_timestamp'])
 
             # Convert all numeric values to native Python types (handle numpy types)
             total_pnl = self._convert_to_native_types(stats['total_pnl'])
@@ -167,6 +253,14 @@ class RateTracker:
             token4_rewards  = self._convert_to_native_types(stats.get('token4_rewards'))
             accumulated_realised_pnl = self._convert_to_native_types(stats.get('accumulated_realised_pnl'))
 
+            # Checkpoint metadata for incremental statistics (optional)
+            stats_version = self._convert_to_native_types(stats.get('stats_version'))
+            segment_start_str = (
+                to_datetime_str(stats['segment_start_timestamp'])
+                if stats.get('segment_start_timestamp') is not None else None
+            )
+            rate_rows_used = self._convert_to_native_types(stats.get('rate_rows_used'))
+
             if self.use_cloud:
                 # PostgreSQL INSERT ... ON CONFLICT DO UPDATE
                 cursor = conn.cursor()
@@ -177,8 +271,8 @@ class RateTracker:
                         live_pnl, realized_pnl, calculation_timestamp,
                         token1_earnings, token1_rewards, token2_earnings, token2_rewards,
                         token3_earnings, token3_rewards, token4_earnings, token4_rewards,
-                        accumulated_realised_pnl
-                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                        accumulated_realised_pnl, stats_version, segment_start_timestamp, rate_rows_used
+                    ) VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
                     ON CONFLICT (position_id, timestamp) DO UPDATE SET
                         total_pnl = EXCLUDED.total_pnl,
                         total_earnings = EXCLUDED.total_earnings,
@@ -199,7 +293,10 @@ class RateTracker:
                         token3_rewards = EXCLUDED.token3_rewards,
                         token4_earnings = EXCLUDED.token4_earnings,
                         token4_rewards = EXCLUDED.token4_rewards,
-                        accumulated_realised_pnl = EXCLUDED.accumulated_realised_pnl
+                        accumulated_realised_pnl = EXCLUDED.accumulated_realised_pnl,
+                        stats_version = EXCLUDED.stats_version,
+                        segment_start_timestamp = EXCLUDED.segment_start_timestamp,
+                        rate_rows_used = EXCLUDED.rate_rows_used
                 """, (
                     stats['position_id'],
                     timestamp_str,
@@ -208,7 +305,7 @@ class RateTracker:
                     calc_timestamp_str,
                     token1_earnings, token1_rewards, token2_earnings, token2_rewards,
                     token3_earnings, token3_rewards, token4_earnings, token4_rewards,
-                    accumulated_realised_pnl
+                    accumulated_realised_pnl, stats_version, segment_start_str, rate_rows_used
                 ))
             else:
                 # SQLite INSERT OR REPLACE
@@ -220,8 +317,8 @@ class RateTracker:
                         live_pnl, realized_pnl, calculation_timestamp,
                         token1_earnings, token1_rewards, token2_earnings, token2_rewards,
                         token3_earnings, token3_rewards, token4_earnings, token4_rewards,
-                        accumulated_realised_pnl
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        accumulated_realised_pnl, stats_version, segment_start_timestamp, rate_rows_used
+                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
                 """, (
                     stats['position_id'],
                     timestamp_str,
@@ -230,7 +327,7 @@ class RateTracker:
                     calc_timestamp_str,
                     token1_earnings, token1_rewards, token2_earnings, token2_rewards,
                     token3_earnings, token3_rewards, token4_earnings, token4_rewards,
-                    accumulated_realised_pnl
+                    accumulated_realised_pnl, stats_version, segment_start_str, rate_rows_used
                 ))
 
             conn.commit()
@@ -331,14 +428,148 @@ class RateTracker:
                     'borrow_weight': borrow_weight,
                 })
         
+        # Change-only persistence: unchanged rows become markers (data/snapshot_diff.py)
+        markers = []
+        if rows and settings.SNAPSHOT_DIFF_ENABLED:
+            self._ensure_snapshot_diff_schema(conn)
+            total = len(rows)
+            rows, markers = snapshot_diff.split_unchanged(rows, self._previous_snapshot_rows(conn, timestamp))
+            self._clear_snapshot_rows(conn, timestamp, markers)
+            print(f"[DB] Snapshot diff: {len(rows)} changed, {len(markers)} unchanged of {total} rows")
+
         # Insert rows
         if rows:
             if self.use_cloud:
+                self._ensure_rates_partition(conn, timestamp)
                 self._insert_rates_postgres(conn, rows)
             else:
                 self._insert_rates_sqlite(conn, rows)
-        
-        return len(rows) 
+        if markers:
+            self._insert_unchanged_markers(conn, timestamp, markers)
+
+        return len(rows) + len(markers)
+
+    def _ensure_snapshot_diff_schema(self, conn) -> None:
+        """Create the marker table and resolved view once per database and process."""
+        key = self._db_key()
+        if key in RateTracker._snapshot_diff_ready:
+            return
+        cursor = conn.cursor()
+        for statement in snapshot_diff.schema_statements(self.use_cloud):
+            cursor.execute(statement)
+        RateTracker._snapshot_diff_ready.add(key)
+
+    def _ensure_rates_partition(self, conn, timestamp: datetime) -> None:
+        """
+        Create the monthly rates_snapshot partition for timestamp (and the next month's).
+
+        No-op unless rates_snapshot was partitioned by migration 012. Each partition is
+        only created once per process.
+        """
+        known = RateTracker._partitions_ready.setdefault(self.connection_url, set())
+        if known is False:
+            return
+        month_start = timestamp.replace(day=1, hour=0, minute=0, second=0, microsecond=0, tzinfo=None)
+        if month_start in known:
+            return
+        cursor = conn.cursor()
+        if not known and not snapshot_retention.is_partitioned(cursor):
+            RateTracker._partitions_ready[self.connection_url] = False
+            return
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        for start in (month_start, next_month):
+            cursor.execute(snapshot_retention.partition_statement(start))
+        known.add(month_start)
+
+    def _previous_snapshot_rows(self, conn, timestamp: datetime) -> pd.DataFrame:
+        """
+        Resolved rows of the latest snapshot before timestamp, for snapshot_diff.split_unchanged().
+
+        Returns:
+            DataFrame (protocol, token_contract, token, DIFF_COLUMNS..., source_timestamp);
+            empty if there is no earlier snapshot
+        """
+        ph = '%s' if self.use_cloud else '?'
+        marker_table = snapshot_diff.MARKER_TABLE
+        cursor = conn.cursor()
+        cursor.execute(f"""
+            SELECT MAX(ts) FROM (
+                SELECT MAX(timestamp) AS ts FROM rates_snapshot WHERE timestamp < {ph}
+                UNION ALL
+                SELECT MAX(timestamp) AS ts FROM {marker_table} WHERE timestamp < {ph}
+            ) latest
+        """, (timestamp, timestamp))
+        row = cursor.fetchone()
+        if not row or row[0] is None:
+            return pd.DataFrame()
+        previous_ts = row[0]
+
+        # source_timestamp is passed back verbatim as the marker's unchanged_since, so it
+        # matches the base row exactly (SQLite compares timestamps as text)
+        values = ', '.join(f"rs.{c}" for c in snapshot_diff.DIFF_COLUMNS)
+        cursor.execute(f"""
+            SELECT rs.protocol, rs.token_contract, rs.token, {values}, rs.timestamp AS source_timestamp
+            FROM rates_snapshot rs
+            WHERE rs.timestamp = {ph}
+            UNION ALL
+            SELECT rs.protocol, rs.token_contract, rs.token, {values}, rs.timestamp AS source_timestamp
+            FROM {marker_table} m
+            JOIN rates_snapshot rs
+              ON rs.timestamp = m.unchanged_since
+             AND rs.protocol = m.protocol
+             AND rs.token_contract = m.token_contract
+            WHERE m.timestamp = {ph}
+        """, (previous_ts, previous_ts))
+        columns = [d[0] for d in cursor.description]
+        return pd.DataFrame(cursor.fetchall(), columns=columns)
+
+    def _insert_unchanged_markers(self, conn, timestamp: datetime, markers: list) -> None:
+        """
+        Write rates_snapshot_unchanged markers for rows equal to the previous snapshot.
+
+        Markers take part in the hourly use_for_pnl selection like full rows.
+
+        Args:
+            markers: [(row, unchanged_since), ...] from snapshot_diff.split_unchanged()
+        """
+        cursor = conn.cursor()
+        should_use_for_pnl = self._should_use_for_pnl if self.use_cloud else self._should_use_for_pnl_sqlite
+        values = []
+        for row, unchanged_since in markers:
+            use_for_pnl = should_use_for_pnl(cursor, timestamp, row['protocol'], row['token_contract'])
+            values.append((
+                timestamp, row['protocol'], row['token_contract'], unchanged_since,
+                use_for_pnl if self.use_cloud else (1 if use_for_pnl else 0),
+            ))
+
+        if self.use_cloud:
+            execute_values(cursor, f"""
+                INSERT INTO {snapshot_diff.MARKER_TABLE}
+                    (timestamp, protocol, token_contract, unchanged_since, use_for_pnl)
+                VALUES %s
+            """, values, page_size=len(values))
+        else:
+            cursor.executemany(f"""
+                INSERT INTO {snapshot_diff.MARKER_TABLE}
+                    (timestamp, protocol, token_contract, unchanged_since, use_for_pnl)
+                VALUES (?, ?, ?, ?, ?)
+            """, values)
+
+    def _clear_snapshot_rows(self, conn, timestamp: datetime, markers: list) -> None:
+        """
+        Re-saving a timestamp: drop its markers and the full rows that become markers.
+
+        Otherwise a (protocol, token_contract) could appear twice in the resolved view.
+        """
+        ph = '%s' if self.use_cloud else '?'
+        cursor = conn.cursor()
+        cursor.execute(f"DELETE FROM {snapshot_diff.MARKER_TABLE} WHERE timestamp = {ph}", (timestamp,))
+        if markers:
+            cursor.executemany(
+                f"DELETE FROM rates_snapshot WHERE timestamp = {ph} AND protocol = {ph} AND token_contract = {ph}",
+                [(timestamp, row['protocol'], row['token_contract']) for row, _ in markers],
+            )
+
     def _should_use_for_pnl_sqlite(self, cursor, timestamp: datetime, protocol: str, token_contract: str) -> bool:
         """
         SQLite version of _should_use_for_pnl using ? placeholders.
@@ -349,35 +580,52 @@ class RateTracker:
         hour_start = timestamp.replace(minute=0, second=0, microsecond=0)
         hour_end = hour_start + timedelta(hours=1)
 
-        query = """
-        SELECT timestamp
-        FROM rates_snapshot
-        WHERE timestamp >= ? AND timestamp < ?
-          AND protocol = ? AND token_contract = ?
-          AND use_for_pnl = 1
-        LIMIT 1
-        """
-
-        cursor.execute(query, (hour_start, hour_end, protocol, token_contract))
+        cursor.execute(
+            self._pnl_flag_query('?', true_literal='1'),
+            self._pnl_flag_params(hour_start, hour_end, protocol, token_contract),
+        )
         existing = cursor.fetchone()
 
         if not existing:
             return True
 
+        # SQLite returns timestamps as 'YYYY-MM-DD HH:MM:SS' text
         existing_ts = existing[0]
-        existing_distance = abs((existing_ts - hour_start).total_seconds())
+        existing_distance = abs(to_seconds(existing_ts) - to_seconds(hour_start))
         new_distance = abs((timestamp - hour_start).total_seconds())
 
-        if new_distance < existing_distance:
-            cursor.execute("""
-                UPDATE rates_snapshot
-                SET use_for_pnl = 0
-                WHERE timestamp = ? AND protocol = ? AND token_contract = ?
-            """, (existing_ts, protocol, token_contract))
+        if new_distance <= existing_distance:  # equal = re-saving the same snapshot
+            for table in self._pnl_flag_tables():
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET use_for_pnl = 0
+                    WHERE timestamp = ? AND protocol = ? AND token_contract = ?
+                """, (existing_ts, protocol, token_contract))
             return True
 
         return False
 
+    @staticmethod
+    def _pnl_flag_tables() -> tuple:
+        """Tables holding use_for_pnl flags (markers too while snapshot diffing is enabled)."""
+        if settings.SNAPSHOT_DIFF_ENABLED:
+            return ('rates_snapshot', snapshot_diff.MARKER_TABLE)
+        return ('rates_snapshot',)
+
+    def _pnl_flag_query(self, ph: str, true_literal: str) -> str:
+        """Flagged row (full or marker) for one (protocol, token_contract) within an hour."""
+        selects = [
+            f"""SELECT timestamp FROM {table}
+            WHERE timestamp >= {ph} AND timestamp < {ph}
+              AND protocol = {ph} AND token_contract = {ph}
+              AND use_for_pnl = {true_literal}"""
+            for table in self._pnl_flag_tables()
+        ]
+        return f"SELECT timestamp FROM ({' UNION ALL '.join(selects)}) flagged LIMIT 1"
+
+    def _pnl_flag_params(self, hour_start, hour_end, protocol: str, token_contract: str) -> tuple:
+        return (hour_start, hour_end, protocol, token_contract) * len(self._pnl_flag_tables())
+
     def _insert_rates_sqlite(self, conn, rows):
         """Insert rates into SQLite with PnL flag optimization"""
         cursor = conn.cursor()
@@ -448,17 +696,11 @@ class RateTracker:
         hour_start = timestamp.replace(minute=0, second=0, microsecond=0)
         hour_end = hour_start + timedelta(hours=1)
 
-        # Query existing PnL snapshot in this hour for this protocol/token
-        query = """
-        SELECT timestamp
-        FROM rates_snapshot
-        WHERE timestamp >= %s AND timestamp < %s
-          AND protocol = %s AND token_contract = %s
-          AND use_for_pnl = TRUE
-        LIMIT 1
-        """
-
-        cursor.execute(query, (hour_start, hour_end, protocol, token_contract))
+        # Query existing PnL snapshot (full row or diff marker) in this hour for this protocol/token
+        cursor.execute(
+            self._pnl_flag_query('%s', true_literal='TRUE'),
+            self._pnl_flag_params(hour_start, hour_end, protocol, token_contract),
+        )
         existing = cursor.fetchone()
 
         if not existing:
@@ -470,13 +712,14 @@ class RateTracker:
         existing_distance = abs((existing_ts - hour_start).total_seconds())
         new_distance = abs((timestamp - hour_start).total_seconds())
 
-        if new_distance < existing_distance:
+        if new_distance <= existing_distance:  # equal = re-saving the same snapshot
             # This snapshot is closer to top of hour - unset old flag and use this one
-            cursor.execute("""
-                UPDATE rates_snapshot
-                SET use_for_pnl = FALSE
-                WHERE timestamp = %s AND protocol = %s AND token_contract = %s
-            """, (existing_ts, protocol, token_contract))
+            for table in self._pnl_flag_tables():
+                cursor.execute(f"""
+                    UPDATE {table}
+                    SET use_for_pnl = FALSE
+                    WHERE timestamp = %s AND protocol = %s AND token_contract = %s
+                """, (existing_ts, protocol, token_contract))
             return True
 
         # Existing snapshot is closer - don't flag this one
@@ -573,50 +816,61 @@ class RateTracker:
 
     def _patch_missing_perp_avg_rates(self, cursor) -> tuple:
         """
-        Run the two rolling-average UPDATE statements on an open cursor.
+        Fill NULL avg_rate_8hr / avg_rate_24hr on an open cursor.
         Caller is responsible for commit/rollback.
 
+        Averages are the last 8 / 24 observations per (protocol, token_contract),
+        including the current row, computed in one pass with window functions
+        over only the partitions that still have NULLs. Non-NULL values are never
+        overwritten. The same statement runs on PostgreSQL and SQLite (3.33+ for
+        UPDATE ... FROM).
+
         Returns:
             (rows_8hr, rows_24hr)
         """
+        # Cheap check first - on most refreshes nothing is missing
         cursor.execute("""
-            UPDATE perp_margin_rates t
-            SET avg_rate_8hr = (
-                SELECT AVG(p.funding_rate_annual)
-                FROM (
-                    SELECT p2.funding_rate_annual
-                    FROM perp_margin_rates p2
-                    WHERE p2.protocol      = t.protocol
-                      AND p2.token_contract = t.token_contract
-                      AND p2.timestamp     <= t.timestamp
-                    ORDER BY p2.timestamp DESC
-                    LIMIT 8
-                ) p
-            )
-            WHERE t.avg_rate_8hr IS NULL
+            SELECT
+                COALESCE(SUM(CASE WHEN avg_rate_8hr  IS NULL THEN 1 ELSE 0 END), 0),
+                COALESCE(SUM(CASE WHEN avg_rate_24hr IS NULL THEN 1 ELSE 0 END), 0)
+            FROM perp_margin_rates
+            WHERE avg_rate_8hr IS NULL OR avg_rate_24hr IS NULL
         """)
-        rows_8hr = cursor.rowcount
+        rows_8hr, rows_24hr = (int(n) for n in cursor.fetchone())
+        if rows_8hr == 0 and rows_24hr == 0:
+            return 0, 0
 
         cursor.execute("""
-            UPDATE perp_margin_rates t
-            SET avg_rate_24hr = (
-                SELECT AVG(p.funding_rate_annual)
-                FROM (
-                    SELECT p2.funding_rate_annual
-                    FROM perp_margin_rates p2
-                    WHERE p2.protocol      = t.protocol
-                      AND p2.token_contract = t.token_contract
-                      AND p2.timestamp     <= t.timestamp
-                    ORDER BY p2.timestamp DESC
-                    LIMIT 24
-                ) p
-            )
-            WHERE t.avg_rate_24hr IS NULL
+            UPDATE perp_margin_rates AS t
+            SET avg_rate_8hr  = COALESCE(t.avg_rate_8hr,  w.avg_8hr),
+                avg_rate_24hr = COALESCE(t.avg_rate_24hr, w.avg_24hr)
+            FROM (
+                SELECT
+                    p.timestamp, p.protocol, p.token_contract,
+                    AVG(p.funding_rate_annual) OVER (
+                        PARTITION BY p.protocol, p.token_contract
+                        ORDER BY p.timestamp
+                        ROWS BETWEEN 7 PRECEDING AND CURRENT ROW
+                    ) AS avg_8hr,
+                    AVG(p.funding_rate_annual) OVER (
+                        PARTITION BY p.protocol, p.token_contract
+                        ORDER BY p.timestamp
+                        ROWS BETWEEN 23 PRECEDING AND CURRENT ROW
+                    ) AS avg_24hr
+                FROM perp_margin_rates p
+                WHERE (p.protocol, p.token_contract) IN (
+                    SELECT DISTINCT protocol, token_contract
+                    FROM perp_margin_rates
+                    WHERE avg_rate_8hr IS NULL OR avg_rate_24hr IS NULL
+                )
+            ) w
+            WHERE t.timestamp      = w.timestamp
+              AND t.protocol       = w.protocol
+              AND t.token_contract = w.token_contract
+              AND (t.avg_rate_8hr IS NULL OR t.avg_rate_24hr IS NULL)
         """)
-        rows_24hr = cursor.rowcount
 
-        if rows_8hr > 0 or rows_24hr > 0:
-            print(f"[PERP] avg patch: {rows_8hr} rows got avg_rate_8hr, {rows_24hr} rows got avg_rate_24hr")
+        print(f"[PERP] avg patch: {rows_8hr} rows got avg_rate_8hr, {rows_24hr} rows got avg_rate_24hr")
         return rows_8hr, rows_24hr
 
     def _update_perp_avg_rates(self, conn, timestamp: datetime) -> None:
@@ -628,20 +882,37 @@ class RateTracker:
         For perp rows lend and borrow avg APRs are equal (same funding rate, both negated).
         """
         cursor = conn.cursor()
-        cursor.execute("""
-            UPDATE rates_snapshot rs
-            SET
-                avg8hr_lend_total_apr   = -pmr.avg_rate_8hr,
-                avg8hr_borrow_total_apr = -pmr.avg_rate_8hr,
-                avg24hr_lend_total_apr  = -pmr.avg_rate_24hr,
-                avg24hr_borrow_total_apr = -pmr.avg_rate_24hr
-            FROM perp_margin_rates pmr
-            WHERE rs.timestamp      = %s
-              AND rs.protocol       = 'Bluefin'
-              AND rs.token_contract = pmr.token_contract
-              AND pmr.timestamp     = DATE_TRUNC('hour', rs.timestamp)
-              AND pmr.avg_rate_8hr IS NOT NULL
-        """, (timestamp,))
+        if self.use_cloud:
+            cursor.execute("""
+                UPDATE rates_snapshot rs
+                SET
+                    avg8hr_lend_total_apr   = -pmr.avg_rate_8hr,
+                    avg8hr_borrow_total_apr = -pmr.avg_rate_8hr,
+                    avg24hr_lend_total_apr  = -pmr.avg_rate_24hr,
+                    avg24hr_borrow_total_apr = -pmr.avg_rate_24hr
+                FROM perp_margin_rates pmr
+                WHERE rs.timestamp      = %s
+                  AND rs.protocol       = 'Bluefin'
+                  AND rs.token_contract = pmr.token_contract
+                  AND pmr.timestamp     = DATE_TRUNC('hour', rs.timestamp)
+                  AND pmr.avg_rate_8hr IS NOT NULL
+            """, (timestamp,))
+        else:
+            # SQLite stores timestamps as 'YYYY-MM-DD HH:MM:SS' text; truncate to the hour with strftime
+            cursor.execute("""
+                UPDATE rates_snapshot AS rs
+                SET
+                    avg8hr_lend_total_apr   = -pmr.avg_rate_8hr,
+                    avg8hr_borrow_total_apr = -pmr.avg_rate_8hr,
+                    avg24hr_lend_total_apr  = -pmr.avg_rate_24hr,
+                    avg24hr_borrow_total_apr = -pmr.avg_rate_24hr
+                FROM perp_margin_rates pmr
+                WHERE rs.timestamp      = ?
+                  AND rs.protocol       = 'Bluefin'
+                  AND rs.token_contract = pmr.token_contract
+                  AND pmr.timestamp     = strftime('%Y-%m-%d %H:00:00', rs.timestamp)
+                  AND pmr.avg_rate_8hr IS NOT NULL
+            """, (timestamp,))
         cursor.close()
 
     def _save_reward_prices(
@@ -729,30 +1000,40 @@ class RateTracker:
         }
         df = df.groupby("token_contract", as_index=False).agg(agg)
 
-        token_list = df["token_contract"].tolist()
-
         conn = self._get_connection()
         try:
-            existing = self._get_existing_token_contracts(conn, token_list)
-            inserted = len([t for t in token_list if t not in existing])
-            updated_count = len(token_list) - inserted
-
             if not self.use_cloud:
-                self._upsert_token_registry_sqlite(conn, ts, df)
+                inserted, updated_count = self._upsert_token_registry_sqlite(conn, ts, df)
             else:
-                self._upsert_token_registry_postgres(conn, ts, df)
+                inserted, updated_count = self._upsert_token_registry_postgres(conn, ts, df)
 
             total = self._count_table("token_registry", conn=conn)
 
-            if not self.use_cloud:
-                conn.commit()
-            else:
-                conn.commit()
+            conn.commit()
 
-            return {"seen": len(token_list), "inserted": inserted, "updated": updated_count, "total": total}
+            return {"seen": len(df), "inserted": inserted, "updated": updated_count, "total": total}
         finally:
             conn.close()
 
+    # token_registry columns written by upsert_token_registry (after token_contract, symbol)
+    _TOKEN_FLAG_COLUMNS = (
+        "seen_on_navi", "seen_on_alphafi", "seen_on_suilend",
+        "seen_as_reserve", "seen_as_reward_lend", "seen_as_reward_borrow",
+    )
+
+    def _token_registry_rows(self, ts: datetime, df: pd.DataFrame) -> list:
+        """
+        Parameter tuples (token_contract, symbol, 6 seen_* flags, first_seen, last_seen).
+
+        Built from column arrays; .tolist() yields Python ints, which both drivers adapt
+        (numpy int64 is not adaptable by psycopg2).
+        """
+        n = len(df)
+        columns = [df["token_contract"].tolist(), df["symbol"].tolist()]
+        columns += [df[c].astype(int).tolist() for c in self._TOKEN_FLAG_COLUMNS]
+        columns += [[ts] * n, [ts] * n]
+        return list(zip(*columns))
+
     def _get_existing_token_contracts(self, conn, token_contracts: list) -> set:
         """Return set of token_contracts already present in token_registry."""
         if not token_contracts:
@@ -768,7 +1049,17 @@ class RateTracker:
         rows = cur.fetchall()
         return {r[0] for r in rows}
 
-    def _upsert_token_registry_sqlite(self, conn, ts: datetime, df: pd.DataFrame) -> None:
+    def _upsert_token_registry_sqlite(self, conn, ts: datetime, df: pd.DataFrame) -> tuple:
+        """
+        Upsert for SQLite (in-process, so executemany costs no round trips).
+
+        Returns:
+            (inserted, updated) counts
+        """
+        token_list = df["token_contract"].tolist()
+        existing = self._get_existing_token_contracts(conn, token_list)
+        inserted = len(set(token_list) - existing)
+
         cur = conn.cursor()
         cur.executemany(
             """
@@ -795,26 +1086,24 @@ class RateTracker:
                 seen_as_reward_lend = MAX(token_registry.seen_as_reward_lend, excluded.seen_as_reward_lend),
                 seen_as_reward_borrow = MAX(token_registry.seen_as_reward_borrow, excluded.seen_as_reward_borrow)
             """,
-            [
-                (
-                    r["token_contract"],
-                    r["symbol"],
-                    int(r["seen_on_navi"]),
-                    int(r["seen_on_alphafi"]),
-                    int(r["seen_on_suilend"]),
-                    int(r["seen_as_reserve"]),
-                    int(r["seen_as_reward_lend"]),
-                    int(r["seen_as_reward_borrow"]),
-                    ts,
-                    ts,
-                )
-                for _, r in df.iterrows()
-            ],
+            self._token_registry_rows(ts, df),
         )
+        return inserted, len(token_list) - inserted
 
-    def _upsert_token_registry_postgres(self, conn, ts: datetime, df: pd.DataFrame) -> None:
+    def _upsert_token_registry_postgres(self, conn, ts: datetime, df: pd.DataFrame) -> tuple:
+        """
+        Upsert for PostgreSQL: one multi-row INSERT ... ON CONFLICT statement.
+
+        RETURNING (xmax = 0) is true for rows the statement inserted and false for rows
+        it updated, so the inserted/updated split needs no separate lookup query.
+
+        Returns:
+            (inserted, updated) counts
+        """
+        rows = self._token_registry_rows(ts, df)
         cur = conn.cursor()
-        cur.executemany(
+        results = execute_values(
+            cur,
             """
             INSERT INTO token_registry (
                 token_contract, symbol, pyth_id, coingecko_id,
@@ -822,12 +1111,7 @@ class RateTracker:
                 seen_as_reserve, seen_as_reward_lend, seen_as_reward_borrow,
                 first_seen, last_seen
             )
-            VALUES (
-                %s, %s, NULL, NULL,
-                %s, %s, %s,
-                %s, %s, %s,
-                %s, %s
-            )
+            VALUES %s
             ON CONFLICT(token_contract) DO UPDATE SET
                 last_seen = EXCLUDED.last_seen,
                 symbol = COALESCE(token_registry.symbol, EXCLUDED.symbol),
@@ -837,23 +1121,15 @@ class RateTracker:
                 seen_as_reserve = GREATEST(token_registry.seen_as_reserve, EXCLUDED.seen_as_reserve),
                 seen_as_reward_lend = GREATEST(token_registry.seen_as_reward_lend, EXCLUDED.seen_as_reward_lend),
                 seen_as_reward_borrow = GREATEST(token_registry.seen_as_reward_borrow, EXCLUDED.seen_as_reward_borrow)
+            RETURNING (xmax = 0) AS inserted
             """,
-            [
-                (
-                    r["token_contract"],
-                    r["symbol"],
-                    int(r["seen_on_navi"]),
-                    int(r["seen_on_alphafi"]),
-                    int(r["seen_on_suilend"]),
-                    int(r["seen_as_reserve"]),
-                    int(r["seen_as_reward_lend"]),
-                    int(r["seen_as_reward_borrow"]),
-                    ts,
-                    ts,
-                )
-                for _, r in df.iterrows()
-            ],
+            rows,
+            template="(%s, %s, NULL, NULL, %s, %s, %s, %s, %s, %s, %s, %s)",
+            page_size=len(rows),
+            fetch=True,
         )
+        inserted = sum(1 for (was_inserted,) in results if was_inserted)
+        return inserted, len(results) - inserted
 
     # ---------------------------------------------------------------------
     # Inspection helpers
@@ -957,16 +1233,16 @@ class RateTracker:
         Returns:
             Number of distinct protocols
         """
+        source = self._rates_source(conn)
         cur = conn.cursor()
-
         if self.use_cloud:
             cur.execute(
-                "SELECT COUNT(DISTINCT protocol) FROM rates_snapshot WHERE timestamp = %s",
+                f"SELECT COUNT(DISTINCT protocol) FROM {source} WHERE timestamp = %s",
                 (timestamp,)
             )
         else:
             cur.execute(
-                "SELECT COUNT(DISTINCT protocol) FROM rates_snapshot WHERE timestamp = ?",
+                f"SELECT COUNT(DISTINCT protocol) FROM {source} WHERE timestamp = ?",
                 (timestamp,)
             )
 
@@ -994,15 +1270,20 @@ class RateTracker:
                     )
                 """)
 
-                # Create chart_cache table
+                # chart_cache held rendered HTML before it stored chart data; nothing wrote it
+                columns = [row[1] for row in conn.execute("PRAGMA table_info(chart_cache)")]
+                if 'chart_html' in columns:
+                    conn.execute("DROP TABLE chart_cache")
+
+                # Create chart_cache table (chart data: see analysis/strategy_history/chart_cache.py)
                 conn.execute("""
                     CREATE TABLE IF NOT EXISTS chart_cache (
-                        id INTEGER PRIMARY KEY AUTOINCREMENT,
                         strategy_hash TEXT NOT NULL,
+                        time_range TEXT NOT NULL,
                         timestamp_seconds INTEGER NOT NULL,
-                        chart_html TEXT NOT NULL,
+                        chart_data BLOB NOT NULL,
                         created_at INTEGER NOT NULL,
-                        UNIQUE(strategy_hash, timestamp_seconds)
+                        PRIMARY KEY (strategy_hash, time_range, timestamp_seconds)
                     )
                 """)
 
@@ -1013,8 +1294,8 @@ class RateTracker:
                 """)
 
                 conn.execute("""
-                    CREATE INDEX IF NOT EXISTS idx_chart_cache_strategy
-                        ON chart_cache(strategy_hash, timestamp_seconds)
+                    CREATE INDEX IF NOT EXISTS idx_chart_cache_created
+                        ON chart_cache(created_at)
                 """)
 
                 conn.commit()
@@ -1035,16 +1316,18 @@ class RateTracker:
             timestamp_seconds: Unix timestamp (int)
             liquidation_distance: Decimal (0.10 = 10%)
             all_results: DataFrame or list of dicts (from RateAnalyzer.find_best_protocol_pair)
+
+        Results are stored in the core schema as columnar JSON (see
+        analysis/result_schema.py); display columns are re-derived after loading.
         """
         import json
         import time
+        from analysis.result_schema import slim_results, to_cache_payload
 
-        # Convert DataFrame to list of dicts if needed
-        if hasattr(all_results, 'to_dict'):
-            # It's a DataFrame, convert to list of dicts
-            all_results = all_results.to_dict('records')
+        if not hasattr(all_results, 'to_dict'):
+            all_results = pd.DataFrame(all_results)
 
-        results_json = json.dumps(all_results)
+        results_json = json.dumps(to_cache_payload(slim_results(all_results)))
         strategy_count = len(all_results)
         created_at = int(time.time())
 
@@ -1109,20 +1392,11 @@ class RateTracker:
         )
         deleted_analysis = cursor.rowcount
 
-        # Delete old chart_cache entries
-        # Handle database type difference: PostgreSQL uses TIMESTAMP, SQLite uses INTEGER
-        if self.use_cloud:
-            # PostgreSQL: created_at is TIMESTAMP, convert Unix timestamp to TIMESTAMP
-            cursor.execute(
-                f"DELETE FROM chart_cache WHERE created_at < to_timestamp({ph})",
-                (cutoff_time,)
-            )
-        else:
-            # SQLite: created_at is INTEGER (Unix timestamp)
-            cursor.execute(
-                f"DELETE FROM chart_cache WHERE created_at < {ph}",
-                (cutoff_time,)
-            )
+        # Delete old chart_cache entries (created_at is INTEGER as well)
+        cursor.execute(
+            f"DELETE FROM chart_cache WHERE created_at < {ph}",
+            (cutoff_time,)
+        )
         deleted_charts = cursor.rowcount
 
         conn.commit()
@@ -1140,10 +1414,13 @@ class RateTracker:
         Load analysis results from cache.
 
         Returns:
-            DataFrame with all strategies (sorted by net_apr descending) or None if not cached
+            DataFrame with all strategies (sorted by net_apr descending) or None if not cached.
+            Core result schema - call with_display_columns() before rendering. Caches
+            written before the columnar format load as the full row dicts they stored.
         """
         import json
         import time
+        from analysis.result_schema import from_cache_payload
 
         fetch_start = time.time()
 
@@ -1168,10 +1445,8 @@ class RateTracker:
                     return None
 
                 results_json, strategy_count = row
-                all_results = json.loads(results_json)
-
-                # Convert list of dicts to DataFrame (matches RateAnalyzer.find_best_protocol_pair return)
-                df = pd.DataFrame(all_results)
+                # Columnar core frame, or legacy list of dicts (matches RateAnalyzer.find_best_protocol_pair return)
+                df = from_cache_payload(json.loads(results_json))
 
                 fetch_time = (time.time() - fetch_start) * 1000
                 if start_time:
@@ -1191,10 +1466,22 @@ class RateTracker:
     def save_chart_cache(
         self,
         strategy_hash: str,
+        time_range: str,
         timestamp_seconds: int,
-        chart_html: str
+        chart_data: bytes
     ) -> None:
-        """Save rendered chart to cache."""
+        """
+        Save a chart's data series to cache.
+
+        Entries of older snapshots for the same strategy and time range are
+        superseded and deleted in the same transaction.
+
+        Args:
+            strategy_hash: compute_strategy_hash() of the strategy
+            time_range: Chart time range ('7d', '30d', '90d', 'all')
+            timestamp_seconds: Snapshot the series ends at (Unix seconds)
+            chart_data: Encoded series (analysis/strategy_history/chart_cache.encode_series)
+        """
         import time
 
         created_at = int(time.time())
@@ -1210,15 +1497,21 @@ class RateTracker:
                 # Use PostgreSQL-compatible UPSERT syntax
                 cursor.execute(f"""
                     INSERT INTO chart_cache
-                    (strategy_hash, timestamp_seconds, chart_html, created_at)
-                    VALUES ({ph}, {ph}, {ph}, {ph})
-                    ON CONFLICT (strategy_hash, timestamp_seconds)
+                    (strategy_hash, time_range, timestamp_seconds, chart_data, created_at)
+                    VALUES ({ph}, {ph}, {ph}, {ph}, {ph})
+                    ON CONFLICT (strategy_hash, time_range, timestamp_seconds)
                     DO UPDATE SET
-                        chart_html = EXCLUDED.chart_html,
+                        chart_data = EXCLUDED.chart_data,
                         created_at = EXCLUDED.created_at
-                """, (strategy_hash, timestamp_seconds, chart_html, created_at))
+                """, (strategy_hash, time_range, timestamp_seconds, chart_data, created_at))
+
+                cursor.execute(f"""
+                    DELETE FROM chart_cache
+                    WHERE strategy_hash = {ph} AND time_range = {ph} AND timestamp_seconds < {ph}
+                """, (strategy_hash, time_range, timestamp_seconds))
 
                 conn.commit()
+                print(f"[CACHE SAVE] Chart data {strategy_hash}/{time_range}: {len(chart_data):,} bytes")
 
                 # Clean up old cache entries (keep only last 48 hours)
                 self._cleanup_old_cache(conn, created_at)
@@ -1231,9 +1524,10 @@ class RateTracker:
     def load_chart_cache(
         self,
         strategy_hash: str,
+        time_range: str,
         timestamp_seconds: int
-    ) -> Optional[str]:
-        """Load rendered chart from cache. Returns HTML string or None."""
+    ) -> Optional[bytes]:
+        """Load a chart's data series from cache. Returns encoded bytes or None."""
         try:
             conn = self._get_connection()
             try:
@@ -1243,12 +1537,13 @@ class RateTracker:
                 ph = '%s' if self.use_cloud else '?'
 
                 cursor.execute(f"""
-                    SELECT chart_html FROM chart_cache
-                    WHERE strategy_hash = {ph} AND timestamp_seconds = {ph}
-                """, (strategy_hash, timestamp_seconds))
+                    SELECT chart_data FROM chart_cache
+                    WHERE strategy_hash = {ph} AND time_range = {ph} AND timestamp_seconds = {ph}
+                """, (strategy_hash, time_range, timestamp_seconds))
 
                 row = cursor.fetchone()
-                return row[0] if row else None
+                # psycopg2 returns BYTEA as memoryview
+                return bytes(row[0]) if row else None
             finally:
                 conn.close()
         except Exception as e:
@@ -1256,6 +1551,21 @@ class RateTracker:
             # Return None to fall back to recalculation
             return None
 
+    def clear_chart_cache(self) -> None:
+        """Delete all cached chart data (history changed under existing snapshots)."""
+        try:
+            conn = self._get_connection()
+            try:
+                cursor = conn.cursor()
+                cursor.execute("DELETE FROM chart_cache")
+                deleted = cursor.rowcount
+                conn.commit()
+                print(f"[CACHE CLEANUP] Removed {deleted} chart entries")
+            finally:
+                conn.close()
+        except Exception as e:
+            print(f"[CACHE CLEANUP] Warning: Failed to clear chart cache: {e}")
+
     # ========================================================================
     # PERPETUAL FUNDING RATES (added 2026-02-17)
     # ========================================================================
@@ -1470,6 +1780,8 @@ class RateTracker:
                     deduplicated_values
                 )
 
+                self._patch_missing_perp_avg_rates(cursor)
+
             rows_saved = len(deduplicated_values)
             conn.commit()
             print(f"[PERP] Saved/updated {rows_saved} perp rates")
@@ -1501,52 +1813,46 @@ class RateTracker:
         conn = self._get_connection()
         try:
             cursor = conn.cursor()
-            tokens_registered = 0
-
-            # Get unique token contracts
-            unique_tokens = perp_rates_df[['token_contract', 'base_token', 'quote_token']].drop_duplicates()
-
-            # Adjust placeholder based on database type
-            ph = '%s' if self.use_cloud else '?'
-
-            for _, row in unique_tokens.iterrows():
-                token_contract = row['token_contract']
-                symbol = f"{row['base_token']}-{row['quote_token']}-PERP"
-
-                try:
-                    if self.use_cloud:
-                        # PostgreSQL: ON CONFLICT DO NOTHING
-                        cursor.execute(f"""
-                            INSERT INTO token_registry (
-                                token_contract, symbol, first_seen, last_seen
-                            ) VALUES ({ph}, {ph}, NOW(), NOW())
-                            ON CONFLICT (token_contract) DO UPDATE SET
-                                last_seen = NOW()
-                        """, (token_contract, symbol))
-                    else:
-                        # SQLite: INSERT OR IGNORE
-                        cursor.execute(f"""
-                            INSERT OR IGNORE INTO token_registry (
-                                token_contract, symbol, first_seen, last_seen
-                            ) VALUES ({ph}, {ph}, datetime('now'), datetime('now'))
-                        """, (token_contract, symbol))
-
-                        # Update last_seen if already exists
-                        cursor.execute(f"""
-                            UPDATE token_registry
-                            SET last_seen = datetime('now')
-                            WHERE token_contract = {ph}
-                        """, (token_contract,))
-
-                    tokens_registered += 1
 
-                except Exception as e:
-                    print(f"[PERP] Warning: Failed to register token {symbol}: {e}")
-                    continue
+            # Get unique token contracts (first symbol wins, as with row-by-row inserts)
+            unique_tokens = perp_rates_df[['token_contract', 'base_token', 'quote_token']].drop_duplicates('token_contract')
+            symbols = unique_tokens['base_token'].astype(str) + '-' + unique_tokens['quote_token'].astype(str) + '-PERP'
+            rows = list(zip(unique_tokens['token_contract'].tolist(), symbols.tolist()))
 
+            if self.use_cloud:
+                # PostgreSQL: one multi-row upsert; (xmax = 0) marks newly inserted rows
+                results = execute_values(
+                    cursor,
+                    """
+                    INSERT INTO token_registry (
+                        token_contract, symbol, first_seen, last_seen
+                    ) VALUES %s
+                    ON CONFLICT (token_contract) DO UPDATE SET
+                        last_seen = NOW()
+                    RETURNING (xmax = 0) AS inserted
+                    """,
+                    rows,
+                    template="(%s, %s, NOW(), NOW())",
+                    page_size=len(rows),
+                    fetch=True,
+                )
+                new_tokens = sum(1 for (was_inserted,) in results if was_inserted)
+            else:
+                # SQLite: upsert refreshes last_seen for existing tokens
+                before = self._count_table("token_registry", conn=conn)
+                cursor.executemany("""
+                    INSERT INTO token_registry (
+                        token_contract, symbol, first_seen, last_seen
+                    ) VALUES (?, ?, datetime('now'), datetime('now'))
+                    ON CONFLICT(token_contract) DO UPDATE SET
+                        last_seen = datetime('now')
+                """, rows)
+                new_tokens = self._count_table("token_registry", conn=conn) - before
+
+            tokens_registered = len(rows)
             conn.commit()
             if tokens_registered > 0:
-                print(f"[PERP] Registered {tokens_registered} perp tokens in token_registry")
+                print(f"[PERP] Registered {tokens_registered} perp tokens in token_registry ({new_tokens} new)")
             return tokens_registered
 
         except Exception as e:
@@ -1780,9 +2086,9 @@ class RateTracker:
         conn = self._get_connection()
         try:
             cursor = conn.cursor()
-            cursor.execute("""
+            cursor.execute(f"""
                 SELECT MAX(timestamp)
-                FROM rates_snapshot
+                FROM {self._rates_source(conn)}
             """)
             row = cursor.fetchone()
             return row[0] if row and row[0] is not None else None
@@ -1799,7 +2105,7 @@ class RateTracker:
     @staticmethod
     def compute_strategy_hash(strategy: dict) -> str:
         """
-        Compute unique hash for strategy based on tokens and protocols.
+        Compute unique hash for strategy based on type, tokens and protocols.
         Uses contract addresses (not symbols) for uniqueness.
 
         Args:
@@ -1815,6 +2121,7 @@ class RateTracker:
                f"_{strategy.get('token3_contract') or ''}_{strategy.get('token4_contract') or ''}")
         key += f"_{strategy['protocol_a']}_{strategy['protocol_b']}"
         key += f"_{strategy.get('liquidation_distance', 0.10)}"
+        key += f"_{strategy.get('strategy_type') or ''}"
 
         return hashlib.sha256(key.encode()).hexdigest()[:16]
 
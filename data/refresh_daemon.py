@@ -0,0 +1,286 @@
+"""
+Long-running refresh daemon: `python main.py --daemon`.
+
+Railway's cron starts a fresh `python main.py` every hour (and
+`main_perp_refresh.py` at :05), so every run pays interpreter start, the
+pandas/numpy/SQLAlchemy import graph, a new PostgreSQL TLS session per
+RateTracker call and RateTracker's DDL. The daemon runs the same
+refresh_pipeline() in one process that stays up:
+
+- imports are paid once at start
+- PostgreSQL connections come from a process-wide pool (data/db_pool.py)
+- RateTracker's cache-table DDL runs once per process
+- the previous refresh's market data is kept and diffed against the next one
+
+Refreshes run on the cadence of `local scheduler.py` (REFRESH_CRON_JOBS, shared
+with it) plus the hourly perp refresh at :05. Each job has a lock, so a refresh
+that overruns its slot makes the next one skip instead of overlapping.
+
+GET /health (any path) on settings.DAEMON_HEALTH_PORT returns JSON with per-job
+status: 'starting' (200) during the startup refresh, 'ok' (200) while the scheduler
+runs, and 'stopped' (503) once stop() has been called.
+"""
+
+import json
+import signal
+import threading
+import time
+import traceback
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Dict, Optional
+
+import numpy as np
+
+from alerts import notification_queue
+from config import settings
+from data import db_pool
+from data.market_data import MARKET_FIELDS, MarketData
+
+# Cadence of `local scheduler.py` (APScheduler cron fields)
+REFRESH_CRON_JOBS = (
+    # Weekday daytime: every hour 8am-5:59pm
+    {'id': 'weekday_daytime_refresh', 'minute': '0', 'hour': '8-17', 'day_of_week': 'mon-fri'},
+    # Weekday nighttime: every 4 hours 6pm-8am
+    {'id': 'weekday_nighttime_refresh', 'minute': '0', 'hour': '18,22,2,6', 'day_of_week': 'mon-fri'},
+    # Weekend: every 4 hours
+    {'id': 'weekend_refresh', 'minute': '0', 'hour': '*/4', 'day_of_week': 'sat-sun'},
+)
+
+# main_perp_refresh.py slot from railway.toml
+PERP_REFRESH_CRON = {'id': 'perp_refresh', 'minute': '5'}
+
+
+def _utc_now_str() -> str:
+    return datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S')
+
+
+def describe_market_changes(previous: MarketData, current: MarketData) -> str:
+    """
+    One-line summary of what moved between two refreshes.
+
+    Compares every field on the (contract, protocol) cells both refreshes have;
+    a cell counts as changed when its value differs or it became/stopped being NaN.
+    """
+    prev_rows = {c: i for i, c in enumerate(previous.contracts)}
+    cur_rows = {c: i for i, c in enumerate(current.contracts)}
+    shared = [c for c in cur_rows if c in prev_rows]
+    protocols = [p for p in current.protocols if p in previous.protocols]
+    added = len(cur_rows) - len(shared)
+    removed = len(prev_rows) - len(shared)
+
+    if not shared or not protocols:
+        return f"no overlapping tokens/protocols (+{added} / -{removed} tokens)"
+
+    prev_idx = np.array([prev_rows[c] for c in shared])
+    cur_idx = np.array([cur_rows[c] for c in shared])
+    prev_cols = np.array([previous.protocols.index(p) for p in protocols])
+    cur_cols = np.array([current.protocols.index(p) for p in protocols])
+
+    before = previous.values[:, prev_idx][:, :, prev_cols]
+    after = current.values[:, cur_idx][:, :, cur_cols]
+    changed = ~((before == after) | (np.isnan(before) & np.isnan(after)))
+    per_field = changed.reshape(len(MARKET_FIELDS), -1).sum(axis=1)
+
+    moved = ', '.join(f"{name} {int(n)}" for name, n in zip(MARKET_FIELDS, per_field) if n)
+    return (f"{int(changed.sum())}/{changed.size} values changed"
+            f"{f' ({moved})' if moved else ''}, +{added} / -{removed} tokens")
+
+
+class RefreshDaemon:
+    """Schedules refresh_pipeline() (and the perp refresh) inside one warm process."""
+
+    def __init__(
+        self,
+        health_port: Optional[int] = None,
+        run_on_start: Optional[bool] = None,
+        perp_refresh: Optional[bool] = None,
+    ):
+        """
+        Args:
+            health_port: Port for the health endpoint (default settings.DAEMON_HEALTH_PORT, 0 = off)
+            run_on_start: Run one refresh before the first scheduled slot
+                          (default settings.DAEMON_RUN_ON_START)
+            perp_refresh: Also run main_perp_refresh.main() hourly at :05
+                          (default settings.DAEMON_PERP_REFRESH)
+        """
+        self.health_port = settings.DAEMON_HEALTH_PORT if health_port is None else health_port
+        self.run_on_start = settings.DAEMON_RUN_ON_START if run_on_start is None else run_on_start
+        self.perp_refresh = settings.DAEMON_PERP_REFRESH if perp_refresh is None else perp_refresh
+
+        self.started_at = _utc_now_str()
+        self.scheduler = None
+        self._http_server: Optional[ThreadingHTTPServer] = None
+        self._locks: Dict[str, threading.Lock] = {'refresh': threading.Lock(), 'perp_refresh': threading.Lock()}
+        self.jobs: Dict[str, dict] = {
+            name: {'runs': 0, 'failures': 0, 'skipped_overlaps': 0, 'running': False,
+                   'last_start': None, 'last_end': None, 'last_duration_s': None,
+                   'last_status': None, 'last_error': None}
+            for name in self._locks
+        }
+        self.last_refresh: Optional[dict] = None
+        self._stopping = False
+        self._previous_market: Optional[MarketData] = None
+
+    # ------------------------------------------------------------------
+    # Jobs
+    # ------------------------------------------------------------------
+    def _run_job(self, name: str, fn: Callable[[], None]) -> None:
+        """Run fn under the job's lock; an overlapping trigger is skipped, errors are recorded."""
+        lock = self._locks[name]
+        status = self.jobs[name]
+        if not lock.acquire(blocking=False):
+            status['skipped_overlaps'] += 1
+            print(f"[DAEMON] {name} still running since {status['last_start']} UTC - skipping this slot")
+            return
+        start = time.perf_counter()
+        status.update(running=True, last_start=_utc_now_str())
+        try:
+            fn()
+            status['last_status'] = 'ok'
+            status['last_error'] = None
+        except Exception as e:
+            status['failures'] += 1
+            status['last_status'] = 'failed'
+            status['last_error'] = f"{type(e).__name__}: {e}"
+            print(f"[DAEMON] {name} failed: {e}")
+            traceback.print_exc()
+        finally:
+            status['runs'] += 1
+            status.update(running=False, last_end=_utc_now_str(),
+                          last_duration_s=round(time.perf_counter() - start, 1))
+            lock.release()
+            print(f"[DAEMON] {name} finished ({status['last_status']}) in {status['last_duration_s']}s")
+
+    def _refresh(self) -> None:
+        from data.refresh_pipeline import refresh_pipeline
+
+        result = refresh_pipeline(
+            timestamp=datetime.now(),
+            save_snapshots=True,
+            send_slack_notifications=True,
+        )
+        if self._previous_market is not None:
+            print(f"[DAEMON] Market vs previous refresh: {describe_market_changes(self._previous_market, result.market)}")
+        self._previous_market = result.market
+        self.last_refresh = {
+            'timestamp': result.timestamp,
+            'strategies': 0 if result.all_results is None else len(result.all_results),
+            'auto_rebalanced': result.auto_rebalanced_count,
+            'tokens_inserted': result.token_summary.get('inserted', 0),
+        }
+
+    def _perp_refresh(self) -> None:
+        import main_perp_refresh
+
+        exit_code = main_perp_refresh.main()
+        if exit_code:
+            raise RuntimeError(f"main_perp_refresh.main() returned {exit_code}")
+
+    def run_refresh(self) -> None:
+        self._run_job('refresh', self._refresh)
+
+    def run_perp_refresh(self) -> None:
+        self._run_job('perp_refresh', self._perp_refresh)
+
+    # ------------------------------------------------------------------
+    # Health endpoint
+    # ------------------------------------------------------------------
+    def health(self) -> dict:
+        running = self.scheduler is not None and self.scheduler.running
+        next_runs = {}
+        if running:
+            for job in self.scheduler.get_jobs():
+                if job.next_run_time is not None:
+                    next_runs[job.id] = job.next_run_time.isoformat()
+        if self._stopping:
+            status = 'stopped'
+        elif running:
+            status = 'ok'
+        else:
+            status = 'starting'  # Startup refresh (run_on_start) before the scheduler starts
+        return {
+            'status': status,
+            'started_at': self.started_at,
+            'now': _utc_now_str(),
+            'jobs': self.jobs,
+            'last_refresh': self.last_refresh,
+            'next_runs': next_runs,
+            'db_pool': db_pool.is_enabled(),
+            'slack_queue': notification_queue.stats(),
+        }
+
+    def _start_health_server(self) -> None:
+        if not self.health_port:
+            return
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                payload = daemon.health()
+                body = json.dumps(payload, default=str).encode()
+                self.send_response(503 if payload['status'] == 'stopped' else 200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass  # Health probes would flood the refresh log
+
+        self._http_server = ThreadingHTTPServer(('0.0.0.0', self.health_port), HealthHandler)
+        threading.Thread(target=self._http_server.serve_forever, name='health', daemon=True).start()
+        print(f"[DAEMON] Health endpoint on :{self.health_port}")
+
+    # ------------------------------------------------------------------
+    # Lifecycle
+    # ------------------------------------------------------------------
+    def _build_scheduler(self):
+        from apscheduler.schedulers.blocking import BlockingScheduler
+
+        scheduler = BlockingScheduler()
+        for cron in REFRESH_CRON_JOBS:
+            fields = {k: v for k, v in cron.items() if k != 'id'}
+            scheduler.add_job(self.run_refresh, 'cron', id=cron['id'], max_instances=1,
+                              coalesce=True, misfire_grace_time=None, **fields)
+        if self.perp_refresh:
+            fields = {k: v for k, v in PERP_REFRESH_CRON.items() if k != 'id'}
+            scheduler.add_job(self.run_perp_refresh, 'cron', id=PERP_REFRESH_CRON['id'], max_instances=1,
+                              coalesce=True, misfire_grace_time=None, **fields)
+        return scheduler
+
+    def stop(self, *_signal_args) -> None:
+        """Stop scheduling; the scheduler waits for a running refresh to finish."""
+        print("[DAEMON] Shutdown requested - waiting for running jobs")
+        self._stopping = True
+        if self.scheduler is not None and self.scheduler.running:
+            self.scheduler.shutdown(wait=False)
+
+    def run(self) -> None:
+        """Block running scheduled refreshes until SIGINT/SIGTERM."""
+        print(f"\n=== Sui Lending Bot: Refresh Daemon Started ({self.started_at} UTC) ===\n")
+        if settings.USE_CLOUD_DB:
+            db_pool.enable(settings.DB_POOL_SIZE)
+
+        self.scheduler = self._build_scheduler()
+        signal.signal(signal.SIGTERM, self.stop)
+        signal.signal(signal.SIGINT, self.stop)
+        self._start_health_server()
+
+        try:
+            if self.run_on_start:
+                self.run_refresh()
+            if not self._stopping:
+                print(f"[DAEMON] Scheduled jobs: {', '.join(job.id for job in self.scheduler.get_jobs())}")
+                self.scheduler.start()
+        finally:
+            # A job started by the scheduler may still be running in its worker thread
+            for lock in self._locks.values():
+                with lock:
+                    pass
+            if self._http_server is not None:
+                self._http_server.shutdown()
+                self._http_server.server_close()
+            notification_queue.stop()
+            db_pool.close_all()
+            print("=== Refresh Daemon Stopped ===")
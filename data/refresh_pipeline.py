@@ -21,10 +21,14 @@ import pandas as pd
 from config import settings
 from config.stablecoins import STABLECOIN_CONTRACTS
 from data.protocol_merger import merge_protocol_data
+from data.market_data import MARKET_FIELDS, MarketData
+from analysis.market_snapshot import MarketSnapshot
 from analysis.rate_analyzer import RateAnalyzer
 from analysis.strategy_calculators import get_all_strategy_types
 from data.rate_tracker import RateTracker
+from alerts import notification_queue
 from alerts.slack_notifier import SlackNotifier
+from utils.http_client import get_http_client
 from utils.time_helpers import to_seconds, to_datetime_str
 from analysis.position_statistics_calculator import calculate_position_statistics
 
@@ -48,17 +52,8 @@ def backfill_rates_snapshot_with_perp():
 class RefreshResult:
     timestamp: int  # Unix timestamp in seconds
 
-    # Raw merged protocol data
-    lend_rates: pd.DataFrame
-    borrow_rates: pd.DataFrame
-    collateral_ratios: pd.DataFrame
-    prices: pd.DataFrame
-    lend_rewards: pd.DataFrame
-    borrow_rewards: pd.DataFrame
-    available_borrow: pd.DataFrame
-    borrow_fees: pd.DataFrame
-    borrow_weights: pd.DataFrame
-    liquidation_thresholds: pd.DataFrame
+    # Raw merged protocol data, packed (result.lend_rates etc. return views - see __getattr__)
+    market: MarketData
 
     # Strategy outputs
     protocol_a: Optional[str]
@@ -72,6 +67,185 @@ class RefreshResult:
     rebalance_checks: list = None  # List of positions checked for rebalancing
     auto_rebalanced_count: int = 0  # Number of positions auto-rebalanced
 
+    def __getattr__(self, name: str) -> pd.DataFrame:
+        # result.lend_rates, result.borrow_rates, ... -> wide frame view of the market container
+        if name in MARKET_FIELDS:
+            return self.market.frame(name)
+        raise AttributeError(f"'{type(self).__name__}' object has no attribute '{name}'")
+
+
+def auto_rebalance_positions(
+    current_seconds: int,
+    notifier: Optional[SlackNotifier] = None,
+    send_slack_notifications: bool = True,
+    market_snapshot: Optional[MarketSnapshot] = None,
+) -> int:
+    """Check every active position and rebalance those past their threshold.
+
+    Args:
+        current_seconds: Refresh timestamp (Unix seconds)
+        notifier: SlackNotifier used for per-position rebalance alerts
+        send_slack_notifications: Whether to send those alerts
+        market_snapshot: Rates/basis saved by this refresh; live leg lookups are served
+                         from it instead of rereading rates_snapshot / spot_perp_basis
+
+    Returns:
+        Number of positions auto-rebalanced. Errors are logged, never raised.
+    """
+    auto_rebalanced_count = 0
+    print("[AUTO-REBALANCE] Checking positions for rebalancing needs...")
+
+    try:
+        from analysis.position_service import PositionService
+        from data.db_utils import get_db_connection
+
+        conn = get_db_connection()
+        service = PositionService(conn, market_snapshot=market_snapshot)
+        active_positions = service.get_active_positions(live_timestamp=current_seconds)
+
+        if active_positions.empty:
+            print("[AUTO-REBALANCE] OK No active positions to check")
+        else:
+            for _, position in active_positions.iterrows():
+                position_id = position['position_id']
+                try:
+                    rebalance_id = service.rebalance_position(
+                        position_id=position_id,
+                        live_timestamp=current_seconds,
+                        rebalance_reason="auto_rebalance_threshold_exceeded",
+                        rebalance_notes="Auto-rebalance",
+                        force=False
+                    )
+                    if rebalance_id is not None:
+                        auto_rebalanced_count += 1
+                        print(f"[AUTO-REBALANCE] {position_id[:8]} | rebalanced")
+                        if send_slack_notifications and notifier is not None:
+                            try:
+                                notifier.alert_position_rebalanced(
+                                    position_id=position_id,
+                                    token1=position.get('token1', ''),
+                                    token2=position.get('token2', ''),
+                                    token3=position.get('token3', ''),
+                                    protocol_a=position['protocol_a'],
+                                    protocol_b=position['protocol_b'],
+                                    liq_dist_2a_before=None, liq_dist_2a_after=None,
+                                    liq_dist_2b_before=None, liq_dist_2b_after=None,
+                                    rebalance_timestamp=current_seconds
+                                )
+                            except Exception as slack_error:
+                                print(f"[AUTO-REBALANCE] Slack alert failed: {slack_error}")
+                except Exception as rebalance_error:
+                    print(f"[AUTO-REBALANCE] {position_id[:8]} | FAILED | {rebalance_error}")
+
+            if auto_rebalanced_count > 0:
+                print(f"[AUTO-REBALANCE] ✅ Auto-rebalanced {auto_rebalanced_count} position(s)")
+            else:
+                print("[AUTO-REBALANCE] OK All positions within threshold")
+
+    except Exception as rebalance_system_error:
+        print(f"[AUTO-REBALANCE] Error in auto-rebalance system: {rebalance_system_error}")
+        import traceback
+        traceback.print_exc()
+    finally:
+        if 'conn' in locals():
+            conn.close()
+
+    return auto_rebalanced_count
+
+
+def update_position_statistics(
+    tracker: RateTracker,
+    current_seconds: int,
+    lend_rates: pd.DataFrame,
+    borrow_rates: pd.DataFrame,
+    borrow_fees: pd.DataFrame,
+    market_snapshot: Optional[MarketSnapshot] = None,
+) -> int:
+    """Calculate and save position_statistics for every active position.
+
+    Current rates and fees are served from the merged frames of this refresh.
+
+    Args:
+        tracker: RateTracker used to save the statistics rows
+        current_seconds: Refresh timestamp (Unix seconds)
+        lend_rates / borrow_rates / borrow_fees: Merged frames from merge_protocol_data()
+        market_snapshot: Rates/basis saved by this refresh, passed to PositionService
+
+    Returns:
+        Number of positions whose statistics were saved. Errors are logged, never raised.
+    """
+    stats_saved = 0
+    print("[POSITION STATS] Calculating position statistics...")
+    try:
+        from analysis.position_service import PositionService
+        from data.db_utils import get_db_connection
+
+        # Create database connection for position service
+        conn = get_db_connection()  # Respects USE_CLOUD_DB setting
+        service = PositionService(conn, market_snapshot=market_snapshot)
+
+        # Get all active positions at this timestamp
+        active_positions = service.get_active_positions(live_timestamp=current_seconds)
+
+        if not active_positions.empty:
+            # Helper functions for rate lookups
+            def get_rate(token_contract: str, protocol: str, side: str) -> float:
+                """Get rate from merged data for a specific token/protocol/side"""
+                if side == 'lend':
+                    row = lend_rates[lend_rates['Contract'] == token_contract]
+                    if not row.empty and protocol in row.columns:
+                        rate = row.iloc[0][protocol]
+                        return rate if pd.notna(rate) else 0.0
+                else:  # borrow
+                    row = borrow_rates[borrow_rates['Contract'] == token_contract]
+                    if not row.empty and protocol in row.columns:
+                        rate = row.iloc[0][protocol]
+                        return rate if pd.notna(rate) else 0.0
+                return 0.0
+
+            def get_borrow_fee(token_contract: str, protocol: str) -> float:
+                """Get borrow fee from merged data for a specific token/protocol"""
+                row = borrow_fees[borrow_fees['Contract'] == token_contract]
+                if not row.empty and protocol in row.columns:
+                    fee = row.iloc[0][protocol]
+                    return fee if pd.notna(fee) else 0.0
+                return 0.0
+
+            # Calculate statistics for each active position
+            for _, position in active_positions.iterrows():
+                try:
+                    stats = calculate_position_statistics(
+                        position_id=position['position_id'],
+                        timestamp=current_seconds,
+                        service=service,
+                        get_rate_func=get_rate,
+                        get_borrow_fee_func=get_borrow_fee,
+                        incremental=True
+                    )
+
+                    # Save to database
+                    tracker.save_position_statistics(stats)
+                    stats_saved += 1
+
+                except Exception as e:
+                    print(f"[POSITION STATS] Failed to calculate/save stats for position {position['position_id'][:8]}...: {e}")
+                    # Continue to next position even if this one fails
+
+            print(f"[POSITION STATS] Successfully calculated and saved statistics for {stats_saved}/{len(active_positions)} position(s)")
+        else:
+            print("[POSITION STATS] No active positions to calculate statistics for")
+
+        # Clean up database connection
+        conn.close()
+
+    except Exception as e:
+        print(f"[POSITION STATS] Error in position statistics calculation: {e}")
+        import traceback
+        traceback.print_exc()
+        # Don't fail entire pipeline if position statistics fails
+
+    return stats_saved
+
 
 def refresh_pipeline(
     *,
@@ -154,13 +328,13 @@ def refresh_pipeline(
         print(f"[PERP CHECK] OK Perp data exists for {rates_ts_hour_str} ({count} markets)")
         # Still patch any rows that are missing rolling averages (e.g. inserted before
         # avg columns existed, or by an older code path without the avg UPDATE).
-        if tracker.use_cloud:
-            try:
-                tracker.patch_missing_perp_avg_rates()
-            except Exception as e:
-                print(f"[PERP CHECK] WARNING: avg rate patch failed: {e}")
+        try:
+            tracker.patch_missing_perp_avg_rates()
+        except Exception as e:
+            print(f"[PERP CHECK] WARNING: avg rate patch failed: {e}")
 
     # STEP 2: Fetch spot/perp basis (AMM aggregator + perp orderbook)
+    saved_basis_df: Optional[pd.DataFrame] = None
     if save_snapshots:
         try:
             from data.bluefin.bluefin_pricing_reader import BluefinPricingReader
@@ -168,6 +342,7 @@ def refresh_pipeline(
             basis_df = basis_reader.get_spot_perp_basis(timestamp=current_seconds)
             if not basis_df.empty:
                 rows_saved = tracker.save_spot_perp_basis(basis_df)
+                saved_basis_df = basis_df
                 print(f"[BASIS] Saved {rows_saved} spot/perp basis rows")
             else:
                 print("[BASIS] WARNING: No basis data fetched — skipping save")
@@ -176,15 +351,24 @@ def refresh_pipeline(
             print("[BASIS] Continuing without basis data — not a critical failure")
 
     notifier = SlackNotifier()
+    if send_slack_notifications and settings.SLACK_ASYNC:
+        # Slack POSTs run on a background thread (drained at exit) instead of inline
+        notification_queue.start()
     print("[FETCH] Starting protocol data fetch...")
-    lend_rates, borrow_rates, collateral_ratios, prices, lend_rewards, borrow_rewards, available_borrow, borrow_fees, borrow_weights, liquidation_thresholds = merge_protocol_data(
-        stablecoin_contracts=stablecoin_contracts,
-        timestamp=current_seconds  # NEW: Pass timestamp for perp rate fetching (DESIGN_NOTES.md #1, #2)
-    )
-    print("[FETCH] Protocol data fetch complete")
+    market = MarketData.from_frames(
+        merge_protocol_data(
+            stablecoin_contracts=stablecoin_contracts,
+            timestamp=current_seconds  # NEW: Pass timestamp for perp rate fetching (DESIGN_NOTES.md #1, #2)
+        )
+    )  # float64: these values are persisted, diffed and analysed (MARKET_DATA_FLOAT32 is display-only)
+    # Everything below works on views into the packed container (the merged frames are freed)
+    lend_rates, borrow_rates, collateral_ratios, prices, lend_rewards, borrow_rewards, available_borrow, borrow_fees, borrow_weights, liquidation_thresholds = market.frames()
+    print(f"[FETCH] Protocol data fetch complete ({len(market)} tokens x {len(market.protocols)} protocols, {market.nbytes / 1024:.1f} KB)")
+    get_http_client().print_metrics()
 
     # Persist snapshot early, so even if analysis fails you still capture the raw state.
     token_summary = {"seen": 0, "inserted": 0, "updated": 0, "total": 0}  # Default if not saving
+    market_snapshot: Optional[MarketSnapshot] = None
 
     if save_snapshots:
         tracker.save_snapshot(
@@ -200,6 +384,20 @@ def refresh_pipeline(
             borrow_weights=borrow_weights,
             liquidation_thresholds=liquidation_thresholds,
         )
+
+        # Keep what was just saved in memory so PositionService doesn't read it back
+        market_snapshot = MarketSnapshot.from_merged_frames(
+            timestamp=current_seconds,
+            lend_rates=lend_rates,
+            borrow_rates=borrow_rates,
+            collateral_ratios=collateral_ratios,
+            prices=prices,
+            lend_rewards=lend_rewards,
+            borrow_rewards=borrow_rewards,
+            borrow_weights=borrow_weights,
+            liquidation_thresholds=liquidation_thresholds,
+            basis_df=saved_basis_df,
+        )
         
         # Update token registry - just use lend_rates with simple rename
         tokens_df = lend_rates[['Token', 'Contract']].copy()
@@ -220,8 +418,9 @@ def refresh_pipeline(
                 from utils.populate_coingecko_ids import populate_coingecko_ids_auto
                 from utils.populate_pyth_ids import populate_pyth_ids_auto
 
-                cg_matches = populate_coingecko_ids_auto(engine=tracker.engine, dry_run=False, force=False)
-                pyth_matches = populate_pyth_ids_auto(engine=tracker.engine, dry_run=False, force=False)
+                # Both default to data.db_utils.get_db_engine() (same database as the tracker)
+                cg_matches = populate_coingecko_ids_auto(dry_run=False, force=False)
+                pyth_matches = populate_pyth_ids_auto(dry_run=False, force=False)
 
                 print(f"[ORACLE] CoinGecko: {cg_matches} newly matched")
                 print(f"[ORACLE] Pyth: {pyth_matches} newly matched")
@@ -231,6 +430,15 @@ def refresh_pipeline(
                 print("[ORACLE] Continuing with refresh - oracle IDs can be populated manually")
                 # Continue with refresh - not a critical failure
 
+        # Roll expired snapshots up into the hourly/daily tiers (opt-in, data/snapshot_retention.py)
+        from data.snapshot_retention import retention_enabled
+        if retention_enabled():
+            try:
+                tracker.apply_retention(now=ts)
+            except Exception as e:
+                print(f"[RETENTION] Retention failed: {e}")
+                print("[RETENTION] Continuing with refresh - retention runs again after the next snapshot")
+
         # Note: If perp data was not available, it will be included in the next refresh
         # after main_perp_refresh.py populates the perp_margin_rates table
 
@@ -247,17 +455,8 @@ def refresh_pipeline(
     try:
         print("[ANALYSIS] Running rate analysis...")
         perp_basis_df = tracker.load_spot_perp_basis(current_seconds)
-        analyzer = RateAnalyzer(
-            lend_rates=lend_rates,
-            borrow_rates=borrow_rates,
-            collateral_ratios=collateral_ratios,
-            liquidation_thresholds=liquidation_thresholds,
-            prices=prices,
-            lend_rewards=lend_rewards,
-            borrow_rewards=borrow_rewards,
-            available_borrow=available_borrow,
-            borrow_fees=borrow_fees,
-            borrow_weights=borrow_weights,
+        analyzer = RateAnalyzer.from_market_data(
+            market,
             timestamp=current_seconds,  # Pass Unix timestamp in seconds (integer)
             liquidation_distance=liquidation_distance,
             strategy_types=get_all_strategy_types(),  # Generate all strategy types
@@ -285,133 +484,31 @@ def refresh_pipeline(
                     timestamp=current_seconds
                 )
 
-        # Auto-rebalance: check each active position and rebalance if threshold exceeded
-        print("[AUTO-REBALANCE] Checking positions for rebalancing needs...")
-
-        try:
-            from analysis.position_service import PositionService
-            from dashboard.dashboard_utils import get_db_connection
-
-            conn = get_db_connection()
-            service = PositionService(conn)
-            active_positions = service.get_active_positions(live_timestamp=current_seconds)
-
-            if active_positions.empty:
-                print("[AUTO-REBALANCE] OK No active positions to check")
-            else:
-                for _, position in active_positions.iterrows():
-                    position_id = position['position_id']
-                    try:
-                        rebalance_id = service.rebalance_position(
-                            position_id=position_id,
-                            live_timestamp=current_seconds,
-                            rebalance_reason="auto_rebalance_threshold_exceeded",
-                            rebalance_notes="Auto-rebalance",
-                            force=False
-                        )
-                        if rebalance_id is not None:
-                            auto_rebalanced_count += 1
-                            print(f"[AUTO-REBALANCE] {position_id[:8]} | rebalanced")
-                            if send_slack_notifications:
-                                try:
-                                    notifier.alert_position_rebalanced(
-                                        position_id=position_id,
-                                        token1=position.get('token1', ''),
-                                        token2=position.get('token2', ''),
-                                        token3=position.get('token3', ''),
-                                        protocol_a=position['protocol_a'],
-                                        protocol_b=position['protocol_b'],
-                                        liq_dist_2a_before=None, liq_dist_2a_after=None,
-                                        liq_dist_2b_before=None, liq_dist_2b_after=None,
-                                        rebalance_timestamp=current_seconds
-                                    )
-                                except Exception as slack_error:
-                                    print(f"[AUTO-REBALANCE] Slack alert failed: {slack_error}")
-                    except Exception as rebalance_error:
-                        print(f"[AUTO-REBALANCE] {position_id[:8]} | FAILED | {rebalance_error}")
-
-                if auto_rebalanced_count > 0:
-                    print(f"[AUTO-REBALANCE] ✅ Auto-rebalanced {auto_rebalanced_count} position(s)")
-                else:
-                    print("[AUTO-REBALANCE] OK All positions within threshold")
-
-        except Exception as rebalance_system_error:
-            print(f"[AUTO-REBALANCE] Error in auto-rebalance system: {rebalance_system_error}")
-            import traceback
-            traceback.print_exc()
-        finally:
-            if 'conn' in locals():
-                conn.close()
-
-        # Calculate and save position statistics (AFTER rebalancing so stats include new rebalances)
-        print("[POSITION STATS] Calculating position statistics...")
-        try:
-            from analysis.position_service import PositionService
-            from dashboard.dashboard_utils import get_db_connection
-
-            # Create database connection for position service
-            conn = get_db_connection()  # Respects USE_CLOUD_DB setting
-            service = PositionService(conn)
-
-            # Get all active positions at this timestamp
-            active_positions = service.get_active_positions(live_timestamp=current_seconds)
-
-            if not active_positions.empty:
-                # Helper functions for rate lookups
-                def get_rate(token_contract: str, protocol: str, side: str) -> float:
-                    """Get rate from merged data for a specific token/protocol/side"""
-                    if side == 'lend':
-                        row = lend_rates[lend_rates['Contract'] == token_contract]
-                        if not row.empty and protocol in row.columns:
-                            rate = row.iloc[0][protocol]
-                            return rate if pd.notna(rate) else 0.0
-                    else:  # borrow
-                        row = borrow_rates[borrow_rates['Contract'] == token_contract]
-                        if not row.empty and protocol in row.columns:
-                            rate = row.iloc[0][protocol]
-                            return rate if pd.notna(rate) else 0.0
-                    return 0.0
-
-                def get_borrow_fee(token_contract: str, protocol: str) -> float:
-                    """Get borrow fee from merged data for a specific token/protocol"""
-                    row = borrow_fees[borrow_fees['Contract'] == token_contract]
-                    if not row.empty and protocol in row.columns:
-                        fee = row.iloc[0][protocol]
-                        return fee if pd.notna(fee) else 0.0
-                    return 0.0
-
-                # Calculate statistics for each active position
-                stats_saved = 0
-                for _, position in active_positions.iterrows():
-                    try:
-                        stats = calculate_position_statistics(
-                            position_id=position['position_id'],
-                            timestamp=current_seconds,
-                            service=service,
-                            get_rate_func=get_rate,
-                            get_borrow_fee_func=get_borrow_fee
-                        )
-
-                        # Save to database
-                        tracker.save_position_statistics(stats)
-                        stats_saved += 1
-
-                    except Exception as e:
-                        print(f"[POSITION STATS] Failed to calculate/save stats for position {position['position_id'][:8]}...: {e}")
-                        # Continue to next position even if this one fails
-
-                print(f"[POSITION STATS] Successfully calculated and saved statistics for {stats_saved}/{len(active_positions)} position(s)")
+        # Auto-rebalance: check each active position and rebalance if threshold exceeded.
+        # Rebalance alerts are coalesced into one Slack message per refresh.
+        def send_digest(alerts):
+            if send_slack_notifications:
+                notifier.send_rebalance_digest(alerts)
             else:
-                print("[POSITION STATS] No active positions to calculate statistics for")
+                print(f"[AUTO-REBALANCE] Slack disabled - {len(alerts)} rebalance alert(s) not sent")
 
-            # Clean up database connection
-            conn.close()
+        with notification_queue.digest('rebalance', send_digest):
+            auto_rebalanced_count = auto_rebalance_positions(
+                current_seconds=current_seconds,
+                notifier=notifier,
+                send_slack_notifications=send_slack_notifications,
+                market_snapshot=market_snapshot,
+            )
 
-        except Exception as e:
-            print(f"[POSITION STATS] Error in position statistics calculation: {e}")
-            import traceback
-            traceback.print_exc()
-            # Don't fail entire pipeline if position statistics fails
+        # Calculate and save position statistics (AFTER rebalancing so stats include new rebalances)
+        update_position_statistics(
+            tracker=tracker,
+            current_seconds=current_seconds,
+            lend_rates=lend_rates,
+            borrow_rates=borrow_rates,
+            borrow_fees=borrow_fees,
+            market_snapshot=market_snapshot,
+        )
 
     except Exception as e:
         error_msg = f"Error during analysis: {str(e)}"
@@ -420,16 +517,7 @@ def refresh_pipeline(
             notifier.alert_error(error_msg)
     return RefreshResult(
         timestamp=current_seconds,  # Return Unix timestamp in seconds
-        lend_rates=lend_rates,
-        borrow_rates=borrow_rates,
-        collateral_ratios=collateral_ratios,
-        prices=prices,
-        lend_rewards=lend_rewards,
-        borrow_rewards=borrow_rewards,
-        available_borrow=available_borrow,
-        borrow_fees=borrow_fees,
-        borrow_weights=borrow_weights,
-        liquidation_thresholds=liquidation_thresholds,
+        market=market,
         protocol_a=protocol_a,
         protocol_b=protocol_b,
         all_results=all_results,
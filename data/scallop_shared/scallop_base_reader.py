@@ -1,12 +1,10 @@
 import json
-import os
 import subprocess
 import time
 from dataclasses import dataclass
 from typing import Tuple, List, Dict, Any, Optional
 
 import pandas as pd
-import requests
 
 # Import centralized RPC URL from settings
 import sys
@@ -14,6 +12,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 from config.settings import SUI_RPC_URL
+from utils.fixtures import run_node_script
 
 
 @dataclass
@@ -58,22 +57,15 @@ class ScallopBaseReader:
         """Call Node.js SDK wrapper and parse JSON output"""
         start_time = time.time()
 
-        env = os.environ.copy()
-        env["SUI_RPC_URL"] = self.config.rpc_url
+        env_overrides = {"SUI_RPC_URL": self.config.rpc_url}
 
         # Enable debug mode if requested
         if self.config.debug:
-            env["SCALLOP_DEBUG"] = "1"
+            env_overrides["SCALLOP_DEBUG"] = "1"
 
         try:
-            res = subprocess.run(
-                ["node", self.config.node_script_path],
-                capture_output=True,
-                text=True,
-                env=env,
-                check=False,
-                timeout=60,  # 60 second timeout to prevent indefinite hangs
-            )
+            # Goes through the fixture recorder so offline replay runs skip node entirely
+            res = run_node_script(self.config.node_script_path, env_overrides, timeout=60)
         except subprocess.TimeoutExpired:
             raise RuntimeError(f"Scallop node script timed out after 60 seconds (RPC may be unresponsive)")
 
@@ -107,14 +99,17 @@ class ScallopBaseReader:
 
     def _get_markets_from_api(self) -> List[Dict[str, Any]]:
         """Fetch market data from Scallop REST API as fallback"""
+        from utils.http_client import get_http_client
+
+        http = get_http_client()
         base_url = "https://sdk.api.scallop.io"
 
         # 1. Get pools
-        pools_resp = requests.get(f"{base_url}/api/market/pools", timeout=30).json()
+        pools_resp = http.get_json(f"{base_url}/api/market/pools", timeout=30)
         pools = {p["coinName"]: p for p in pools_resp["pools"]}
 
         # 2. Get collaterals
-        collaterals_resp = requests.get(f"{base_url}/api/market/collaterals", timeout=30).json()
+        collaterals_resp = http.get_json(f"{base_url}/api/market/collaterals", timeout=30)
         collaterals = {c["coinName"]: c for c in collaterals_resp["collaterals"]}
 
         # 3. For each pool, get borrow incentives
@@ -125,10 +120,10 @@ class ScallopBaseReader:
             # Get borrow rewards for this coin
             borrow_reward_apr = 0
             try:
-                incentive_resp = requests.get(
+                incentive_resp = http.get_json(
                     f"{base_url}/api/borrowIncentivePool/{coin_type}",
                     timeout=10
-                ).json()
+                )
 
                 # Sum all reward APRs
                 for reward in incentive_resp["borrowIncentivePool"]["rewards"]:
@@ -78,6 +78,166 @@ CREATE POLICY "Authenticated users can read rates_snapshot"
 ON rates_snapshot FOR SELECT TO authenticated
 USING (true);
 
+-- Table 1b: rates_snapshot_unchanged
+-- Change-only persistence (settings.SNAPSHOT_DIFF_ENABLED, data/snapshot_diff.py):
+-- a row equal to the previous snapshot is stored as this marker instead of a full
+-- rates_snapshot row. unchanged_since is the timestamp of the rates_snapshot row
+-- holding the values (always a full row, never another marker).
+CREATE TABLE IF NOT EXISTS rates_snapshot_unchanged (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    unchanged_since TIMESTAMP NOT NULL,
+    use_for_pnl BOOLEAN NOT NULL DEFAULT FALSE,
+    PRIMARY KEY (timestamp, protocol, token_contract)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rates_unchanged_pnl_lookup ON rates_snapshot_unchanged(token_contract, protocol, timestamp) WHERE use_for_pnl = TRUE;
+
+ALTER TABLE rates_snapshot_unchanged ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot_unchanged"
+ON rates_snapshot_unchanged FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_unchanged"
+ON rates_snapshot_unchanged FOR SELECT TO authenticated
+USING (true);
+
+-- View: rates_snapshot_resolved
+-- rates_snapshot plus every marker expanded from its base row: complete snapshots
+-- with rates_snapshot's columns. Readers use it while snapshot diffing is enabled.
+CREATE VIEW IF NOT EXISTS rates_snapshot_resolved AS
+SELECT
+    timestamp, protocol, token, token_contract,
+    lend_base_apr, lend_reward_apr, lend_total_apr,
+    borrow_base_apr, borrow_reward_apr, borrow_total_apr,
+    avg8hr_lend_total_apr, avg8hr_borrow_total_apr,
+    avg24hr_lend_total_apr, avg24hr_borrow_total_apr,
+    collateral_ratio, liquidation_threshold, price_usd,
+    utilization, total_supply_usd, total_borrow_usd, available_borrow_usd,
+    borrow_fee, borrow_weight,
+    reward_token, reward_token_contract, reward_token_price_usd,
+    market, side,
+    use_for_pnl
+FROM rates_snapshot
+
+UNION ALL
+
+SELECT
+    m.timestamp, m.protocol, rs.token, m.token_contract,
+    rs.lend_base_apr, rs.lend_reward_apr, rs.lend_total_apr,
+    rs.borrow_base_apr, rs.borrow_reward_apr, rs.borrow_total_apr,
+    rs.avg8hr_lend_total_apr, rs.avg8hr_borrow_total_apr,
+    rs.avg24hr_lend_total_apr, rs.avg24hr_borrow_total_apr,
+    rs.collateral_ratio, rs.liquidation_threshold, rs.price_usd,
+    rs.utilization, rs.total_supply_usd, rs.total_borrow_usd, rs.available_borrow_usd,
+    rs.borrow_fee, rs.borrow_weight,
+    rs.reward_token, rs.reward_token_contract, rs.reward_token_price_usd,
+    rs.market, rs.side,
+    m.use_for_pnl
+FROM rates_snapshot_unchanged m
+JOIN rates_snapshot rs
+  ON rs.timestamp = m.unchanged_since
+ AND rs.protocol = m.protocol
+ AND rs.token_contract = m.token_contract;
+
+-- Table 1c: rates_snapshot_hourly
+-- Retention tier (data/snapshot_retention.py): once a snapshot is older than
+-- RATES_RAW_RETENTION_DAYS only the use_for_pnl row of its hour is kept, here.
+CREATE TABLE IF NOT EXISTS rates_snapshot_hourly (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    collateral_ratio NUMERIC, liquidation_threshold NUMERIC, price_usd NUMERIC,
+    utilization NUMERIC, total_supply_usd NUMERIC, total_borrow_usd NUMERIC, available_borrow_usd NUMERIC,
+    borrow_fee NUMERIC, borrow_weight NUMERIC,
+    reward_token TEXT, reward_token_contract TEXT, reward_token_price_usd NUMERIC,
+    market TEXT, side TEXT,
+    PRIMARY KEY (token_contract, protocol, timestamp)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rates_hourly_time ON rates_snapshot_hourly(timestamp);
+
+ALTER TABLE rates_snapshot_hourly ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot_hourly"
+ON rates_snapshot_hourly FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_hourly"
+ON rates_snapshot_hourly FOR SELECT TO authenticated
+USING (true);
+
+-- Table 1d: rates_snapshot_daily
+-- Retention tier: hourly rows older than RATES_HOURLY_RETENTION_DAYS averaged per day
+-- (text columns keep MAX). Timestamp is the day's midnight.
+CREATE TABLE IF NOT EXISTS rates_snapshot_daily (
+    timestamp TIMESTAMP NOT NULL,
+    protocol VARCHAR(50) NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    collateral_ratio NUMERIC, liquidation_threshold NUMERIC, price_usd NUMERIC,
+    utilization NUMERIC, total_supply_usd NUMERIC, total_borrow_usd NUMERIC, available_borrow_usd NUMERIC,
+    borrow_fee NUMERIC, borrow_weight NUMERIC,
+    reward_token TEXT, reward_token_contract TEXT, reward_token_price_usd NUMERIC,
+    market TEXT, side TEXT,
+    PRIMARY KEY (token_contract, protocol, timestamp)
+);
+
+CREATE INDEX IF NOT EXISTS idx_rates_daily_time ON rates_snapshot_daily(timestamp);
+
+ALTER TABLE rates_snapshot_daily ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to rates_snapshot_daily"
+ON rates_snapshot_daily FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read rates_snapshot_daily"
+ON rates_snapshot_daily FOR SELECT TO authenticated
+USING (true);
+
+-- Table 1e: pnl_rates_hourly
+-- One row per (hour, protocol, token_contract): the use_for_pnl snapshot's APR / price
+-- columns, upserted by RateTracker.save_snapshot(). Read by PnL integration and
+-- strategy history (data/pnl_rates.py). The primary key is their range-scan index.
+-- Not trimmed by snapshot retention: it is the PnL ledger (see data/pnl_rates.py).
+CREATE TABLE IF NOT EXISTS pnl_rates_hourly (
+    hour TIMESTAMP NOT NULL,              -- DATE_TRUNC('hour', timestamp)
+    protocol VARCHAR(50) NOT NULL,
+    token_contract TEXT NOT NULL,
+    token VARCHAR(50) NOT NULL,
+    timestamp TIMESTAMP NOT NULL,         -- Source snapshot (earliest of the hour)
+    lend_base_apr NUMERIC, lend_reward_apr NUMERIC, lend_total_apr NUMERIC,
+    borrow_base_apr NUMERIC, borrow_reward_apr NUMERIC, borrow_total_apr NUMERIC,
+    avg8hr_lend_total_apr NUMERIC, avg8hr_borrow_total_apr NUMERIC,
+    avg24hr_lend_total_apr NUMERIC, avg24hr_borrow_total_apr NUMERIC,
+    price_usd NUMERIC, collateral_ratio NUMERIC, liquidation_threshold NUMERIC, borrow_fee NUMERIC,
+    PRIMARY KEY (token_contract, protocol, hour)
+);
+
+-- Tier bounds for history_source() (MIN/MAX hour)
+CREATE INDEX IF NOT EXISTS idx_pnl_rates_hour ON pnl_rates_hourly(hour);
+
+ALTER TABLE pnl_rates_hourly ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Service role has full access to pnl_rates_hourly"
+ON pnl_rates_hourly FOR ALL TO service_role
+USING (true) WITH CHECK (true);
+
+CREATE POLICY "Authenticated users can read pnl_rates_hourly"
+ON pnl_rates_hourly FOR SELECT TO authenticated
+USING (true);
+
 
 -- Table 2: token_registry
 -- Stores every token contract (coin type) seen by the bot, and optional mappings to pricing IDs.
@@ -733,6 +893,11 @@ CREATE TABLE IF NOT EXISTS position_statistics (
     -- Accumulated realised PnL across all closed rebalance segments
     accumulated_realised_pnl DECIMAL(20, 10),
 
+    -- Checkpoint metadata for incremental statistics (calculate_position_statistics(incremental=True))
+    stats_version INTEGER,                        -- STATISTICS_VERSION the row was calculated with
+    segment_start_timestamp TIMESTAMP,            -- Live segment start the leg earnings were integrated from
+    rate_rows_used INTEGER,                       -- use_for_pnl rates_snapshot rows integrated (backfill detection)
+
     -- Metadata
     calculation_timestamp TIMESTAMP DEFAULT CURRENT_TIMESTAMP,  -- When this was calculated
 
@@ -801,19 +966,18 @@ USING (true);
 
 -- =============================================================================
 -- Table 10: chart_cache
--- Cache for rendered chart visualizations (for faster dashboard loading)
+-- Cache for strategy history chart data (analysis/strategy_history/chart_cache.py):
+-- compressed numpy series per strategy, time range and snapshot
 -- =============================================================================
 CREATE TABLE IF NOT EXISTS chart_cache (
     strategy_hash TEXT NOT NULL,
+    time_range TEXT NOT NULL,
     timestamp_seconds INTEGER NOT NULL,
-    chart_html TEXT NOT NULL,
+    chart_data BYTEA NOT NULL,
     created_at INTEGER NOT NULL,
-    PRIMARY KEY (strategy_hash, timestamp_seconds)
+    PRIMARY KEY (strategy_hash, time_range, timestamp_seconds)
 );
 
-CREATE INDEX IF NOT EXISTS idx_chart_cache_lookup
-ON chart_cache(strategy_hash, timestamp_seconds);
-
 CREATE INDEX IF NOT EXISTS idx_chart_cache_created
 ON chart_cache(created_at);
 
@@ -0,0 +1,226 @@
+"""
+Change-only persistence for rates_snapshot (settings.SNAPSHOT_DIFF_ENABLED).
+
+Every refresh wrote a full rates_snapshot row per (protocol, token_contract), even
+when nothing moved since the previous snapshot. With diffing enabled,
+RateTracker._save_rates_snapshot() compares each new row with the previous snapshot:
+
+- changed (or new) rows are written to rates_snapshot as before
+- unchanged rows become a narrow marker in rates_snapshot_unchanged
+  (timestamp, protocol, token_contract, unchanged_since, use_for_pnl), where
+  unchanged_since is the timestamp of the rates_snapshot row holding the values -
+  never another marker, so one join resolves any marker
+
+A row is unchanged when token and every value column (DIFF_COLUMNS, i.e. all of
+VALUE_COLUMNS) are equal - numeric columns after rounding to their DECIMAL scale, text
+columns exactly, columns the row does not set as NULL - i.e. when the stored values
+would be identical.
+Bluefin rows are always written in full: save_snapshot() fills their avg8hr/avg24hr
+columns after the insert, from perp_margin_rates.
+
+The rates_snapshot_resolved view (rates_snapshot UNION ALL the markers expanded from
+their base rows) has the same columns as rates_snapshot. Readers select from
+rates_source(), which is the view whenever markers exist - including after diffing
+was turned off - so they see complete snapshots either way.
+"""
+
+from typing import List, Optional, Tuple
+
+import pandas as pd
+
+from config import settings
+
+MARKER_TABLE = 'rates_snapshot_unchanged'
+RESOLVED_VIEW = 'rates_snapshot_resolved'
+
+# DECIMAL scale in schema.sql of the numeric value columns
+DECIMAL_SCALES = {
+    'lend_base_apr': 6,
+    'lend_reward_apr': 6,
+    'lend_total_apr': 6,
+    'borrow_base_apr': 6,
+    'borrow_reward_apr': 6,
+    'borrow_total_apr': 6,
+    'avg8hr_lend_total_apr': 6,
+    'avg8hr_borrow_total_apr': 6,
+    'avg24hr_lend_total_apr': 6,
+    'avg24hr_borrow_total_apr': 6,
+    'collateral_ratio': 6,
+    'liquidation_threshold': 6,
+    'price_usd': 10,
+    'utilization': 6,
+    'total_supply_usd': 10,
+    'total_borrow_usd': 10,
+    'available_borrow_usd': 10,
+    'borrow_fee': 6,
+    'borrow_weight': 6,
+    'reward_token_price_usd': 10,
+}
+
+# Text value columns (compared exactly)
+TEXT_VALUE_COLUMNS = ('reward_token', 'reward_token_contract', 'market', 'side')
+
+# Protocols whose rows are updated after the insert and therefore never diffed
+ALWAYS_FULL_PROTOCOLS = ('Bluefin',)
+
+# Database key -> marker table exists (rates_source() checks once per database and process)
+_markers_found = {}
+
+# rates_snapshot value columns (everything except the key and use_for_pnl), in schema order
+VALUE_COLUMNS = (
+    'lend_base_apr', 'lend_reward_apr', 'lend_total_apr',
+    'borrow_base_apr', 'borrow_reward_apr', 'borrow_total_apr',
+    'avg8hr_lend_total_apr', 'avg8hr_borrow_total_apr',
+    'avg24hr_lend_total_apr', 'avg24hr_borrow_total_apr',
+    'collateral_ratio', 'liquidation_threshold', 'price_usd',
+    'utilization', 'total_supply_usd', 'total_borrow_usd', 'available_borrow_usd',
+    'borrow_fee', 'borrow_weight',
+    'reward_token', 'reward_token_contract', 'reward_token_price_usd',
+    'market', 'side',
+)
+
+# Compared column -> DECIMAL scale (None for text): every value column, so a marker
+# never stands for a row whose stored values would differ
+DIFF_COLUMNS = {
+    column: None if column in TEXT_VALUE_COLUMNS else DECIMAL_SCALES[column]
+    for column in VALUE_COLUMNS
+}
+
+
+def rates_source(engine=None) -> str:
+    """
+    Relation readers should select snapshot rows from.
+
+    The resolved view while diffing is enabled, and also after it was turned off if
+    markers were written (the marker table exists); rates_snapshot otherwise. The
+    table check runs once per database and process.
+
+    Args:
+        engine: SQLAlchemy engine of the database read (default: data.db_utils.get_db_engine())
+    """
+    if settings.SNAPSHOT_DIFF_ENABLED:
+        return RESOLVED_VIEW
+    if engine is None:
+        from data.db_utils import get_db_engine
+        engine = get_db_engine()
+    key = engine.url.render_as_string(hide_password=False)
+    if key not in _markers_found:
+        conn = engine.raw_connection()
+        try:
+            _markers_found[key] = markers_exist(conn.cursor(), engine.dialect.name == 'postgresql')
+        finally:
+            conn.close()
+    return RESOLVED_VIEW if _markers_found[key] else 'rates_snapshot'
+
+
+def rates_source_for(cursor, use_cloud: bool, key: Optional[str] = None) -> str:
+    """
+    rates_source() for code holding a DB-API cursor instead of an engine.
+
+    Args:
+        cursor: DB-API cursor on the database read
+        use_cloud: True for PostgreSQL
+        key: Identifies the database (connection URL or SQLite path) so the check runs
+            once per process; None checks on every call
+    """
+    if settings.SNAPSHOT_DIFF_ENABLED:
+        return RESOLVED_VIEW
+    found = _markers_found.get(key) if key is not None else None
+    if found is None:
+        found = markers_exist(cursor, use_cloud)
+        if key is not None:
+            _markers_found[key] = found
+    return RESOLVED_VIEW if found else 'rates_snapshot'
+
+
+def markers_exist(cursor, use_cloud: bool) -> bool:
+    """
+    True if the marker table exists, whatever SNAPSHOT_DIFF_ENABLED says now.
+
+    Markers written while diffing was on stay in the table after it is turned off;
+    code deleting rates_snapshot rows must keep them resolvable.
+    """
+    if use_cloud:
+        cursor.execute("SELECT TO_REGCLASS(%s) IS NOT NULL", (f"public.{MARKER_TABLE}",))
+    else:
+        cursor.execute("SELECT COUNT(*) FROM sqlite_master WHERE type = 'table' AND name = ?", (MARKER_TABLE,))
+    return bool(cursor.fetchone()[0])
+
+
+def resolved_view_sql() -> str:
+    """SELECT behind rates_snapshot_resolved (shared by schema.sql and the lazy DDL)."""
+    values = ', '.join(VALUE_COLUMNS)
+    base_values = ', '.join(f"rs.{c}" for c in VALUE_COLUMNS)
+    return f"""
+        SELECT timestamp, protocol, token, token_contract, {values}, use_for_pnl
+        FROM rates_snapshot
+        UNION ALL
+        SELECT m.timestamp, m.protocol, rs.token, m.token_contract, {base_values}, m.use_for_pnl
+        FROM {MARKER_TABLE} m
+        JOIN rates_snapshot rs
+          ON rs.timestamp = m.unchanged_since
+         AND rs.protocol = m.protocol
+         AND rs.token_contract = m.token_contract
+    """
+
+
+def schema_statements(use_cloud: bool) -> List[str]:
+    """CREATE statements for the marker table and the resolved view (idempotent)."""
+    create_view = "CREATE OR REPLACE VIEW" if use_cloud else "CREATE VIEW IF NOT EXISTS"
+    return [
+        f"""
+        CREATE TABLE IF NOT EXISTS {MARKER_TABLE} (
+            timestamp TIMESTAMP NOT NULL,
+            protocol VARCHAR(50) NOT NULL,
+            token_contract TEXT NOT NULL,
+            unchanged_since TIMESTAMP NOT NULL,
+            use_for_pnl BOOLEAN NOT NULL DEFAULT FALSE,
+            PRIMARY KEY (timestamp, protocol, token_contract)
+        )
+        """,
+        f"CREATE INDEX IF NOT EXISTS idx_rates_unchanged_pnl_lookup "
+        f"ON {MARKER_TABLE}(token_contract, protocol, timestamp) WHERE use_for_pnl = TRUE",
+        f"{create_view} {RESOLVED_VIEW} AS {resolved_view_sql()}",
+    ]
+
+
+def split_unchanged(rows: List[dict], previous: pd.DataFrame) -> Tuple[List[dict], List[Tuple[dict, object]]]:
+    """
+    Split new snapshot rows into rows to write and rows unchanged since the previous snapshot.
+
+    Args:
+        rows: Row dicts built by RateTracker._save_rates_snapshot()
+        previous: Previous snapshot (protocol, token_contract, token, DIFF_COLUMNS...,
+            source_timestamp = timestamp of the rates_snapshot row holding the values)
+
+    Returns:
+        (changed_rows, [(row, unchanged_since), ...]) - changed_rows keep their order
+    """
+    if not rows or previous is None or previous.empty:
+        return rows, []
+
+    new = pd.DataFrame(rows)
+    # Value columns the rows do not set are written as NULL
+    new = new.assign(**{c: None for c in DIFF_COLUMNS if c not in new.columns})
+    prev = previous.drop_duplicates(['protocol', 'token_contract'])
+    merged = new.merge(
+        prev, on=['protocol', 'token_contract'], how='left', suffixes=('', '_prev'), indicator=True
+    )
+
+    same = (merged['_merge'] == 'both') & ~merged['protocol'].isin(ALWAYS_FULL_PROTOCOLS)
+    same &= merged['token'] == merged['token_prev']
+    for column, scale in DIFF_COLUMNS.items():
+        current, stored = merged[column], merged[f"{column}_prev"]
+        if scale is not None:
+            # Postgres returns Decimal, SQLite float; both compared as stored (rounded to scale)
+            current = pd.to_numeric(current, errors='coerce').astype(float).round(scale)
+            stored = pd.to_numeric(stored, errors='coerce').astype(float).round(scale)
+        same &= (current == stored) | (current.isna() & stored.isna())
+
+    changed = [row for row, unchanged in zip(rows, same) if not unchanged]
+    markers = [
+        (row, since)
+        for row, unchanged, since in zip(rows, same, merged['source_timestamp'])
+        if unchanged
+    ]
+    return changed, markers
@@ -0,0 +1,423 @@
+"""
+Retention tiers for rates_snapshot: raw -> hourly -> daily rollups.
+
+rates_snapshot grows by one row per (protocol, token_contract) per refresh, forever,
+and every history query and PnL integration scans its indexes. With
+settings.RATES_RAW_RETENTION_DAYS > 0, apply_retention() (run after each saved
+snapshot, or `python -m data.snapshot_retention`) keeps three disjoint tiers:
+
+- rates_snapshot:        every snapshot newer than RATES_RAW_RETENTION_DAYS
+- rates_snapshot_hourly: older than that, only the use_for_pnl row of each hour
+                         (sub-hourly snapshots are dropped)
+- rates_snapshot_daily:  older than RATES_HOURLY_RETENTION_DAYS (if > 0), one row per
+                         day with the mean of that day's hourly values
+
+Cutoffs are UTC midnights, so a day is never split across tiers. Every rollup row
+counts as use_for_pnl. Moves are idempotent (rows are copied, then deleted, in one
+transaction). pnl_rates_hourly (data/pnl_rates.py) is not trimmed: it is the PnL
+ledger, and the complete hourly tier.
+
+Range readers (fetch_rates_from_database, hence get_strategy_history; the dashboard's
+historical rates) select from history_source(engine, start, end, resolution), which
+routes them to the coarsest table that has rows at least as fine as they need over
+the whole range - e.g. hourly readers to pnl_rates_hourly, old ranges to the daily
+rollups - and combines the disjoint tiers only when no single table covers it.
+Point-in-time readers (load_historical_snapshot, the dashboard timestamp list) keep
+reading raw snapshots only.
+
+On PostgreSQL, rates_snapshot can be range-partitioned by month
+(migrations/012_partition_rates_snapshot.sql); RateTracker then creates each
+month's partition before writing into it, and retention drops whole partitions
+instead of deleting row by row. SQLite (local development) keeps one table.
+"""
+
+import re
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from config import settings
+from data import pnl_rates, snapshot_diff
+
+HOURLY_TABLE = 'rates_snapshot_hourly'
+DAILY_TABLE = 'rates_snapshot_daily'
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Columns of a history_source() relation besides timestamp, protocol, token, token_contract
+# (every tier has them: pnl_rates_hourly holds only these)
+HISTORY_COLUMNS = pnl_rates.RATE_COLUMNS
+
+# Value columns kept as-is in daily rollups (not averaged)
+TEXT_COLUMNS = snapshot_diff.TEXT_VALUE_COLUMNS
+
+# Monthly partitions are named rates_snapshot_YYYY_MM
+PARTITION_NAME = re.compile(r'^rates_snapshot_(\d{4})_(\d{2})$')
+
+
+def retention_enabled() -> bool:
+    return settings.RATES_RAW_RETENTION_DAYS > 0
+
+
+def _rollup_table_sql(table: str) -> str:
+    values = ',\n            '.join(
+        f"{c} TEXT" if c in TEXT_COLUMNS else f"{c} NUMERIC" for c in snapshot_diff.VALUE_COLUMNS
+    )
+    # Key order matches the PnL range scans: one (token_contract, protocol) over time
+    return f"""
+        CREATE TABLE IF NOT EXISTS {table} (
+            timestamp TIMESTAMP NOT NULL,
+            protocol VARCHAR(50) NOT NULL,
+            token VARCHAR(50) NOT NULL,
+            token_contract TEXT NOT NULL,
+            {values},
+            PRIMARY KEY (token_contract, protocol, timestamp)
+        )
+    """
+
+
+def schema_statements() -> List[str]:
+    """CREATE statements for the rollup tables (idempotent)."""
+    return [
+        _rollup_table_sql(HOURLY_TABLE),
+        f"CREATE INDEX IF NOT EXISTS idx_rates_hourly_time ON {HOURLY_TABLE}(timestamp)",
+        _rollup_table_sql(DAILY_TABLE),
+        f"CREATE INDEX IF NOT EXISTS idx_rates_daily_time ON {DAILY_TABLE}(timestamp)",
+    ]
+
+
+def _cutoff(now: datetime, days: int) -> datetime:
+    """Midnight `days` days before now, naive like the stored timestamps (aware input -> UTC)."""
+    day = now - timedelta(days=days)
+    if day.tzinfo is not None:
+        day = day.astimezone(timezone.utc).replace(tzinfo=None)
+    return day.replace(hour=0, minute=0, second=0, microsecond=0)
+
+
+# ---------------------------------------------------------------------------
+# Reading
+# ---------------------------------------------------------------------------
+
+def _tier_bounds(engine) -> Optional[dict]:
+    """
+    {relation: (first, last)} in Unix seconds for every history tier that has rows.
+
+    For pnl_rates_hourly the bounds are hours. Returns None while the rollup tables
+    do not exist yet (no apply_retention() has run, so nothing was moved).
+    """
+    from sqlalchemy import text
+    from sqlalchemy.exc import SQLAlchemyError
+    from utils.time_helpers import to_seconds
+
+    raw_source = snapshot_diff.rates_source(engine)
+    raw_tables = ['rates_snapshot']
+    if raw_source != 'rates_snapshot':
+        raw_tables.append(snapshot_diff.MARKER_TABLE)
+    queries = {
+        DAILY_TABLE: f"SELECT MIN(timestamp), MAX(timestamp) FROM {DAILY_TABLE}",
+        pnl_rates.TABLE: f"SELECT MIN(hour), MAX(hour) FROM {pnl_rates.TABLE}",
+        HOURLY_TABLE: f"SELECT MIN(timestamp), MAX(timestamp) FROM {HOURLY_TABLE}",
+    }
+    try:
+        with engine.connect() as conn:
+            bounds = {table: conn.execute(text(query)).one() for table, query in queries.items()}
+            raw = [conn.execute(text(f"SELECT MIN(timestamp), MAX(timestamp) FROM {t}")).one() for t in raw_tables]
+    except SQLAlchemyError:
+        return None
+    bounds[raw_source] = (
+        min((lo for lo, _ in raw if lo is not None), default=None),
+        max((hi for _, hi in raw if hi is not None), default=None),
+    )
+    return {
+        table: (to_seconds(lo), to_seconds(hi))
+        for table, (lo, hi) in bounds.items() if lo is not None
+    }
+
+
+def _tier_select(relation: str, pnl_rows_only: bool = False) -> str:
+    values = ', '.join(HISTORY_COLUMNS)
+    where = " WHERE use_for_pnl = TRUE" if pnl_rows_only else ""
+    return f"SELECT timestamp, protocol, token, token_contract, {values} FROM {relation}{where}"
+
+
+def history_source(
+    engine,
+    start_seconds: Optional[int] = None,
+    end_seconds: Optional[int] = None,
+    resolution: int = 0
+) -> str:
+    """
+    FROM-clause relation for a range read over [start_seconds, end_seconds].
+
+    Tiers, coarsest first: rates_snapshot_daily (one row per day), pnl_rates_hourly
+    and rates_snapshot_hourly (one row per hour), raw snapshots (rates_source()).
+    The read is routed to the coarsest tier whose step is at most `resolution` and
+    whose rows cover the whole range. If no single tier does, the disjoint tiers
+    the range reaches are combined with UNION ALL.
+
+    The relation has timestamp, protocol, token, token_contract and HISTORY_COLUMNS;
+    callers alias it (e.g. `FROM {history_source(...)} rs`) and filter on timestamp
+    (history_time_range() also uses pnl_rates_hourly's hour key when it is routed there).
+
+    Args:
+        engine: SQLAlchemy engine (tier bounds are looked up when retention is on)
+        start_seconds / end_seconds: Requested range (Unix seconds), None = open
+        resolution: Coarsest row spacing the reader accepts, in seconds. 0 = every
+            snapshot; HOUR = the use_for_pnl row of each hour
+
+    Returns:
+        A table/view name, or a parenthesised subquery
+    """
+    raw = snapshot_diff.rates_source(engine)
+    hourly = resolution >= HOUR
+    if not retention_enabled():
+        # Nothing leaves rates_snapshot; pnl_rates_hourly has the use_for_pnl row of every hour
+        return pnl_rates.TABLE if hourly else raw
+
+    bounds = _tier_bounds(engine)
+    if not bounds:
+        return pnl_rates.TABLE if hourly else raw
+
+    earliest = min(lo for lo, _ in bounds.values())
+    latest = max(hi for _, hi in bounds.values())
+    want_start = earliest if start_seconds is None else max(start_seconds, earliest)
+    want_end = latest if end_seconds is None else min(end_seconds, latest)
+
+    # A tier's last row stands for one step (daily rows are stamped at midnight)
+    for relation, step in ((DAILY_TABLE, DAY), (pnl_rates.TABLE, HOUR), (HOURLY_TABLE, HOUR), (raw, 0)):
+        if step > resolution or relation not in bounds:
+            continue
+        lo, hi = bounds[relation]
+        if lo <= want_start and want_end < hi + max(step, 1):
+            if relation == raw and hourly:
+                return f"({_tier_select(raw, pnl_rows_only=True)})"
+            return relation
+
+    # Tiers are disjoint in time: daily < hourly_start <= hourly < raw_start <= raw
+    raw_start = bounds[raw][0] if raw in bounds else None
+    hourly_start = bounds[HOURLY_TABLE][0] if HOURLY_TABLE in bounds else raw_start
+    reaches = lambda tier_start: tier_start is None or want_start < tier_start
+
+    selects = []
+    if DAILY_TABLE in bounds and reaches(hourly_start):
+        selects.append(_tier_select(DAILY_TABLE))
+    if HOURLY_TABLE in bounds and reaches(raw_start) and want_end >= hourly_start:
+        selects.append(_tier_select(HOURLY_TABLE))
+    if raw_start is not None and want_end >= raw_start:
+        selects.append(_tier_select(raw, pnl_rows_only=hourly))
+    if not selects:
+        return pnl_rates.TABLE if hourly else raw
+    return "(" + " UNION ALL ".join(selects) + ")"
+
+
+def history_time_range(
+    relation: str,
+    ph: str,
+    start_seconds: Optional[int],
+    end_seconds: Optional[int],
+    alias: str = ''
+) -> Tuple[str, list]:
+    """
+    WHERE conditions for start_seconds <= timestamp <= end_seconds on a history_source() relation.
+
+    Returns:
+        (conditions joined with AND, or '' when unbounded, params)
+    """
+    from utils.time_helpers import to_datetime_str
+
+    if relation == pnl_rates.TABLE:
+        return pnl_rates.time_range(ph, start_seconds, end_seconds, alias=alias)
+    prefix = f"{alias}." if alias else ''
+    conditions, params = [], []
+    if start_seconds is not None:
+        conditions.append(f"{prefix}timestamp >= {ph}")
+        params.append(to_datetime_str(start_seconds))
+    if end_seconds is not None:
+        conditions.append(f"{prefix}timestamp <= {ph}")
+        params.append(to_datetime_str(end_seconds))
+    return ' AND '.join(conditions), params
+
+
+# ---------------------------------------------------------------------------
+# Writing
+# ---------------------------------------------------------------------------
+
+def is_partitioned(cursor) -> bool:
+    """True if rates_snapshot is a range-partitioned table (PostgreSQL only)."""
+    cursor.execute("""
+        SELECT relkind FROM pg_class
+        WHERE relname = 'rates_snapshot' AND relnamespace = 'public'::regnamespace
+    """)
+    row = cursor.fetchone()
+    return bool(row) and row[0] == 'p'
+
+
+def partition_statement(month_start: datetime) -> str:
+    """CREATE TABLE ... PARTITION OF rates_snapshot for the month starting at month_start."""
+    next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    name = f"rates_snapshot_{month_start:%Y_%m}"
+    return (
+        f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF rates_snapshot "
+        f"FOR VALUES FROM ('{month_start:%Y-%m-%d}') TO ('{next_month:%Y-%m-%d}')"
+    )
+
+
+def _drop_expired_partitions(cursor, cutoff: datetime) -> int:
+    """Drop monthly partitions that end on or before cutoff (their rows were copied already)."""
+    cursor.execute("""
+        SELECT c.relname
+        FROM pg_inherits i
+        JOIN pg_class c ON c.oid = i.inhrelid
+        WHERE i.inhparent = 'public.rates_snapshot'::regclass
+    """)
+    dropped = 0
+    for (name,) in cursor.fetchall():
+        match = PARTITION_NAME.match(name)
+        if not match:
+            continue
+        month_start = datetime(int(match.group(1)), int(match.group(2)), 1)
+        next_month = (month_start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        if next_month <= cutoff:
+            cursor.execute(f"DROP TABLE {name}")
+            dropped += 1
+    return dropped
+
+
+def _reanchor_markers(cursor, ph: str, cutoff: datetime) -> int:
+    """
+    Make markers at/after cutoff independent of base rows before it.
+
+    For each base row about to be deleted, the first newer marker pointing at it
+    becomes a full rates_snapshot row and the later markers point at that instead.
+    """
+    marker = snapshot_diff.MARKER_TABLE
+    cursor.execute(f"""
+        SELECT protocol, token_contract, unchanged_since, MIN(timestamp)
+        FROM {marker}
+        WHERE timestamp >= {ph} AND unchanged_since < {ph}
+        GROUP BY protocol, token_contract, unchanged_since
+    """, (cutoff, cutoff))
+    groups = cursor.fetchall()
+
+    values = ', '.join(snapshot_diff.VALUE_COLUMNS)
+    base_values = ', '.join(f"rs.{c}" for c in snapshot_diff.VALUE_COLUMNS)
+    for protocol, token_contract, old_base, new_base in groups:
+        cursor.execute(f"""
+            INSERT INTO rates_snapshot (timestamp, protocol, token, token_contract, {values}, use_for_pnl)
+            SELECT m.timestamp, m.protocol, rs.token, m.token_contract, {base_values}, m.use_for_pnl
+            FROM {marker} m
+            JOIN rates_snapshot rs
+              ON rs.timestamp = m.unchanged_since
+             AND rs.protocol = m.protocol
+             AND rs.token_contract = m.token_contract
+            WHERE m.timestamp = {ph} AND m.protocol = {ph} AND m.token_contract = {ph}
+        """, (new_base, protocol, token_contract))
+        cursor.execute(f"""
+            UPDATE {marker} SET unchanged_since = {ph}
+            WHERE protocol = {ph} AND token_contract = {ph} AND unchanged_since = {ph}
+        """, (new_base, protocol, token_contract, old_base))
+        cursor.execute(
+            f"DELETE FROM {marker} WHERE timestamp = {ph} AND protocol = {ph} AND token_contract = {ph}",
+            (new_base, protocol, token_contract),
+        )
+    return len(groups)
+
+
+def apply_retention(conn, use_cloud: bool, now: Optional[datetime] = None) -> dict:
+    """
+    Move expired snapshots into the rollup tiers (caller commits).
+
+    Args:
+        conn: DB-API connection (RateTracker._get_connection())
+        use_cloud: True for PostgreSQL
+        now: Reference time, e.g. the snapshot just saved (default: current UTC time)
+
+    Returns:
+        Dict with counts: hourly_rows, raw_deleted, partitions_dropped, daily_rows, hourly_deleted
+
+    Raises:
+        ValueError: If RATES_HOURLY_RETENTION_DAYS is set below RATES_RAW_RETENTION_DAYS
+    """
+    summary = {'hourly_rows': 0, 'raw_deleted': 0, 'partitions_dropped': 0, 'daily_rows': 0, 'hourly_deleted': 0}
+    if not retention_enabled():
+        return summary
+
+    raw_days = settings.RATES_RAW_RETENTION_DAYS
+    hourly_days = settings.RATES_HOURLY_RETENTION_DAYS
+    if 0 < hourly_days < raw_days:
+        raise ValueError(
+            f"RATES_HOURLY_RETENTION_DAYS ({hourly_days}) must be 0 or >= "
+            f"RATES_RAW_RETENTION_DAYS ({raw_days})"
+        )
+
+    now = now or datetime.now(timezone.utc)
+    raw_cutoff = _cutoff(now, raw_days)
+    ph = '%s' if use_cloud else '?'
+    insert_ignore = "INSERT INTO" if use_cloud else "INSERT OR IGNORE INTO"
+    on_conflict = "ON CONFLICT DO NOTHING" if use_cloud else ""
+    values = ', '.join(snapshot_diff.VALUE_COLUMNS)
+
+    cursor = conn.cursor()
+    for statement in schema_statements():
+        cursor.execute(statement)
+
+    # 1. Raw -> hourly: the use_for_pnl row of each hour (markers resolved). Markers are
+    # handled whenever the table exists - diffing may have been turned off since
+    has_markers = snapshot_diff.markers_exist(cursor, use_cloud)
+    if has_markers:
+        _reanchor_markers(cursor, ph, raw_cutoff)
+    cursor.execute(f"""
+        {insert_ignore} {HOURLY_TABLE} (timestamp, protocol, token, token_contract, {values})
+        SELECT timestamp, protocol, token, token_contract, {values}
+        FROM {snapshot_diff.RESOLVED_VIEW if has_markers else 'rates_snapshot'}
+        WHERE timestamp < {ph} AND use_for_pnl = TRUE
+        {on_conflict}
+    """, (raw_cutoff,))
+    summary['hourly_rows'] = max(cursor.rowcount, 0)
+
+    if has_markers:
+        cursor.execute(f"DELETE FROM {snapshot_diff.MARKER_TABLE} WHERE timestamp < {ph}", (raw_cutoff,))
+    if use_cloud and is_partitioned(cursor):
+        summary['partitions_dropped'] = _drop_expired_partitions(cursor, raw_cutoff)
+    cursor.execute(f"DELETE FROM rates_snapshot WHERE timestamp < {ph}", (raw_cutoff,))
+    summary['raw_deleted'] = max(cursor.rowcount, 0)
+
+    # 2. Hourly -> daily: mean of each day's hourly values
+    if hourly_days > 0:
+        hourly_cutoff = _cutoff(now, hourly_days)
+        day = "DATE_TRUNC('day', timestamp)" if use_cloud else "strftime('%Y-%m-%d 00:00:00', timestamp)"
+        aggregated = ', '.join(
+            f"MAX({c})" if c in TEXT_COLUMNS else f"AVG({c})" for c in snapshot_diff.VALUE_COLUMNS
+        )
+        cursor.execute(f"""
+            {insert_ignore} {DAILY_TABLE} (timestamp, protocol, token, token_contract, {values})
+            SELECT {day}, protocol, MAX(token), token_contract, {aggregated}
+            FROM {HOURLY_TABLE}
+            WHERE timestamp < {ph}
+            GROUP BY {day}, protocol, token_contract
+            {on_conflict}
+        """, (hourly_cutoff,))
+        summary['daily_rows'] = max(cursor.rowcount, 0)
+        cursor.execute(f"DELETE FROM {HOURLY_TABLE} WHERE timestamp < {ph}", (hourly_cutoff,))
+        summary['hourly_deleted'] = max(cursor.rowcount, 0)
+
+    return summary
+
+
+def main():
+    """Apply retention once to the configured database."""
+    from data.rate_tracker import RateTracker
+
+    if not retention_enabled():
+        print("[RETENTION] RATES_RAW_RETENTION_DAYS is 0 - retention disabled, nothing to do")
+        return
+    tracker = RateTracker(
+        use_cloud=settings.USE_CLOUD_DB,
+        db_path=settings.SQLITE_PATH,
+        connection_url=settings.SUPABASE_URL,
+    )
+    print(tracker.apply_retention())
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,4 @@
 import json
-import os
 import subprocess
 from dataclasses import dataclass
 from typing import Tuple, List, Dict, Any, Optional
@@ -12,6 +11,7 @@ from pathlib import Path
 project_root = Path(__file__).parent.parent.parent
 sys.path.insert(0, str(project_root))
 from config.settings import SUI_RPC_URL, SUI_FALLBACK_RPC_URL
+from utils.fixtures import run_node_script
 
 
 @dataclass
@@ -128,19 +128,14 @@ class SuilendReader:
     # ---------- internals ----------
 
     def _get_all_reserves(self) -> List[Dict[str, Any]]:
-        env = os.environ.copy()
-        env["SUI_RPC_URL"] = self.config.rpc_url
-        env["SUI_FALLBACK_RPC_URL"] = self.config.fallback_rpc_url
+        env_overrides = {
+            "SUI_RPC_URL": self.config.rpc_url,
+            "SUI_FALLBACK_RPC_URL": self.config.fallback_rpc_url,
+        }
 
         try:
-            res = subprocess.run(
-                ["node", self.config.node_script_path],
-                capture_output=True,
-                text=True,
-                env=env,
-                check=False,
-                timeout=60,  # 60 second timeout to prevent indefinite hangs
-            )
+            # Goes through the fixture recorder so offline replay runs skip node entirely
+            res = run_node_script(self.config.node_script_path, env_overrides, timeout=60)
         except subprocess.TimeoutExpired:
             raise RuntimeError(f"Suilend node script timed out after 60 seconds (RPC may be unresponsive)")
 
@@ -1,6 +1,7 @@
 from apscheduler.schedulers.blocking import BlockingScheduler
 from datetime import datetime
 from data.refresh_pipeline import refresh_pipeline
+from data.refresh_daemon import REFRESH_CRON_JOBS
 from config import settings
 
 def run_refresh():
@@ -19,38 +20,16 @@ def main():
     # Run immediately on start
     run_refresh()
 
-    # Weekday daytime schedule: Every hour between 8am-6pm (Mon-Fri)
-    scheduler.add_job(
-        run_refresh,
-        'cron',
-        minute='0',
-        hour='8-17',  # 8am to 5:59pm (hour 17 is 5:00-5:59pm)
-        day_of_week='mon-fri',
-        misfire_grace_time=None,  # Don't run missed jobs (skip if overlapping)
-        id='weekday_daytime_refresh'
-    )
-
-    # Weekday nighttime schedule: Every 4 hours between 6pm-8am (Mon-Fri)
-    scheduler.add_job(
-        run_refresh,
-        'cron',
-        minute='0',
-        hour='18,22,2,6',  # 6pm, 10pm, 2am, 6am
-        day_of_week='mon-fri',
-        misfire_grace_time=None,  # Don't run missed jobs (skip if overlapping)
-        id='weekday_nighttime_refresh'
-    )
-
-    # Weekend schedule: Every 4 hours all day (Sat-Sun)
-    scheduler.add_job(
-        run_refresh,
-        'cron',
-        minute='0',
-        hour='*/4',  # Every 4 hours
-        day_of_week='sat-sun',
-        misfire_grace_time=None,  # Don't run missed jobs (skip if overlapping)
-        id='weekend_refresh'
-    )
+    # Same cadence the refresh daemon (python main.py --daemon) uses
+    for cron in REFRESH_CRON_JOBS:
+        fields = {k: v for k, v in cron.items() if k != 'id'}
+        scheduler.add_job(
+            run_refresh,
+            'cron',
+            misfire_grace_time=None,  # Don't run missed jobs (skip if overlapping)
+            id=cron['id'],
+            **fields
+        )
 
     print(f"\n🚀 Scheduler started")
     print("   Weekdays (Mon-Fri):")
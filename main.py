@@ -1,3 +1,4 @@
+import argparse
 import os
 import sys
 from datetime import datetime
@@ -6,7 +7,41 @@ from data.rate_tracker import RateTracker
 from config import settings
 
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run one full refresh")
+    fixture = parser.add_mutually_exclusive_group()
+    fixture.add_argument('--record', metavar='DIR',
+                         help='Capture every HTTP / Node SDK payload to DIR (local SQLite, no Slack)')
+    fixture.add_argument('--replay', metavar='DIR',
+                         help='Re-run a recorded refresh from DIR offline (local SQLite, no Slack)')
+    parser.add_argument('--sqlite-path', metavar='PATH',
+                        help='SQLite DB for --record/--replay (default: DIR/<mode>.db, recreated each run)')
+    parser.add_argument('--force', action='store_true',
+                        help='Let --sqlite-path replace an existing database outside DIR')
+    daemon = parser.add_argument_group('daemon mode')
+    daemon.add_argument('--daemon', action='store_true',
+                        help='Stay running and refresh on the local scheduler cadence (warm imports, '
+                             'pooled DB connections, health endpoint on DAEMON_HEALTH_PORT)')
+    daemon.add_argument('--health-port', type=int, metavar='PORT',
+                        help='Health endpoint port for --daemon (default: DAEMON_HEALTH_PORT, 0 = off)')
+    args = parser.parse_args(argv)
+
+    if args.daemon:
+        # The daemon refreshes live against the configured database (and Slack)
+        fixture_flags = [flag for flag, value in (
+            ('--record', args.record), ('--replay', args.replay),
+            ('--sqlite-path', args.sqlite_path), ('--force', args.force),
+        ) if value]
+        if fixture_flags:
+            parser.error(f"--daemon cannot be combined with {', '.join(fixture_flags)}")
+    elif args.health_port is not None:
+        parser.error("--health-port requires --daemon")
+
+    if args.daemon:
+        from data.refresh_daemon import RefreshDaemon
+        RefreshDaemon(health_port=args.health_port).run()
+        return
+
     print("\n=== Sui Lending Bot: Refresh Started ===\n")
 
     # Debug: Print environment info for cron troubleshooting
@@ -17,13 +52,20 @@ def main():
     print(f"NODE_PATH: {os.environ.get('NODE_PATH', 'NOT SET')}")
     print("=========================\n")
 
-    # Get current time
+    # Get current time (fixture runs pin it to the recorded timestamp)
     current_time = datetime.now()
+    fixture_mode = 'record' if args.record else 'replay' if args.replay else None
+    if fixture_mode:
+        from utils.fixtures import configure_fixture_mode
+        current_time = configure_fixture_mode(
+            fixture_mode, args.record or args.replay, sqlite_path=args.sqlite_path, force=args.force
+        )
 
     # Run full refresh pipeline
     result = refresh_pipeline(
         timestamp=current_time,
         save_snapshots=True,
+        send_slack_notifications=fixture_mode is None,
     )
 
     # -------------------------
@@ -43,6 +85,7 @@ def main():
     # -------------------------
     tracker = RateTracker(
         use_cloud=settings.USE_CLOUD_DB,
+        db_path=settings.SQLITE_PATH,
         connection_url=settings.SUPABASE_URL
     )
     table_counts = tracker.get_table_counts()
@@ -18,23 +18,67 @@ Usage:
 
 import argparse
 import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Optional, Tuple
+from typing import Optional, Tuple, List
 from datetime import datetime
 
 # Add project root to path
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from dashboard.db_utils import get_db_engine
-from dashboard.oracle_price_utils import compute_latest_price
+from data.db_utils import get_db_engine
+from dashboard.oracle_price_utils import compute_latest_price, compute_latest_prices
+from config import settings
+from utils.http_client import get_http_client
 from sqlalchemy import text
+import numpy as np
 import pandas as pd
 
+# Keep request URLs comfortably under common 2048/8192-char proxy and CDN limits.
+# CoinGecko takes ids in the query string, DeFi Llama takes coins in the path.
+COINGECKO_PRICE_URL = "https://api.coingecko.com/api/v3/simple/price"
+DEFILLAMA_PRICE_URL = "https://coins.llama.fi/prices/current/"
+MAX_URL_LENGTH = 2000
+
+
+def chunk_by_url_length(items: List[str], base_length: int, max_length: int = MAX_URL_LENGTH) -> List[List[str]]:
+    """
+    Split items into chunks whose comma-joined (URL-encoded) length fits in one URL.
+
+    Args:
+        items: Identifiers to join with ',' in the request URL
+        base_length: Length of the URL without the joined identifiers
+        max_length: Maximum total URL length
+
+    Returns:
+        List of chunks (each at least one item, order preserved)
+    """
+    from urllib.parse import quote
+
+    chunks: List[List[str]] = []
+    current: List[str] = []
+    current_length = base_length
+
+    for item in items:
+        # Measure the percent-encoded form (worst case for both query string and path)
+        item_length = len(quote(item, safe='')) + (3 if current else 0)  # %2C separator
+        if current and current_length + item_length > max_length:
+            chunks.append(current)
+            current = []
+            current_length = base_length
+            item_length -= 3
+        current.append(item)
+        current_length += item_length
+
+    if current:
+        chunks.append(current)
+    return chunks
+
 
 def fetch_coingecko_prices_batch(coingecko_ids: list) -> dict:
     """
-    Fetch multiple prices from CoinGecko API in a single request.
+    Fetch multiple prices from CoinGecko API, one request per URL-sized chunk.
 
     Args:
         coingecko_ids: List of CoinGecko token IDs (e.g., ['sui', 'usd-coin'])
@@ -45,34 +89,29 @@ def fetch_coingecko_prices_batch(coingecko_ids: list) -> dict:
     if not coingecko_ids:
         return {}
 
-    try:
-        import requests
-
-        # CoinGecko API supports comma-separated IDs (max 250)
-        url = "https://api.coingecko.com/api/v3/simple/price"
-        params = {
-            'ids': ','.join(coingecko_ids),
-            'vs_currencies': 'usd'
-        }
+    unique_ids = list(dict.fromkeys(coingecko_ids))
+    base_length = len(COINGECKO_PRICE_URL) + len("?ids=&vs_currencies=usd")
+    results = {}
 
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
+    for chunk in chunk_by_url_length(unique_ids, base_length):
+        try:
+            params = {
+                'ids': ','.join(chunk),
+                'vs_currencies': 'usd'
+            }
 
-        data = response.json()
-        timestamp = datetime.now()
+            data = get_http_client().get_json(COINGECKO_PRICE_URL, params=params, timeout=30)
+            timestamp = datetime.now()
 
-        # Build result dict
-        results = {}
-        for cg_id in coingecko_ids:
-            if cg_id in data and 'usd' in data[cg_id]:
-                price = float(data[cg_id]['usd'])
-                results[cg_id] = (price, timestamp)
+            for cg_id in chunk:
+                if cg_id in data and 'usd' in data[cg_id]:
+                    price = float(data[cg_id]['usd'])
+                    results[cg_id] = (price, timestamp)
 
-        return results
+        except Exception as e:
+            print(f"[ERROR] CoinGecko batch fetch failed ({len(chunk)} ids): {e}")
 
-    except Exception as e:
-        print(f"[ERROR] CoinGecko batch fetch failed: {e}")
-        return {}
+    return results
 
 
 def fetch_coingecko_price(coingecko_id: str) -> Optional[Tuple[float, datetime]]:
@@ -89,18 +128,13 @@ def fetch_coingecko_price(coingecko_id: str) -> Optional[Tuple[float, datetime]]
         return None
 
     try:
-        import requests
-
         url = "https://api.coingecko.com/api/v3/simple/price"
         params = {
             'ids': coingecko_id,
             'vs_currencies': 'usd'
         }
 
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
+        data = get_http_client().get_json(url, params=params, timeout=10)
 
         if coingecko_id in data and 'usd' in data[coingecko_id]:
             price = float(data[coingecko_id]['usd'])
@@ -128,18 +162,13 @@ def fetch_pyth_price(pyth_id: str) -> Optional[Tuple[float, datetime]]:
         return None
 
     try:
-        import requests
-
         # Pyth Hermes API endpoint
         url = "https://hermes.pyth.network/api/latest_price_feeds"
         params = {
             'ids[]': pyth_id
         }
 
-        response = requests.get(url, params=params, timeout=10)
-        response.raise_for_status()
-
-        data = response.json()
+        data = get_http_client().get_json(url, params=params, timeout=10)
 
         if data and len(data) > 0:
             feed = data[0]
@@ -176,16 +205,11 @@ def fetch_pyth_prices_batch(pyth_ids: list) -> dict:
         return {}
 
     try:
-        import requests
-
         # Pyth supports multiple ids[] parameters in a single request
         url = "https://hermes.pyth.network/api/latest_price_feeds"
         params = [('ids[]', pyth_id) for pyth_id in pyth_ids]
 
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-
-        data = response.json()
+        data = get_http_client().get_json(url, params=params, timeout=30)
 
         results = {}
         for feed in data:
@@ -211,7 +235,7 @@ def fetch_pyth_prices_batch(pyth_ids: list) -> dict:
 
 def fetch_defillama_prices_batch(token_contracts: list) -> dict:
     """
-    Fetch multiple prices from DeFi Llama in a single request.
+    Fetch multiple prices from DeFi Llama, one request per URL-sized chunk.
 
     Args:
         token_contracts: List of Sui contract addresses (e.g., '0x2::sui::SUI')
@@ -222,46 +246,35 @@ def fetch_defillama_prices_batch(token_contracts: list) -> dict:
     if not token_contracts:
         return {}
 
-    try:
-        import requests
+    # Coin identifiers carry a "sui:" prefix
+    coin_ids = [f"sui:{contract}" for contract in dict.fromkeys(token_contracts)]
+    results = {}
 
-        # Build comma-separated coin identifiers with "sui:" prefix
-        coin_ids = [f"sui:{contract}" for contract in token_contracts]
-        coins_param = ','.join(coin_ids)
+    for chunk in chunk_by_url_length(coin_ids, len(DEFILLAMA_PRICE_URL)):
+        try:
+            url = DEFILLAMA_PRICE_URL + ','.join(chunk)
 
-        # DeFi Llama API endpoint
-        url = f"https://coins.llama.fi/prices/current/{coins_param}"
+            data = get_http_client().get_json(url, timeout=30)
 
-        response = requests.get(url, timeout=30)
-        response.raise_for_status()
+            if 'coins' not in data:
+                print(f"[WARNING] DeFi Llama response missing 'coins' field")
+                continue
 
-        data = response.json()
+            for coin_key in chunk:
+                if coin_key in data['coins']:
+                    coin_data = data['coins'][coin_key]
 
-        if 'coins' not in data:
-            print(f"[WARNING] DeFi Llama response missing 'coins' field")
-            return {}
-
-        results = {}
-        for contract in token_contracts:
-            coin_key = f"sui:{contract}"
-            if coin_key in data['coins']:
-                coin_data = data['coins'][coin_key]
+                    price = float(coin_data.get('price', 0))
+                    timestamp_unix = int(coin_data.get('timestamp', 0))
+                    confidence = coin_data.get('confidence', None)
 
-                price = float(coin_data.get('price', 0))
-                timestamp_unix = int(coin_data.get('timestamp', 0))
-                confidence = coin_data.get('confidence', None)
+                    # Store tuple: (price, timestamp, confidence)
+                    results[coin_key[len("sui:"):]] = (price, datetime.fromtimestamp(timestamp_unix), confidence)
 
-                # Convert Unix timestamp to datetime
-                timestamp = datetime.fromtimestamp(timestamp_unix)
+        except Exception as e:
+            print(f"[ERROR] DeFi Llama batch fetch failed ({len(chunk)} coins): {e}")
 
-                # Store tuple: (price, timestamp, confidence)
-                results[contract] = (price, timestamp, confidence)
-
-        return results
-
-    except Exception as e:
-        print(f"[ERROR] DeFi Llama batch fetch failed: {e}")
-        return {}
+    return results
 
 
 def update_oracle_price(
@@ -410,10 +423,90 @@ def update_oracle_price(
         return False
 
 
+def upsert_oracle_prices(prices_df: pd.DataFrame) -> int:
+    """
+    Write many oracle_prices rows in a single set-based UPSERT.
+
+    Same per-column semantics as update_oracle_price(): a NULL incoming value
+    keeps the stored one (and its timestamp), non-NULL values overwrite.
+
+    Args:
+        prices_df: One row per token with token_contract, symbol, coingecko,
+            coingecko_time, pyth, pyth_time, defillama, defillama_time,
+            defillama_confidence, latest_price, latest_oracle, latest_time
+
+    Returns:
+        Number of rows written
+    """
+    if prices_df.empty:
+        return 0
+
+    columns = [
+        'token_contract', 'symbol',
+        'coingecko', 'coingecko_time',
+        'pyth', 'pyth_time',
+        'defillama', 'defillama_time', 'defillama_confidence',
+        'latest_price', 'latest_oracle', 'latest_time',
+    ]
+    last_updated = datetime.now()
+
+    # Column arrays -> native Python values (None for NaN/NaT), then zip into row tuples
+    column_values = []
+    for col in columns:
+        series = prices_df[col]
+        if pd.api.types.is_datetime64_any_dtype(series):
+            values = np.where(series.notna(), series.dt.to_pydatetime(), None)
+        else:
+            values = series.astype(object).where(series.notna(), None).to_numpy()
+        column_values.append(values.tolist())
+    rows = [row + (last_updated,) for row in zip(*column_values)]
+
+    conflict_clause = """
+        ON CONFLICT (token_contract) DO UPDATE SET
+            coingecko = COALESCE(excluded.coingecko, oracle_prices.coingecko),
+            coingecko_time = CASE WHEN excluded.coingecko IS NOT NULL
+                                  THEN excluded.coingecko_time ELSE oracle_prices.coingecko_time END,
+            pyth = COALESCE(excluded.pyth, oracle_prices.pyth),
+            pyth_time = CASE WHEN excluded.pyth IS NOT NULL
+                             THEN excluded.pyth_time ELSE oracle_prices.pyth_time END,
+            defillama = COALESCE(excluded.defillama, oracle_prices.defillama),
+            defillama_time = CASE WHEN excluded.defillama IS NOT NULL
+                                  THEN excluded.defillama_time ELSE oracle_prices.defillama_time END,
+            defillama_confidence = COALESCE(excluded.defillama_confidence, oracle_prices.defillama_confidence),
+            latest_price = COALESCE(excluded.latest_price, oracle_prices.latest_price),
+            latest_oracle = COALESCE(excluded.latest_oracle, oracle_prices.latest_oracle),
+            latest_time = COALESCE(excluded.latest_time, oracle_prices.latest_time),
+            last_updated = excluded.last_updated
+    """
+    insert_clause = f"INSERT INTO oracle_prices ({', '.join(columns)}, last_updated) VALUES"
+
+    engine = get_db_engine()
+    raw_conn = engine.raw_connection()
+    try:
+        cursor = raw_conn.cursor()
+        if settings.USE_CLOUD_DB:
+            # PostgreSQL: one multi-row INSERT ... ON CONFLICT statement
+            from psycopg2.extras import execute_values
+            execute_values(cursor, f"{insert_clause} %s {conflict_clause}", rows, page_size=len(rows))
+        else:
+            placeholders = "(" + ", ".join(["?"] * (len(columns) + 1)) + ")"
+            cursor.executemany(f"{insert_clause} {placeholders} {conflict_clause}", rows)
+        raw_conn.commit()
+        return len(rows)
+    except Exception:
+        raw_conn.rollback()
+        raise
+    finally:
+        raw_conn.close()
+
+
 def fetch_all_oracle_prices(dry_run: bool = False) -> dict:
     """
-    Fetch prices from all oracles for all tokens in oracle_prices table.
-    Uses batch fetching for CoinGecko to avoid rate limits.
+    Fetch prices from all oracles for all tokens in token_registry.
+
+    The CoinGecko, Pyth and DeFi Llama batches run concurrently (each source
+    fetches its own URL-sized chunks sequentially), and every resulting
+    oracle_prices row is written with one bulk UPSERT.
 
     Args:
         dry_run: If True, only show what would be updated
@@ -445,108 +538,61 @@ def fetch_all_oracle_prices(dry_run: bool = False) -> dict:
 
     print(f"[INFO] Found {len(df)} tokens with oracle IDs")
 
-    # Batch fetch CoinGecko prices
-    coingecko_ids = []
-    cg_id_to_info = {}  # Map coingecko_id -> (token_contract, symbol)
-
-    for _, row in df.iterrows():
-        if pd.notna(row['coingecko_id']):
-            cg_id = row['coingecko_id']
-            coingecko_ids.append(cg_id)
-            cg_id_to_info[cg_id] = (row['token_contract'], row['symbol'])
-
-    print(f"[INFO] Batch fetching {len(coingecko_ids)} CoinGecko prices...")
-    coingecko_prices = fetch_coingecko_prices_batch(coingecko_ids)
-    print(f"[SUCCESS] Fetched {len(coingecko_prices)} CoinGecko prices")
-
-    # Batch fetch Pyth prices
-    pyth_ids = []
-    for _, row in df.iterrows():
-        if pd.notna(row['pyth_id']):
-            pyth_ids.append(row['pyth_id'])
-
-    if pyth_ids:
-        print(f"[INFO] Batch fetching {len(pyth_ids)} Pyth prices...")
-        pyth_prices = fetch_pyth_prices_batch(pyth_ids)
-        print(f"[SUCCESS] Fetched {len(pyth_prices)} Pyth prices")
-    else:
-        pyth_prices = {}
-
-    # Batch fetch DeFi Llama prices
+    coingecko_ids = df['coingecko_id'].dropna().unique().tolist()
+    pyth_ids = df['pyth_id'].dropna().unique().tolist()
     token_contracts = df['token_contract'].tolist()
-    print(f"[INFO] Batch fetching {len(token_contracts)} DeFi Llama prices...")
-    defillama_prices = fetch_defillama_prices_batch(token_contracts)
-    print(f"[SUCCESS] Fetched {len(defillama_prices)} DeFi Llama prices")
-
-    # Process each token
-    total = len(df)
-    updated = 0
-    failed = 0
-
-    for idx, row in df.iterrows():
-        token_contract = row['token_contract']
-        symbol = row['symbol']
-        coingecko_id = row['coingecko_id']
-        pyth_id = row['pyth_id']
-
-        print(f"\n[{idx + 1}/{total}] Processing {symbol}...")
-
-        # Get CoinGecko price from batch results
-        coingecko_result = None
-        if pd.notna(coingecko_id):
-            if coingecko_id in coingecko_prices:
-                coingecko_result = coingecko_prices[coingecko_id]
-                price, _ = coingecko_result
-                print(f"  [OK] CoinGecko: ${price:.6f}")
-            else:
-                print(f"  [SKIP] CoinGecko: No price for {coingecko_id}")
-
-        # Get Pyth price from batch results
-        pyth_result = None
-        if pd.notna(pyth_id):
-            if pyth_id in pyth_prices:
-                pyth_result = pyth_prices[pyth_id]
-                price, _ = pyth_result
-                print(f"  [OK] Pyth: ${price:.6f}")
-            else:
-                print(f"  [SKIP] Pyth: No price for {pyth_id[:16]}...")
-
-        # Get DeFi Llama price from batch results
-        defillama_result = None
-        if token_contract in defillama_prices:
-            defillama_result = defillama_prices[token_contract]
-            dl_price, _, dl_confidence = defillama_result
-            conf_str = f" (confidence: {dl_confidence:.2f})" if dl_confidence else ""
-            print(f"  [OK] DeFi Llama: ${dl_price:.6f}{conf_str}")
-        else:
-            print(f"  [SKIP] DeFi Llama: No price for {token_contract[:20]}...")
 
-        # Update database
-        if coingecko_result or pyth_result or defillama_result:
-            cg_price, cg_time = coingecko_result if coingecko_result else (None, None)
-            pyth_price, pyth_time = pyth_result if pyth_result else (None, None)
+    print(f"[INFO] Fetching {len(coingecko_ids)} CoinGecko, {len(pyth_ids)} Pyth, "
+          f"{len(token_contracts)} DeFi Llama prices concurrently...")
 
-            # Extract DeFi Llama data
-            if defillama_result:
-                dl_price, dl_time, dl_confidence = defillama_result
-            else:
-                dl_price, dl_time, dl_confidence = None, None, None
-
-            success = update_oracle_price(
-                token_contract, symbol,
-                cg_price, cg_time,
-                pyth_price, pyth_time,
-                dl_price, dl_time, dl_confidence,
-                dry_run=dry_run
-            )
-
-            if success:
-                updated += 1
-            else:
-                failed += 1
-        else:
-            print(f"  [SKIP] No valid prices fetched for {symbol}")
-            failed += 1
+    # Each source has its own host and rate limit, so the three batches are independent
+    with ThreadPoolExecutor(max_workers=3, thread_name_prefix="oracle") as pool:
+        cg_future = pool.submit(fetch_coingecko_prices_batch, coingecko_ids)
+        pyth_future = pool.submit(fetch_pyth_prices_batch, pyth_ids)
+        dl_future = pool.submit(fetch_defillama_prices_batch, token_contracts)
+        coingecko_prices = cg_future.result()
+        pyth_prices = pyth_future.result()
+        defillama_prices = dl_future.result()
+
+    print(f"[SUCCESS] Fetched {len(coingecko_prices)} CoinGecko, {len(pyth_prices)} Pyth, "
+          f"{len(defillama_prices)} DeFi Llama prices")
+
+    # Map batch results back onto token rows (column-wise lookups, no per-row loop)
+    def _lookup(keys: pd.Series, results: dict, position: int) -> pd.Series:
+        return keys.map(lambda k: results[k][position] if k in results else None)
+
+    prices_df = df[['token_contract', 'symbol']].copy()
+    prices_df['coingecko'] = pd.to_numeric(_lookup(df['coingecko_id'], coingecko_prices, 0))
+    prices_df['coingecko_time'] = pd.to_datetime(_lookup(df['coingecko_id'], coingecko_prices, 1))
+    prices_df['pyth'] = pd.to_numeric(_lookup(df['pyth_id'], pyth_prices, 0))
+    prices_df['pyth_time'] = pd.to_datetime(_lookup(df['pyth_id'], pyth_prices, 1))
+    prices_df['defillama'] = pd.to_numeric(_lookup(df['token_contract'], defillama_prices, 0))
+    prices_df['defillama_time'] = pd.to_datetime(_lookup(df['token_contract'], defillama_prices, 1))
+    prices_df['defillama_confidence'] = pd.to_numeric(_lookup(df['token_contract'], defillama_prices, 2))
+
+    prices_df = prices_df.join(compute_latest_prices(prices_df))
+
+    has_price = prices_df[['coingecko', 'pyth', 'defillama']].notna().any(axis=1)
+    total = len(prices_df)
+    missing = prices_df.loc[~has_price, 'symbol'].tolist()
+    if missing:
+        print(f"[SKIP] No valid prices fetched for {len(missing)} token(s): {', '.join(missing)}")
+
+    to_write = prices_df[has_price]
+
+    if dry_run:
+        print(f"[DRY RUN] Would upsert {len(to_write)} oracle_prices rows:")
+        print(to_write[['symbol', 'coingecko', 'pyth', 'defillama', 'latest_price', 'latest_oracle']].to_string(index=False))
+        updated = len(to_write)
+        failed = total - updated
+    else:
+        try:
+            updated = upsert_oracle_prices(to_write)
+            failed = total - updated
+        except Exception as e:
+            print(f"[ERROR] Bulk oracle_prices upsert failed: {e}")
+            updated = 0
+            failed = total
 
     print(f"\n[SUMMARY] Total: {total}, Updated: {updated}, Failed: {failed}")
 
@@ -45,10 +45,12 @@ def get_latest_price_from_snapshot(conn: sqlite3.Connection, coin_type: str) ->
     Returns:
         Tuple of (price, timestamp) or None if not found
     """
+    from data.snapshot_diff import rates_source_for
+
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT price_usd, timestamp
-        FROM rates_snapshot
+        FROM {rates_source_for(cursor, use_cloud=False, key=str(DB_PATH))}
         WHERE token_contract = ?
           AND price_usd IS NOT NULL
         ORDER BY timestamp DESC
@@ -119,8 +121,10 @@ def get_price_history_stats(conn: sqlite3.Connection, coin_type: str) -> Optiona
     Returns:
         Dict with price statistics or None
     """
+    from data.snapshot_diff import rates_source_for
+
     cursor = conn.cursor()
-    cursor.execute("""
+    cursor.execute(f"""
         SELECT
             COUNT(*) as count,
             MIN(price_usd) as min_price,
@@ -128,7 +132,7 @@ def get_price_history_stats(conn: sqlite3.Connection, coin_type: str) -> Optiona
             AVG(price_usd) as avg_price,
             MIN(timestamp) as first_seen,
             MAX(timestamp) as last_seen
-        FROM rates_snapshot
+        FROM {rates_source_for(cursor, use_cloud=False, key=str(DB_PATH))}
         WHERE token_contract = ?
           AND price_usd IS NOT NULL
     """, (coin_type,))
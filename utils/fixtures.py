@@ -0,0 +1,185 @@
+"""
+Record / replay fixtures for offline refresh runs.
+
+A fixture directory holds everything a refresh_pipeline() run read from the
+outside world:
+
+    <dir>/manifest.json          - run timestamp + metadata (written in record mode)
+    <dir>/<host>/<key>.json      - HTTP JSON responses (utils.http_client.ResponseCache)
+    <dir>/node/<key>.json        - Node SDK script results (stdout, stderr, returncode)
+
+Record mode runs the live readers and captures every payload; replay mode feeds
+the same payloads back through the same readers, so fetch -> merge -> analyze ->
+save can be profiled deterministically without network access.
+
+Usage:
+    python main.py --record fixtures/2026-10-18      # capture a live run
+    python main.py --replay fixtures/2026-10-18      # re-run it offline
+"""
+
+import json
+import os
+import subprocess
+from datetime import datetime
+from pathlib import Path
+from typing import Dict, Optional
+
+from utils.http_client import ResponseCache
+
+MANIFEST_FILE = 'manifest.json'
+
+# Env vars that only select an endpoint; excluded from the fixture key so a
+# recording replays regardless of which RPC the recorder happened to use.
+_ENDPOINT_ENV_KEYS = ('SUI_RPC_URL', 'SUI_FALLBACK_RPC_URL')
+
+
+def _fixture_cache() -> Optional[ResponseCache]:
+    """ResponseCache for the configured fixture directory, or None when disabled."""
+    from config import settings
+
+    cache_dir = getattr(settings, 'HTTP_CACHE_DIR', None)
+    cache_mode = getattr(settings, 'HTTP_CACHE_MODE', None)
+    if cache_dir and cache_mode:
+        return ResponseCache(cache_dir, cache_mode)
+    return None
+
+
+def run_node_script(
+    script_path: str,
+    env_overrides: Optional[Dict[str, str]] = None,
+    timeout: int = 60,
+) -> subprocess.CompletedProcess:
+    """
+    Run a Node SDK wrapper script, recording or replaying its output.
+
+    Behaves like subprocess.run(["node", script_path], capture_output=True, text=True)
+    with env_overrides applied on top of os.environ. In record mode the result is
+    written to the fixture directory; in replay mode node is never started.
+
+    Args:
+        script_path: Path to the .mjs wrapper script
+        env_overrides: Extra environment variables for the script
+        timeout: Seconds before subprocess.TimeoutExpired is raised
+
+    Returns:
+        subprocess.CompletedProcess with returncode, stdout and stderr
+
+    Raises:
+        subprocess.TimeoutExpired: Script timed out (live, or recorded as timed out)
+        CacheMissError: Replay mode and this script was never recorded
+    """
+    env_overrides = dict(env_overrides or {})
+    args = ["node", script_path]
+
+    cache = _fixture_cache()
+    url = f"node://node/{Path(script_path).name}"
+    key_params = {k: v for k, v in env_overrides.items() if k not in _ENDPOINT_ENV_KEYS}
+
+    if cache is not None and cache.mode == 'replay':
+        record = cache.load('RUN', url, key_params)
+        if record.get('timeout'):
+            raise subprocess.TimeoutExpired(args, timeout)
+        return subprocess.CompletedProcess(args, record['returncode'], record['stdout'], record['stderr'])
+
+    env = os.environ.copy()
+    env.update(env_overrides)
+
+    try:
+        res = subprocess.run(
+            args,
+            capture_output=True,
+            text=True,
+            env=env,
+            check=False,
+            timeout=timeout,
+        )
+    except subprocess.TimeoutExpired:
+        if cache is not None:
+            cache.store('RUN', url, key_params, None, {'timeout': True})
+        raise
+
+    if cache is not None:
+        cache.store('RUN', url, key_params, None, {
+            'returncode': res.returncode,
+            'stdout': res.stdout,
+            'stderr': res.stderr,
+        })
+    return res
+
+
+def configure_fixture_mode(
+    mode: str,
+    directory: str,
+    sqlite_path: Optional[str] = None,
+    force: bool = False
+) -> datetime:
+    """
+    Point this process at a fixture directory and a fresh local SQLite database.
+
+    Must be called before the first reader / database access. Overrides the
+    relevant settings in-process (USE_CLOUD_DB, SQLITE_PATH, HTTP_CACHE_DIR,
+    HTTP_CACHE_MODE) and resets the shared HTTP client and DB engines.
+
+    Args:
+        mode: 'record' or 'replay'
+        directory: Fixture directory
+        sqlite_path: Local database for this run (default: <directory>/<mode>.db).
+                     Recreated from schema.sql on every call so runs start identical.
+        force: Allow sqlite_path to replace an existing database outside the fixture
+               directory (e.g. data/lending_rates.db). Refused otherwise.
+
+    Returns:
+        Timestamp to pass to refresh_pipeline(). Record mode uses now and writes it
+        to the manifest; replay mode reads it back so time-based logic matches.
+
+    Raises:
+        ValueError: Unknown mode
+        FileNotFoundError: Replay mode and the directory has no manifest
+        FileExistsError: sqlite_path is an existing file outside the directory and force is False
+    """
+    from config import settings
+    from data.db_utils import dispose_engines
+    from data.init_db import init_sqlite
+    from utils.http_client import set_http_client
+
+    if mode not in ResponseCache.MODES:
+        raise ValueError(f"Unknown fixture mode '{mode}'. Expected one of {ResponseCache.MODES}")
+
+    fixture_dir = Path(directory)
+    manifest_path = fixture_dir / MANIFEST_FILE
+
+    db_path = sqlite_path or str(fixture_dir / f"{mode}.db")
+    # The database is deleted below; never a real one by accident (checked before any writes)
+    outside_fixture_dir = fixture_dir.resolve() not in Path(db_path).resolve().parents
+    if os.path.exists(db_path) and outside_fixture_dir and not force:
+        raise FileExistsError(
+            f"Refusing to recreate existing database {db_path} outside fixture directory "
+            f"{fixture_dir} - pass force=True (--force) to replace it"
+        )
+
+    if mode == 'record':
+        fixture_dir.mkdir(parents=True, exist_ok=True)
+        timestamp = datetime.now().replace(second=0, microsecond=0)
+        with open(manifest_path, 'w') as f:
+            json.dump({'timestamp': timestamp.isoformat(), 'recorded_at': datetime.now().isoformat()}, f, indent=2)
+    else:
+        if not manifest_path.exists():
+            raise FileNotFoundError(f"No {MANIFEST_FILE} in {fixture_dir} - record a run first")
+        with open(manifest_path, 'r') as f:
+            timestamp = datetime.fromisoformat(json.load(f)['timestamp'])
+
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    settings.USE_CLOUD_DB = False
+    settings.SQLITE_PATH = db_path
+    settings.HTTP_CACHE_DIR = str(fixture_dir)
+    settings.HTTP_CACHE_MODE = mode
+
+    dispose_engines()
+    set_http_client(None)
+    init_sqlite(db_path)
+
+    print(f"[FIXTURE] Mode: {mode} | dir: {fixture_dir} | db: {db_path} | timestamp: {timestamp}")
+    return timestamp
+
@@ -0,0 +1,449 @@
+"""
+Shared HTTP client for all external JSON fetches.
+
+Every protocol reader and oracle/ID utility goes through get_http_client() so that:
+- connections are reused (one keep-alive requests.Session per host)
+- each host has its own token-bucket rate limit (HOST_RATE_LIMITS)
+- retries/backoff are uniform: 429/5xx, timeouts and connection errors are retried
+  with exponential backoff (Retry-After is honoured when the server sends it)
+- per-host metrics are collected: requests, retries, errors, bytes, latency
+- responses can optionally be recorded to / replayed from disk (ResponseCache)
+
+Failures are raised as requests.exceptions.RequestException subclasses, so
+existing `except requests.exceptions.RequestException` handlers keep working.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+
+DEFAULT_USER_AGENT = 'SuiLendingBot/1.0'
+
+# Status codes worth retrying: rate limited or transient upstream failure
+RETRYABLE_STATUS = (429, 500, 502, 503, 504)
+
+
+@dataclass
+class HostPolicy:
+    """Rate limit and retry policy for one host."""
+    rate_per_second: float = 5.0   # Sustained request rate (token refill rate)
+    burst: int = 10                # Bucket capacity (requests allowed back-to-back)
+    max_retries: int = 3           # Total attempts = max_retries
+    backoff_base: float = 1.0      # Delay before retry n = backoff_base * 2**(n-1) seconds
+    max_backoff: float = 30.0      # Cap on any single retry delay
+    timeout: float = 30.0          # Per-request timeout (seconds)
+
+
+# Per-host policies. Hosts not listed here use HostPolicy() defaults.
+# CoinGecko's public tier allows roughly 30 calls/minute; the rest are generous APIs.
+HOST_RATE_LIMITS: Dict[str, HostPolicy] = {
+    'api.coingecko.com': HostPolicy(rate_per_second=0.5, burst=3, backoff_base=2.0),
+    'hermes.pyth.network': HostPolicy(rate_per_second=5.0, burst=10),
+    'coins.llama.fi': HostPolicy(rate_per_second=5.0, burst=10),
+    'open-api.naviprotocol.io': HostPolicy(rate_per_second=5.0, burst=5, timeout=10.0),
+    'devapi.pebble-finance.com': HostPolicy(rate_per_second=5.0, burst=5, timeout=10.0),
+    'api.sui-prod.bluefin.io': HostPolicy(rate_per_second=4.0, burst=8, backoff_base=2.0),
+    'aggregator.api.sui-prod.bluefin.io': HostPolicy(rate_per_second=10.0, burst=10, backoff_base=2.0),
+    'sdk.api.scallop.io': HostPolicy(rate_per_second=5.0, burst=10),
+}
+
+
+class CacheMissError(requests.exceptions.RequestException):
+    """Raised in replay mode when no recorded response exists for a request."""
+
+
+class TokenBucket:
+    """Thread-safe token bucket; acquire() blocks until a token is available."""
+
+    def __init__(self, rate_per_second: float, capacity: int):
+        self.rate = max(rate_per_second, 1e-6)
+        self.capacity = max(capacity, 1)
+        self._tokens = float(self.capacity)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping if necessary. Returns seconds waited."""
+        waited = 0.0
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._last) * self.rate)
+                self._last = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return waited
+                delay = (1.0 - self._tokens) / self.rate
+            time.sleep(delay)
+            waited += delay
+
+
+@dataclass
+class HostMetrics:
+    """Counters for one host."""
+    requests: int = 0
+    retries: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    bytes_received: int = 0
+    total_latency_s: float = 0.0
+    max_latency_s: float = 0.0
+    throttle_wait_s: float = 0.0
+
+    def as_dict(self) -> dict:
+        avg = self.total_latency_s / self.requests if self.requests else 0.0
+        return {
+            'requests': self.requests,
+            'retries': self.retries,
+            'errors': self.errors,
+            'cache_hits': self.cache_hits,
+            'bytes_received': self.bytes_received,
+            'avg_latency_ms': round(avg * 1000, 1),
+            'max_latency_ms': round(self.max_latency_s * 1000, 1),
+            'throttle_wait_ms': round(self.throttle_wait_s * 1000, 1),
+        }
+
+
+class ResponseCache:
+    """
+    On-disk store of JSON responses keyed by (method, url, params, body).
+
+    Modes:
+        'record' - every successful live response is written to disk
+        'replay' - responses are served from disk only; a miss raises CacheMissError
+    """
+
+    MODES = ('record', 'replay')
+
+    def __init__(self, directory: str, mode: str):
+        if mode not in self.MODES:
+            raise ValueError(f"Unknown cache mode '{mode}'. Expected one of {self.MODES}")
+        self.directory = Path(directory)
+        self.mode = mode
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def request_key(method: str, url: str, params: Any = None, body: Any = None) -> str:
+        """Stable hash of a request (params order-insensitive for dicts)."""
+        if isinstance(params, dict):
+            params = sorted((str(k), str(v)) for k, v in params.items())
+        elif params is not None:
+            params = [(str(k), str(v)) for k, v in params]
+        payload = json.dumps([method.upper(), url, params, body], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+
+    def _path(self, url: str, key: str) -> Path:
+        host = urlsplit(url).netloc or 'local'
+        return self.directory / host / f"{key}.json"
+
+    def load(self, method: str, url: str, params: Any = None, body: Any = None) -> Any:
+        key = self.request_key(method, url, params, body)
+        path = self._path(url, key)
+        if not path.exists():
+            raise CacheMissError(f"No recorded response for {method.upper()} {url} (key {key}) in {self.directory}")
+        with open(path, 'r') as f:
+            return json.load(f)['response']
+
+    def store(self, method: str, url: str, params: Any, body: Any, response_json: Any) -> None:
+        key = self.request_key(method, url, params, body)
+        path = self._path(url, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        record = {'method': method.upper(), 'url': url, 'params': params, 'body': body, 'response': response_json}
+        with open(path, 'w') as f:
+            json.dump(record, f, default=str)
+
+
+class HttpClient:
+    """Keep-alive, rate-limited, retrying JSON client shared by all readers."""
+
+    def __init__(
+        self,
+        host_policies: Optional[Dict[str, HostPolicy]] = None,
+        cache: Optional[ResponseCache] = None,
+        user_agent: str = DEFAULT_USER_AGENT,
+    ):
+        self.host_policies = dict(HOST_RATE_LIMITS if host_policies is None else host_policies)
+        self.cache = cache
+        self.user_agent = user_agent
+        self._sessions: Dict[str, requests.Session] = {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._metrics: Dict[str, HostMetrics] = {}
+        self._lock = threading.Lock()
+
+    # ------------------------------------------------------------------
+    # Per-host state
+    # ------------------------------------------------------------------
+    def policy_for(self, host: str) -> HostPolicy:
+        return self.host_policies.get(host, HostPolicy())
+
+    def _host_state(self, host: str):
+        with self._lock:
+            if host not in self._sessions:
+                policy = self.policy_for(host)
+                session = requests.Session()
+                # Retries are handled here (uniformly), not by urllib3
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=max(policy.burst, 4), max_retries=0)
+                session.mount('https://', adapter)
+                session.mount('http://', adapter)
+                session.headers.update({'User-Agent': self.user_agent, 'Accept': 'application/json'})
+                self._sessions[host] = session
+                self._buckets[host] = TokenBucket(policy.rate_per_second, policy.burst)
+                self._metrics[host] = HostMetrics()
+            return self._sessions[host], self._buckets[host], self._metrics[host]
+
+    # ------------------------------------------------------------------
+    # Requests
+    # ------------------------------------------------------------------
+    def get_json(self, url: str, params: Any = None, **kwargs) -> Any:
+        """GET url and return the decoded JSON body."""
+        return self.request_json('GET', url, params=params, **kwargs)
+
+    def post_json(self, url: str, json_body: Any = None, **kwargs) -> Any:
+        """POST a JSON body and return the decoded JSON response."""
+        return self.request_json('POST', url, json_body=json_body, **kwargs)
+
+    def request_json(
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        json_body: Any = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+    ) -> Any:
+        """
+        Perform a request with rate limiting, retries and metrics; return decoded JSON.
+
+        Args:
+            method: HTTP method ('GET', 'POST')
+            url: Absolute URL
+            params: Query parameters (dict or list of tuples)
+            json_body: JSON body for POST
+            headers: Extra headers for this request
+            timeout / max_retries / backoff_base: Override the host policy
+
+        Raises:
+            requests.exceptions.RequestException: After the final failed attempt
+            CacheMissError: In replay mode when the request was never recorded
+        """
+        data, _ = self._send(method, url, params, json_body, headers, timeout, max_retries, backoff_base)
+        return data
+
+    def get_json_if_modified(
+        self,
+        url: str,
+        params: Any = None,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+        **kwargs,
+    ) -> Tuple[bool, Any, Dict[str, str]]:
+        """
+        Conditional GET (If-None-Match / If-Modified-Since) for large, rarely changing documents.
+
+        Args:
+            url / params: As get_json()
+            etag: ETag from the previous response, if any
+            last_modified: Last-Modified from the previous response, if any
+            **kwargs: timeout / max_retries / backoff_base overrides
+
+        Returns:
+            (modified, data, validators):
+            - (False, None, validators) on 304 Not Modified
+            - (True, decoded JSON, validators) otherwise
+            validators holds the response's 'etag' / 'last_modified' (when sent)
+
+        Raises:
+            requests.exceptions.RequestException: After the final failed attempt
+        """
+        headers = {}
+        if etag:
+            headers['If-None-Match'] = etag
+        if last_modified:
+            headers['If-Modified-Since'] = last_modified
+        data, response = self._send('GET', url, params, None, headers or None, **kwargs)
+
+        validators = {}
+        if response is not None:
+            if response.headers.get('ETag'):
+                validators['etag'] = response.headers['ETag']
+            if response.headers.get('Last-Modified'):
+                validators['last_modified'] = response.headers['Last-Modified']
+            if response.status_code == 304:
+                return False, None, validators
+        return True, data, validators
+
+    def _send(
+        self,
+        method: str,
+        url: str,
+        params: Any = None,
+        json_body: Any = None,
+        headers: Optional[dict] = None,
+        timeout: Optional[float] = None,
+        max_retries: Optional[int] = None,
+        backoff_base: Optional[float] = None,
+    ) -> Tuple[Any, Optional[requests.Response]]:
+        """
+        Request loop behind request_json(): rate limiting, retries, metrics, response cache.
+
+        Returns:
+            (decoded JSON, response); (None, response) for 304 Not Modified;
+            (recorded JSON, None) when replaying from the response cache
+        """
+        host = urlsplit(url).netloc
+        session, bucket, metrics = self._host_state(host)
+
+        if self.cache is not None and self.cache.mode == 'replay':
+            data = self.cache.load(method, url, params, json_body)
+            with self._lock:
+                metrics.cache_hits += 1
+            return data, None
+
+        policy = self.policy_for(host)
+        attempts = max(1, max_retries if max_retries is not None else policy.max_retries)
+        base = backoff_base if backoff_base is not None else policy.backoff_base
+        req_timeout = timeout if timeout is not None else policy.timeout
+
+        last_error: Optional[requests.exceptions.RequestException] = None
+        for attempt in range(1, attempts + 1):
+            waited = bucket.acquire()
+            start = time.perf_counter()
+            retry_after = None
+            try:
+                response = session.request(
+                    method, url, params=params, json=json_body, headers=headers, timeout=req_timeout
+                )
+                elapsed = time.perf_counter() - start
+                self._record(metrics, elapsed, len(response.content), waited)
+
+                if response.status_code in RETRYABLE_STATUS and attempt < attempts:
+                    retry_after = self._retry_after_seconds(response)
+                    raise requests.exceptions.HTTPError(
+                        f"{response.status_code} from {host}", response=response
+                    )
+
+                response.raise_for_status()
+                if response.status_code == 304:
+                    return None, response
+                data = response.json()
+
+                if self.cache is not None and self.cache.mode == 'record':
+                    self.cache.store(method, url, params, json_body, data)
+                return data, response
+
+            except (requests.exceptions.Timeout, requests.exceptions.ConnectionError, requests.exceptions.HTTPError) as e:
+                if isinstance(e, (requests.exceptions.Timeout, requests.exceptions.ConnectionError)):
+                    self._record(metrics, time.perf_counter() - start, 0, waited)
+                last_error = e
+                status = getattr(getattr(e, 'response', None), 'status_code', None)
+                retryable = status is None or status in RETRYABLE_STATUS
+                if not retryable or attempt >= attempts:
+                    break
+                delay = min(policy.max_backoff, retry_after if retry_after is not None else base * 2 ** (attempt - 1))
+                with self._lock:
+                    metrics.retries += 1
+                print(f"  [HTTP] {host}: {e.__class__.__name__} ({status or 'no response'}), "
+                      f"retrying in {delay:.1f}s (attempt {attempt}/{attempts})")
+                time.sleep(delay)
+
+            except requests.exceptions.RequestException as e:
+                last_error = e
+                break
+
+            except ValueError as e:
+                # Body was not valid JSON
+                last_error = requests.exceptions.RequestException(f"Invalid JSON from {host}: {e}")
+                break
+
+        with self._lock:
+            metrics.errors += 1
+        raise last_error
+
+    @staticmethod
+    def _retry_after_seconds(response: requests.Response) -> Optional[float]:
+        value = response.headers.get('Retry-After')
+        try:
+            return float(value) if value is not None else None
+        except ValueError:
+            return None
+
+    def _record(self, metrics: HostMetrics, elapsed: float, size: int, waited: float) -> None:
+        with self._lock:
+            metrics.requests += 1
+            metrics.bytes_received += size
+            metrics.total_latency_s += elapsed
+            metrics.max_latency_s = max(metrics.max_latency_s, elapsed)
+            metrics.throttle_wait_s += waited
+
+    # ------------------------------------------------------------------
+    # Metrics / lifecycle
+    # ------------------------------------------------------------------
+    def get_metrics(self) -> Dict[str, dict]:
+        """Per-host metrics snapshot."""
+        with self._lock:
+            return {host: m.as_dict() for host, m in self._metrics.items()}
+
+    def reset_metrics(self) -> None:
+        with self._lock:
+            for host in self._metrics:
+                self._metrics[host] = HostMetrics()
+
+    def print_metrics(self) -> None:
+        """Log one line per host that was contacted."""
+        for host, m in sorted(self.get_metrics().items()):
+            print(f"[HTTP] {host}: {m['requests']} req, {m['retries']} retries, {m['errors']} errors, "
+                  f"{m['cache_hits']} cached, {m['bytes_received'] / 1024:.1f} KiB, "
+                  f"avg {m['avg_latency_ms']:.0f}ms / max {m['max_latency_ms']:.0f}ms")
+
+    def close(self) -> None:
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
+            self._buckets.clear()
+
+
+# Singleton client (same lifecycle pattern as data.db_utils engines)
+_client: Optional[HttpClient] = None
+_client_lock = threading.Lock()
+
+
+def get_http_client() -> HttpClient:
+    """
+    Get the process-wide HttpClient.
+
+    If settings.HTTP_CACHE_DIR and settings.HTTP_CACHE_MODE are set, the client
+    records responses to / replays responses from that directory.
+    """
+    global _client
+    with _client_lock:
+        if _client is None:
+            from config import settings
+
+            cache = None
+            cache_dir = getattr(settings, 'HTTP_CACHE_DIR', None)
+            cache_mode = getattr(settings, 'HTTP_CACHE_MODE', None)
+            if cache_dir and cache_mode:
+                cache = ResponseCache(cache_dir, cache_mode)
+                print(f"[HTTP] Response cache: {cache_mode} ({cache_dir})")
+            _client = HttpClient(cache=cache)
+        return _client
+
+
+def set_http_client(client: Optional[HttpClient]) -> None:
+    """Replace the process-wide client (None resets to lazy default)."""
+    global _client
+    with _client_lock:
+        if _client is not None and _client is not client:
+            _client.close()
+        _client = client
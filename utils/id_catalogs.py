@@ -0,0 +1,188 @@
+"""
+Disk-cached CoinGecko / Pyth catalogs for token_registry ID population.
+
+populate_coingecko_ids_auto() and populate_pyth_ids_auto() run whenever a refresh
+inserts new tokens. Each run downloaded the whole CoinGecko /coins/list (with
+platforms, several MB) or the Pyth Hermes feed catalog, only to look up a handful
+of contracts. Here each catalog is reduced once to the small lookup indexes the
+matchers need (contract -> id, symbol -> id) and stored on disk
+(settings.CATALOG_CACHE_DIR) with the response's ETag / Last-Modified:
+
+- younger than its TTL: the index is read from disk, no request is made
+- older: the catalog is revalidated with If-None-Match / If-Modified-Since; a 304
+  keeps the index (and restarts the TTL), a 200 rebuilds it
+- the fetch fails: a stale index is used (with a warning) rather than nothing
+
+While the HTTP response cache is active (main.py --record/--replay) the disk
+catalog is bypassed so fixture runs stay reproducible.
+
+bulk_update_token_ids() writes all matched IDs in one UPDATE statement.
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Callable, Dict, Optional
+
+from config import settings
+
+# Bump when an index builder changes shape, so cached indexes are rebuilt
+INDEX_VERSION = 1
+
+# token_registry columns bulk_update_token_ids() may write
+TOKEN_ID_COLUMNS = ('coingecko_id', 'pyth_id')
+
+
+def _catalog_path(name: str) -> Path:
+    return Path(settings.CATALOG_CACHE_DIR) / f"{name}.json"
+
+
+def _read_entry(name: str) -> Optional[dict]:
+    path = _catalog_path(name)
+    if not path.exists():
+        return None
+    try:
+        with open(path, 'r') as f:
+            entry = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"[CATALOG] WARNING: Ignoring unreadable {path}: {e}")
+        return None
+    if entry.get('index_version') != INDEX_VERSION:
+        return None
+    return entry
+
+
+def _write_entry(name: str, entry: dict) -> None:
+    """Write atomically (tmp file + rename) so a crash never leaves half a catalog."""
+    path = _catalog_path(name)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix('.json.tmp')
+    with open(tmp, 'w') as f:
+        json.dump(entry, f)
+    os.replace(tmp, path)
+
+
+def load_catalog_index(
+    name: str,
+    url: str,
+    params: Optional[dict],
+    build_index: Callable[[list], dict],
+    ttl_seconds: float,
+    force_refresh: bool = False,
+) -> Optional[dict]:
+    """
+    Lookup indexes for a remote catalog, from disk when fresh.
+
+    Args:
+        name: Cache file name (e.g. 'coingecko_coins')
+        url / params: Catalog request
+        build_index: fn(catalog JSON) -> JSON-serialisable dict of indexes
+        ttl_seconds: Serve the disk copy without a request for this long
+        force_refresh: Ignore the TTL (still revalidates with ETag / Last-Modified)
+
+    Returns:
+        The indexes, or None if the catalog could not be fetched and nothing is cached
+    """
+    import requests
+    from utils.http_client import get_http_client
+
+    client = get_http_client()
+    if client.cache is not None:
+        # Fixture record/replay: always go through the response cache
+        return build_index(client.get_json(url, params=params, timeout=60))
+
+    entry = _read_entry(name)
+    if entry is not None and (entry.get('url'), entry.get('params')) != (url, params):
+        entry = None
+    now = time.time()
+
+    if entry is not None and not force_refresh and now - entry['fetched_at'] < ttl_seconds:
+        age_h = (now - entry['fetched_at']) / 3600
+        print(f"[CATALOG] {name}: using cached index ({age_h:.1f}h old)")
+        return entry['index']
+
+    try:
+        modified, catalog, validators = client.get_json_if_modified(
+            url,
+            params=params,
+            etag=entry.get('etag') if entry else None,
+            last_modified=entry.get('last_modified') if entry else None,
+            timeout=60,
+        )
+    except requests.exceptions.RequestException as e:
+        if entry is None:
+            print(f"[CATALOG] {name}: fetch failed and nothing cached: {e}")
+            return None
+        age_h = (now - entry['fetched_at']) / 3600
+        print(f"[CATALOG] WARNING: {name}: fetch failed ({e}) - using stale index ({age_h:.1f}h old)")
+        return entry['index']
+
+    if not modified and entry is not None:
+        print(f"[CATALOG] {name}: not modified - keeping cached index")
+        entry['fetched_at'] = now
+        entry.update(validators)
+        _write_entry(name, entry)
+        return entry['index']
+
+    if catalog is None:
+        # 304 without a cached entry (should not happen) - fetch unconditionally next time
+        return None
+
+    index = build_index(catalog)
+    _write_entry(name, {
+        'index_version': INDEX_VERSION,
+        'url': url,
+        'params': params,
+        'fetched_at': now,
+        'etag': validators.get('etag'),
+        'last_modified': validators.get('last_modified'),
+        'index': index,
+    })
+    print(f"[CATALOG] {name}: fetched {len(catalog)} entries, index cached in {settings.CATALOG_CACHE_DIR}")
+    return index
+
+
+def bulk_update_token_ids(engine, column: str, updates: Dict[str, str]) -> int:
+    """
+    Set token_registry.<column> for many contracts in one statement.
+
+    WITH v AS (VALUES ...) UPDATE ... FROM v works on PostgreSQL and SQLite >= 3.33.
+
+    Args:
+        engine: SQLAlchemy engine
+        column: 'coingecko_id' or 'pyth_id'
+        updates: {token_contract: id}
+
+    Returns:
+        Number of token_registry rows updated (contracts in updates that exist in
+        token_registry; sqlite3 reports no rowcount for a statement starting with WITH)
+    """
+    from sqlalchemy import bindparam, text
+
+    if column not in TOKEN_ID_COLUMNS:
+        raise ValueError(f"Unknown token_registry ID column '{column}'. Expected one of {TOKEN_ID_COLUMNS}")
+    if not updates:
+        return 0
+
+    params = {}
+    rows = []
+    for i, (token_contract, value) in enumerate(updates.items()):
+        params[f"c{i}"] = token_contract
+        params[f"v{i}"] = value
+        rows.append(f"(:c{i}, :v{i})")
+
+    query = text(f"""
+        WITH v(token_contract, new_id) AS (VALUES {', '.join(rows)})
+        UPDATE token_registry
+        SET {column} = v.new_id
+        FROM v
+        WHERE token_registry.token_contract = v.token_contract
+    """)
+    existing = text(
+        "SELECT COUNT(*) FROM token_registry WHERE token_contract IN :contracts"
+    ).bindparams(bindparam('contracts', expanding=True))
+    with engine.begin() as conn:
+        matched = conn.execute(existing, {'contracts': list(updates)}).scalar()
+        conn.execute(query, params)
+    return int(matched)
@@ -3,12 +3,15 @@
 Auto-populate coingecko_id field in token_registry by matching contract addresses.
 
 Fetches all coins from CoinGecko API and matches Sui platform contract addresses
-with token_contract values in the database.
+with token_contract values in the database. The contract index built from the coin
+list is cached on disk (utils/id_catalogs.py), so repeat runs within
+settings.COINGECKO_CATALOG_TTL_HOURS make no request.
 
 Usage:
     python utils/populate_coingecko_ids.py           # Update all missing IDs
     python utils/populate_coingecko_ids.py --force   # Update all IDs (overwrite existing)
     python utils/populate_coingecko_ids.py --dry-run # Show matches without updating
+    python utils/populate_coingecko_ids.py --refresh-catalog  # Revalidate the cached coin list now
 """
 
 import argparse
@@ -21,10 +24,14 @@ import time
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from dashboard.db_utils import get_db_engine
-from sqlalchemy import text
+from config import settings
+from data.db_utils import get_db_engine
+from utils.id_catalogs import bulk_update_token_ids, load_catalog_index
 import pandas as pd
 
+COINGECKO_COINS_URL = "https://api.coingecko.com/api/v3/coins/list"
+COINGECKO_COINS_PARAMS = {'include_platform': 'true'}
+
 
 def fetch_coingecko_coin_list() -> list:
     """
@@ -34,16 +41,11 @@ def fetch_coingecko_coin_list() -> list:
         List of coin dictionaries with id, symbol, name, and platforms
     """
     import requests
-
-    url = "https://api.coingecko.com/api/v3/coins/list"
-    params = {'include_platform': 'true'}
+    from utils.http_client import get_http_client
 
     try:
         print("[INFO] Fetching coin list from CoinGecko API...")
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-
-        coins = response.json()
+        coins = get_http_client().get_json(COINGECKO_COINS_URL, params=COINGECKO_COINS_PARAMS, timeout=60)
         print(f"[SUCCESS] Fetched {len(coins)} coins from CoinGecko")
 
         return coins
@@ -83,6 +85,32 @@ def build_contract_to_id_mapping(coins: list) -> Dict[str, Tuple[str, str, str]]
     return mapping
 
 
+def load_contract_mapping(force_refresh: bool = False) -> Dict[str, Tuple[str, str, str]]:
+    """
+    Contract -> (coingecko_id, symbol, name) for Sui coins, from the disk-cached index.
+
+    Downloads the coin list only when the cached index is older than
+    settings.COINGECKO_CATALOG_TTL_HOURS and CoinGecko reports it changed.
+
+    Args:
+        force_refresh: Revalidate with CoinGecko even if the cached index is fresh
+
+    Returns:
+        Same mapping as build_contract_to_id_mapping() (empty if unavailable)
+    """
+    index = load_catalog_index(
+        'coingecko_coins',
+        COINGECKO_COINS_URL,
+        COINGECKO_COINS_PARAMS,
+        build_index=lambda coins: {'contracts': build_contract_to_id_mapping(coins)},
+        ttl_seconds=settings.COINGECKO_CATALOG_TTL_HOURS * 3600,
+        force_refresh=force_refresh,
+    )
+    if not index:
+        return {}
+    return {contract: tuple(entry) for contract, entry in index['contracts'].items()}
+
+
 def normalize_contract_address(contract: str) -> str:
     """
     Normalize contract address for matching.
@@ -104,20 +132,25 @@ def normalize_contract_address(contract: str) -> str:
 def update_token_registry(
     mapping: Dict[str, Tuple[str, str, str]],
     force: bool = False,
-    dry_run: bool = False
+    dry_run: bool = False,
+    engine=None
 ) -> Dict[str, int]:
     """
     Update coingecko_id field in token_registry for matched contracts.
 
+    Matching is a dict lookup per contract; all matches are written with one
+    bulk UPDATE.
+
     Args:
         mapping: Dict mapping contract address to (coingecko_id, symbol, name)
         force: If True, update all tokens (overwrite existing IDs)
         dry_run: If True, show matches without updating database
+        engine: SQLAlchemy engine (default get_db_engine())
 
     Returns:
         Dict with counts: {'total': int, 'matched': int, 'updated': int, 'skipped': int}
     """
-    engine = get_db_engine()
+    engine = engine if engine is not None else get_db_engine()
 
     # Query tokens from database
     if force:
@@ -134,59 +167,28 @@ def update_token_registry(
     print(f"[INFO] Processing {len(df)} tokens from token_registry...")
 
     total = len(df)
-    matched = 0
-    updated = 0
-    skipped = 0
-
-    matches = []
-
-    for idx, row in df.iterrows():
-        token_contract = row['token_contract']
-        db_symbol = row['symbol']
-
-        # Normalize contract for matching
-        normalized_contract = normalize_contract_address(token_contract)
-
-        # Check if we have a match
-        if normalized_contract in mapping:
-            coingecko_id, cg_symbol, cg_name = mapping[normalized_contract]
-            matched += 1
-
-            matches.append({
-                'token_contract': token_contract,
-                'db_symbol': db_symbol,
-                'coingecko_id': coingecko_id,
-                'cg_symbol': cg_symbol,
-                'cg_name': cg_name
-            })
-
+    found = df['token_contract'].map(normalize_contract_address).map(mapping)
+    is_match = found.notna()
+    matched = int(is_match.sum())
+
+    updates = {}
+    for token_contract, db_symbol, match in zip(df['token_contract'], df['symbol'], found):
+        if isinstance(match, tuple):
+            coingecko_id, cg_symbol, cg_name = match
+            updates[token_contract] = coingecko_id
             print(f"[MATCH] {db_symbol:8s} -> {coingecko_id:20s} ({cg_name})")
-
-            if not dry_run:
-                # Update database
-                try:
-                    update_query = text("""
-                    UPDATE token_registry
-                    SET coingecko_id = :coingecko_id
-                    WHERE token_contract = :token_contract
-                    """)
-
-                    with engine.connect() as conn:
-                        conn.execute(update_query, {
-                            'coingecko_id': coingecko_id,
-                            'token_contract': token_contract
-                        })
-                        conn.commit()
-
-                    updated += 1
-
-                except Exception as e:
-                    print(f"[ERROR] Failed to update {db_symbol}: {e}")
-                    skipped += 1
         else:
-            # No match found
             print(f"[NO MATCH] {db_symbol:8s} ({token_contract[:40]}...)")
-            skipped += 1
+
+    updated = 0
+    skipped = total - matched
+    if not dry_run and updates:
+        try:
+            bulk_update_token_ids(engine, 'coingecko_id', updates)
+            updated = len(updates)
+        except Exception as e:
+            print(f"[ERROR] Failed to update coingecko_ids: {e}")
+            skipped += len(updates)
 
     print("\n" + "="*80)
     print(f"[SUMMARY]")
@@ -238,7 +240,7 @@ def verify_updates():
     print("="*80)
 
 
-def populate_coingecko_ids_auto(engine=None, dry_run=False, force=False):
+def populate_coingecko_ids_auto(engine=None, dry_run=False, force=False, refresh_catalog=False):
     """
     Auto-populate coingecko_id for tokens in token_registry.
 
@@ -248,36 +250,20 @@ def populate_coingecko_ids_auto(engine=None, dry_run=False, force=False):
         engine: Optional SQLAlchemy engine. If None, will create one via get_db_engine()
         dry_run: If True, show matches without updating database
         force: If True, update all tokens (overwrite existing IDs)
+        refresh_catalog: If True, revalidate the cached coin list even if it is fresh
 
     Returns:
         int: Number of newly matched/updated tokens (0 if error or no matches)
     """
-    # Use provided engine or create one
-    if engine is None:
-        from dashboard.db_utils import get_db_engine as _get_db_engine
-        engine = _get_db_engine()
-
-    # Store original engine in module globals for update_token_registry to use
-    # (it calls get_db_engine() internally, so we need to make it use our engine)
-    import dashboard.db_utils as db_utils
-    original_get_engine = db_utils.get_db_engine
-    db_utils.get_db_engine = lambda: engine
-
     try:
-        # Fetch coin list from CoinGecko
-        coins = fetch_coingecko_coin_list()
-
-        if not coins:
-            return 0
-
-        # Build contract -> ID mapping
-        mapping = build_contract_to_id_mapping(coins)
+        # Contract -> ID mapping (disk-cached coin list index)
+        mapping = load_contract_mapping(force_refresh=refresh_catalog)
 
         if not mapping:
             return 0
 
         # Update token registry
-        results = update_token_registry(mapping, force=force, dry_run=dry_run)
+        results = update_token_registry(mapping, force=force, dry_run=dry_run, engine=engine)
 
         return results.get('updated', 0) if not dry_run else results.get('matched', 0)
 
@@ -285,10 +271,6 @@ def populate_coingecko_ids_auto(engine=None, dry_run=False, force=False):
         print(f"[ERROR] populate_coingecko_ids_auto failed: {e}")
         return 0
 
-    finally:
-        # Restore original get_db_engine function
-        db_utils.get_db_engine = original_get_engine
-
 
 def main():
     """Main entry point."""
@@ -310,6 +292,11 @@ def main():
         action='store_true',
         help='Only verify current coingecko_id population (no updates)'
     )
+    parser.add_argument(
+        '--refresh-catalog',
+        action='store_true',
+        help='Revalidate the cached CoinGecko coin list even if it is within its TTL'
+    )
 
     args = parser.parse_args()
 
@@ -318,18 +305,11 @@ def main():
         verify_updates()
         sys.exit(0)
 
-    # Fetch coin list from CoinGecko
-    coins = fetch_coingecko_coin_list()
-
-    if not coins:
-        print("[ERROR] Failed to fetch coin list. Exiting.")
-        sys.exit(1)
-
-    # Build contract -> ID mapping
-    mapping = build_contract_to_id_mapping(coins)
+    # Contract -> ID mapping (disk-cached coin list index)
+    mapping = load_contract_mapping(force_refresh=args.refresh_catalog)
 
     if not mapping:
-        print("[WARNING] No Sui tokens found in CoinGecko data")
+        print("[ERROR] No Sui tokens found in CoinGecko data (or coin list unavailable). Exiting.")
         sys.exit(1)
 
     # Update token registry
@@ -6,10 +6,15 @@ Fetches all Pyth price feeds from Hermes API and matches using two-step approach
 1. Primary: Contract address matching (when contract_id field is present with "sui: " prefix)
 2. Secondary: Symbol matching (fallback when no contract_id available)
 
+The contract/symbol indexes built from the feed catalog are cached on disk
+(utils/id_catalogs.py), so repeat runs within settings.PYTH_CATALOG_TTL_HOURS make
+no request.
+
 Usage:
     python utils/populate_pyth_ids.py           # Update all missing IDs
     python utils/populate_pyth_ids.py --force   # Update all IDs (overwrite existing)
     python utils/populate_pyth_ids.py --dry-run # Show matches without updating
+    python utils/populate_pyth_ids.py --refresh-catalog  # Revalidate the cached feed catalog now
 """
 
 import argparse
@@ -22,10 +27,14 @@ import time
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from dashboard.db_utils import get_db_engine
-from sqlalchemy import text
+from config import settings
+from data.db_utils import get_db_engine
+from utils.id_catalogs import bulk_update_token_ids, load_catalog_index
 import pandas as pd
 
+PYTH_FEEDS_URL = "https://hermes.pyth.network/v2/price_feeds"
+PYTH_FEEDS_PARAMS = {'asset_type': 'crypto'}
+
 
 def fetch_pyth_price_feeds() -> list:
     """
@@ -35,16 +44,11 @@ def fetch_pyth_price_feeds() -> list:
         List of price feed dictionaries with id and attributes
     """
     import requests
-
-    url = "https://hermes.pyth.network/v2/price_feeds"
-    params = {'asset_type': 'crypto'}
+    from utils.http_client import get_http_client
 
     try:
         print("[INFO] Fetching price feeds from Pyth Hermes API...")
-        response = requests.get(url, params=params, timeout=30)
-        response.raise_for_status()
-
-        feeds = response.json()
+        feeds = get_http_client().get_json(PYTH_FEEDS_URL, params=PYTH_FEEDS_PARAMS, timeout=60)
         print(f"[SUCCESS] Fetched {len(feeds)} price feeds from Pyth")
 
         return feeds
@@ -94,9 +98,45 @@ def build_pyth_id_mappings(feeds: list) -> Tuple[Dict[str, Tuple[str, str]], Dic
     return contract_mapping, symbol_mapping
 
 
+def _build_pyth_index(feeds: list) -> dict:
+    contract_mapping, symbol_mapping = build_pyth_id_mappings(feeds)
+    return {'contracts': contract_mapping, 'symbols': symbol_mapping}
+
+
+def load_pyth_id_mappings(
+    force_refresh: bool = False
+) -> Tuple[Dict[str, Tuple[str, str]], Dict[str, Tuple[str, str]]]:
+    """
+    build_pyth_id_mappings() result for the Hermes feed catalog, from the disk-cached index.
+
+    Downloads the catalog only when the cached index is older than
+    settings.PYTH_CATALOG_TTL_HOURS and Hermes reports it changed.
+
+    Args:
+        force_refresh: Revalidate with Hermes even if the cached index is fresh
+
+    Returns:
+        tuple: (contract_mapping, symbol_mapping) - both empty if unavailable
+    """
+    index = load_catalog_index(
+        'pyth_feeds',
+        PYTH_FEEDS_URL,
+        PYTH_FEEDS_PARAMS,
+        build_index=_build_pyth_index,
+        ttl_seconds=settings.PYTH_CATALOG_TTL_HOURS * 3600,
+        force_refresh=force_refresh,
+    )
+    if not index:
+        return {}, {}
+    contract_mapping = {k: tuple(v) for k, v in index['contracts'].items()}
+    symbol_mapping = {k: tuple(v) for k, v in index['symbols'].items()}
+    return contract_mapping, symbol_mapping
+
+
 def match_tokens_to_pyth_ids(
     contract_mapping: Dict[str, Tuple[str, str]],
-    symbol_mapping: Dict[str, Tuple[str, str]]
+    symbol_mapping: Dict[str, Tuple[str, str]],
+    engine=None
 ) -> Dict[str, Tuple[str, str, str]]:
     """
     Match tokens from token_registry to Pyth IDs.
@@ -108,11 +148,12 @@ def match_tokens_to_pyth_ids(
     Args:
         contract_mapping: Dict mapping contract address to (pyth_id, symbol)
         symbol_mapping: Dict mapping symbol to (pyth_id, description)
+        engine: SQLAlchemy engine (default get_db_engine())
 
     Returns:
         dict: {token_contract: (pyth_id, match_type, matched_value)}
     """
-    engine = get_db_engine()
+    engine = engine if engine is not None else get_db_engine()
 
     query = """
     SELECT token_contract, symbol
@@ -123,24 +164,17 @@ def match_tokens_to_pyth_ids(
 
     df = pd.read_sql_query(query, engine)
 
-    matches = {}
-    contract_matches = 0
-    symbol_matches = 0
+    # Priority 1: Contract address match; Priority 2: Symbol match
+    by_contract = df['token_contract'].isin(contract_mapping.keys())
+    by_symbol = ~by_contract & df['symbol'].isin(symbol_mapping.keys())
+    contract_matches = int(by_contract.sum())
+    symbol_matches = int(by_symbol.sum())
 
-    for _, row in df.iterrows():
-        token_contract = row['token_contract']
-        symbol = row['symbol']
-
-        # Priority 1: Contract address match
-        if token_contract in contract_mapping:
-            pyth_id, matched_symbol = contract_mapping[token_contract]
-            matches[token_contract] = (pyth_id, 'contract', token_contract)
-            contract_matches += 1
-        # Priority 2: Symbol match
-        elif symbol in symbol_mapping:
-            pyth_id, description = symbol_mapping[symbol]
-            matches[token_contract] = (pyth_id, 'symbol', symbol)
-            symbol_matches += 1
+    matches = {}
+    for token_contract in df.loc[by_contract, 'token_contract']:
+        matches[token_contract] = (contract_mapping[token_contract][0], 'contract', token_contract)
+    for token_contract, symbol in zip(df.loc[by_symbol, 'token_contract'], df.loc[by_symbol, 'symbol']):
+        matches[token_contract] = (symbol_mapping[symbol][0], 'symbol', symbol)
 
     print(f"[INFO] Matched {len(matches)} tokens total:")
     print(f"  - {contract_matches} via contract address")
@@ -152,20 +186,24 @@ def match_tokens_to_pyth_ids(
 def update_token_registry(
     matches: Dict[str, Tuple[str, str, str]],
     force: bool = False,
-    dry_run: bool = False
+    dry_run: bool = False,
+    engine=None
 ) -> Dict[str, int]:
     """
     Update pyth_id field in token_registry for matched tokens.
 
+    All matches are written with one bulk UPDATE.
+
     Args:
         matches: Dict mapping token_contract to (pyth_id, match_type, matched_value)
         force: If True, update all tokens (overwrite existing IDs)
         dry_run: If True, show matches without updating database
+        engine: SQLAlchemy engine (default get_db_engine())
 
     Returns:
         Dict with counts: {'total': int, 'matched': int, 'updated': int, 'skipped': int}
     """
-    engine = get_db_engine()
+    engine = engine if engine is not None else get_db_engine()
 
     # Query tokens from database
     if force:
@@ -189,43 +227,28 @@ def update_token_registry(
     print(f"{'Symbol':<10} {'Match Type':<12} {'Matched Value':<30} {'Pyth ID (first 16 chars)':<20}")
     print("-"*100)
 
-    for idx, row in df.iterrows():
-        token_contract = row['token_contract']
-        db_symbol = row['symbol']
-
+    updates = {}
+    for token_contract, db_symbol in zip(df['token_contract'], df['symbol']):
         # Check if we have a match
         if token_contract in matches:
             pyth_id, match_type, matched_value = matches[token_contract]
+            updates[token_contract] = pyth_id
 
             # Show match info
             pyth_id_short = pyth_id[:16] + "..."
             matched_value_display = matched_value[:30] if len(matched_value) > 30 else matched_value
             print(f"{db_symbol:<10} {match_type:<12} {matched_value_display:<30} {pyth_id_short:<20}")
-
-            if not dry_run:
-                # Update database
-                try:
-                    update_query = text("""
-                    UPDATE token_registry
-                    SET pyth_id = :pyth_id
-                    WHERE token_contract = :token_contract
-                    """)
-
-                    with engine.connect() as conn:
-                        conn.execute(update_query, {
-                            'pyth_id': pyth_id,
-                            'token_contract': token_contract
-                        })
-                        conn.commit()
-
-                    updated += 1
-
-                except Exception as e:
-                    print(f"[ERROR] Failed to update {db_symbol}: {e}")
-                    skipped += 1
         else:
             skipped += 1
 
+    if not dry_run and updates:
+        try:
+            bulk_update_token_ids(engine, 'pyth_id', updates)
+            updated = len(updates)
+        except Exception as e:
+            print(f"[ERROR] Failed to update pyth_ids: {e}")
+            skipped += len(updates)
+
     print("="*100)
     print(f"\n[SUMMARY]")
     print(f"  Total tokens:   {total}")
@@ -277,7 +300,7 @@ def verify_updates():
     print("="*100)
 
 
-def populate_pyth_ids_auto(engine=None, dry_run=False, force=False):
+def populate_pyth_ids_auto(engine=None, dry_run=False, force=False, refresh_catalog=False):
     """
     Auto-populate pyth_id for tokens in token_registry.
 
@@ -287,41 +310,26 @@ def populate_pyth_ids_auto(engine=None, dry_run=False, force=False):
         engine: Optional SQLAlchemy engine. If None, will create one via get_db_engine()
         dry_run: If True, show matches without updating database
         force: If True, update all tokens (overwrite existing IDs)
+        refresh_catalog: If True, revalidate the cached feed catalog even if it is fresh
 
     Returns:
         int: Number of newly matched/updated tokens (0 if error or no matches)
     """
-    # Use provided engine or create one
-    if engine is None:
-        from dashboard.db_utils import get_db_engine as _get_db_engine
-        engine = _get_db_engine()
-
-    # Store original engine in module globals for update_token_registry to use
-    import dashboard.db_utils as db_utils
-    original_get_engine = db_utils.get_db_engine
-    db_utils.get_db_engine = lambda: engine
-
     try:
-        # Fetch price feeds from Pyth
-        feeds = fetch_pyth_price_feeds()
-
-        if not feeds:
-            return 0
-
-        # Build mappings
-        contract_mapping, symbol_mapping = build_pyth_id_mappings(feeds)
+        # Contract / symbol mappings (disk-cached feed catalog index)
+        contract_mapping, symbol_mapping = load_pyth_id_mappings(force_refresh=refresh_catalog)
 
         if not contract_mapping and not symbol_mapping:
             return 0
 
         # Match tokens to Pyth IDs
-        matches = match_tokens_to_pyth_ids(contract_mapping, symbol_mapping)
+        matches = match_tokens_to_pyth_ids(contract_mapping, symbol_mapping, engine=engine)
 
         if not matches:
             return 0
 
         # Update token registry
-        results = update_token_registry(matches, force=force, dry_run=dry_run)
+        results = update_token_registry(matches, force=force, dry_run=dry_run, engine=engine)
 
         return results.get('updated', 0) if not dry_run else results.get('matched', 0)
 
@@ -329,10 +337,6 @@ def populate_pyth_ids_auto(engine=None, dry_run=False, force=False):
         print(f"[ERROR] populate_pyth_ids_auto failed: {e}")
         return 0
 
-    finally:
-        # Restore original get_db_engine function
-        db_utils.get_db_engine = original_get_engine
-
 
 def main():
     """Main entry point."""
@@ -354,6 +358,11 @@ def main():
         action='store_true',
         help='Only verify current pyth_id population (no updates)'
     )
+    parser.add_argument(
+        '--refresh-catalog',
+        action='store_true',
+        help='Revalidate the cached Pyth feed catalog even if it is within its TTL'
+    )
 
     args = parser.parse_args()
 
@@ -362,18 +371,11 @@ def main():
         verify_updates()
         sys.exit(0)
 
-    # Fetch price feeds from Pyth
-    feeds = fetch_pyth_price_feeds()
-
-    if not feeds:
-        print("[ERROR] Failed to fetch price feeds. Exiting.")
-        sys.exit(1)
-
-    # Build mappings
-    contract_mapping, symbol_mapping = build_pyth_id_mappings(feeds)
+    # Contract / symbol mappings (disk-cached feed catalog index)
+    contract_mapping, symbol_mapping = load_pyth_id_mappings(force_refresh=args.refresh_catalog)
 
     if not contract_mapping and not symbol_mapping:
-        print("[WARNING] No mappings found in Pyth data")
+        print("[WARNING] No mappings found in Pyth data (or feed catalog unavailable)")
         sys.exit(1)
 
     # Match tokens to Pyth IDs
@@ -164,3 +164,45 @@ def to_datetime_utc(seconds: int) -> datetime:
         return datetime.fromtimestamp(seconds, tz=timezone.utc)
     except (OSError, OverflowError, ValueError) as e:
         raise ValueError(f"Failed to convert {seconds} to datetime: {e}")
+
+
+def series_to_seconds(values) -> "pd.Series":
+    """
+    Vectorized to_seconds() for a whole column of timestamps.
+
+    Accepts the column shapes that come back from pd.read_sql on either backend:
+    "YYYY-MM-DD HH:MM:SS" strings (SQLite), naive datetime64 (PostgreSQL TIMESTAMP),
+    tz-aware datetime64, or already-numeric Unix seconds.
+    Naive values are treated as UTC, matching to_seconds().
+    FAILS LOUDLY if any value is missing or unparseable.
+
+    Args:
+        values: pandas Series (or array-like) of timestamps
+
+    Returns:
+        pandas Series of Unix seconds (int64), same index as the input
+
+    Raises:
+        ValueError: If any value is missing or cannot be parsed
+    """
+    import pandas as pd
+
+    series = values if isinstance(values, pd.Series) else pd.Series(values)
+
+    if series.empty:
+        return series.astype('int64')
+
+    if pd.api.types.is_numeric_dtype(series):
+        if series.isna().any():
+            raise ValueError("Cannot convert NaN to seconds - timestamp is missing")
+        return series.astype('int64')
+
+    try:
+        parsed = pd.to_datetime(series, utc=True, format='ISO8601')
+    except (ValueError, TypeError) as e:
+        raise ValueError(f"Cannot parse timestamp column: {e}")
+
+    if parsed.isna().any():
+        raise ValueError("Cannot convert None/NaT to seconds - timestamp is required")
+
+    return (parsed - pd.Timestamp(0, tz='UTC')) // pd.Timedelta(seconds=1)